@@ -0,0 +1,150 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+# One stage between the analysers and the consumers of their InfoDicts. The background timer reads
+# the same InfoDict again and again until the engine reaches a new depth; the pipeline turns each
+# distinct InfoDict into one read-only AnalysisResult, with score and SAN worked out once, and
+# remembers what every consumer (web engine line, web tutor line, clock) got last, so ticks where
+# nothing changed are not sent again.
+
+import logging
+
+import chess  # type: ignore
+from chess.engine import InfoDict
+
+from picotutor import PicoTutor
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 64  # results kept for the analysed fen, a new fen starts over
+
+
+class AnalysisResult(object):
+    """Read-only analysis of one InfoDict, shared by all consumers."""
+
+    __slots__ = ("key", "fen", "depth", "multipv", "move", "score", "mate", "pv", "_san")
+
+    def __init__(self, key: tuple, fen: str, depth: int | None, multipv: int, pv: tuple, move, score, mate):
+        self.fen = fen
+        self.depth = depth
+        self.multipv = multipv
+        self.pv = pv
+        self.move = move  # first pv move, chess.Move.null() if there is none
+        self.score = score  # from white's view, None if the InfoDict has no score yet
+        self.mate = mate  # 0 if no mate
+        self._san: tuple | None = None
+        self.key = key  # set last, the result is read-only from here on
+
+    @staticmethod
+    def key_of(info: InfoDict, fen: str) -> tuple:
+        """Two InfoDicts with the same key give the same result."""
+        (move, score, mate) = PicoTutor.get_score(info)
+        pv = tuple(info.get("pv") or ())
+        return (fen, info.get("depth"), info.get("multipv", 1), hash(pv), score, mate), pv, move, score, mate
+
+    def san(self) -> list:
+        """PV in SAN from the analysed fen, in UCI if the fen can not be read by chess.Board."""
+        if self._san is None:
+            object.__setattr__(self, "_san", tuple(self._pv_text()))
+        return list(self._san)
+
+    def _pv_text(self) -> list:
+        # SAN is worked out here so the web client can render figurine notation without
+        # re-parsing UCI+FEN through chess.js, which can silently fail
+        pv_text = []
+        if self.pv and self.fen:
+            try:
+                san_board = chess.Board(self.fen)
+                for move in self.pv:
+                    if not move or move == chess.Move.null():
+                        break
+                    try:
+                        pv_text.append(san_board.san(move))
+                        san_board.push(move)
+                    except (ValueError, AssertionError):
+                        break
+            except Exception:
+                pass
+        if not pv_text:
+            # raw UCI, the web client will attempt chess.js parsing
+            pv_text = [move.uci() for move in self.pv if move and move != chess.Move.null()]
+        return pv_text
+
+    def web_payload(self, source: str, suppress_engine_line: bool) -> dict:
+        """WEB_ANALYSIS payload for the engine or tutor line of the web client."""
+        return {
+            "depth": self.depth,
+            "score": self.score,
+            "mate": self.mate,
+            "pv": self.san(),
+            "fen": self.fen,
+            "source": source,
+            "suppress_engine_line": suppress_engine_line,
+        }
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "key"):
+            raise AttributeError("AnalysisResult is read-only")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return "AnalysisResult(depth {}, score {}, mate {}, {} pv moves)".format(
+            self.depth, self.score, self.mate, len(self.pv)
+        )
+
+
+class AnalysisPipeline(object):
+    """Turns InfoDicts into shared AnalysisResults and tracks what each consumer has been sent."""
+
+    def __init__(self):
+        self._fen = ""
+        self._results: dict[tuple, AnalysisResult] = {}
+        self._published: dict[str, tuple] = {}
+        self.sent = 0  # number of results published, grows when a consumer gets something new
+
+    def result(self, info: InfoDict | None, fen: str) -> AnalysisResult | None:
+        """Result of info analysed for fen, the same object for an unchanged InfoDict."""
+        if not info:
+            return None
+        key, pv, move, score, mate = AnalysisResult.key_of(info, fen)
+        if fen != self._fen or len(self._results) >= MAX_RESULTS:
+            self._fen = fen
+            self._results.clear()
+        result = self._results.get(key)
+        if result is None:
+            result = AnalysisResult(key, fen, info.get("depth"), info.get("multipv", 1), pv, move, score, mate)
+            self._results[key] = result
+        return result
+
+    def publish(self, consumer: str, result: AnalysisResult, *extra) -> bool:
+        """True if consumer has not been sent result (with extra) yet - the caller sends it now."""
+        mark = (result.key,) + extra
+        if self._published.get(consumer) == mark:
+            return False
+        self._published[consumer] = mark
+        self.sent += 1
+        return True
+
+    def forget(self, *consumers: str):
+        """Send the next result again to consumers, to all consumers if none given."""
+        if consumers:
+            for consumer in consumers:
+                self._published.pop(consumer, None)
+        else:
+            self._published.clear()
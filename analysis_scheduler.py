@@ -0,0 +1,97 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+# Adaptive timing of the background analysis. The analysis used to be read once a second whether or
+# not anybody looked at it. The scheduler reads it every second while something new comes in, backs
+# off while the engine's depth stays the same or its search limit is reached, is woken early when an
+# analyser reaches a new depth, and pauses - engine analyser included - while no display uses it.
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from utilities import AsyncRepeatingTimer
+
+logger = logging.getLogger(__name__)
+
+WOKEN_INTERVAL = 0.25  # earliest tick after an analyser reported a new depth
+BUSY_INTERVAL = 1.0  # interval while the analysis changes
+QUIET_INTERVAL = 4.0  # longest interval while the analysis stays the same
+IDLE_INTERVAL = 4.0  # interval of the check for a display while paused
+BACK_OFF = 2.0  # interval growth per tick without news
+
+
+class AnalysisScheduler(object):
+    """Runs the background analysis on an adaptive AsyncRepeatingTimer."""
+
+    def __init__(
+        self,
+        analyse: Callable[[bool], Awaitable[bool]],
+        watched: Callable[[], bool],
+        pause: Callable[[], Awaitable[None]],
+        loop: asyncio.AbstractEventLoop,
+    ):
+        """
+        :param analyse: reads and sends the analysis, gets True for a tick that was woken early
+                        and returns True if it sent something new or needs the next tick soon
+        :param watched: True while a display or mode uses the analysis
+        :param pause: stops the analysers when the last display went away
+        """
+        self.analyse = analyse
+        self.watched = watched
+        self.pause = pause
+        self.paused = False
+        self.interval = BUSY_INTERVAL
+        self._woken = False
+        self.timer = AsyncRepeatingTimer(BUSY_INTERVAL, self._tick, loop=loop)
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def is_running(self) -> bool:
+        return self.timer.is_running()
+
+    def wake(self):
+        """Tick soon - an analyser reached a new depth."""
+        if self.paused or self._woken or not self.timer.is_running():
+            return
+        self._woken = True
+        self.timer.set_interval(WOKEN_INTERVAL)
+
+    async def _tick(self):
+        woken, self._woken = self._woken, False
+        if not self.watched():
+            if not self.paused:
+                logger.debug("no display uses the analysis - pausing it")
+                self.paused = True
+                await self.pause()
+            self.timer.set_interval(IDLE_INTERVAL)
+            return
+        if self.paused:
+            logger.debug("analysis is used again - resuming it")
+            self.paused = False
+            self.interval = BUSY_INTERVAL
+        if await self.analyse(woken):
+            self.interval = BUSY_INTERVAL
+        elif not woken:
+            self.interval = min(self.interval * BACK_OFF, QUIET_INTERVAL)
+        self.timer.set_interval(self.interval)
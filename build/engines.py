@@ -16,9 +16,17 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
+import argparse
 import sys
 import os
-from uci.write import write_engine_ini
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
-write_engine_ini()
+from uci.write import PROBE_TIMEOUT, write_engine_ini  # noqa: E402
+
+parser = argparse.ArgumentParser(description="Create engines.ini from the engines folder of this machine")
+parser.add_argument("--path", help="engines folder, default engines/<machine>")
+parser.add_argument("--jobs", type=int, help="engines started at the same time, default up to 4")
+parser.add_argument("--timeout", type=float, default=PROBE_TIMEOUT, help="seconds for one engine to start")
+parser.add_argument("--no-cache", action="store_true", help="start every engine, also the unchanged ones")
+args = parser.parse_args()
+write_engine_ini(args.path, jobs=args.jobs, timeout=args.timeout, use_cache=not args.no_cache)
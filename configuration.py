@@ -116,6 +116,11 @@ class Configuration:
             help="logging level",
         )
         self.parser.add_argument("-lf", "--log-file", type=str, help="log to the given file")
+        self.parser.add_argument(
+            "--profile-startup",
+            action="store_true",
+            help="log an import-time and init-phase breakdown of the startup",
+        )
         self.parser.add_argument(
             "-pf", "--pgn-file", type=str, help="pgn file used to store the games", default="games.pgn"
         )
@@ -368,6 +373,20 @@ class Configuration:
             default="off",
             help="show game comments based on specific engines (=single) or in general (=all). Default value is off",
         )
+        self.parser.add_argument(
+            "-tbp",
+            "--tablebase-path",
+            type=str,
+            default="tablebases/syzygy",
+            help="folder of the Syzygy tablebases used by PicoTutor in 3-5 piece endings, a relative path is below "
+            "the picochess folder, default is tablebases/syzygy",
+        )
+        self.parser.add_argument(
+            "-tbad",
+            "--tablebase-adjudicate",
+            action="store_true",
+            help="end a game as won or drawn as soon as the tablebases know the result, default is off",
+        )
         self.parser.add_argument(
             "-tbh",
             "--tutor-brain-hint-display",
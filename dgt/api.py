@@ -19,6 +19,8 @@
 class BaseClass(object):
     """Used for creating event, message, dgt classes."""
 
+    __slots__ = ("_type",)
+
     def __init__(self, classtype):
         self._type = classtype
 
@@ -26,21 +28,29 @@ class BaseClass(object):
         return self._type
 
     def __hash__(self):
-        return hash(str(self.__class__) + ": " + str(self.__dict__))
+        values = []
+        for name in self.__slots__:
+            value = getattr(self, name, None)
+            try:
+                values.append(hash(value))
+            except TypeError:  # devs set, lists, dicts, boards
+                values.append(hash(frozenset(value)) if isinstance(value, set) else hash(repr(value)))
+        return hash((self.__class__, tuple(values)))
 
 
 def ClassFactory(name, argnames, BaseClass=BaseClass):
     """Class factory for generating."""
+    valid_names = frozenset(argnames)
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             # here, the argnames variable is the one passed to the ClassFactory call
-            if key not in argnames:
+            if key not in valid_names:
                 raise TypeError("argument {} not valid for {}".format(key, self.__class__.__name__))
             setattr(self, key, value)
         BaseClass.__init__(self, name)
 
-    newclass = type(name, (BaseClass,), {"__init__": __init__})
+    newclass = type(name, (BaseClass,), {"__init__": __init__, "__slots__": tuple(argnames)})
     return newclass
 
 
@@ -218,11 +228,40 @@ class Dgt:
 
     DISPLAY_MOVE = ClassFactory(
         DgtApi.DISPLAY_MOVE,
-        ["move", "fen", "uci960", "side", "lang", "capital", "long", "beep", "maxtime", "devs", "wait", "ld", "rd"],
+        [
+            "move",
+            "fen",
+            "uci960",
+            "side",
+            "lang",
+            "capital",
+            "long",
+            "beep",
+            "maxtime",
+            "devs",
+            "wait",
+            "ld",
+            "rd",
+            "variant",
+            "analysis_update",
+        ],
     )
     DISPLAY_TEXT = ClassFactory(
         DgtApi.DISPLAY_TEXT,
-        ["web_text", "large_text", "medium_text", "small_text", "beep", "maxtime", "devs", "wait", "ld", "rd"],
+        [
+            "web_text",
+            "large_text",
+            "medium_text",
+            "small_text",
+            "beep",
+            "maxtime",
+            "devs",
+            "wait",
+            "ld",
+            "rd",
+            "variant",
+            "analysis_update",
+        ],
     )
     DISPLAY_TIME = ClassFactory(DgtApi.DISPLAY_TIME, ["wait", "force", "devs"])
     LIGHT_CLEAR = ClassFactory(DgtApi.LIGHT_CLEAR, ["devs"])
@@ -271,7 +310,7 @@ class Message:
     INTERACTION_MODE = ClassFactory(MessageApi.INTERACTION_MODE, ["mode", "mode_text", "show_ok"])
     PLAY_MODE = ClassFactory(MessageApi.PLAY_MODE, ["play_mode", "play_mode_text"])
     SET_PLAYMODE = ClassFactory(MessageApi.SET_PLAYMODE, ["play_mode"])
-    START_NEW_GAME = ClassFactory(MessageApi.START_NEW_GAME, ["game", "newgame"])
+    START_NEW_GAME = ClassFactory(MessageApi.START_NEW_GAME, ["game", "newgame", "variant"])
     COMPUTER_MOVE_DONE = ClassFactory(MessageApi.COMPUTER_MOVE_DONE, [])
     SEARCH_STARTED = ClassFactory(MessageApi.SEARCH_STARTED, [])
     SEARCH_STOPPED = ClassFactory(MessageApi.SEARCH_STOPPED, [])
@@ -281,7 +320,7 @@ class Message:
     CLOCK_TIME = ClassFactory(MessageApi.CLOCK_TIME, ["time_white", "time_black", "low_time"])
     USER_MOVE_DONE = ClassFactory(MessageApi.USER_MOVE_DONE, ["move", "fen", "turn", "game"])
     TUTOR_MOVE_REVEAL = ClassFactory(MessageApi.TUTOR_MOVE_REVEAL, ["move"])
-    GAME_ENDS = ClassFactory(MessageApi.GAME_ENDS, ["tc_init", "result", "play_mode", "game", "mode"])
+    GAME_ENDS = ClassFactory(MessageApi.GAME_ENDS, ["tc_init", "result", "play_mode", "game", "mode", "pgn_filename"])
 
     SYSTEM_INFO = ClassFactory(MessageApi.SYSTEM_INFO, ["info"])
     STARTUP_INFO = ClassFactory(MessageApi.STARTUP_INFO, ["info"])
@@ -0,0 +1,215 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Message dispatch throughput benchmark. Run from the picochess folder:
+#   python3 -m dgt.bench [--trace logs/picochess.log] [--repeat 5]
+# The trace is the sequence of MSG_* names found in the file, so a debug picochess.log works as a
+# recorded trace. Without one a built-in engine game is replayed. Every message is shown to stand-ins
+# of the four message displays, once broadcast to all of them and once through their subscription filters.
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional
+
+import chess  # type: ignore
+
+from dgt.api import Dgt, Message
+from dgt.util import Mode, PlayMode
+import utilities
+from utilities import DisplayMsg
+
+MESSAGE_CLASSES: Dict[str, type] = {cls.__name__: cls for cls in vars(Message).values() if isinstance(cls, type)}
+
+
+def builtin_trace(moves: int = 40) -> List[str]:
+    """Message names of an engine game with analysis and a running clock."""
+    trace = ["MSG_STARTUP_INFO", "MSG_ENGINE_READY", "MSG_START_NEW_GAME"]
+    for _ in range(moves):
+        trace += ["MSG_USER_MOVE_DONE", "MSG_SEARCH_STARTED"]
+        for _ in range(12):
+            trace += ["MSG_NEW_DEPTH", "MSG_NEW_SCORE", "MSG_NEW_PV", "MSG_WEB_ANALYSIS", "MSG_CLOCK_TIME"]
+        trace += ["MSG_COMPUTER_MOVE", "MSG_SEARCH_STOPPED", "MSG_DGT_FEN", "MSG_COMPUTER_MOVE_DONE"]
+    trace += ["MSG_GAME_ENDS"]
+    return trace
+
+
+def read_trace(file_name: str) -> List[str]:
+    """All known MSG_* names in the file, in order."""
+    with open(file_name, encoding="utf-8", errors="replace") as trace_file:
+        names = re.findall(r"\bMSG_[A-Z0-9_]+\b", trace_file.read())
+    return [name for name in names if name in MESSAGE_CLASSES]
+
+
+def sample_message(name: str, game: chess.Board):
+    """A message of the class with realistic field values."""
+    move = game.peek()
+    values = {
+        "game": game,
+        "move": move,
+        "ponder": move,
+        "pv": list(game.move_stack[-8:]),
+        "fen": game.board_fen(),
+        "turn": game.turn,
+        "score": 35,
+        "mate": None,
+        "depth": 18,
+        "mode": Mode.NORMAL,
+        "play_mode": PlayMode.USER_WHITE,
+        "info": {"engine_name": "Stockfish", "user_name": "Player", "level_text": None, "level_name": ""},
+        "analysis": {"depth": 18, "score": 35, "pv": [move.uci() for move in game.move_stack[-8:]]},
+        "time_left": 300,
+        "time_right": 300,
+        "devs": {"ser", "i2c", "web"},
+        "wait": False,
+        "newgame": True,
+        "tc_init": {"mode": 0, "fixed": 1},
+        "eng": {"elo": 2000},
+        "engine_name": "Stockfish",
+        "has_levels": True,
+        "text": Dgt.DISPLAY_TEXT(web_text="text", large_text="text", medium_text="text", small_text="text"),
+    }
+    cls = MESSAGE_CLASSES[name]
+    return cls(**{slot: values.get(slot) for slot in cls.__slots__})
+
+
+class Subscriber(DisplayMsg):
+    """Queue-only stand-in for a message display."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, message_types):
+        super(Subscriber, self).__init__(loop)
+        self.message_types = message_types
+
+
+def display_subscriptions() -> Dict[str, Optional[frozenset]]:
+    """Subscription sets of the real message displays."""
+    from dgt.display import DgtDisplay
+    from pgn import PgnDisplay
+    from picotalker import PicoTalkerDisplay
+    from server import WebDisplay
+
+    return {cls.__name__: cls.message_types for cls in (DgtDisplay, WebDisplay, PicoTalkerDisplay, PgnDisplay)}
+
+
+async def show_trace(messages: list, subscriptions: Dict[str, Optional[frozenset]], filtered: bool) -> dict:
+    """Show all messages and drain the queues, return throughput and queued copies per display."""
+    utilities.msgdisplay_devices.clear()
+    loop = asyncio.get_running_loop()
+    subscribers = {name: Subscriber(loop, types if filtered else None) for name, types in subscriptions.items()}
+    start = time.perf_counter()
+    for message in messages:
+        await DisplayMsg.show(message)
+        for subscriber in subscribers.values():
+            while not subscriber.msg_queue.empty():
+                subscriber.msg_queue.get_nowait()
+    seconds = time.perf_counter() - start
+    queued = {name: 0 for name in subscribers}
+    for message in messages:
+        for name, subscriber in subscribers.items():
+            queued[name] += subscriber.accepts(message)
+    utilities.msgdisplay_devices.clear()
+    return {"seconds": seconds, "messages_per_second": len(messages) / seconds if seconds else 0, "queued": queued}
+
+
+def display_commands(game: chess.Board, count: int) -> list:
+    """Clock text and move commands like the ones the Dispatcher hashes to skip repeated displays."""
+    commands = []
+    for index in range(count):
+        text = "ok {}".format(index % 10)
+        commands.append(
+            Dgt.DISPLAY_TEXT(
+                web_text=text,
+                large_text=text,
+                medium_text=text,
+                small_text=text,
+                beep=False,
+                maxtime=1,
+                devs={"ser", "i2c", "web"},
+                wait=False,
+            )
+        )
+        commands.append(
+            Dgt.DISPLAY_MOVE(
+                move=game.peek(),
+                fen=game.fen(),
+                side=0,
+                maxtime=0,
+                beep=False,
+                devs={"ser", "i2c", "web"},
+                wait=False,
+                uci960=False,
+                lang="en",
+                capital=False,
+                long=False,
+            )
+        )
+    return commands
+
+
+def hash_rate(commands: list, repeat: int = 3) -> dict:
+    """Commands hashed per second with the slot hash and the former str(__dict__) hash."""
+
+    def dict_hash(message):
+        fields = {slot: getattr(message, slot) for slot in message.__slots__ if hasattr(message, slot)}
+        return hash(str(message.__class__) + ": " + str(fields))
+
+    rates = {}
+    for label, hasher in (("slots", hash), ("dict_str", dict_hash)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for command in commands:
+                hasher(command)
+        rates[label] = repeat * len(commands) / (time.perf_counter() - start)
+    return rates
+
+
+def run_benchmark(trace: List[str], repeat: int = 5) -> dict:
+    game = chess.Board()
+    for uci in ("e2e4", "e7e5", "g1f3", "b8c6", "f1b5", "a7a6", "b5a4", "g8f6", "e1g1", "f8e7"):
+        game.push_uci(uci)
+    messages = [sample_message(name, game) for name in trace] * repeat
+    subscriptions = display_subscriptions()
+    return {
+        "messages": len(messages),
+        "broadcast": asyncio.run(show_trace(messages, subscriptions, filtered=False)),
+        "subscribed": asyncio.run(show_trace(messages, subscriptions, filtered=True)),
+        "hash": hash_rate(display_commands(game, len(messages) // 2)),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark message dispatch to the display queues")
+    parser.add_argument("--trace", help="file with MSG_* names, e.g. a debug picochess.log")
+    parser.add_argument("--repeat", type=int, default=5, help="replay the trace this many times")
+    args = parser.parse_args(argv)
+    trace = read_trace(args.trace) if args.trace else builtin_trace()
+    if not trace:
+        parser.error("no MSG_* names found in " + args.trace)
+    report = run_benchmark(trace, args.repeat)
+    print("{} messages".format(report["messages"]))
+    for mode in ("broadcast", "subscribed"):
+        result = report[mode]
+        queued = ", ".join("{} {}".format(name, count) for name, count in result["queued"].items())
+        print("{:10} {:>9.0f} msg/s  queued: {}".format(mode, result["messages_per_second"], queued))
+    rates = report["hash"]
+    print("{:10} {:>9.0f} cmd/s  str(__dict__) hash: {:.0f} cmd/s".format("hash", rates["slots"], rates["dict_str"]))
+
+
+if __name__ == "__main__":
+    main()
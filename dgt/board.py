@@ -175,7 +175,7 @@ class DgtBoard(EBoard):
         if not self.serial:
             return False
         mes = message[3] if message[0].value == DgtCmd.DGT_CLOCK_MESSAGE.value else message[0]
-        if not mes == DgtCmd.DGT_RETURN_SERIALNR:
+        if not mes == DgtCmd.DGT_RETURN_SERIALNR and logger.isEnabledFor(logging.DEBUG):
             logger.debug("(ser) board put [%s] length: %i", mes, len(message))
             if mes.value == DgtClk.DGT_CMD_CLOCK_ASCII.value:
                 logger.debug("sending text [%s] to (ser) clock", "".join([chr(elem) for elem in message[4:12]]))
@@ -481,10 +481,11 @@ class DgtBoard(EBoard):
                 0x0F: "&",
                 0x00: ".",
             }
-            board = ""
-            for character in message:
-                board += piece_to_char[character & 0x0F]
-            logger.debug("\n" + "\n".join(board[0 + i: 8 + i] for i in range(0, len(board), 8)))  # Show debug board
+            if logger.isEnabledFor(logging.DEBUG):
+                board = ""
+                for character in message:
+                    board += piece_to_char[character & 0x0F]
+                logger.debug("\n" + "\n".join(board[0 + i: 8 + i] for i in range(0, len(board), 8)))  # Show debug board
             # Create fen from board
             fen = ""
             empty = 0
@@ -21,7 +21,6 @@ import logging
 import copy
 import asyncio
 import chess  # type: ignore
-import chess.variant  # type: ignore
 from pgn import ModeInfo
 from utilities import DisplayMsg, Observable, DispatchDgt, AsyncRepeatingTimer, write_picochess_ini, get_window_command
 from timecontrol import TimeControl
@@ -31,6 +30,7 @@ from dgt.api import Dgt, Event, Message
 from dgt.board import Rev2Info
 from dgt.translate import DgtTranslate
 import pairing_ipc
+from variants import VARIANT_BOARDS, attach_snapshot, copy_variant_info, snapshot_of, variant_fen
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +40,86 @@ class DgtDisplay(DisplayMsg):
 
     ANALYSIS_MESSAGE_TYPES = (Message.NEW_DEPTH, Message.NEW_PV, Message.NEW_SCORE)
 
+    # subscription filter: the messages _process_message handles
+    message_types = frozenset(
+        {
+            Message.ALTERNATIVE_MOVE,
+            Message.ALTMOVES,
+            Message.BATTERY,
+            Message.BOOK_MOVE,
+            Message.CLOCK_START,
+            Message.CLOCK_STOP,
+            Message.CLOCK_TIME,
+            Message.COMPUTER_MOVE,
+            Message.COMPUTER_MOVE_DONE,
+            Message.CONTLAST,
+            Message.DGT_BUTTON,
+            Message.DGT_CLOCK_TIME,
+            Message.DGT_CLOCK_VERSION,
+            Message.DGT_EBOARD_VERSION,
+            Message.DGT_FEN,
+            Message.DGT_JACK_CONNECTED_ERROR,
+            Message.DGT_NO_CLOCK_ERROR,
+            Message.DGT_NO_EBOARD_ERROR,
+            Message.DGT_SERIAL_NR,
+            Message.ENGINE_FAIL,
+            Message.ENGINE_NAME,
+            Message.ENGINE_READY,
+            Message.ENGINE_SETUP,
+            Message.ENGINE_STARTUP,
+            Message.EXIT_MENU,
+            Message.GAME_ENDS,
+            Message.INTERACTION_MODE,
+            Message.IP_INFO,
+            Message.LEVEL,
+            Message.LOST_ON_TIME,
+            Message.MOVE_RETRY,
+            Message.MOVE_WRONG,
+            Message.NEW_DEPTH,
+            Message.NEW_PV,
+            Message.NEW_SCORE,
+            Message.ONLINE_FAILED,
+            Message.ONLINE_LOGIN,
+            Message.ONLINE_NAMES,
+            Message.ONLINE_NO_OPPONENT,
+            Message.ONLINE_USER_FAILED,
+            Message.OPENING_BOOK,
+            Message.PGN_GAME_END,
+            Message.PICOCOACH,
+            Message.PICOCOMMENT,
+            Message.PICOEXPLORER,
+            Message.PICOTUTOR_MSG,
+            Message.PICOWATCHER,
+            Message.PLAY_MODE,
+            Message.POSITION_FAIL,
+            Message.PROMOTION_DONE,
+            Message.READ_GAME,
+            Message.REMOTE_FAIL,
+            Message.REMOTE_ROOM,
+            Message.RESTORE_GAME,
+            Message.REVIEW_MOVE_DONE,
+            Message.RSPEED,
+            Message.SAVE_GAME,
+            Message.SEARCH_STARTED,
+            Message.SEARCH_STOPPED,
+            Message.SEEKING,
+            Message.SET_NOBOOK,
+            Message.SET_PLAYMODE,
+            Message.SHOW_ENGINENAME,
+            Message.SHOW_TEXT,
+            Message.STARTUP_INFO,
+            Message.START_NEW_GAME,
+            Message.SWITCH_SIDES,
+            Message.TAKE_BACK,
+            Message.TIMECONTROL_CHECK,
+            Message.TIME_CONTROL,
+            Message.TUTOR_MOVE_REVEAL,
+            Message.UPDATE_PICO,
+            Message.USER_MOVE_DONE,
+            Message.WRONG_FEN,
+        }
+    )
+
     def __init__(
         self,
         dgttranslate: DgtTranslate,
@@ -424,7 +504,8 @@ class DgtDisplay(DisplayMsg):
         logger.debug("(%s) clock handle button 4 press", dev)
         if self._inside_updt_menu():
             tag = self.dgtmenu.updt_down(dev)
-            await Observable.fire(Event.UPDATE_PICO(tag=tag))
+            if tag:
+                await Observable.fire(Event.UPDATE_PICO(tag=tag))
         else:
             text = await self.dgtmenu.main_down()  # button4 can exit the menu, so check
             if text:
@@ -838,7 +919,7 @@ class DgtDisplay(DisplayMsg):
         """Determine variant name and return correct FEN for variant boards.
 
         For atomic chess, the standard chess.Board does not track explosions,
-        so we replay all moves on an AtomicBoard to get the correct FEN.
+        the FEN is taken from the variant snapshot of the game (see variants.py).
         The variant is detected from (in order):
         1. game._variant_name attribute (set by picochess.game_copy())
         2. self._current_variant (instance state, set via Message attributes)
@@ -864,46 +945,13 @@ class DgtDisplay(DisplayMsg):
         elif class_name == "AntichessBoard":
             return "antichess", game.fen()
 
-        # For atomic variant with a standard chess.Board, replay on AtomicBoard
-        if variant_name == "atomic" and game.move_stack:
-            try:
-                atm = chess.variant.AtomicBoard()
-                for move in game.move_stack:
-                    atm.push(move)
-                return variant_name, atm.fen()
-            except Exception as exc:
-                logger.warning("_variant_fen_from_game: atomic replay failed: %s", exc)
-
-        # For 3check variant with a standard chess.Board, replay on ThreeCheckBoard
-        # to include the check-count suffix (e.g. +3+2) in the FEN.
-        if variant_name == "3check" and game.move_stack:
-            try:
-                tcb = chess.variant.ThreeCheckBoard()
-                for move in game.move_stack:
-                    tcb.push(move)
-                return variant_name, tcb.fen()
-            except Exception as exc:
-                logger.warning("_variant_fen_from_game: 3check replay failed: %s", exc)
-
-        # For racingkings variant with a standard chess.Board, replay on RacingKingsBoard
-        if variant_name == "racingkings" and game.move_stack:
-            try:
-                rkb = chess.variant.RacingKingsBoard()
-                for move in game.move_stack:
-                    rkb.push(move)
-                return variant_name, rkb.fen()
-            except Exception as exc:
-                logger.warning("_variant_fen_from_game: racingkings replay failed: %s", exc)
-
-        # For antichess variant with a standard chess.Board, replay on AntichessBoard
-        if variant_name == "antichess" and game.move_stack:
-            try:
-                ach = chess.variant.AntichessBoard()
-                for move in game.move_stack:
-                    ach.push(move)
-                return variant_name, ach.fen()
-            except Exception as exc:
-                logger.warning("_variant_fen_from_game: antichess replay failed: %s", exc)
+        # For a variant with a standard chess.Board use the variant snapshot attached by
+        # picochess.game_copy(), the move_stack is only replayed for a copy without one.
+        # 3check needs it for the check-count suffix (e.g. +3+2) in the FEN.
+        if variant_name in VARIANT_BOARDS and game.move_stack:
+            fen = variant_fen(game, variant_name)
+            if fen is not None:
+                return variant_name, fen
 
         return variant_name or "chess", game.fen()
 
@@ -925,12 +973,10 @@ class DgtDisplay(DisplayMsg):
             self.play_fen = game_fen
             self.play_turn = message.game.turn
         if ponder:
-            game_copy = message.game.copy()
-            # Preserve _variant_name which chess.Board.copy() does not copy
-            vn = getattr(message.game, '_variant_name', None)
-            if vn:
-                game_copy._variant_name = vn
+            game_copy = copy_variant_info(message.game, message.game.copy())
+            snapshot = snapshot_of(game_copy)
             game_copy.push(move)
+            attach_snapshot(game_copy, snapshot.after(move) if snapshot is not None else None)
             _, hint_fen = self._variant_fen_from_game(game_copy)
             self.hint_move = ponder
             self.hint_fen = hint_fen
@@ -1397,11 +1443,9 @@ class DgtDisplay(DisplayMsg):
 
         elif isinstance(message, Message.TAKE_BACK):
             self.take_back_move: chess.Move = chess.Move.null()
-            game_copy: chess.Board = message.game.copy()
-            # Preserve _variant_name which chess.Board.copy() does not copy
-            vn = getattr(message.game, '_variant_name', None)
-            if vn:
-                game_copy._variant_name = vn
+            # keep _variant_name which chess.Board.copy() does not copy, the snapshot
+            # no longer matches after the pop below and the FEN is replayed
+            game_copy: chess.Board = copy_variant_info(message.game, message.game.copy())
 
             await self.force_leds_off()
             self._reset_moves_and_score()
@@ -1430,6 +1474,7 @@ class DgtDisplay(DisplayMsg):
                     capital=self.dgttranslate.capital,
                     long=True,
                 )  # molli: for take back display use long notation
+                vn = getattr(game_copy, "_variant_name", None)
                 if vn:
                     text.variant = vn
                 text.wait = True
@@ -1888,7 +1933,8 @@ class DgtDisplay(DisplayMsg):
                 message = await self.msg_queue.get()
                 # message = self._grab_only_latest(message)
                 if (
-                    not isinstance(message, Message.DGT_SERIAL_NR)
+                    logger.isEnabledFor(logging.DEBUG)
+                    and not isinstance(message, Message.DGT_SERIAL_NR)
                     and not isinstance(message, Message.DGT_CLOCK_TIME)
                     and not isinstance(message, Message.CLOCK_TIME)
                     and not isinstance(message, Message.NEW_DEPTH)
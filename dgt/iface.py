@@ -15,20 +15,86 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import functools
 import logging
 import asyncio
 
 from chess import Board  # type: ignore
 import chess.variant  # type: ignore
-from utilities import DisplayDgt
+from utilities import DisplayDgt, handles
 from pgn import ModeInfo
 from dgt.util import ClockSide
 from dgt.api import Dgt
 from dgt.board import Rev2Info
 from eboard.eboard import EBoard
+from variants import VARIANT_BOARDS
 
 logger = logging.getLogger(__name__)
 
+# boards for the SAN of a move - king of the hill has standard FENs, so it needs no
+# variant snapshot, but its SAN shows the win on the hill
+SAN_BOARDS: dict[str, type[Board]] = {**VARIANT_BOARDS, "kingofthehill": chess.variant.KingOfTheHillBoard}
+
+# piece letters of the clock languages, the King of fr, es, it is an "R" (roi, rey, re)
+PIECE_LETTERS = {
+    language: str.maketrans({**letters, "@": "R"})
+    for language, letters in {
+        "en": {},
+        "de": {"R": "T", "N": "S", "B": "L", "Q": "D"},
+        "nl": {"R": "T", "N": "P", "B": "L", "Q": "D"},
+        "fr": {"R": "T", "N": "C", "B": "F", "Q": "D", "K": "R"},
+        "es": {"R": "T", "N": "C", "B": "A", "Q": "D", "K": "R"},
+        "it": {"R": "T", "N": "C", "B": "A", "Q": "D", "K": "R"},
+    }.items()
+}
+
+
+def move_variant(message) -> str:
+    """Variant the move of message is played in."""
+    # Fallback: message has no variant attribute (e.g. DISPLAY_MOVE).
+    # Must use the correct variant board here — 3check FENs contain "+N+N"
+    # which standard chess.Board cannot parse and will raise ValueError.
+    variant = getattr(message, "variant", None)
+    return variant if variant in SAN_BOARDS else ModeInfo.get_variant()
+
+
+@functools.lru_cache(maxsize=32)
+def move_san(fen: str, variant: str, move: chess.Move) -> tuple[Board, str | None]:
+    """Board of fen and the SAN of move on it, None if move is illegal there."""
+    bit_board = SAN_BOARDS.get(variant, Board)(fen)
+    return bit_board, bit_board.san(move) if bit_board.is_legal(move) else None
+
+
+@functools.lru_cache(maxsize=128)
+def render_move(
+    fen: str,
+    variant: str,
+    move: chess.Move,
+    long: bool,
+    language: str,
+    capital: bool,
+    side: ClockSide,
+    is_xl: bool,
+    new_rev2: bool,
+) -> tuple[Board, str, bool]:
+    """Board, clock text and legality of move - the same move is shown on every device, often again and again."""
+    bit_board, san = move_san(fen, variant, move)
+    if san is None:
+        move_text = "er{}" if is_xl else "err {}"
+        move_text = move_text.format(move.uci()[:4])
+    else:
+        move_text = move.uci() if long else san
+
+    if side == ClockSide.RIGHT:
+        if new_rev2:
+            move_text = move_text.rjust(5)
+        else:
+            move_text = move_text.rjust(6 if is_xl else 8)
+
+    if not long:
+        move_text = move_text.translate(PIECE_LETTERS.get(language, PIECE_LETTERS["en"]))
+    return bit_board, move_text.upper() if capital else move_text, san is not None
+
 
 class DgtIface(DisplayDgt):
     """An Interface class for DgtHw, DgtPi, DgtVr."""
@@ -91,72 +157,22 @@ class DgtIface(DisplayDgt):
         """Override this function."""
         raise NotImplementedError()
 
-    def _mk_board(self, message):
-        """Create the appropriate board type based on variant for SAN generation."""
-        variant = getattr(message, "variant", None)
-        fen = message.fen
-
-        if variant == "atomic":
-            return chess.variant.AtomicBoard(fen)
-        elif variant == "kingofthehill":
-            return chess.variant.KingOfTheHillBoard(fen)
-        elif variant == "3check":
-            return chess.variant.ThreeCheckBoard(fen)
-        elif variant == "racingkings":
-            return chess.variant.RacingKingsBoard(fen)
-        elif variant == "antichess":
-            return chess.variant.AntichessBoard(fen)
-
-        # Fallback: message has no variant attribute (e.g. DISPLAY_MOVE).
-        # Must use the correct variant board here — 3check FENs contain "+N+N"
-        # which standard chess.Board cannot parse and will raise ValueError.
-        fallback_variant = ModeInfo.get_variant()
-        if fallback_variant == "atomic":
-            return chess.variant.AtomicBoard(fen)
-        elif fallback_variant == "kingofthehill":
-            return chess.variant.KingOfTheHillBoard(fen)
-        elif fallback_variant == "3check":
-            return chess.variant.ThreeCheckBoard(fen)
-        elif fallback_variant == "racingkings":
-            return chess.variant.RacingKingsBoard(fen)
-        elif fallback_variant == "antichess":
-            return chess.variant.AntichessBoard(fen)
-
-        return Board(fen)
-
     def get_san(self, message, is_xl=False):
-        """Create a chess.board plus a text ready to display on clock."""
-
-        def move(text: str, language: str, capital: bool, short: bool):
-            """Return move text for clock display."""
-            if short:
-                directory = {}
-                if language == "de":
-                    directory = {"R": "T", "N": "S", "B": "L", "Q": "D"}
-                if language == "nl":
-                    directory = {"R": "T", "N": "P", "B": "L", "Q": "D"}
-                if language == "fr":
-                    directory = {"R": "T", "N": "C", "B": "F", "Q": "D", "K": "@"}
-                if language == "es":
-                    directory = {"R": "T", "N": "C", "B": "A", "Q": "D", "K": "@"}
-                if language == "it":
-                    directory = {"R": "T", "N": "C", "B": "A", "Q": "D", "K": "@"}
-                for i, j in directory.items():
-                    text = text.replace(i, j)
-                text = text.replace("@", "R")  # replace the King "@" from fr, es, it languages
-            if capital:
-                return text.upper()
-            else:
-                return text
-
-        # Use variant-appropriate board for legal move check and SAN generation
-        bit_board = self._mk_board(message)
-        if bit_board.is_legal(message.move):
-            if message.long:
-                move_text = message.move.uci()
-            else:
-                move_text = bit_board.san(message.move)
-        else:
+        """Create a chess.board plus a text ready to display on clock.
+
+        The board and text are shared by all devices showing the move - do not push moves on the board."""
+        bit_board, text, legal = render_move(
+            message.fen,
+            move_variant(message),
+            message.move,
+            message.long,
+            message.lang,
+            message.capital and not is_xl,
+            message.side,
+            is_xl,
+            Rev2Info.get_new_rev2_mode(),
+        )
+        if not legal:
             logger.warning(
                 "[%s] illegal move %s found - uci960: %s fen: %s",
                 self.get_name(),
@@ -164,61 +180,78 @@ class DgtIface(DisplayDgt):
                 message.uci960,
                 message.fen,
             )
-            move_text = "er{}" if is_xl else "err {}"
-            move_text = move_text.format(message.move.uci()[:4])
+        return bit_board, text
 
-        if message.side == ClockSide.RIGHT:
-            if Rev2Info.get_new_rev2_mode():
-                move_text = move_text.rjust(5)
-            else:
-                move_text = move_text.rjust(6 if is_xl else 8)
-
-        return bit_board, move(move_text, message.lang, message.capital and not is_xl, not message.long)
+    def accepts(self, message) -> bool:
+        """Only queue the commands addressed to this device."""
+        return self.get_name() in getattr(message, "devs", ()) and super(DgtIface, self).accepts(message)
 
     async def _process_message(self, message):
         """Message task consumer for WebVR - can we do await anywhere?"""
         if self.get_name() not in message.devs:
             return True
 
-        logger.debug("(%s) handle DgtApi: %s started", ",".join(message.devs), message)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("(%s) handle DgtApi: %s started", ",".join(message.devs), message)
         self.case_res = True
-
-        # switch-case
-        if isinstance(message, Dgt.DISPLAY_MOVE):
-            self.case_res = self.display_move_on_clock(message)
-        elif isinstance(message, Dgt.DISPLAY_TEXT):
-            self.case_res = self.display_text_on_clock(message)
-        elif isinstance(message, Dgt.DISPLAY_TIME):
-            self.case_res = self.display_time_on_clock(message)
-        elif isinstance(message, Dgt.LIGHT_CLEAR):
-            self.case_res = self.clear_light_on_revelation()
-        elif isinstance(message, Dgt.LIGHT_SQUARES):
-            self.case_res = self.light_squares_on_revelation(message.uci_move)
-        elif isinstance(message, Dgt.LIGHT_SQUARE):
-            self.case_res = self.light_square_on_revelation(message.square)
-        elif isinstance(message, Dgt.CLOCK_SET):
-            self.case_res = self.set_clock(message.time_left, message.time_right, message.devs)
-        elif isinstance(message, Dgt.CLOCK_START):
-            self.case_res = await self.start_clock(message.side, message.devs)
-        elif isinstance(message, Dgt.CLOCK_STOP):
-            if self.side_running != ClockSide.NONE:
-                self.case_res = await self.stop_clock(message.devs)
-            else:
-                logger.debug("(%s) clock is already stopped", ",".join(message.devs))
-        elif isinstance(message, Dgt.CLOCK_VERSION):
-            if "i2c" in message.devs:
-                logger.debug("(i2c) clock found => starting the board connection")
-                self.dgtboard.run()  # finally start the serial board connection - see picochess.py
-            else:
-                if message.main == 2:
-                    self.enable_dgt3000 = True
-        elif isinstance(message, Dgt.PROMOTION_DONE):
-            self.promotion_done(message.uci_move)
-        else:  # switch-default
-            pass
-        logger.debug("(%s) handle DgtApi: %s ended", ",".join(message.devs), message)
+        await self.dispatch(message)
+        if debug:
+            logger.debug("(%s) handle DgtApi: %s ended", ",".join(message.devs), message)
         return self.case_res
 
+    @handles(Dgt.DISPLAY_MOVE)
+    async def _on_display_move(self, message):
+        self.case_res = self.display_move_on_clock(message)
+
+    @handles(Dgt.DISPLAY_TEXT)
+    async def _on_display_text(self, message):
+        self.case_res = self.display_text_on_clock(message)
+
+    @handles(Dgt.DISPLAY_TIME)
+    async def _on_display_time(self, message):
+        self.case_res = self.display_time_on_clock(message)
+
+    @handles(Dgt.LIGHT_CLEAR)
+    async def _on_light_clear(self, message):
+        self.case_res = self.clear_light_on_revelation()
+
+    @handles(Dgt.LIGHT_SQUARES)
+    async def _on_light_squares(self, message):
+        self.case_res = self.light_squares_on_revelation(message.uci_move)
+
+    @handles(Dgt.LIGHT_SQUARE)
+    async def _on_light_square(self, message):
+        self.case_res = self.light_square_on_revelation(message.square)
+
+    @handles(Dgt.CLOCK_SET)
+    async def _on_clock_set(self, message):
+        self.case_res = self.set_clock(message.time_left, message.time_right, message.devs)
+
+    @handles(Dgt.CLOCK_START)
+    async def _on_clock_start(self, message):
+        self.case_res = await self.start_clock(message.side, message.devs)
+
+    @handles(Dgt.CLOCK_STOP)
+    async def _on_clock_stop(self, message):
+        if self.side_running != ClockSide.NONE:
+            self.case_res = await self.stop_clock(message.devs)
+        else:
+            logger.debug("(%s) clock is already stopped", ",".join(message.devs))
+
+    @handles(Dgt.CLOCK_VERSION)
+    async def _on_clock_version(self, message):
+        if "i2c" in message.devs:
+            logger.debug("(i2c) clock found => starting the board connection")
+            self.dgtboard.run()  # finally start the serial board connection - see picochess.py
+        else:
+            if message.main == 2:
+                self.enable_dgt3000 = True
+
+    @handles(Dgt.PROMOTION_DONE)
+    async def _on_promotion_done(self, message):
+        self.promotion_done(message.uci_move)
+
     async def dgt_consumer(self):
         """Message task consumer for WebVr messages"""
         logger.debug("[%s] dgt_queue ready", self.get_name())
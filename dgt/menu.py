@@ -27,7 +27,7 @@ from typing import Dict, List, Set
 from pgn import ModeInfo
 import chess  # type: ignore
 from timecontrol import TimeControl
-from utilities import Observable, DispatchDgt, get_internal_ip, get_tags, version, write_picochess_ini
+from utilities import Observable, DispatchDgt, internal_ip_lookup, tags_lookup, version, write_picochess_ini
 from dgt.util import (
     TimeMode,
     TimeModeLoop,
@@ -970,7 +970,12 @@ class DgtMenu(object):
     def enable_picochess_displayed(self, dev):
         """Enable picochess display."""
         self.picochess_displayed.add(dev)
-        self.updt_tags = get_tags()
+        self._refresh_updt_tags()
+
+    def _refresh_updt_tags(self):
+        """Take the git tags from the lookup cache - never run git on the event loop."""
+        tags_lookup.refresh_soon()
+        self.updt_tags = tags_lookup.peek()
         try:
             self.updt_version = [item[1] for item in self.updt_tags].index(version)
         except ValueError:
@@ -3415,7 +3420,7 @@ class DgtMenu(object):
             text = await self._fire_dispatchdgt(text)
 
         elif self.state == MenuState.SYS_INFO_IP:
-            live_int_ip = get_internal_ip()
+            live_int_ip = await internal_ip_lookup.get()
             if live_int_ip is not None:
                 self.int_ip = live_int_ip
             display_int_ip = live_int_ip or self.int_ip
@@ -3427,12 +3432,12 @@ class DgtMenu(object):
                     msg = " ".join(display_int_ip.split(".")[:2])
                     text = self.dgttranslate.text("B07_default", msg)
                     if len(msg) == 7:  # delete the " " for XL incase its "123 456"
-                        text.s = msg[:3] + msg[4:]
+                        text.small_text = msg[:3] + msg[4:]
                     await DispatchDgt.fire(text)
                     msg = " ".join(display_int_ip.split(".")[2:])
                     text = self.dgttranslate.text("N07_default", msg)
                     if len(msg) == 7:  # delete the " " for XL incase its "123 456"
-                        text.s = msg[:3] + msg[4:]
+                        text.small_text = msg[:3] + msg[4:]
                     text.wait = True
             else:
                 text = self.dgttranslate.text("B10_noipadr")
@@ -5182,28 +5187,34 @@ class DgtMenu(object):
         self.current_text = text
         return text
 
+    def _updt_text(self):
+        """The selected version - the running one while the git tags are still being looked up."""
+        tag_version = self.updt_tags[self.updt_version][1] if self.updt_tags else version
+        text = self.dgttranslate.text("B00_updt_version", tag_version, devs=self.updt_devs)
+        text.rd = ClockIcons.DOT
+        return text
+
     def updt_middle(self, dev):
         """Change the menu state after MIDDLE action."""
         self.updt_devs.add(dev)
-        text = self.dgttranslate.text("B00_updt_version", self.updt_tags[self.updt_version][1], devs=self.updt_devs)
-        text.rd = ClockIcons.DOT
+        if not self.updt_tags:
+            self._refresh_updt_tags()
+        text = self._updt_text()
         logger.debug("enter update menu dev: %s", dev)
         self.updt_top = True
         return text
 
     def updt_right(self):
         """Change the menu state after RIGHT action."""
-        self.updt_version = (self.updt_version + 1) % len(self.updt_tags)
-        text = self.dgttranslate.text("B00_updt_version", self.updt_tags[self.updt_version][1], devs=self.updt_devs)
-        text.rd = ClockIcons.DOT
-        return text
+        if self.updt_tags:
+            self.updt_version = (self.updt_version + 1) % len(self.updt_tags)
+        return self._updt_text()
 
     def updt_left(self):
         """Change the menu state after LEFT action."""
-        self.updt_version = (self.updt_version - 1) % len(self.updt_tags)
-        text = self.dgttranslate.text("B00_updt_version", self.updt_tags[self.updt_version][1], devs=self.updt_devs)
-        text.rd = ClockIcons.DOT
-        return text
+        if self.updt_tags:
+            self.updt_version = (self.updt_version - 1) % len(self.updt_tags)
+        return self._updt_text()
 
     def updt_down(self, dev):
         """Change the menu state after DOWN action."""
@@ -5211,7 +5222,7 @@ class DgtMenu(object):
         self.updt_top = False
         self.updt_devs.discard(dev)
         self.enter_top_menu()
-        return self.updt_tags[self.updt_version][0]
+        return self.updt_tags[self.updt_version][0] if self.updt_tags else None
 
     def updt_up(self, dev):
         """Change the menu state after UP action."""
@@ -21,7 +21,7 @@ from threading import Timer, Lock
 from typing import Dict, Set
 from utilities import AsyncRepeatingTimer  # Ensure AsyncRepeatingTimer is imported from the correct module
 from utilities import DisplayDgt, DispatchDgt, dispatch_queue
-from dgt.api import Dgt, DgtApi
+from dgt.api import Dgt
 from dgt.menu import DgtMenu
 
 
@@ -61,11 +61,11 @@ class Dispatcher(DispatchDgt):
         if not getattr(new_message, "analysis_update", False):
             return 0
 
-        representative = repr(new_message)
+        representative = type(new_message)
         kept = []
         dropped = 0
         for task in self.tasks[dev]:
-            if getattr(task, "analysis_update", False) and repr(task) == representative:
+            if getattr(task, "analysis_update", False) and type(task) is representative:
                 dropped += 1
                 continue
             kept.append(task)
@@ -118,10 +118,10 @@ class Dispatcher(DispatchDgt):
 
     async def _process_message(self, message, dev: str):
         do_handle = True
-        if repr(message) in (DgtApi.CLOCK_START, DgtApi.CLOCK_STOP, DgtApi.DISPLAY_TIME):
+        if isinstance(message, (Dgt.CLOCK_START, Dgt.CLOCK_STOP, Dgt.DISPLAY_TIME)):
             self.display_hash[dev] = 0  # Cant know the clock display if command changing the running status
         else:
-            if repr(message) in (DgtApi.DISPLAY_MOVE, DgtApi.DISPLAY_TEXT):
+            if isinstance(message, (Dgt.DISPLAY_MOVE, Dgt.DISPLAY_TEXT)):
                 if self.display_hash[dev] == hash(message) and not message.beep:
                     do_handle = False
                 else:
@@ -129,23 +129,23 @@ class Dispatcher(DispatchDgt):
 
         if do_handle:
             logger.debug("(%s) handle DgtApi: %s", dev, message)
-            if repr(message) == DgtApi.CLOCK_VERSION:
+            if isinstance(message, Dgt.CLOCK_VERSION):
                 logger.debug("(%s) clock registered", dev)
                 self.clock_connected[dev] = True
 
             clk = (
-                DgtApi.DISPLAY_MOVE,
-                DgtApi.DISPLAY_TEXT,
-                DgtApi.DISPLAY_TIME,
-                DgtApi.CLOCK_SET,
-                DgtApi.CLOCK_START,
-                DgtApi.CLOCK_STOP,
+                Dgt.DISPLAY_MOVE,
+                Dgt.DISPLAY_TEXT,
+                Dgt.DISPLAY_TIME,
+                Dgt.CLOCK_SET,
+                Dgt.CLOCK_START,
+                Dgt.CLOCK_STOP,
             )
-            if repr(message) in clk and not self.clock_connected[dev]:
+            if isinstance(message, clk) and not self.clock_connected[dev]:
                 logger.debug("(%s) clock still not registered => ignore %s", dev, message)
                 return
             if hasattr(message, "maxtime"):
-                if repr(message) == DgtApi.DISPLAY_TEXT:
+                if isinstance(message, Dgt.DISPLAY_TEXT):
                     if message.maxtime == 2.1:  # 2.1=picochess message
                         self.dgtmenu.enable_picochess_displayed(dev)
                     if self.dgtmenu.inside_updt_menu():
@@ -162,7 +162,7 @@ class Dispatcher(DispatchDgt):
                     self.maxtimer[dev].start()
                     logger.debug("(%s) showing %s for %.1f secs", dev, message, message.maxtime * self.time_factor)
                     self.maxtimer_running[dev] = True
-            if repr(message) == DgtApi.CLOCK_START and self.dgtmenu.inside_updt_menu():
+            if isinstance(message, Dgt.CLOCK_START) and self.dgtmenu.inside_updt_menu():
                 logger.debug("(%s) inside update menu => clock not started", dev)
                 return
             message.devs = {dev}  # on new system, we only have ONE device each message - force this!
@@ -184,7 +184,8 @@ class Dispatcher(DispatchDgt):
             while True:
                 # Check if we have something to display
                 msg = await dispatch_queue.get()
-                logger.debug("received command from dispatch_queue: %s devs: %s", msg, ",".join(msg.devs))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("received command from dispatch_queue: %s devs: %s", msg, ",".join(msg.devs))
                 # issue #45 just process one message at a time - dont spawn task
                 # asyncio.create_task(self.process_dispatch_message(msg))
                 try:
@@ -206,7 +207,7 @@ class Dispatcher(DispatchDgt):
                     # Prioritize "no e-Board" spinner: do not queue behind existing max timer.
                     if (
                         message.wait
-                        and repr(message) == DgtApi.DISPLAY_TEXT
+                        and isinstance(message, Dgt.DISPLAY_TEXT)
                         and getattr(message, "maxtime", None) == 0.1
                     ):
                         logger.debug("(%s) prioritizing no e-Board display over maxtimer", dev)
@@ -225,7 +226,7 @@ class Dispatcher(DispatchDgt):
                             logger.debug("delete following (%s) tasks: %s", dev, self.tasks[dev])
                             while self.tasks[dev]:  # but do the last CLOCK_START()
                                 command = self.tasks[dev].pop()
-                                if repr(command) == DgtApi.CLOCK_START:  # clock might be in set mode
+                                if isinstance(command, Dgt.CLOCK_START):  # clock might be in set mode
                                     logger.debug("processing (last) delayed clock start command")
                                     with self.process_lock[dev]:
                                         await self._process_message(command, dev)
@@ -0,0 +1,235 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# E-board scan decoding benchmark. Run from the picochess folder:
+#   python3 -m eboard.bench [--board chessnut] [--trace scans.txt] [--repeat 5] [--chunk 20]
+# A trace has one received message per line, hex encoded, as the driver gets it from the transport.
+# Without one a built-in game is replayed with the board polled 25 times per move. Every board type
+# is replayed through its real parser, and decoded once more without skipping repeated scans.
+# With --chunk the byte stream is cut in chunks of that size first, like BLE notifications.
+
+import argparse
+import queue
+import time
+from typing import Callable, Dict, List, Optional
+
+import chess  # type: ignore
+
+from eboard import scan
+from eboard.certabo.parser import CertaboBoardMessageParser, CertaboPiece
+from eboard.chesslink import chess_link_protocol as clp
+from eboard.chesslink.chess_link import SCAN_ORDER as CHESSLINK_ORDER
+from eboard.chesslink.chess_link import SCAN_PIECES as CHESSLINK_PIECES
+from eboard.chessnut import parser as chessnut
+from eboard.ichessone import parser as ichessone
+
+SCANS_PER_MOVE = 25
+OPENING = (
+    "e2e4", "e7e5", "g1f3", "b8c6", "f1b5", "a7a6", "b5a4", "g8f6", "e1g1", "f8e7",
+    "f1e1", "b7b5", "a4b3", "d7d6", "c2c3", "e8g8", "h2h3", "c6b8", "d2d4", "b8d7",
+)  # fmt: skip
+CERTABO_IDS = {symbol: bytes([3, 0, 84, index, 17]) for index, symbol in enumerate("PNBRQKpnbrqk")}
+
+
+class UpdateCounter(object):
+    """Parser callback that counts board updates."""
+
+    def __init__(self):
+        self.updates = 0
+
+    def board_update(self, short_fen: str):
+        self.updates += 1
+
+    def __getattr__(self, name):
+        return lambda *args: None
+
+
+def to_board(game: chess.Board) -> str:
+    """Board string of a position, square 0 is a1."""
+    pieces = game.piece_map()
+    return "".join(pieces[square].symbol() if square in pieces else scan.EMPTY for square in range(64))
+
+
+def encode(board: str, table, order) -> bytes:
+    """Inverse of the ScanDecoder: frame bytes holding the board."""
+    codes = {pieces: value for value, pieces in reversed(list(enumerate(table))) if scan.INVALID not in pieces}
+    width = len(table[0])
+    frame = bytearray(max(order) + 1)
+    for index, position in enumerate(order):
+        frame[position] = codes[board[index * width:index * width + width]]
+    return bytes(frame)
+
+
+def chessnut_message(board: str) -> bytes:
+    return bytes([0x01, 0x24]) + encode(board, chessnut.PIECES, chessnut.FRAME_ORDER) + bytes(4)
+
+
+def ichessone_message(board: str) -> bytes:
+    return bytes([0x3D, 0x70]) + encode(board, ichessone.PIECES, ichessone.FRAME_ORDER)
+
+
+def certabo_message(board: str) -> bytes:
+    ids = [CERTABO_IDS.get(board[square ^ 56], bytes(5)) for square in range(64)]  # a8 first
+    return (":" + " ".join(str(value) for piece_id in ids for value in piece_id) + " \r\n").encode()
+
+
+def chesslink_message(board: str) -> bytes:
+    return clp.add_block_crc("s" + encode(board, CHESSLINK_PIECES, CHESSLINK_ORDER).decode()).encode()
+
+
+def chessnut_replay(messages: List[bytes]) -> int:
+    counter = UpdateCounter()
+    parser = chessnut.Parser(counter)
+    for message in messages:
+        parser.parse(bytearray(message))
+    return counter.updates
+
+
+def ichessone_replay(messages: List[bytes]) -> int:
+    counter = UpdateCounter()
+    parser = ichessone.Parser(counter)
+    for message in messages:
+        parser.parse(bytearray(message))
+    return counter.updates
+
+
+def certabo_replay(messages: List[bytes]) -> int:
+    counter = UpdateCounter()
+    parser = CertaboBoardMessageParser(counter, False)
+    parser.update_stones({CertaboPiece(bytearray(piece_id)): symbol for symbol, piece_id in CERTABO_IDS.items()})
+    for message in messages:
+        parser.parse(bytearray(message))
+    return counter.updates
+
+
+def chesslink_replay(messages: List[bytes]) -> int:
+    """The transport reply assembly and the board scan part of ChessLink._event_worker_thread."""
+    replies: queue.SimpleQueue = queue.SimpleQueue()
+    assembler = clp.reply_assembler(replies)
+    decoder = scan.ScanDecoder(CHESSLINK_PIECES, CHESSLINK_ORDER)
+    updates = 0
+    for message in messages:
+        assembler.feed(message.translate(clp.STRIP_PARITY))
+        while not replies.empty():
+            board = decoder.update(replies.get()[1:65].encode("latin-1", "replace"))
+            if board is not None:
+                scan.to_short_fen(board)
+                updates += 1
+    return updates
+
+
+# message builder, replay through the driver, and table, order and frame slice of the ScanDecoder
+BOARDS: Dict[str, tuple] = {
+    "chessnut": (chessnut_message, chessnut_replay, (chessnut.PIECES, chessnut.FRAME_ORDER, slice(2, 34))),
+    "ichessone": (ichessone_message, ichessone_replay, (ichessone.PIECES, ichessone.FRAME_ORDER, slice(2, 34))),
+    "certabo": (certabo_message, certabo_replay, None),
+    "chesslink": (chesslink_message, chesslink_replay, (CHESSLINK_PIECES, CHESSLINK_ORDER, slice(1, 65))),
+}
+
+
+def builtin_boards(moves: int = len(OPENING)) -> List[str]:
+    """Boards seen while a game is played: the board is polled while a piece is lifted and after each move."""
+    game = chess.Board()
+    boards = [to_board(game)] * SCANS_PER_MOVE
+    for uci in OPENING[:moves]:
+        move = chess.Move.from_uci(uci)
+        lifted = to_board(game)
+        lifted = lifted[:move.from_square] + scan.EMPTY + lifted[move.from_square + 1:]
+        game.push(move)
+        boards += [lifted] * (SCANS_PER_MOVE // 5) + [to_board(game)] * SCANS_PER_MOVE
+    return boards
+
+
+def read_trace(file_name: str) -> List[bytes]:
+    """Hex encoded messages, one per line, other lines are skipped."""
+    messages = []
+    with open(file_name, encoding="utf-8", errors="replace") as trace_file:
+        for line in trace_file:
+            try:
+                messages.append(bytes.fromhex(line.strip()))
+            except ValueError:
+                continue
+    return [message for message in messages if message]
+
+
+def chunked(messages: List[bytes], size: int) -> List[bytes]:
+    """The messages as one byte stream cut in chunks of size bytes."""
+    stream = b"".join(messages)
+    return [stream[offset:offset + size] for offset in range(0, len(stream), size)]
+
+
+def rate(replay: Callable, messages: List[bytes], repeat: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        updates = replay(messages)
+    seconds = time.perf_counter() - start
+    return {"scans_per_second": repeat * len(messages) / seconds if seconds else 0, "updates": updates}
+
+
+def decode_all(decoder: scan.ScanDecoder, frames: List[bytes]) -> int:
+    """Decode every frame, as the drivers did before repeated scans were skipped."""
+    for frame in frames:
+        board = decoder.decode(frame)
+        if board is not None:
+            scan.to_short_fen(scan.orient(board, False)[0])
+    return len(frames)
+
+
+def run_benchmark(
+    boards: List[str], repeat: int = 5, board_types: Optional[List[str]] = None, trace=None, chunk: int = 0
+) -> dict:
+    report = {}
+    for name in board_types or list(BOARDS):
+        message, replay, decoding = BOARDS[name]
+        messages = trace if trace is not None else [message(board) for board in boards]
+        received = chunked(messages, chunk) if chunk else messages
+        result = {"scans": len(messages), "replay": rate(replay, received, repeat)}
+        result["replay"]["scans_per_second"] *= len(messages) / len(received)
+        if decoding is not None:
+            table, order, frame = decoding
+            decoder = scan.ScanDecoder(table, order)
+            frames = [item[frame] for item in messages]
+            result["decode_every_scan"] = rate(lambda items: decode_all(decoder, items), frames, repeat)
+        report[name] = result
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark e-board scan decoding")
+    parser.add_argument("--board", choices=sorted(BOARDS), help="only this board type, required with --trace")
+    parser.add_argument("--trace", help="file with one hex encoded message per line")
+    parser.add_argument("--repeat", type=int, default=5, help="replay the trace this many times")
+    parser.add_argument("--chunk", type=int, default=0, help="feed the parsers chunks of this many bytes")
+    args = parser.parse_args(argv)
+    if args.trace and not args.board:
+        parser.error("--trace needs --board")
+    trace = read_trace(args.trace) if args.trace else None
+    if args.trace and not trace:
+        parser.error("no hex messages found in " + args.trace)
+    report = run_benchmark(builtin_boards(), args.repeat, [args.board] if args.board else None, trace, args.chunk)
+    for name, result in report.items():
+        line = "{:10} {:6} scans {:>9.0f} scans/s  {} updates".format(
+            name, result["scans"], result["replay"]["scans_per_second"], result["replay"]["updates"]
+        )
+        if "decode_every_scan" in result:
+            line += "  decoding every scan: {:.0f} scans/s".format(result["decode_every_scan"]["scans_per_second"])
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ import re
 from collections import Counter
 
 from eboard.eboard import to_short_fen, check_reversed
+from eboard.frames import FrameAssembler, FrameSpec
 
 
 class CertaboPiece(object):
@@ -97,37 +98,39 @@ def to_square(i: int):
     return row * 8 + col
 
 
+# a scan is ":" and the numbers of the 64 squares, broken over several lines, ended with "\r\n"
+FRAMES = (FrameSpec("line", b"", terminator=b"\r\n"),)
+
+
 class Parser(object):
 
-    def __init__(self, callback: BoardTranslator):
+    def __init__(self, callback: BoardTranslator, skip_repeats: bool = False):
+        """:param skip_repeats: do not translate a board scan that repeats the previous one"""
         self.callback = callback
-        self.buffer = bytearray()
-        self.last_board: List = []
+        self.frames = FrameAssembler(FRAMES, {"line": self._on_line})
+        self.lines = 0
+        self.skip_repeats = skip_repeats
+        self.last_frame: List[str] = []
         self.reversed = False
         self.piece_recognition = False
 
     def parse(self, msg: bytearray):
-        # copy any previous buffer to the front
-        data = self.buffer + msg
-        self.buffer = bytearray()
-
-        if len(data) > 15:
-            input_str = data.decode(encoding="UTF-8", errors="ignore")
-            if "\r\n" not in input_str:
-                self._add_to_buffer(data)
-            else:
-                split_data = input_str.split(":")
-                for index, part in enumerate(split_data):
-                    if len(part) > 0 and not self._parse(part) and index == len(split_data) - 1:
-                        position = len(data) - len(part) - 1
-                        if position >= 0:
-                            self._add_to_buffer(data[position:])
-                        break
-        else:
-            self.buffer = data
-
-    def _add_to_buffer(self, arr):
-        self.buffer += arr
+        lines = self.lines
+        self.frames.feed(msg)
+        if self.lines != lines:
+            # the last scan of a chunk may come without "\r\n", take it if it is complete
+            self.frames.flush(self._on_unterminated)
+
+    def _on_line(self, frame: memoryview) -> bool:
+        self.lines += 1
+        for part in bytes(frame).decode(encoding="UTF-8", errors="ignore").split(":"):
+            if len(part) > 0:
+                self._parse(part)
+        return True
+
+    def _on_unterminated(self, frame: memoryview) -> bool:
+        parts = bytes(frame).decode(encoding="UTF-8", errors="ignore").split(":")
+        return len(parts) > 1 and len(parts[-1]) > 0 and self._parse(parts[-1])
 
     def _parse(self, part: str):
         if "L" in part:
@@ -145,18 +148,17 @@ class Parser(object):
 
     def _parse_with_piece_info(self, split_input):
         if len(split_input) >= 320:
-            board = []
-            for square in range(64):
-                piece_id = bytearray(5)
-                for i in range(5):
-                    try:
-                        piece_id[i] = int(split_input[square * 5 + i])
-                    except ValueError:
-                        return False
-                piece = CertaboPiece(piece_id)
-                board.append(piece)
-            self.callback.translate(board)
-            self.buffer = bytearray()
+            frame = split_input[:320]
+            if self.skip_repeats:
+                if frame == self.last_frame:
+                    return True
+                self.last_frame = frame
+            try:
+                piece_ids = bytes(map(int, frame))
+            except ValueError:
+                self.last_frame = []
+                return False
+            self.callback.translate([CertaboPiece(bytearray(piece_ids[i:i + 5])) for i in range(0, 320, 5)])
             return True
         else:
             return False
@@ -175,7 +177,6 @@ class Parser(object):
                 except ValueError:
                     return False
             self.callback.translate_occupied_squares(board)
-            self.buffer = bytearray()
             return True
         else:
             return False
@@ -185,15 +186,17 @@ class CertaboBoardMessageParser(BoardTranslator):
 
     def __init__(self, callback: ParserCallback, low_gain):
         self.callback = callback
-        self.last_board: List = []
+        self.last_board = ""
         self.board_history: List = []
         self.low_gain_chips = low_gain
         self.reversed = False
         self.stones: Dict = {}
-        self.parser = Parser(self)
+        # low gain boards average over repeated scans, so they need every scan
+        self.parser = Parser(self, skip_repeats=not low_gain)
 
     def update_stones(self, stones: Dict[CertaboPiece, Optional[str]]):
         self.stones = stones
+        self.parser.last_frame = []
 
     def parse(self, msg: bytearray):
         self.parser.parse(msg)
@@ -225,6 +228,7 @@ class CertaboBoardMessageParser(BoardTranslator):
             self._process_new_board(new_board)
 
     def _process_new_board(self, new_board):
+        new_board = "".join(new_board)
         if self.last_board != new_board:
             self.last_board = new_board
             board, self.reversed = check_reversed(new_board, self.reversed, self.callback)
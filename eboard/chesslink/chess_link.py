@@ -39,10 +39,10 @@ import threading
 import queue
 import json
 import importlib
-import copy
 
 import eboard.chesslink.chess_link_protocol as clp
 import eboard.chesslink.chess_link_bluepy as tri
+from eboard import scan
 
 # See document:
 # `magic-board.md <https://github.com/domschl/python-mchess/blob/master/mchess/magic-board.md>_
@@ -50,6 +50,16 @@ import eboard.chesslink.chess_link_bluepy as tri
 
 logger = logging.getLogger(__name__)
 
+FIGURES = "PNBRQK.pnbrqk"
+FIGURE_VALUES = (1, 2, 3, 4, 5, 6, 0, -1, -2, -3, -4, -5, -6)
+ASCII_INT = dict(zip(FIGURES, FIGURE_VALUES))
+INT_ASCII = dict(zip(FIGURE_VALUES, FIGURES))
+BOARD_INT = {**ASCII_INT, scan.EMPTY: 0}
+
+# a scan lists each rank from h to a, rank 1 first
+SCAN_PIECES = scan.byte_table({**{ord(c): c for c in FIGURES}, ord("."): scan.EMPTY})
+SCAN_ORDER = tuple(square - square % 8 + 7 - square % 8 for square in range(64))
+
 
 class ChessLink:
     """
@@ -113,7 +123,8 @@ class ChessLink:
         self.version = "0.3.0"
         self.board_version = "---"
         self.name = name
-        self.figrep = {"int": [1, 2, 3, 4, 5, 6, 0, -1, -2, -3, -4, -5, -6], "ascii": "PNBRQK.pnbrqk"}
+        self.figrep = {"int": list(FIGURE_VALUES), "ascii": FIGURES}
+        self.decoder = scan.ScanDecoder(SCAN_PIECES, SCAN_ORDER)
         logger.debug("Chess Link starting")
         self.WHITE = 0
         self.BLACK = 1
@@ -319,73 +330,9 @@ class ChessLink:
                 if len(msg) > 0:
                     if msg[0] == "s":
                         if len(msg) == 67:
-                            rp = msg[1:65]
-                            val_pos = True
-                            position = [[0 for x in range(8)] for y in range(8)]
-                            if len(rp) == 64:
-                                for y in range(8):
-                                    for x in range(8):
-                                        c = rp[7 - x + y * 8]
-                                        i = self.figrep["ascii"].find(c)
-                                        if i == -1:
-                                            logger.warning(f"Invalid char in raw position: {c}")
-                                            val_pos = False
-                                            continue
-                                        else:
-                                            f = self.figrep["int"][i]
-                                            if self.orientation is True:
-                                                position[y][x] = f
-                                            else:
-                                                position[7 - y][7 - x] = f
-                            else:
-                                val_pos = False
-                                logger.warning(f"Error in board position, received {len(rp)}")
-                                continue
+                            self._board_scan(msg[1:65], mutex)
                         else:
-                            val_pos = False
                             logger.error(f"Incomplete board position, {msg}")
-                        if val_pos is True:
-                            fen = self.position_to_fen(position)
-                            sfen = self.short_fen(fen)
-                            if sfen == "RNBKQBNR/PPPPPPPP/8/8/8/8/pppppppp/rnbkqbnr":
-                                if self.orientation is True:
-                                    logger.debug("Cable-left board detected.")
-                                    self.orientation = False
-                                    self.write_configuration()
-                                    position_inv = copy.deepcopy(position)
-                                    for x in range(8):
-                                        for y in range(8):
-                                            position[x][y] = position_inv[7 - x][7 - y]
-                                else:
-                                    logger.debug("Cable-right board detected.")
-                                    self.orientation = True
-                                    self.write_configuration()
-                                    position_inv = copy.deepcopy(position)
-                                    for x in range(8):
-                                        for y in range(8):
-                                            position[x][y] = position_inv[7 - x][7 - y]
-                            fen = self.position_to_fen(position)
-                            sfen = self.short_fen(fen)
-
-                            if sfen == "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR":
-                                if self.is_new_game is False:
-                                    self.is_new_game = True  # XXX changed on cleanup
-                                    cmd = {
-                                        "cmd": "new_game",
-                                        "actor": self.name,
-                                        "orientation": self.orientation,
-                                    }  # XXX: orientation?!
-                                    self.new_game(position)
-                                    self.appque.put(cmd)
-                            else:
-                                self.is_new_game = False
-
-                            with mutex:
-                                self.position = copy.deepcopy(position)
-                                if self.reference_position is None:
-                                    self.reference_position = copy.deepcopy(position)
-                            self.appque.put({"cmd": "raw_board_position", "fen": fen, "actor": self.name})
-                            self._check_move(position)
                     if msg[0] == "v":
                         logger.debug("got version reply")
                         if len(msg) == 7:
@@ -416,6 +363,53 @@ class ChessLink:
             else:
                 time.sleep(0.01)
 
+    def _board_scan(self, raw_position, mutex):
+        """
+        Decode a 64 character board scan of the worker thread. Scans that repeat the previous one
+        are not decoded again, only pending legal moves are checked.
+        """
+        board = self.decoder.update(raw_position.encode("latin-1", "replace"))
+        if board is None:
+            if not self.decoder.valid:
+                logger.warning(f"Invalid char in raw position: {raw_position}")
+            elif self.legal_moves is not None and self.position is not None:
+                self._check_move(self.position)
+            return
+        if self.orientation is False:
+            board = board[::-1]
+        if scan.to_short_fen(board) == "RNBKQBNR/PPPPPPPP/8/8/8/8/pppppppp/rnbkqbnr":
+            if self.orientation is True:
+                logger.debug("Cable-left board detected.")
+            else:
+                logger.debug("Cable-right board detected.")
+            self.orientation = not self.orientation
+            self.write_configuration()
+            board = board[::-1]
+        position = [[BOARD_INT[piece] for piece in board[y * 8:y * 8 + 8]] for y in range(8)]
+        fen = self.position_to_fen(position)
+        sfen = self.short_fen(fen)
+
+        if sfen == "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR":
+            if self.is_new_game is False:
+                self.is_new_game = True  # XXX changed on cleanup
+                cmd = {
+                    "cmd": "new_game",
+                    "actor": self.name,
+                    "orientation": self.orientation,
+                }  # XXX: orientation?!
+                self.new_game(position)
+                self.appque.put(cmd)
+        else:
+            self.is_new_game = False
+
+        # positions are never changed in place, the next scan builds a new one
+        with mutex:
+            self.position = position
+            if self.reference_position is None:
+                self.reference_position = position
+        self.appque.put({"cmd": "raw_board_position", "fen": fen, "actor": self.name})
+        self._check_move(position)
+
     def new_game(self, pos):
         """
         Initiate a new game
@@ -752,11 +746,7 @@ class ChessLink:
         for y in range(8):
             for x in range(8):
                 f = position[7 - y][x]
-                c = "?"
-                for i in range(len(self.figrep["int"])):
-                    if self.figrep["int"][i] == f:
-                        c = self.figrep["ascii"][i]
-                        break
+                c = INT_ASCII.get(f, "?")
                 if c == "?":
                     logger.error(f"Internal FEN error, could not translation {c} at {y}{x}")
                     return ""
@@ -807,11 +797,7 @@ class ChessLink:
                 if c >= "1" and c <= "8":
                     x += int(c)
                     continue
-                ci = -99
-                for i in range(len(self.figrep["ascii"])):
-                    if self.figrep["ascii"][i] == c:
-                        ci = self.figrep["int"][i]
-                        break
+                ci = ASCII_INT.get(c, -99)
                 if ci == -99:
                     logger.error(f"Internal FEN2 error decoding {c} at {y}{x}")
                     return []
@@ -889,11 +875,9 @@ class ChessLink:
             self.orientation = orientation
             logger.info("Swapping board position")
             with self.board_mutex:
-                pos = copy.deepcopy(self.position)
-                for y in range(8):
-                    for x in range(8):
-                        pos[y][x] = self.position[7 - y][7 - x]
-                self.position = pos
+                if self.position is not None:
+                    self.position = [row[::-1] for row in self.position[::-1]]
+                self.decoder.reset()
         self.write_configuration()
 
     def get_orientation(self):
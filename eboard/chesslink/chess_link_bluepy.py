@@ -201,6 +201,7 @@ class Transport:
         que.put("agent-state: " + state + " " + msg)
 
     def mil_open(self, address, mil, que):
+        protocol_debug = self.protocol_debug
 
         class PeriDelegate(DefaultDelegate):
             """peripheral delegate class"""
@@ -208,28 +209,12 @@ class Transport:
             def __init__(self, que):
                 self.que = que
                 logger.debug("Init delegate for peri")
-                self.chunks = ""
+                self.replies = clp.reply_assembler(que, protocol_debug)
                 DefaultDelegate.__init__(self)
 
             def handleNotification(self, cHandle, data):
-                logger.debug(f"BLE: Handle: {cHandle}, data: {data}")
-                rcv = ""
-                for b in data:
-                    rcv += chr(b & 127)
-                logger.debug("BLE received [{}]".format(rcv))
-                self.chunks += rcv
-                if self.chunks[0] not in clp.protocol_replies:
-                    logger.warning(f"Illegal reply start '{self.chunks[0]}' received, discarding")
-                    while len(self.chunks) > 0 and self.chunks[0] not in clp.protocol_replies:
-                        self.chunks = self.chunks[1:]
-                if len(self.chunks) > 0:
-                    mlen = clp.protocol_replies[self.chunks[0]]
-                    if len(self.chunks) >= mlen:
-                        valmsg = self.chunks[:mlen]
-                        logger.debug("bluepy_ble received complete msg: {}".format(valmsg))
-                        if clp.check_block_crc(valmsg):
-                            que.put(valmsg)
-                        self.chunks = self.chunks[mlen:]
+                logger.debug("BLE: Handle: %s, data: %s", cHandle, data)
+                self.replies.feed(data.translate(clp.STRIP_PARITY))
 
         rx = None
         tx = None
@@ -35,8 +35,13 @@ Details of the Chess Link protocol are documented in
 
 import logging
 
+from eboard.frames import FrameAssembler, FrameSpec
+
 protocol_replies = {"v": 7, "s": 67, "l": 3, "x": 3, "w": 7, "r": 7}
 
+STRIP_PARITY = bytes(value & 127 for value in range(256))  # bytes.translate table
+REPLY_FRAMES = tuple(FrameSpec(reply, reply.encode(), length) for reply, length in protocol_replies.items())
+
 
 logger = logging.getLogger(__name__)
 
@@ -124,3 +129,23 @@ def add_block_crc(msg):
         gpar = gpar ^ ord(b)
     msg = msg + hex2(gpar)
     return msg
+
+
+def reply_assembler(que, protocol_debug=False):
+    """
+    Reassembles the replies of the board from received bytes, feed it with bytes translated by STRIP_PARITY.
+
+    :param que: complete replies with a valid block CRC are put on this queue as strings
+    :param protocol_debug: log every reply
+    :returns: a FrameAssembler
+    """
+
+    def on_reply(frame):
+        reply = bytes(frame).decode("ascii")
+        if protocol_debug is True:
+            logger.debug("Received reply: %s", reply)
+        if check_block_crc(reply):
+            que.put(reply)
+        return True
+
+    return FrameAssembler(REPLY_FRAMES, {reply: on_reply for reply in protocol_replies})
@@ -248,9 +248,7 @@ class Transport:
         Background thread that sends data received via usb to the queue `que`.
         """
         logger.debug("USB worker thread started.")
-        cmd_started = False
-        cmd_size = 0
-        cmd = ""
+        replies = clp.reply_assembler(que, self.protocol_debug)
         self.agent_state(self.que, "online", f"Connected to {self.uport}")
         self.error_state = False
         posted = False
@@ -275,44 +273,22 @@ class Transport:
                         self.agent_state(self.que, "offline", emsg)
                         posted = True
 
-            b = ""
             try:
-                if cmd_started is False:
+                if replies.pending() == 0:
                     self.usb_dev.timeout = None
                 else:
                     self.usb_dev.timeout = 0.2
-                by = self.usb_dev.read()
-                if len(by) > 0:
-                    b = chr(ord(by) & 127)
-                else:
+                by = self.usb_dev.read(max(1, self.usb_dev.in_waiting))
+                if len(by) == 0:
                     continue
             except Exception as e:
-                if len(cmd) > 0:
-                    logger.debug(f"USB command '{cmd[0]}' interrupted: {e}")
+                if replies.pending() > 0:
+                    logger.debug(f"USB command interrupted: {e}")
                 time.sleep(0.1)
-                cmd_started = False
-                cmd_size = 0
-                cmd = ""
+                replies.reset()
                 self.error_state = True
                 continue
-            if len(b) > 0:
-                if cmd_started is False:
-                    if b in clp.protocol_replies:
-                        cmd_started = True
-                        cmd_size = clp.protocol_replies[b]
-                        cmd = b
-                        cmd_size -= 1
-                else:
-                    cmd += b
-                    cmd_size -= 1
-                    if cmd_size == 0:
-                        cmd_started = False
-                        cmd_size = 0
-                        if self.protocol_debug is True:
-                            logger.debug(f"USB received cmd: {cmd}")
-                        if clp.check_block_crc(cmd):
-                            que.put(cmd)
-                        cmd = ""
+            replies.feed(by.translate(clp.STRIP_PARITY))
 
     def get_name(self):
         """
@@ -11,11 +11,40 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import List
 from enum import Enum
 
-from eboard.eboard import to_short_fen, to_battery, get_upper_4_bits, get_lower_4_bits, check_reversed
+from eboard.eboard import to_short_fen, to_battery, check_reversed
 from eboard.eboard import Battery
+from eboard.frames import FrameAssembler, FrameSpec
+from eboard.scan import EMPTY, ScanDecoder, nibble_table
+
+# two squares per byte: upper and lower 4 bits
+PIECES = nibble_table(
+    {
+        0: EMPTY,
+        0x07: "P",
+        0x06: "R",
+        0x0A: "N",
+        0x09: "B",
+        0x0B: "Q",
+        0x0C: "K",
+        0x04: "p",
+        0x08: "r",
+        0x05: "n",
+        0x03: "b",
+        0x01: "q",
+        0x02: "k",
+    }
+)
+FRAME_ORDER = tuple(range(31, -1, -1))  # the last byte holds the first two squares
+
+FRAMES = (
+    FrameSpec("position", b"\x01\x24", 38),
+    FrameSpec("battery", b"\x2a\x02", 4),  # regular Chessnut
+    FrameSpec("move_battery", b"\x41\x03\x0c", 5),
+    FrameSpec("regular", b"\x32\x01", 2),
+    FrameSpec("move", b"\x41\x05\x15", 7),
+)
 
 
 class BoardType(Enum):
@@ -42,93 +71,42 @@ class Parser(object):
 
     def __init__(self, callback: ParserCallback):
         self.callback = callback
-        self.buffer = bytearray()
-        self.last_board: List = []
+        self.frames = FrameAssembler(
+            FRAMES,
+            {
+                "position": self._on_position,
+                "battery": self._on_battery,
+                "move_battery": self._on_move_battery,
+                "regular": self._on_board_type,
+                "move": self._on_board_type,
+            },
+        )
+        self.decoder = ScanDecoder(PIECES, FRAME_ORDER)
         self.reversed = False
 
     def parse(self, msg: bytearray):
-        # copy any previous buffer to the front
-        data = self.buffer + msg
-        self.buffer = bytearray()
-        if len(data) >= 3:
-            i = 0
-            while i < len(data):
-                if (i + 2) < len(data):
-                    if data[i] == 0x01 and data[i + 1] == 0x24:  # position
-                        new_pos, position_data = self._parse_position(data, i)
-                        board = self._to_board(position_data)
-                        if len(board) > 0 and None not in board:
-                            if self.last_board != board:
-                                self.last_board = board
-                                board, self.reversed = check_reversed(board, self.reversed, self.callback)
-                                self.callback.board_update(to_short_fen(board))
-                            i = new_pos
-                    elif (i + 3) < len(data) and data[i] == 0x2A and data[i + 1] == 0x02:  # battery (regular Chessnut)
-                        value, battery = to_battery(data[i + 2], data[i + 3])
-                        # Ignore invalid battery status (regular result from Chessnut Move)
-                        if not (value == 0 and battery == Battery.EXHAUSTED):
-                            self.callback.battery(value, battery)
-                        i += 3
-                    elif (i + 4) < len(data) and data[i] == 0x41 and data[i + 1] == 0x03 and data[i + 2] == 0x0C:
-                        value, battery = to_battery(data[i + 4], data[i + 3])
-                        if not (value == 0 and battery == Battery.EXHAUSTED):
-                            self.callback.battery(value, battery)
-                        i += 4
-                    elif (i + 2) < len(data) and data[i] == 0x32 and data[i + 1] == 0x01:
-                        self.callback.board_type(BoardType.CHESSNUT_REGULAR)
-                        i += 2
-                    elif (i + 6) < len(data) and data[i] == 0x41 and data[i + 1] == 0x05 and data[i + 2] == 0x15:
-                        self.callback.board_type(BoardType.CHESSNUT_MOVE)
-                        i += 6
-                i += 1
-        else:
-            self._add_to_buffer(msg)
-
-    def _parse_position(self, data, index):
-        data_length = 36
-        if len(data) >= (index + data_length + 2):
-            data = data[index + 2:]
-            index += data_length + 1
-            return index, data
-        else:
-            self._add_to_buffer(data)
-        return index, bytearray()
-
-    def _add_to_buffer(self, arr):
-        self.buffer += arr
-
-    def _to_board(self, data):
-        if len(data) >= 32:
-            board = [None] * 64
-            i = 0
-            for row in range(7, -1, -1):
-                for col in range(3, -1, -1):
-                    board[i] = self._to_stone(get_upper_4_bits(data[row * 4 + col]))
-                    board[i + 1] = self._to_stone(get_lower_4_bits(data[row * 4 + col]))
-                    i += 2
-            i += 1
-            return board
-        else:
-            return []
-
-    @staticmethod
-    def _to_stone(value):
-        translation = {
-            0: " ",
-            0x07: "P",
-            0x06: "R",
-            0x0A: "N",
-            0x09: "B",
-            0x0B: "Q",
-            0x0C: "K",
-            0x04: "p",
-            0x08: "r",
-            0x05: "n",
-            0x03: "b",
-            0x01: "q",
-            0x02: "k",
-        }
-        if value in translation:
-            return translation[value]
-        else:
-            return None
+        self.frames.feed(msg)
+
+    def _on_position(self, frame: memoryview) -> bool:
+        board = self.decoder.update(frame[2:34])
+        if board is not None:
+            board, self.reversed = check_reversed(board, self.reversed, self.callback)
+            self.callback.board_update(to_short_fen(board))
+        return self.decoder.valid
+
+    def _on_battery(self, frame: memoryview) -> bool:
+        self._battery(*to_battery(frame[2], frame[3]))
+        return True
+
+    def _on_move_battery(self, frame: memoryview) -> bool:
+        self._battery(*to_battery(frame[4], frame[3]))
+        return True
+
+    def _battery(self, value: int, battery: Battery):
+        # Ignore invalid battery status (regular result from Chessnut Move)
+        if not (value == 0 and battery == Battery.EXHAUSTED):
+            self.callback.battery(value, battery)
+
+    def _on_board_type(self, frame: memoryview) -> bool:
+        self.callback.board_type(BoardType.CHESSNUT_REGULAR if frame[0] == 0x32 else BoardType.CHESSNUT_MOVE)
+        return True
@@ -3,6 +3,7 @@ from abc import abstractmethod
 from enum import Enum
 
 from dgt.util import ClockIcons
+from eboard import scan
 
 
 class EBoard(Protocol):
@@ -89,25 +90,10 @@ def to_battery(percent, status):
 def to_short_fen(board) -> str:
     """
     Convert a board to a short FEN representation, e.g. 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'
-    :param board: the board to convert
+    :param board: the board to convert, a 64 character string or a list of 64 pieces
     :return: a short fen representation
     """
-    fen = ""
-    for row_index, row in enumerate(range(7, -1, -1)):
-        blanks = 0
-        for col_index, col in enumerate(range(8)):
-            if board[row * 8 + col] == " ":
-                blanks += 1
-                if col_index == 7 and blanks > 0:
-                    fen += str(blanks)
-            else:
-                if blanks > 0:
-                    fen += str(blanks)
-                blanks = 0
-                fen += board[row * 8 + col]
-        if row_index != 7:
-            fen += "/"
-    return fen
+    return scan.to_short_fen(board if isinstance(board, str) else "".join(board))
 
 
 def get_upper_4_bits(b):
@@ -119,27 +105,7 @@ def get_lower_4_bits(b):
 
 
 def check_reversed(brd, is_reversed, callback):
-    board = brd.copy()
-    w_count_lower_half, b_count_lower_half = _piece_count(board, range(32))
-    w_count_upper_half, b_count_upper_half = _piece_count(board, range(32, 64))
-    if is_reversed and w_count_lower_half > 10 and b_count_upper_half > 10:
-        is_reversed = False
-        callback.reversed(is_reversed)
-    elif not is_reversed and w_count_upper_half > 10 and b_count_lower_half > 10:
-        is_reversed = True
-        callback.reversed(is_reversed)
-    if is_reversed:
-        board.reverse()
-    return board, is_reversed
-
-
-def _piece_count(board, board_half):
-    w_count = 0
-    b_count = 0
-    for i in board_half:
-        if board[i] != " ":
-            if board[i] < "Z":
-                w_count += 1
-            else:
-                b_count += 1
-    return w_count, b_count
+    board, now_reversed = scan.orient(brd if isinstance(brd, str) else "".join(brd), is_reversed)
+    if now_reversed != is_reversed:
+        callback.reversed(now_reversed)
+    return board, now_reversed
@@ -0,0 +1,159 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Frame reassembly for the e-board byte streams. BLE and serial transports deliver a frame in chunks,
+# often 20 bytes at a time, mixed with junk. The assembler appends chunks to a fixed buffer, finds sync
+# markers with bytearray.find and hands complete frames to the parser as memoryviews, so every received
+# byte is copied once and searched once, however small the chunks are.
+
+import logging
+from typing import Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 4096  # larger than any frame, a Certabo piece-id scan is about 1.3k
+
+
+class FrameSpec(object):
+    """One frame type of a protocol: a sync marker and either a fixed length or a terminator."""
+
+    def __init__(self, name: str, marker: bytes, length: int = 0, terminator: bytes = b""):
+        """
+        :param name: key of the frame handler
+        :param marker: bytes the frame starts with, b"" if frames just follow each other
+        :param length: total frame length including the marker
+        :param terminator: bytes that end a frame of variable length, included in the frame
+        """
+        assert length or terminator, "a frame needs a length or a terminator"
+        self.name = name
+        self.marker = marker
+        self.length = length
+        self.terminator = terminator
+
+    def __repr__(self):
+        return "FrameSpec({})".format(self.name)
+
+
+class FrameAssembler(object):
+    """Incremental frame reassembly over a fixed size buffer."""
+
+    def __init__(
+        self,
+        specs: Sequence[FrameSpec],
+        handlers: Dict[str, Callable[[memoryview], bool]],
+        buffer_size: int = BUFFER_SIZE,
+    ):
+        """
+        :param specs: frame types, the first one wins if two markers start at the same byte
+        :param handlers: handler per frame name; it gets the frame as memoryview, only valid during the call,
+                         and returns False if the frame was invalid, to search the next marker after its first byte
+        """
+        self.specs = tuple(specs)
+        self.handlers = handlers
+        self.buffer = bytearray(buffer_size)
+        self.start = 0  # first byte not handled yet
+        self.end = 0  # end of the received bytes
+        self.frame: Optional[FrameSpec] = None  # frame started at self.start, waiting for more bytes
+        self.scanned = 0  # terminator search of self.frame continues here
+        self.keep = max(0, max(len(spec.marker) for spec in self.specs) - 1)  # bytes that may start a marker
+
+    def feed(self, data):
+        """Add received bytes and handle all frames completed by them."""
+        chunk = len(self.buffer) // 2
+        with memoryview(data) as view:
+            for offset in range(0, len(view), chunk):
+                self._append(view[offset:offset + chunk])
+                while self._next_frame():
+                    pass
+
+    def flush(self, handler: Callable[[memoryview], bool]) -> bool:
+        """Hand the bytes of an unfinished frame to handler, they are dropped if it returns True."""
+        if self.pending() == 0:
+            return False
+        with memoryview(self.buffer)[self.start:self.end] as frame:
+            done = handler(frame)
+        if done:
+            self.start = self.end
+            self.frame = None
+        return done
+
+    def reset(self):
+        """Drop all buffered bytes."""
+        self.start = self.end = self.scanned = 0
+        self.frame = None
+
+    def pending(self) -> int:
+        """Number of buffered bytes not handled yet."""
+        return self.end - self.start
+
+    def _append(self, data: memoryview):
+        size = len(data)
+        capacity = len(self.buffer)
+        if self.end + size > capacity:
+            if self.pending() + size > capacity:
+                # a frame in progress can not be longer than the buffer - it was junk
+                logger.debug("frame buffer overflow, dropping %d bytes", self.pending())
+                self.reset()
+            else:
+                pending = self.pending()
+                self.buffer[:pending] = self.buffer[self.start:self.end]
+                self.scanned -= self.start
+                self.start, self.end = 0, pending
+        self.buffer[self.end:self.end + size] = data
+        self.end += size
+
+    def _next_frame(self) -> bool:
+        """Handle the next frame if it is complete, False when more bytes are needed."""
+        if self.frame is None and (self.start == self.end or not self._sync()):
+            return False
+        spec = self.frame
+        if spec is None:
+            return False
+        if spec.length:
+            frame_end = self.start + spec.length
+            if frame_end > self.end:
+                return False
+        else:
+            found = self.buffer.find(spec.terminator, self.scanned, self.end)
+            if found == -1:
+                self.scanned = max(self.scanned, self.end - len(spec.terminator) + 1)
+                return False
+            frame_end = found + len(spec.terminator)
+        with memoryview(self.buffer)[self.start:frame_end] as frame:
+            valid = self.handlers[spec.name](frame)
+        self.start = frame_end if valid else self.start + 1
+        self.frame = None
+        return True
+
+    def _sync(self) -> bool:
+        """Skip junk up to the earliest marker, False if no marker is in the buffer yet."""
+        first = -1
+        first_spec = None
+        for spec in self.specs:
+            found = self.buffer.find(spec.marker, self.start, self.end if first == -1 else first + len(spec.marker))
+            if found != -1 and (first == -1 or found < first):
+                first, first_spec = found, spec
+                if found == self.start:
+                    break
+        if first_spec is None:
+            self.start = max(self.start, self.end - self.keep)
+            return False
+        self.frame = first_spec
+        self.start = first
+        self.scanned = first + len(first_spec.marker)
+        return True
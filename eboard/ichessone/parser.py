@@ -11,10 +11,35 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import List
-
-from eboard.eboard import to_short_fen, to_battery, get_upper_4_bits, get_lower_4_bits, check_reversed
+from eboard.eboard import to_short_fen, to_battery, check_reversed
 from eboard.eboard import Battery
+from eboard.frames import FrameAssembler, FrameSpec
+from eboard.scan import EMPTY, ScanDecoder, nibble_table
+
+# two squares per byte: upper and lower 4 bits
+PIECES = nibble_table(
+    {
+        0: EMPTY,
+        0x01: "P",
+        0x04: "R",
+        0x02: "N",
+        0x03: "B",
+        0x05: "Q",
+        0x06: "K",
+        0x07: "p",
+        0x0A: "r",
+        0x08: "n",
+        0x09: "b",
+        0x0B: "q",
+        0x0C: "k",
+    }
+)
+FRAME_ORDER = tuple(row * 4 + col for row in range(7, -1, -1) for col in range(4))
+
+FRAMES = (
+    FrameSpec("position", b"\x3d\x70", 34),
+    FrameSpec("battery", b"\x3d\x62", 4),
+)
 
 
 class ParserCallback(object):
@@ -33,79 +58,20 @@ class Parser(object):
 
     def __init__(self, callback: ParserCallback):
         self.callback = callback
-        self.buffer = bytearray()
-        self.last_board: List = []
+        self.frames = FrameAssembler(FRAMES, {"position": self._on_position, "battery": self._on_battery})
+        self.decoder = ScanDecoder(PIECES, FRAME_ORDER)
         self.reversed = False
 
     def parse(self, msg: bytearray):
-        # copy any previous buffer to the front
-        data = self.buffer + msg
-        self.buffer = bytearray()
-        if len(data) >= 3:
-            i = 0
-            while i < len(data):
-                if (i + 2) < len(data):
-                    if data[i] == 0x3D and data[i + 1] == 0x70:  # position
-                        new_pos, position_data = self._parse_position(data, i)
-                        board = self._to_board(position_data)
-                        if len(board) > 0 and None not in board:
-                            if self.last_board != board:
-                                self.last_board = board
-                                board, self.reversed = check_reversed(board, self.reversed, self.callback)
-                                self.callback.board_update(to_short_fen(board))
-                            i = new_pos
-                    elif (i + 3) < len(data) and data[i] == 0x3D and data[i + 1] == 0x62:  # battery
-                        self.callback.battery(*to_battery(data[i + 3], data[i + 2]))
-                        i += 3
-                i += 1
-        else:
-            self._add_to_buffer(msg)
-
-    def _parse_position(self, data, index):
-        data_length = 32
-        if len(data) >= (index + data_length + 2):
-            data = data[index + 2:]
-            index += data_length + 1
-            return index, data
-        else:
-            self._add_to_buffer(data)
-        return index, bytearray()
-
-    def _add_to_buffer(self, arr):
-        self.buffer += arr
+        self.frames.feed(msg)
 
-    def _to_board(self, data):
-        if len(data) >= 32:
-            board = [None] * 64
-            i = 0
-            for row in range(7, -1, -1):
-                for col in range(4):
-                    board[i] = self._to_stone(get_upper_4_bits(data[row * 4 + col]))
-                    board[i + 1] = self._to_stone(get_lower_4_bits(data[row * 4 + col]))
-                    i += 2
-            i += 1
-            return board
-        else:
-            return []
+    def _on_position(self, frame: memoryview) -> bool:
+        board = self.decoder.update(frame[2:34])
+        if board is not None:
+            board, self.reversed = check_reversed(board, self.reversed, self.callback)
+            self.callback.board_update(to_short_fen(board))
+        return self.decoder.valid
 
-    @staticmethod
-    def _to_stone(value):
-        translation = {
-            0: " ",
-            0x01: "P",
-            0x04: "R",
-            0x02: "N",
-            0x03: "B",
-            0x05: "Q",
-            0x06: "K",
-            0x07: "p",
-            0x0A: "r",
-            0x08: "n",
-            0x09: "b",
-            0x0B: "q",
-            0x0C: "k",
-        }
-        if value in translation:
-            return translation[value]
-        else:
-            return None
+    def _on_battery(self, frame: memoryview) -> bool:
+        self.callback.battery(*to_battery(frame[3], frame[2]))
+        return True
@@ -11,11 +11,145 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Callable, List, Optional
-from threading import Timer
+import heapq
+import itertools
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
 import chess  # type: ignore
 
+logger = logging.getLogger(__name__)
+
+
+def _reach_table(piece_type: chess.PieceType, color: chess.Color) -> List[chess.Bitboard]:
+    """Squares a piece could reach from each square on an empty board."""
+    table = []
+    for square in chess.SQUARES:
+        if piece_type == chess.PAWN:
+            step = 8 if color == chess.WHITE else -8
+            reach = chess.BB_PAWN_ATTACKS[color][square]
+            if 0 <= square + step < 64:
+                reach |= chess.BB_SQUARES[square + step]
+            if chess.square_rank(square) == (1 if color == chess.WHITE else 6):
+                reach |= chess.BB_SQUARES[square + 2 * step]
+        elif piece_type == chess.KNIGHT:
+            reach = chess.BB_KNIGHT_ATTACKS[square]
+        elif piece_type == chess.KING:
+            reach = chess.BB_KING_ATTACKS[square]
+        else:
+            reach = chess.BB_EMPTY
+            if piece_type in (chess.BISHOP, chess.QUEEN):
+                reach |= chess.BB_DIAG_ATTACKS[square][0]
+            if piece_type in (chess.ROOK, chess.QUEEN):
+                reach |= chess.BB_RANK_ATTACKS[square][0] | chess.BB_FILE_ATTACKS[square][0]
+        table.append(reach)
+    return table
+
+
+REACH: Dict[Tuple[chess.PieceType, chess.Color], List[chess.Bitboard]] = {
+    (piece_type, color): _reach_table(piece_type, color) for piece_type in chess.PIECE_TYPES for color in chess.COLORS
+}
+
+
+@lru_cache(maxsize=4096)
+def is_move_extendable(previous_fen: str, fen: str) -> bool:
+    """
+    True if fen follows from previous_fen by one legal move of a piece which could also have gone to another square.
+    Only the two changed squares are looked at and only the moves of that piece are generated.
+    """
+    try:
+        before = chess.BaseBoard(previous_fen).piece_map()
+        after = chess.BaseBoard(fen).piece_map()
+    except ValueError:
+        return False
+    changed = [square for square in set(before) | set(after) if before.get(square) != after.get(square)]
+    if len(changed) != 2:
+        return False
+    from_square, to_square = changed if changed[0] not in after else reversed(changed)
+    piece = before.get(from_square)
+    if piece is None or from_square in after or to_square not in after or piece.piece_type == chess.KNIGHT:
+        return False
+    if not REACH[piece.piece_type, piece.color][from_square] & chess.BB_SQUARES[to_square]:
+        return False
+    landed = after[to_square]
+    if landed.color != piece.color or (landed.piece_type != piece.piece_type and piece.piece_type != chess.PAWN):
+        return False
+    board = chess.Board(previous_fen + (" w" if piece.color == chess.WHITE else " b") + " - - 0 1")
+    promotion = landed.piece_type if landed.piece_type != piece.piece_type else None
+    legal = False
+    extendable = False
+    for move in board.generate_legal_moves(from_mask=chess.BB_SQUARES[from_square]):
+        if move.to_square != to_square:
+            extendable = True
+        elif move.promotion == promotion:
+            legal = True
+    return legal and extendable
+
+
+class DebounceHandle(object):
+    """Pending call of a DebounceScheduler, like asyncio.TimerHandle."""
+
+    __slots__ = ("when", "callback", "args", "cancelled")
+
+    def __init__(self, when: float, callback: Callable, args: tuple):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class DebounceScheduler(object):
+    """
+    One daemon thread running the delayed calls of all debouncers in the process.
+    call_later has the signature of asyncio's loop.call_later, so it can be used from the board reader threads
+    which have no event loop.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.heap: List[Tuple[float, int, DebounceHandle]] = []
+        self.counter = itertools.count()
+        self.thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, callback: Callable, *args) -> DebounceHandle:
+        with self.condition:
+            handle = DebounceHandle(time.monotonic() + delay, callback, args)
+            heapq.heappush(self.heap, (handle.when, next(self.counter), handle))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="move-debouncer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+        return handle
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.heap and self.heap[0][2].cancelled:
+                    heapq.heappop(self.heap)
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                wait = self.heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                handle = heapq.heappop(self.heap)[2]
+            if handle.cancelled:
+                continue
+            try:
+                handle.callback(*handle.args)
+            except Exception:  # noqa - keep the scheduler alive for the other boards
+                logger.exception("debounced callback failed")
+
+
+scheduler = DebounceScheduler()
+
 
 class MoveDebouncer(object):
     """
@@ -32,15 +166,22 @@ class MoveDebouncer(object):
           extendable.
     """
 
-    def __init__(self, debounce_time_millis: int, callback: Callable[[str], None]):
+    def __init__(
+        self,
+        debounce_time_millis: int,
+        callback: Callable[[str], None],
+        timer_scheduler: Optional[DebounceScheduler] = None,
+    ):
         """
         :param debounce_time_millis: wait time in milliseconds until the callback is called
         :param callback: callback to be called after the debounce time passes or if the move is not extendable
+        :param timer_scheduler: scheduler for the delayed callback, the shared scheduler thread by default
         """
         self.debounce_time_millis = debounce_time_millis
         self.callback = callback
+        self.scheduler = timer_scheduler or scheduler
         self.previous_fen = None
-        self.timer: Optional[Timer] = None
+        self.timer: Optional[DebounceHandle] = None
         self.previous_fens: List[str] = []
 
     def update(self, short_fen: str):
@@ -55,8 +196,7 @@ class MoveDebouncer(object):
         if self.timer is not None:
             self.timer.cancel()
         if self._shall_start_timer(short_fen):
-            self.timer = Timer(self.debounce_time_millis / 1000, self.callback, [short_fen])
-            self.timer.start()
+            self.timer = self.scheduler.call_later(self.debounce_time_millis / 1000, self.callback, short_fen)
         else:
             self.callback(short_fen)
         self.previous_fens.append(short_fen)
@@ -68,43 +208,7 @@ class MoveDebouncer(object):
     def _shall_start_timer(self, short_fen: str):
         self.previous_fens = self.previous_fens[len(self.previous_fens) - 2:]  # keep two entries max
         for previous in self.previous_fens:
-            if self._is_move_extendable(previous, short_fen):
+            if is_move_extendable(previous, short_fen):
                 self.previous_fens = []
                 return True
         return False
-
-    def _is_move_extendable(self, previous_fen: str, fen: str):
-        board = self._board_from_fen(previous_fen, "b")
-        legal_moves = board.legal_moves
-        legal_fens = self._legal_fens(board, legal_moves)
-        result = False
-        if fen in legal_fens:
-            result = self._is_extendable(board, legal_moves, legal_fens.index(fen))
-        else:
-            board = self._board_from_fen(previous_fen, "w")
-            legal_moves = board.legal_moves
-            legal_fens = self._legal_fens(board, legal_moves)
-            if fen in legal_fens:
-                result = self._is_extendable(board, legal_moves, legal_fens.index(fen))
-        return result
-
-    def _is_extendable(self, board: chess.Board, legal_moves: list, index: int):
-        move = list(legal_moves)[index]
-        if board.piece_type_at(move.from_square) == chess.KNIGHT:
-            return False
-        for m in legal_moves:
-            if m.from_square == move.from_square and m.to_square != move.to_square:
-                return True
-        return False
-
-    def _board_from_fen(self, board_fen: str, color: str):
-        return chess.Board(board_fen + " " + color + " - - 0 1")
-
-    def _legal_fens(self, b: chess.Board, legal_moves: list):
-        board = b.copy()
-        fens = []
-        for move in legal_moves:
-            board.push(move)
-            fens.append(board.board_fen())
-            board.pop()
-        return fens
@@ -0,0 +1,114 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Scan decoding shared by the e-board drivers. A board is a 64 character string with " " for empty
+# squares, square 0 is the first character of the last FEN rank (a1 for a board in normal orientation).
+# Scans are decoded with 256-entry byte tables and the frame bytes are compared before decoding, so a
+# board that is polled many times a second only costs a bytes compare while nothing moves.
+
+from operator import itemgetter
+from typing import Dict, Optional, Tuple
+
+EMPTY = " "
+INVALID = "?"
+START_BOARD = "RNBQKBNRPPPPPPPP" + EMPTY * 32 + "pppppppprnbqkbnr"
+
+_WHITE = "PNBRQK"
+_BLACK = "pnbrqk"
+_RUNS = tuple((EMPTY * length, str(length)) for length in range(8, 0, -1))
+_RANKS = itemgetter(*(slice(row * 8, row * 8 + 8) for row in range(7, -1, -1)))
+
+
+def byte_table(codes: Dict[int, str]) -> Tuple[str, ...]:
+    """Table with the piece of every byte value, INVALID for bytes that are no piece."""
+    return tuple(codes.get(value, INVALID) for value in range(256))
+
+
+def nibble_table(codes: Dict[int, str]) -> Tuple[str, ...]:
+    """Table with the pieces of the upper and the lower 4 bits of every byte value, for two squares per byte."""
+    pieces = [codes.get(value, INVALID) for value in range(16)]
+    return tuple(pieces[value >> 4] + pieces[value & 0x0F] for value in range(256))
+
+
+class ScanDecoder(object):
+    """Turns raw scan frames into boards, skipping frames that repeat the previous one."""
+
+    def __init__(self, table: Tuple[str, ...], order: Tuple[int, ...]):
+        """
+        :param table: byte_table or nibble_table of the board
+        :param order: frame index of every table lookup, in board order
+        """
+        self.table = table
+        self.order = order
+        self.frame_length = max(order) + 1
+        self._pick = itemgetter(*order)
+        self.last_frame = b""
+        self.valid = False  # the last frame held a board
+        self.board: Optional[str] = None
+
+    def decode(self, frame: bytes) -> Optional[str]:
+        """Board of the frame, None if the frame is too short or holds an invalid piece code."""
+        if len(frame) < self.frame_length:
+            return None
+        board = "".join(map(self.table.__getitem__, self._pick(frame)))
+        return None if INVALID in board else board
+
+    def update(self, frame: bytes) -> Optional[str]:
+        """Board of the frame if it is valid and differs from the last board, else None."""
+        if frame == self.last_frame:
+            return None
+        self.last_frame = bytes(frame)
+        board = self.decode(frame)
+        self.valid = board is not None
+        if board is None or board == self.board:
+            return None
+        self.board = board
+        return board
+
+    def reset(self):
+        """Forget the last frame, e.g. when the orientation or piece mapping changed."""
+        self.last_frame = b""
+        self.valid = False
+        self.board = None
+
+
+def to_short_fen(board: str) -> str:
+    """Short FEN of a board, e.g. 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR'."""
+    fen = "/".join(_RANKS(board))
+    for blanks, count in _RUNS:
+        fen = fen.replace(blanks, count)
+    return fen
+
+
+def piece_count(half: str) -> Tuple[int, int]:
+    """Number of white and black pieces on (part of) a board."""
+    return sum(map(half.count, _WHITE)), sum(map(half.count, _BLACK))
+
+
+def orient(board: str, is_reversed: bool) -> Tuple[str, bool]:
+    """
+    Detect a board set up with black at the bottom from the piece counts on both halves.
+    :return: the board in normal orientation and the new reversed state
+    """
+    w_count_lower_half, b_count_lower_half = piece_count(board[:32])
+    w_count_upper_half, b_count_upper_half = piece_count(board[32:])
+    if is_reversed and w_count_lower_half > 10 and b_count_upper_half > 10:
+        is_reversed = False
+    elif not is_reversed and w_count_upper_half > 10 and b_count_lower_half > 10:
+        is_reversed = True
+    return (board[::-1] if is_reversed else board), is_reversed
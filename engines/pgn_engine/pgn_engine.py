@@ -16,8 +16,8 @@ from typing import Any
 import chess  # type: ignore
 import chess.pgn  # type: ignore
 import chess.engine  # type: ignore
+import chess.polyglot  # type: ignore
 import random
-import pygame
 from pathlib import Path
 
 ###########################################################################################
@@ -61,6 +61,12 @@ j = 0
 i = 0
 
 move_list: list[str] = []
+# (zobrist hash, last move) -> ply of the loaded game, first occurrence wins like the old fen search
+position_index: dict[tuple[int, str], int] = {}
+# moves of the last position command, input_board is updated with the difference only
+position_root = ""
+position_moves: list[str] = []
+mixer: Any = None  # pygame.mixer, imported when audio is played
 game_list: list[Any] = []
 orig_game_list: list[Any] = []
 pgn_file: Any = ""
@@ -75,11 +81,23 @@ l_continue = True
 log: Any = None
 
 try:
-    log = open(log_file, "w")
+    log = open(log_file, "w")  # flushed after each bestmove and new game only, not per line
 except OSError:
     print("# Could not create log file")
 
 
+def get_mixer():
+    """pygame takes long to import - only do it when there is audio to play"""
+    global mixer
+
+    if mixer is None:
+        import pygame
+
+        pygame.mixer.init()
+        mixer = pygame.mixer
+    return mixer
+
+
 def play_audio():
     global flag_audio_playing
 
@@ -88,8 +106,8 @@ def play_audio():
         return
 
     if Path(p_audio_comment).is_file():
-        pygame.mixer.music.load(p_audio_comment)
-        pygame.mixer.music.play()
+        get_mixer().music.load(p_audio_comment)
+        get_mixer().music.play()
         flag_audio_playing = True
     return
 
@@ -102,7 +120,6 @@ def print2(x):
 def write_log(x):
     if log is not None:
         log.write("< %s\n" % x)
-        log.flush()
 
 
 def get_move():
@@ -218,6 +235,9 @@ def newgame():
     global game_list
     global game_counter
     global fen
+    global position_root
+
+    position_root = ""  # input_board is set from scratch again by the next position command
 
     if move_counter <= 1 and game_started and max_moves > 1 and fen == "":
         move_counter = 0
@@ -316,10 +336,14 @@ def newgame():
     input_board = get_start_pos(input_board)
 
     i = 0
+    position_index.clear()
     if l_continue:
+        s_board = get_start_pos(None)
         for move in pgn_game.mainline_moves():  # molli: later mainline_moves() for python-chess 25
+            position_index.setdefault((chess.polyglot.zobrist_hash(s_board), move_list[-1] if move_list else ""), i)
             i = i + 1
             move_list.append(move.uci())
+            s_board.push(move)
 
     max_moves = i
 
@@ -392,7 +416,6 @@ def newgame():
 def push_uci_move(uci_move):
     if log is not None:
         log.write("Received an uci move: %s\n" % uci_move)
-        log.flush()
 
 
 def get_start_pos(board):
@@ -408,49 +431,53 @@ def get_start_pos(board):
 def set_move_counter_from_fen(last_move):
     global move_counter
     global board
-    s_board = None
-
-    current_move = ""
-    found = False
-    s_board = get_start_pos(s_board)
 
-    count = 0
+    # same position reached with the same last move - the full fen compare of old
+    count = position_index.get((chess.polyglot.zobrist_hash(input_board), str(last_move)))
+    found = count is not None
+    if log is not None:
+        log.write("Input last move: %s\n" % str(last_move))
 
-    while not (found) and count < max_moves:
-        fen1 = s_board.fen()
-        fen2 = input_board.fen()
-        if count == 0:
-            current_move = ""
-        else:
-            current_move = move_list[count - 1]
+    if found:
         if log is not None:
-            log.write("Input last move: %s\n" % str(last_move))
-            log.write("Current search move: %s\n" % str(current_move))
+            log.write("Found FEN position in game\n")
+            log.write("Old move_counter: %s\n" % str(move_counter))
+            log.write("New move_counter: %s\n" % str(count))
+        move_counter = count
+        board = input_board.copy(stack=False)  # pub_move pushes on board, input_board must stay as sent
 
-        if fen1 == fen2 and str(last_move) == str(current_move):
-            found = True
+    return found
 
-            if log is not None:
-                log.write("Found FEN position in game\n")
-                log.write("Old move_counter: %s\n" % str(move_counter))
-                log.write("New move_counter: %s\n" % str(count))
-                log.flush()
-            move_counter = count
-            board = input_board
 
-        move = move_list[count]
-        s_board.push(chess.Move.from_uci(move))
-        count = count + 1
+def set_input_position(root, moves):
+    """set input_board to root (a fen or startpos) and moves, only the moves changed since the
+    previous position command are popped and pushed - normally just the last one or two"""
+    global input_board
+    global position_root
+    global position_moves
 
-    return found
+    common = 0
+    if input_board is not None and root == position_root:
+        if moves[: len(position_moves)] == position_moves:
+            common = len(position_moves)  # the usual case - new moves appended
+        else:
+            while common < min(len(moves), len(position_moves)) and moves[common] == position_moves[common]:
+                common = common + 1
+        for _ in range(len(position_moves) - common):
+            input_board.pop()
+    else:
+        input_board = chess.Board() if root == "startpos" else chess.Board(root)
+
+    for mo in moves[common:]:
+        input_board.push(chess.Move.from_uci(mo))
+    position_root = root
+    position_moves = moves
 
 
 ###############################################################
 # Main program loop: process input string (line)
 ###############################################################
 
-pygame.mixer.init()
-
 while True:
 
     line = ""
@@ -468,10 +495,9 @@ while True:
     if line:
         if log is not None:
             log.write("*** " + line + "\n")
-            log.flush()
         if line == "quit":
             if flag_audio_playing:
-                pygame.mixer.music.stop()
+                get_mixer().music.stop()
 
             if is_uci and p_pgn_game_file and pgn_file != "" and game_started:
                 pgn_file.close()
@@ -486,15 +512,13 @@ while True:
                 if flag_audio_playing:
                     if log is not None:
                         log.write("pause audio\n")
-                        log.flush()
-                    pygame.mixer.music.pause()
+                    get_mixer().music.pause()
                     flag_audio_playing = False
                 else:
-                    pygame.mixer.music.unpause()
+                    get_mixer().music.unpause()
                     flag_audio_playing = True
                     if log is not None:
                         log.write("continue audio\n")
-                        log.flush()
 
             is_uci = True
 
@@ -513,17 +537,13 @@ while True:
 
         elif "position startpos moves" in line:
             mm = line.split()[3:]
+            last_move = mm[-1] if mm else ""
 
-            input_board = chess.Board()
-
-            for mo in mm:  # get last move and set current position
-                input_board.push(chess.Move.from_uci(mo))
-                last_move = mo
+            set_input_position("startpos", mm)
 
             if log is not None:
                 log.write("input move %s\n" % last_move)
                 log.write("game_started %s\n" % game_started)
-                log.flush()
 
             guess_ok = set_move_counter_from_fen(last_move)
 
@@ -531,20 +551,18 @@ while True:
                 push_uci_move(last_move)
 
         elif "position startpos" in line:
-            input_board = chess.Board()
+            set_input_position("startpos", [])
             move_counter = 0
             # game_started = True
 
             if log is not None:
                 log.write("position startpos ready\n")
-                log.flush()
 
         elif "position fen" in line:
             # game_started = True
             if line == last_fen_line:
                 if log is not None:
                     log.write("WARNING: input fen (double)")
-                    log.flush()
             last_fen_line = line
 
             if line.split()[6] == "moves":  # Shredder FEN
@@ -553,17 +571,12 @@ while True:
             mm = line.split()[9:]
             _fen = " ".join(ff)
 
-            last_move = ""
-
-            input_board = chess.Board(_fen)
+            last_move = mm[-1] if mm else ""
 
-            for mo in mm:  # get last move and set current position
-                input_board.push(chess.Move.from_uci(mo))
-                last_move = mo
+            set_input_position(_fen, mm)
 
             if log is not None:
                 log.write("input move %s\n" % last_move)
-                log.flush()
 
             if last_move != "":
                 guess_ok = set_move_counter_from_fen(last_move)
@@ -645,21 +658,19 @@ while True:
         elif line == "stop":
             # if pygame.mixer.music.get_busy():
             if flag_audio_playing:
-                pygame.mixer.music.pause()
+                get_mixer().music.pause()
                 flag_audio_playing = False
-            else:
-                pygame.mixer.music.unpause()
+            elif mixer is not None:
+                mixer.music.unpause()
                 flag_audio_playing = True
 
             if log is not None:
                 log.write("Stop audio\n")
-                log.flush()
 
         elif line == "?":
             print("move", uci_move)
             if log is not None:
                 log.write("move %s\n" % uci_move)
-                log.flush()
         else:
             if len(line) == 4 and is_uci and game_started:
                 if line[0] in abc and line[2] in abc and line[1] in nn and line[3] in nn:
@@ -0,0 +1,203 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Immutable game snapshots for the Message payloads. A snapshot is the current position
+# without move history plus a persistent move list: each move is a node pointing to the
+# node of the move before, so the snapshots taken during a game share all their moves.
+# Taking a snapshot costs the same at move 5 and at move 150, the full chess.Board with
+# move stack is only built for a receiver that asks for history (move_stack, pop, PGN).
+
+import logging
+
+import chess  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# chess.Board attributes that only depend on the current position
+POSITION_ATTRIBUTES = frozenset(
+    {
+        "aliases", "attackers", "board_fen", "castling_rights", "castling_xfen", "chess960", "chess960_pos",
+        "color_at", "ep_square", "epd", "fen", "fullmove_number", "gives_check", "halfmove_clock",
+        "has_castling_rights", "has_insufficient_material", "has_legal_en_passant", "is_attacked_by",
+        "is_capture", "is_castling", "is_check", "is_checkmate", "is_en_passant", "is_insufficient_material",
+        "is_legal", "is_pseudo_legal", "is_seventyfive_moves", "is_stalemate", "is_variant_draw",
+        "is_variant_end", "is_variant_loss", "is_variant_win", "is_zeroing", "king", "kings", "lan",
+        "legal_moves", "occupied", "occupied_co", "parse_san", "parse_uci", "pawns", "knights", "bishops",
+        "rooks", "queens", "piece_at", "piece_map", "piece_type_at", "pieces", "ply", "promoted",
+        "pseudo_legal_moves", "san", "shredder_fen", "status", "turn", "uci", "uci_variant", "unicode",
+        "variation_san",
+    }
+)  # fmt: skip
+
+# chess.Board methods that change the board - copy() the snapshot first
+MUTATORS = frozenset(
+    {
+        "apply_mirror", "apply_transform", "clear", "clear_board", "clear_stack", "pop", "push", "push_san",
+        "push_uci", "push_xboard", "remove_piece_at", "reset", "reset_board", "set_board_fen",
+        "set_castling_fen", "set_chess960_pos", "set_epd", "set_fen", "set_piece_at", "set_piece_map",
+    }
+)  # fmt: skip
+
+
+class MoveNode(object):
+    """One move of a persistent move list, the list is the chain of parents."""
+
+    __slots__ = ("move", "state", "parent", "length")
+
+    def __init__(self, move: chess.Move, state, parent: "MoveNode | None"):
+        """:param state: the position before move, as python-chess keeps it to pop the move"""
+        self.move = move
+        self.state = state
+        self.parent = parent
+        self.length = parent.length + 1 if parent is not None else 1
+
+
+def history_of(game: chess.Board, known: MoveNode | None = None) -> MoveNode | None:
+    """Persistent move list of game, sharing the moves it has in common with known.
+
+    python-chess keeps one state object per pushed move, which is shared by the board copies
+    and replaced when a move is popped and pushed again, so a node with the same state object
+    at the same ply stands for the same history up to it."""
+    moves = game.move_stack
+    states = game._stack
+    node = known
+    while node is not None and (node.length > len(moves) or states[node.length - 1] is not node.state):
+        node = node.parent
+    for ply in range(node.length if node is not None else 0, len(moves)):
+        node = MoveNode(moves[ply], states[ply], node)
+    return node
+
+
+def _unwind(node: MoveNode | None) -> tuple[list, list]:
+    """Moves and states of the list, first move first."""
+    moves = []
+    states = []
+    while node is not None:
+        moves.append(node.move)
+        states.append(node.state)
+        node = node.parent
+    moves.reverse()
+    states.reverse()
+    return moves, states
+
+
+def last_moves(node: MoveNode | None, count: int) -> list:
+    """The last count moves of the list, first move first."""
+    moves = []
+    while node is not None and len(moves) < count:
+        moves.append(node.move)
+        node = node.parent
+    moves.reverse()
+    return moves
+
+
+class GameSnapshot(object):
+    """Read-only game for the Message payloads, used like the chess.Board it was taken of.
+
+    Queries of the position are answered by a copy without move history, everything else by
+    a full board built on first use from the persistent move list. Use copy() to get a board
+    to push or pop moves on."""
+
+    __slots__ = ("history", "_position", "_board", "_variant_name", "_variant_snapshot")
+
+    def __init__(self, position: chess.Board, history: MoveNode | None):
+        self.history = history
+        self._position = position
+        self._board: chess.Board | None = None
+        self._variant_name = None
+        self._variant_snapshot = None
+
+    @classmethod
+    def of(cls, game: chess.Board, known: MoveNode | None = None) -> "GameSnapshot":
+        """Snapshot of game, known is the move list of an earlier snapshot of the same game."""
+        if isinstance(game, GameSnapshot):
+            return game
+        return cls(game.copy(stack=False), history_of(game, known))
+
+    @property
+    def move_stack(self) -> list:
+        return list(self._full().move_stack)
+
+    def ply_count(self) -> int:
+        """Number of moves played, without building the move stack."""
+        return self.history.length if self.history is not None else 0
+
+    def peek(self) -> chess.Move:
+        if self.history is None:
+            raise IndexError("peek from empty move stack")
+        return self.history.move
+
+    def last_moves(self, count: int) -> list:
+        """The last count moves, first move first, without building the move stack."""
+        return last_moves(self.history, count)
+
+    def root(self) -> chess.Board:
+        if self.history is None:
+            return self._position.copy(stack=False)
+        node = self.history
+        while node.parent is not None:
+            node = node.parent
+        board = type(self._position)(None, chess960=self._position.chess960)
+        node.state.restore(board)
+        return board
+
+    def copy(self, *, stack: bool | int = True) -> chess.Board:
+        """A chess.Board of this snapshot to push and pop moves on, with the last stack moves of history."""
+        board = self._position.copy(stack=False)
+        if stack and self.history is not None:
+            moves, states = _unwind(self.history)
+            stack = len(moves) if stack is True else stack
+            board.move_stack = moves[-stack:]
+            board._stack = states[-stack:]
+        return board
+
+    def _full(self) -> chess.Board:
+        if self._board is None:
+            self._board = self.copy()
+        return self._board
+
+    def __getattr__(self, name):
+        if name in MUTATORS:
+            raise TypeError("GameSnapshot is read-only, {}() needs a copy()".format(name))
+        if name in POSITION_ATTRIBUTES:
+            return getattr(self._position, name)
+        return getattr(self._full(), name)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __str__(self):
+        return str(self._position)
+
+    def __repr__(self):
+        return "GameSnapshot('{}', {} moves)".format(self._position.fen(), self.ply_count())
+
+
+def game_ply_count(game: chess.Board) -> int:
+    """Number of moves of a board or snapshot, a snapshot answers without building its move stack."""
+    return game.ply_count() if isinstance(game, GameSnapshot) else len(game.move_stack)
+
+
+def game_last_moves(game: chess.Board, count: int) -> list:
+    """The last count moves of a board or snapshot, first move first."""
+    if isinstance(game, GameSnapshot):
+        return game.last_moves(count)
+    return game.move_stack[-count:] if count > 0 else []
@@ -19,30 +19,20 @@ import base64
 import datetime
 import logging
 import os
-import mimetypes
 import asyncio
 
-from email import encoders
-from email.mime.multipart import MIMEMultipart
-from email.mime.audio import MIMEAudio
-from email.mime.base import MIMEBase
-from email.mime.image import MIMEImage
-from email.mime.text import MIMEText
 from typing import Optional
-from smtplib import SMTP
-from ssl import create_default_context
 
-import requests
 import chess  # type: ignore
 import chess.pgn  # type: ignore
-import chess.variant  # type: ignore
 import dgt.util
 
 from timecontrol import TimeControl
-from utilities import DisplayMsg, ensure_important_headers
+from utilities import DisplayMsg, ensure_important_headers, handles
 from dgt.api import Dgt, Message
 from dgt.util import PlayMode, Mode, TimeMode
 from picotutor import PicoTutor
+from variants import variant_pgn_game
 
 logger = logging.getLogger(__name__)
 
@@ -135,6 +125,55 @@ def add_picotutor_variations_to_node(node: chess.pgn.GameNode, value: dict):
             variation_node = variation_node.add_variation(move)
 
 
+def add_picotutor_evaluations(game: chess.pgn.Game, eval_moves: dict):
+    """add picotutor evaluations (key=(ply halfmove number, move, turn)) as NAGs, comments and variations"""
+    nodes = list(game.mainline())
+    for (halfmove_nr, user_move, turn), value in eval_moves.items():
+        # halfmove_nr 1 is like 1. e4
+        node = nodes[halfmove_nr - 1] if 0 < halfmove_nr <= len(nodes) else None
+        if node:  # game has this ply node
+            pgn_move = node.move
+            if pgn_move == user_move and node.turn() == turn:  # checksum
+                nag = value["nag"]  # $N symbol for !!, ! etc
+                if nag != chess.pgn.NAG_NULL:
+                    node.nags.add(nag)
+                node.comment = picotutor_eval_comment(nag, value, turn)
+                add_picotutor_variations_to_node(node, value)
+            else:
+                logger.debug("skipped move %s-%s picotutor eval mismatch", pgn_move.uci(), user_move.uci())
+
+
+def picotutor_eval_comment(nag: int, value: dict, turn: chess.Color) -> str:
+    """comment text of a picotutor evaluation value dict - turn is AFTER the move"""
+    if nag != chess.pgn.NAG_NULL:
+        comment = PicoTutor.nag_to_symbol(nag)  # back to !!, ! etc
+    else:
+        # special case inaccuracy - its not a nag, but CPL > INACCURACY_TH
+        # its the only case where there is a No-NULL evaluation
+        if "best_move" in value:
+            comment = "Best: " + value["best_move"]
+        else:
+            comment = "Inaccuracy "  # should never happen, fallback
+    if "mate" in value:
+        comment += " Mate in: " + str(value["mate"])
+    else:
+        if "score" in value:
+            score_value = value["score"]
+            if turn == chess.WHITE:
+                # always show score from white's perspective
+                # as turn is AFTER move this is now Black perspective
+                score_value = -score_value  # change to white's perspective
+            comment += " Score: " + str(score_value)
+    if "CPL" in value:
+        comment += " CPL: " + str(value["CPL"])
+    if "deep_low_diff" in value:
+        comment += " DS: " + str(value.get("deep_low_diff"))
+    if nag in (chess.pgn.NAG_BLUNDER, chess.pgn.NAG_MISTAKE, chess.pgn.NAG_DUBIOUS_MOVE):
+        if "best_move" in value:
+            comment += " Best: " + value["best_move"]
+    return comment
+
+
 def add_picotutor_variations_to_game(game: chess.pgn.Game, picotutor: PicoTutor | None):
     """Add stored tutor PV alternatives to a PGN game tree."""
     if not picotutor:
@@ -363,6 +402,17 @@ class Emailer(object):
         logger.debug("SMTP Mail delivery: Started")
         # change to smtp based mail delivery
         # depending on encrypted mail delivery, we need to import the right lib
+        # the email libs are imported here as most setups never send an email
+        import mimetypes
+        from email import encoders
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.audio import MIMEAudio
+        from email.mime.base import MIMEBase
+        from email.mime.image import MIMEImage
+        from email.mime.text import MIMEText
+        from smtplib import SMTP
+        from ssl import create_default_context
+
         if self.smtp_encryption:
             # lib with ssl encryption
             logger.debug("SMTP Mail delivery: Import SSL SMTP Lib")
@@ -436,6 +486,8 @@ class Emailer(object):
             logger.debug("SMTP Mail delivery: Ended")
 
     def _use_mailgun(self, subject, body):
+        import requests
+
         out = requests.post(
             "https://api.mailgun.net/v3/picochess.org/messages",
             auth=("api", self.mailgun_key),
@@ -521,22 +573,8 @@ class PgnDisplay(DisplayMsg):
         Using the variant board ensures correct SAN notation (e.g. no + in antichess).
         """
         variant = self.shared.get("variant", "chess") if self.shared else "chess"
-        if variant == "atomic" and game.move_stack:
-            try:
-                atm = chess.variant.AtomicBoard()
-                for move in game.move_stack:
-                    atm.push(move)
-                return chess.pgn.Game().from_board(atm)
-            except Exception:
-                pass
-        elif variant == "antichess" and game.move_stack:
-            try:
-                acb = chess.variant.AntichessBoard()
-                for move in game.move_stack:
-                    acb.push(move)
-                return chess.pgn.Game().from_board(acb)
-            except Exception:
-                pass
+        if variant in ("atomic", "antichess") and game.move_stack:
+            return variant_pgn_game(game, variant)
         return chess.pgn.Game().from_board(game)
 
     def _generate_pgn_from_existing_headers(self, message) -> chess.pgn.Game:
@@ -707,50 +745,11 @@ class PgnDisplay(DisplayMsg):
         """add picotutor evaluations to the game"""
         # see if we have an evaluation in picotutor
         if self.picotutor:
-            eval_moves = self.picotutor.get_eval_moves()
-            for (halfmove_nr, user_move, turn), value in eval_moves.items():
-                # key=(ply halfmove number, move)
-                node = self.get_node_at_halfmove_nr(game, halfmove_nr)
-                if node:  # game has this ply node
-                    pgn_move = node.move
-                    if pgn_move == user_move and node.turn() == turn:  # checksum
-                        nag = value["nag"]  # $N symbol for !!, ! etc
-                        if nag != chess.pgn.NAG_NULL:
-                            node.nags.add(nag)
-                        node.comment = self._get_picotutor_eval_comments(nag, value, turn)
-                        add_picotutor_variations_to_node(node, value)
-                    else:
-                        logger.debug("skipped move %s-%s picotutor eval mismatch", pgn_move.uci(), user_move.uci())
+            add_picotutor_evaluations(game, self.picotutor.get_eval_moves())
 
     def _get_picotutor_eval_comments(self, nag: int, value: dict, turn: chess.Color) -> str:
         """get comments found in picotutor evaluations value dict"""
-        if nag != chess.pgn.NAG_NULL:
-            comment = PicoTutor.nag_to_symbol(nag)  # back to !!, ! etc
-        else:
-            # special case inaccuracy - its not a nag, but CPL > INACCURACY_TH
-            # its the only case where there is a No-NULL evaluation
-            if "best_move" in value:
-                comment = "Best: " + value["best_move"]
-            else:
-                comment = "Inaccuracy "  # should never happen, fallback
-        if "mate" in value:
-            comment += " Mate in: " + str(value["mate"])
-        else:
-            if "score" in value:
-                score_value = value["score"]
-                if turn == chess.WHITE:
-                    # always show score from white's perspective
-                    # as turn is AFTER move this is now Black perspective
-                    score_value = -score_value  # change to white's perspective
-                comment += " Score: " + str(score_value)
-        if "CPL" in value:
-            comment += " CPL: " + str(value["CPL"])
-        if "deep_low_diff" in value:
-            comment += " DS: " + str(value.get("deep_low_diff"))
-        if nag in (chess.pgn.NAG_BLUNDER, chess.pgn.NAG_MISTAKE, chess.pgn.NAG_DUBIOUS_MOVE):
-            if "best_move" in value:
-                comment += " Best: " + value["best_move"]
-        return comment
+        return picotutor_eval_comment(nag, value, turn)
 
     def _save_and_email_pgn(self, message):
         """when game ends the pgn file is saved and emailed"""
@@ -848,103 +847,13 @@ class PgnDisplay(DisplayMsg):
 
     async def _process_message(self, message):
         await asyncio.sleep(0.1)  # reduce priority for PGN
-        if False:  # switch-case
-            pass
-
-        elif isinstance(message, Message.SYSTEM_INFO):
-            if "engine_name" in message.info:
-                self.engine_name = message.info["engine_name"]
-
-                ModeInfo.retro_engine_features = " /"
-                if "(pos+info)" in self.engine_name:
-                    ModeInfo.retro_engine_features = " pos + info"
-                    self.engine_name = self.engine_name.replace("(pos+info)", "")
-                if "(pos)" in self.engine_name:
-                    ModeInfo.retro_engine_features = " position"
-                    self.engine_name = self.engine_name.replace("(pos)", "")
-                if "(info)" in self.engine_name:
-                    ModeInfo.retro_engine_features = " information"
-                    self.engine_name = self.engine_name.replace("(info)", "")
-                    self.old_level_name = self.level_name
-                    self.old_level_text = self.level_text
-                    self.old_engine_elo = self.engine_elo
-                    self.old_user_elo = self.user_elo
-            if "user_name" in message.info:
-                self.user_name = message.info["user_name"]
-                self.old_user_name = message.info["user_name"]
-            if "user_elo" in message.info:
-                self.user_elo = message.info["user_elo"]
-            if "engine_elo" in message.info:
-                self.engine_elo = message.info["engine_elo"]
-            if "rspeed" in message.info:
-                self.rspeed = message.info["rspeed"]
-
-        elif isinstance(message, Message.IP_INFO):
-            self.location = message.info["location"]
-
-        elif isinstance(message, Message.STARTUP_INFO):
-            self.level_text = message.info["level_text"]
-            self.level_name = message.info["level_name"]
-            if "engine_name" in message.info:
-                self.engine_name = message.info["engine_name"]
-            self.old_level_name = self.level_name
-            self.old_level_text = self.level_text
-
-            if "engine_elo" in message.info:
-                self.engine_elo = message.info["engine_elo"]
-                self.old_engine_elo = self.engine_elo
+        await self.dispatch(message)
 
-            if "user_elo" in message.info:
-                self.user_elo = message.info["user_elo"]
-                self.old_user_elo = self.user_elo
+    @handles(Message.SYSTEM_INFO)
+    async def _on_system_info(self, message):
+        if "engine_name" in message.info:
+            self.engine_name = message.info["engine_name"]
 
-        elif isinstance(message, Message.LEVEL):
-            self.level_text = message.level_text
-            self.level_name = message.level_name
-            self.old_level_name = self.level_name
-            self.old_level_text = self.level_text
-            self.old_engine_elo = self.engine_elo
-            self.old_user_elo = self.user_elo
-
-        elif isinstance(message, Message.INTERACTION_MODE):
-            if message.mode == Mode.REMOTE:
-                if self.old_engine == "":
-                    self.old_engine = self.engine_name
-                self.engine_name = "Remote Player"
-                self.user_name = self.old_user_name
-                self.level_text = None
-                self.level_name = ""
-            elif message.mode == Mode.OBSERVE:
-                if self.old_engine == "":
-                    self.old_engine = self.engine_name
-                self.engine_name = "Player B"
-
-                if self.old_user_name == "":
-                    self.old_user_name = self.user_name
-                self.user_name = "Player A"
-                self.level_text = None
-                self.level_name = ""
-            else:
-                if self.old_engine != "":
-                    self.engine_name = self.old_engine
-
-                if self.old_user_name != "":
-                    self.user_name = self.old_user_name
-
-                self.level_name = self.old_level_name
-                self.level_text = self.old_level_text
-                self.engine_elo = self.old_engine_elo
-                self.user_elo = self.old_user_elo
-
-        elif isinstance(message, Message.ENGINE_STARTUP):
-            for index in range(0, len(message.installed_engines)):
-                eng = message.installed_engines[index]
-                if eng["file"] == message.file:
-                    self.engine_elo = eng["elo"]
-                    break
-
-        elif isinstance(message, Message.ENGINE_READY):
-            self.engine_name = message.engine_name
             ModeInfo.retro_engine_features = " /"
             if "(pos+info)" in self.engine_name:
                 ModeInfo.retro_engine_features = " pos + info"
@@ -955,47 +864,146 @@ class PgnDisplay(DisplayMsg):
             if "(info)" in self.engine_name:
                 ModeInfo.retro_engine_features = " information"
                 self.engine_name = self.engine_name.replace("(info)", "")
-
-            self.engine_elo = message.eng["elo"]
-            if not message.has_levels:
-                self.level_text = None
-                self.level_name = ""
-
-            self.old_level_name = self.level_name
-            self.old_level_text = self.level_text
+                self.old_level_name = self.level_name
+                self.old_level_text = self.level_text
+                self.old_engine_elo = self.engine_elo
+                self.old_user_elo = self.user_elo
+        if "user_name" in message.info:
+            self.user_name = message.info["user_name"]
+            self.old_user_name = message.info["user_name"]
+        if "user_elo" in message.info:
+            self.user_elo = message.info["user_elo"]
+        if "engine_elo" in message.info:
+            self.engine_elo = message.info["engine_elo"]
+        if "rspeed" in message.info:
+            self.rspeed = message.info["rspeed"]
+
+    @handles(Message.IP_INFO)
+    async def _on_ip_info(self, message):
+        self.location = message.info["location"]
+
+    @handles(Message.STARTUP_INFO)
+    async def _on_startup_info(self, message):
+        self.level_text = message.info["level_text"]
+        self.level_name = message.info["level_name"]
+        if "engine_name" in message.info:
+            self.engine_name = message.info["engine_name"]
+        self.old_level_name = self.level_name
+        self.old_level_text = self.level_text
+
+        if "engine_elo" in message.info:
+            self.engine_elo = message.info["engine_elo"]
             self.old_engine_elo = self.engine_elo
+
+        if "user_elo" in message.info:
+            self.user_elo = message.info["user_elo"]
             self.old_user_elo = self.user_elo
 
-        elif isinstance(message, Message.GAME_ENDS):
-            if (
-                message.game.move_stack
-                and not ModeInfo.get_pgn_mode()
-                and message.mode not in (Mode.PONDER, Mode.PGNREPLAY)
-            ):
-                # note that neither PGNREPLAY nor PONDER (ANALYSIS) modes overwrite last_game.pgn
-                # we do not have pgn_filename in GAME_ENDS as we have in SAVE_GAME message
-                self._save_and_email_pgn(message)
-            elif message.mode == Mode.PGNREPLAY:
-                message.pgn_filename = "last_replay.pgn"
-                self._save_pgn(message)
-
-        elif isinstance(message, Message.START_NEW_GAME):
-            if "(pos+info)" in self.engine_name:
-                ModeInfo.retro_engine_features = " pos + info"
-                self.engine_name = self.engine_name.replace("(pos+info)", "")
-            if "(pos)" in self.engine_name:
-                ModeInfo.retro_engine_features = " position"
-                self.engine_name = self.engine_name.replace("(pos)", "")
-            if "(info)" in self.engine_name:
-                ModeInfo.retro_engine_features = " information"
-                self.engine_name = self.engine_name.replace("(info)", "")
-            self.startime = datetime.datetime.now().strftime("%H:%M:%S")
+    @handles(Message.LEVEL)
+    async def _on_level(self, message):
+        self.level_text = message.level_text
+        self.level_name = message.level_name
+        self.old_level_name = self.level_name
+        self.old_level_text = self.level_text
+        self.old_engine_elo = self.engine_elo
+        self.old_user_elo = self.user_elo
+
+    @handles(Message.INTERACTION_MODE)
+    async def _on_interaction_mode(self, message):
+        if message.mode == Mode.REMOTE:
+            if self.old_engine == "":
+                self.old_engine = self.engine_name
+            self.engine_name = "Remote Player"
+            self.user_name = self.old_user_name
+            self.level_text = None
+            self.level_name = ""
+        elif message.mode == Mode.OBSERVE:
+            if self.old_engine == "":
+                self.old_engine = self.engine_name
+            self.engine_name = "Player B"
+
+            if self.old_user_name == "":
+                self.old_user_name = self.user_name
+            self.user_name = "Player A"
+            self.level_text = None
+            self.level_name = ""
+        else:
+            if self.old_engine != "":
+                self.engine_name = self.old_engine
+
+            if self.old_user_name != "":
+                self.user_name = self.old_user_name
+
+            self.level_name = self.old_level_name
+            self.level_text = self.old_level_text
+            self.engine_elo = self.old_engine_elo
+            self.user_elo = self.old_user_elo
+
+    @handles(Message.ENGINE_STARTUP)
+    async def _on_engine_startup(self, message):
+        for index in range(0, len(message.installed_engines)):
+            eng = message.installed_engines[index]
+            if eng["file"] == message.file:
+                self.engine_elo = eng["elo"]
+                break
+
+    @handles(Message.ENGINE_READY)
+    async def _on_engine_ready(self, message):
+        self.engine_name = message.engine_name
+        ModeInfo.retro_engine_features = " /"
+        if "(pos+info)" in self.engine_name:
+            ModeInfo.retro_engine_features = " pos + info"
+            self.engine_name = self.engine_name.replace("(pos+info)", "")
+        if "(pos)" in self.engine_name:
+            ModeInfo.retro_engine_features = " position"
+            self.engine_name = self.engine_name.replace("(pos)", "")
+        if "(info)" in self.engine_name:
+            ModeInfo.retro_engine_features = " information"
+            self.engine_name = self.engine_name.replace("(info)", "")
+
+        self.engine_elo = message.eng["elo"]
+        if not message.has_levels:
+            self.level_text = None
+            self.level_name = ""
+
+        self.old_level_name = self.level_name
+        self.old_level_text = self.level_text
+        self.old_engine_elo = self.engine_elo
+        self.old_user_elo = self.user_elo
+
+    @handles(Message.GAME_ENDS)
+    async def _on_game_ends(self, message):
+        if (
+            message.game.move_stack
+            and not ModeInfo.get_pgn_mode()
+            and message.mode not in (Mode.PONDER, Mode.PGNREPLAY)
+        ):
+            # note that neither PGNREPLAY nor PONDER (ANALYSIS) modes overwrite last_game.pgn
+            # we do not have pgn_filename in GAME_ENDS as we have in SAVE_GAME message
+            self._save_and_email_pgn(message)
+        elif message.mode == Mode.PGNREPLAY:
+            message.pgn_filename = "last_replay.pgn"
+            self._save_pgn(message)
+
+    @handles(Message.START_NEW_GAME)
+    async def _on_start_new_game(self, message):
+        if "(pos+info)" in self.engine_name:
+            ModeInfo.retro_engine_features = " pos + info"
+            self.engine_name = self.engine_name.replace("(pos+info)", "")
+        if "(pos)" in self.engine_name:
+            ModeInfo.retro_engine_features = " position"
+            self.engine_name = self.engine_name.replace("(pos)", "")
+        if "(info)" in self.engine_name:
+            ModeInfo.retro_engine_features = " information"
+            self.engine_name = self.engine_name.replace("(info)", "")
+        self.startime = datetime.datetime.now().strftime("%H:%M:%S")
 
-        elif isinstance(message, Message.SAVE_GAME):
-            logger.debug("molli: save game message pgn dispatch")
-            self._save_pgn(message)  # needs pgn_filename from SAVE_GAME message
-            # if we _save_and_email_pgn() here the side effect is that
-            # it stores unfinished games in games.pgn
+    @handles(Message.SAVE_GAME)
+    async def _on_save_game(self, message):
+        logger.debug("molli: save game message pgn dispatch")
+        self._save_pgn(message)  # needs pgn_filename from SAVE_GAME message
+        # if we _save_and_email_pgn() here the side effect is that
+        # it stores unfinished games in games.pgn
 
     async def message_consumer(self):
         """PGN message consumer"""
@@ -1005,7 +1013,8 @@ class PgnDisplay(DisplayMsg):
                 # Check if we have something to display
                 message = await self.msg_queue.get()
                 if (
-                    not isinstance(message, Message.DGT_SERIAL_NR)
+                    logger.isEnabledFor(logging.DEBUG)
+                    and not isinstance(message, Message.DGT_SERIAL_NR)
                     and not isinstance(message, Message.DGT_CLOCK_TIME)
                     and not isinstance(message, Message.CLOCK_TIME)
                     and not isinstance(message, Message.NEW_DEPTH)
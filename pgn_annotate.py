@@ -0,0 +1,461 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Offline PGN annotation. Run from the picochess folder:
+#   python3 pgn_annotate.py games/tournament.pgn --engine engines/aarch64/a-stockf [--workers 3]
+#       [--remote pi@bigbox --remote-key ~/.ssh/id_rsa] [--depth 20]
+# Every mainline move of every game is analysed by a pool of tutor engines (one per core
+# and/or remote host) and rated with the PicoTutor rules. Finished positions are appended
+# to a progress file next to the output, an interrupted run continues where it stopped.
+# The web server starts the same job with POST /annotate.
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+from chess.engine import InfoDict, Limit
+
+import picotutor_constants as c
+from pgn import add_picotutor_evaluations
+from picotutor import PicoTutor
+from uci.engine import UciEngine, UciShell
+
+logger = logging.getLogger(__name__)
+
+ANNOTATED_SUFFIX = "-annotated"
+PROGRESS_SUFFIX = ".progress"
+
+ProgressCallback = Callable[[int, int, "PositionTask"], Awaitable[None]]
+
+
+def annotated_file_name(pgn_file: str) -> str:
+    """games/x.pgn is annotated to games/x-annotated.pgn"""
+    root, _ = os.path.splitext(pgn_file)
+    return root + ANNOTATED_SUFFIX + ".pgn"
+
+
+def default_workers() -> int:
+    """one engine per core - minus one core for picochess and the playing engine"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def read_games(pgn_file: str) -> List[chess.pgn.Game]:
+    games = []
+    with open(pgn_file, encoding="utf-8-sig", errors="replace") as pgn:
+        while (game := chess.pgn.read_game(pgn)) is not None:
+            games.append(game)
+    return games
+
+
+class PositionTask(object):
+    """One mainline move of one game, analysed in the position before the move."""
+
+    __slots__ = ("game_no", "ply", "fen", "turn", "move")
+
+    def __init__(self, game_no: int, ply: int, board: chess.Board, move: chess.Move):
+        self.game_no = game_no
+        self.ply = ply  # 1 is the first move of the game, like board.ply() after the move
+        self.fen = board.fen()
+        self.turn = board.turn
+        self.move = move
+
+    @property
+    def key(self) -> str:
+        return "{}:{}:{}".format(self.game_no, self.ply, self.move.uci())
+
+    def board(self) -> chess.Board:
+        return chess.Board(self.fen)
+
+
+def position_tasks(games: List[chess.pgn.Game]) -> List[PositionTask]:
+    """all mainline moves of the standard chess games"""
+    tasks = []
+    for game_no, game in enumerate(games):
+        variant = game.headers.get("Variant", "Standard")
+        if variant.lower() not in ("standard", "chess"):
+            logger.info("game %d skipped - %s is not supported", game_no + 1, variant)
+            continue
+        board = game.board()
+        for ply, move in enumerate(game.mainline_moves(), start=1):
+            tasks.append(PositionTask(game_no, ply, board, move))
+            board.push(move)
+    return tasks
+
+
+def _lines(info_list: List[InfoDict], turn: chess.Color) -> List[dict]:
+    """json friendly form of multipv analysis - scores are from the side to move (turn)"""
+    lines = []
+    for info in info_list:
+        move, score, mate = PicoTutor.get_score(info, turn)
+        if move == chess.Move.null() or score is None:
+            continue
+        lines.append(
+            {
+                "pv": [pv_move.uci() for pv_move in info["pv"]],
+                "score": score,
+                "mate": mate,
+                "depth": int(info.get("depth", 0)),
+            }
+        )
+    return lines
+
+
+def _find_line(lines: List[dict], move: chess.Move) -> Optional[dict]:
+    uci = move.uci()
+    return next((line for line in lines if line["pv"][0] == uci), None)
+
+
+async def analyse_task(engine: UciEngine, task: PositionTask, depth: int, multipv: int) -> dict:
+    """deep and shallow (obvious) multipv analysis of the position before the move, like PicoTutor
+    a move outside the multipv lines is analysed on its own, so every move gets a rating"""
+    board = task.board()
+    result = {"key": task.key, "legal": board.legal_moves.count()}
+    for name, limit in (("best", Limit(depth=depth)), ("obvious", Limit(depth=c.LOW_DEPTH))):
+        lines = _lines(await engine.analyse_position(board, limit, multipv=multipv), board.turn)
+        if lines and _find_line(lines, task.move) is None:
+            lines += _lines(await engine.analyse_position(board, limit, root_moves=[task.move]), board.turn)
+        result[name] = lines
+    return result
+
+
+def evaluate_move(task: PositionTask, result: dict, before_score: Optional[int]) -> tuple:
+    """PicoTutor evaluation value dict of the move (None if not rated), and the move score
+    before_score is the score of the previous move of the same side"""
+    best_moves = [
+        (pv_key, chess.Move.from_uci(line["pv"][0]), line["score"], line["mate"])
+        for pv_key, line in enumerate(result["best"])
+    ]
+    best_moves.sort(key=lambda entry: entry[2], reverse=True)
+    current = next((entry for entry in best_moves if entry[1] == task.move), None)
+    if current is None:
+        return None, None
+    best_pv, best_move, best_score, best_mate = best_moves[0]
+    current_pv, _, current_score, current_mate = current
+    if result["legal"] < 2:
+        return None, current_score  # no point evaluating the only legal move
+
+    low_line = _find_line(result["obvious"], task.move)
+    best_deep_diff = best_score - current_score
+    deep_low_diff = current_score - low_line["score"] if low_line else None
+    score_hist_diff = current_score - before_score if before_score is not None else None
+    eval_string = PicoTutor.classify_move(
+        best_deep_diff,
+        deep_low_diff,
+        score_hist_diff,
+        result["legal"],
+        forced_mate=best_score == 99999 and best_mate == current_mate,
+    )
+
+    board = task.board()
+    value = {
+        "nag": PicoTutor.symbol_to_nag(eval_string),
+        "depth": min(result["best"][best_pv]["depth"], result["best"][current_pv]["depth"]),
+        "best_move": board.san(best_move),
+        "user_move": board.san(task.move),
+    }
+    best_info = [{"pv": [chess.Move.from_uci(uci) for uci in line["pv"]]} for line in result["best"]]
+    variations = PicoTutor.better_pv_variations(best_moves, best_info, task.move)
+    if variations:
+        value["variations"] = variations
+    if value["nag"] == chess.pgn.NAG_NULL:
+        if best_deep_diff <= c.INACCURACY_TH:
+            return None, current_score
+        # inaccuracy - stored without NAG like PicoTutor does
+        value["CPL"] = best_deep_diff
+        value["score"] = current_score
+        return value, current_score
+    value["CPL"] = best_deep_diff
+    if current_mate != 0:
+        value["mate"] = current_mate
+    value["score"] = current_score
+    if deep_low_diff is not None:
+        value["deep_low_diff"] = deep_low_diff
+    if score_hist_diff is not None:
+        value["score_hist_diff"] = score_hist_diff
+    return value, current_score
+
+
+def game_evaluations(tasks: List[PositionTask], results: Dict[str, dict]) -> dict:
+    """evaluated moves of one game in PicoTutor format: key=(ply, move, turn after move)"""
+    eval_moves = {}
+    before_score: Dict[chess.Color, Optional[int]] = {chess.WHITE: None, chess.BLACK: None}
+    for task in sorted(tasks, key=lambda entry: entry.ply):
+        result = results.get(task.key)
+        if result is None:
+            before_score[task.turn] = None  # position not analysed (yet)
+            continue
+        value, before_score[task.turn] = evaluate_move(task, result, before_score[task.turn])
+        if value:
+            eval_moves[(task.ply, task.move, not task.turn)] = value
+    return eval_moves
+
+
+class ProgressLog(object):
+    """Append-only JSON lines file of the analysed positions.
+
+    The first line holds the settings, results made with other settings are not reused."""
+
+    def __init__(self, path: str, settings: dict):
+        self.path = path
+        self.settings = settings
+
+    def load(self) -> Dict[str, dict]:
+        results = {}
+        try:
+            with open(self.path, encoding="utf-8") as progress:
+                if json.loads(progress.readline() or "null") != self.settings:
+                    return {}
+                for line in progress:
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        break  # last line cut short by an interrupted run
+                    results[result["key"]] = result
+        except (OSError, ValueError):
+            return {}
+        return results
+
+    def start(self, results: Dict[str, dict]):
+        """rewrite the file with the settings and the reused results"""
+        with open(self.path, "w", encoding="utf-8") as progress:
+            progress.write(json.dumps(self.settings) + "\n")
+            for result in results.values():
+                progress.write(json.dumps(result) + "\n")
+
+    def append(self, result: dict):
+        with open(self.path, "a", encoding="utf-8") as progress:
+            progress.write(json.dumps(result) + "\n")
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class AnnotatorPool(object):
+    """Engines analysing the positions in parallel, one position per engine at a time."""
+
+    def __init__(self, engines: List[UciEngine], depth: int = c.DEEP_DEPTH, multipv: int = c.VALID_ROOT_MOVES):
+        self.engines = engines
+        self.depth = depth
+        self.multipv = multipv
+
+    async def run(self, tasks: List[PositionTask], on_result: Callable[[PositionTask, dict], Awaitable[None]]):
+        queue: asyncio.Queue = asyncio.Queue()
+        for task in tasks:
+            queue.put_nowait(task)
+        alive = len(self.engines)
+        if not alive:
+            return
+
+        async def worker(engine: UciEngine):
+            nonlocal alive
+            while True:
+                task = await queue.get()
+                try:
+                    try:
+                        result = await analyse_task(engine, task, self.depth, self.multipv)
+                        if result["best"]:
+                            await on_result(task, result)
+                            continue
+                        logger.warning("%s gave no analysis - engine removed from the pool", engine.get_name())
+                    except Exception:
+                        logger.exception("annotation of %s failed - engine removed from the pool", task.key)
+                    # leave the position to the other engines (or the next run)
+                    alive -= 1
+                    queue.put_nowait(task)
+                    while alive == 0 and not queue.empty():
+                        queue.get_nowait()
+                        queue.task_done()
+                    return
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker(engine)) for engine in self.engines]
+        await queue.join()
+        for worker_task in workers:
+            worker_task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def annotate_file(
+    pgn_file: str,
+    engines: List[UciEngine],
+    output_file: Optional[str] = None,
+    depth: int = c.DEEP_DEPTH,
+    multipv: int = c.VALID_ROOT_MOVES,
+    progress: Optional[ProgressCallback] = None,
+) -> str:
+    """annotate all games of pgn_file, return the annotated file name
+    the file is written also when not all positions could be analysed"""
+    output_file = output_file or annotated_file_name(pgn_file)
+    games = read_games(pgn_file)
+    tasks = position_tasks(games)
+    log = ProgressLog(output_file + PROGRESS_SUFFIX, {"source": os.path.basename(pgn_file), "depth": depth})
+    results = {key: result for key, result in log.load().items() if key in {task.key for task in tasks}}
+    log.start(results)
+    todo = [task for task in tasks if task.key not in results]
+    logger.info("annotating %s: %d positions, %d from an earlier run", pgn_file, len(tasks), len(results))
+
+    async def on_result(task: PositionTask, result: dict):
+        results[task.key] = result
+        log.append(result)
+        if progress:
+            await progress(len(results), len(tasks), task)
+
+    await AnnotatorPool(engines, depth, multipv).run(todo, on_result)
+
+    annotator = "PicoTutor {} depth {}".format(engines[0].get_name() if engines else "", depth)
+    for game_no, game in enumerate(games):
+        game_tasks = [task for task in tasks if task.game_no == game_no]
+        if game_tasks:
+            add_picotutor_evaluations(game, game_evaluations(game_tasks, results))
+            game.headers["Annotator"] = annotator
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as out:
+        for game in games:
+            out.write(str(game) + "\n\n")
+    os.replace(tmp_file, output_file)
+    if len(results) == len(tasks):
+        log.remove()
+    else:
+        logger.warning("%d positions not analysed - run again to continue", len(tasks) - len(results))
+    return output_file
+
+
+async def open_engines(
+    engine_file: str,
+    loop: asyncio.AbstractEventLoop,
+    workers: int = 1,
+    remote_hosts: Optional[List[str]] = None,
+    remote_key: Optional[str] = None,
+    remote_home: Optional[str] = None,
+    threads: int = 1,
+) -> List[UciEngine]:
+    """start workers local engines and one engine per remote host (user@host)"""
+    shells: List[Optional[UciShell]] = [None] * workers
+    for remote in remote_hosts or []:
+        username, _, hostname = remote.rpartition("@")
+        shells.append(
+            UciShell(hostname=hostname, username=username or None, key_file=remote_key, remote_home=remote_home)
+        )
+
+    async def start(index: int, shell: Optional[UciShell]) -> Optional[UciEngine]:
+        engine = UciEngine(engine_file, shell, "", loop, "annotate {}".format(index), suppress_info=False)
+        await engine.open_engine()
+        if not engine.loaded_ok():
+            logger.warning("annotation engine %d did not start", index)
+            return None
+        await engine.startup(options={"Contempt": 0, "Threads": threads})
+        engine.set_mode(ponder=False)
+        return engine
+
+    engines = await asyncio.gather(*(start(index, shell) for index, shell in enumerate(shells)))
+    return [engine for engine in engines if engine is not None]
+
+
+async def close_engines(engines: List[UciEngine]):
+    await asyncio.gather(*(engine.quit() for engine in engines), return_exceptions=True)
+
+
+class AnnotationJob(object):
+    """Background annotation started from the web server - one job at a time."""
+
+    current: Optional["AnnotationJob"] = None
+
+    def __init__(self, pgn_file: str, engine_file: str, workers: int, depth: int = c.DEEP_DEPTH):
+        self.pgn_file = pgn_file
+        self.engine_file = engine_file
+        self.workers = workers
+        self.depth = depth
+        self.status = {"file": os.path.basename(pgn_file), "state": "starting", "done": 0, "total": 0}
+        self.task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def running(cls) -> bool:
+        return cls.current is not None and cls.current.status["state"] in ("starting", "running")
+
+    async def run(self, progress: Optional[ProgressCallback] = None):
+        async def on_progress(done: int, total: int, task: PositionTask):
+            self.status.update(state="running", done=done, total=total)
+            if progress:
+                await progress(done, total, task)
+
+        engines: List[UciEngine] = []
+        try:
+            engines = await open_engines(self.engine_file, asyncio.get_running_loop(), self.workers)
+            if not engines:
+                raise RuntimeError("annotation engine did not start")
+            output_file = await annotate_file(self.pgn_file, engines, depth=self.depth, progress=on_progress)
+            self.status.update(state="done", output=os.path.basename(output_file))
+        except Exception as exc:  # reported by GET /annotate
+            logger.exception("annotation of %s failed", self.pgn_file)
+            self.status.update(state="failed", error=str(exc))
+        finally:
+            await close_engines(engines)
+
+
+async def run_annotation(args: argparse.Namespace) -> str:
+    engines = await open_engines(
+        args.engine,
+        asyncio.get_running_loop(),
+        args.workers,
+        args.remote,
+        args.remote_key,
+        args.remote_home,
+        args.threads,
+    )
+    if not engines:
+        raise SystemExit("no engine started: " + args.engine)
+
+    async def progress(done: int, total: int, task: PositionTask):
+        print("\r{}/{} positions (game {} ply {})".format(done, total, task.game_no + 1, task.ply), end="", flush=True)
+
+    try:
+        return await annotate_file(args.pgn_file, engines, args.output, args.depth, args.multipv, progress)
+    finally:
+        await close_engines(engines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Annotate all games of a PGN file with PicoTutor evaluations")
+    parser.add_argument("pgn_file", help="PGN file, eg. games/games.pgn")
+    parser.add_argument("--engine", required=True, help="UCI engine file, eg. engines/aarch64/a-stockf")
+    parser.add_argument("--output", help="annotated PGN file, default <pgn_file>-annotated.pgn")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="local engines, default cores - 1")
+    parser.add_argument("--remote", action="append", help="user@host of a remote engine, can be repeated")
+    parser.add_argument("--remote-key", help="ssh key file for the remote hosts")
+    parser.add_argument("--remote-home", help="picochess folder on the remote hosts")
+    parser.add_argument("--threads", type=int, default=1, help="Threads uci option per engine")
+    parser.add_argument("--depth", type=int, default=c.DEEP_DEPTH, help="depth of the deep analysis")
+    parser.add_argument("--multipv", type=int, default=c.VALID_ROOT_MOVES, help="number of analysed root moves")
+    parser.add_argument("--log-level", default="warning", help="logging level")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+    output_file = asyncio.run(run_annotation(args))
+    print("\nannotated games written to", output_file)
+
+
+if __name__ == "__main__":
+    main()
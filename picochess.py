@@ -29,7 +29,6 @@ import subprocess
 import copy
 import gc
 import logging
-from logging.handlers import RotatingFileHandler
 import math
 import traceback
 from typing import Any, List, Optional, Set, Tuple
@@ -37,6 +36,7 @@ import asyncio
 from pathlib import Path
 import platform
 
+from startup import profiler, StartupOrchestrator
 import chess.pgn
 from chess.pgn import Game
 import chess.polyglot
@@ -47,14 +47,17 @@ from chess.engine import InfoDict, Limit, BestMove, PlayResult
 import dgt.util
 
 from configuration import Configuration
-from uci.engine import UciShell, UciEngine
+from uci.engine import ContinuousAnalysis, UciShell, UciEngine
 from uci.engine_provider import EngineProvider
 from uci.rating import Rating, determine_result
+from uci.rating_store import RatingStore
 
 from timecontrol import TimeControl
-from theme import ThemeResolver
 from utilities import (
-    get_location,
+    location_lookup,
+    tags_lookup,
+    update_status_lookup,
+    git_status_lookup,
     update_pico_v4,
     update_pico_engines,
     get_opening_books,
@@ -76,6 +79,11 @@ from utilities import (
     set_window_control_backend_preference,
 )
 from utilities import AsyncRepeatingTimer
+from variants import VariantSnapshot, attach_snapshot, in_step
+from game_snapshot import GameSnapshot, MoveNode
+from analysis_pipeline import AnalysisPipeline
+from analysis_scheduler import AnalysisScheduler
+from resource_budget import ResourceBudget
 from pgn import Emailer, PgnDisplay, ModeInfo, pgn_has_variations, pgn_variation_review_points
 from server import WebDisplay, WebServer, WebVr, EventHandler
 from picotalker import PicoTalkerDisplay
@@ -92,21 +100,18 @@ from dgt.util import (
     flip_board_fen,
     game_result_from_header,
 )
-from dgt.hw import DgtHw
-from dgt.pi import DgtPi
 from dgt.display import DgtDisplay
 from dgt.board import DgtBoard, Rev2Info
 from dgt.translate import DgtTranslate
 from dgt.menu import DgtMenu
 from eboard.eboard import EBoard
-from eboard.chesslink.board import ChessLinkBoard
-from eboard.chessnut.board import ChessnutBoard
-from eboard.ichessone.board import IChessOneBoard
-from eboard.certabo.board import CertaboBoard
 from picotutor import PicoTutor
+from tablebase import TablebaseProbe
+from queued_log import setup_logging
 import pairing_ipc
 
-FLOAT_MIN_BACKGROUND_TIME = 1.0  # how often to send PV,SCORE,DEPTH
+profiler.record(profiler.IMPORT, "picochess core modules", time.perf_counter() - profiler.started)
+
 # Limit analysis of engine
 # ENGINE WATCHING
 FLOAT_ENGINE_MAX_ANALYSIS_DEPTH = 50  # max limit for any analysis
@@ -123,6 +128,14 @@ WEB_SERVER_DEFAULT_PORT = 80
 WEB_SERVER_PERMISSION_FALLBACK_PORT = 8080
 WEB_SERVER_SETCAP_HINT = "sudo setcap 'cap_net_bind_service=+ep' $(readlink -f $(which python3))"
 
+# e-board drivers are imported only for the configured board-type
+EBOARD_DRIVERS = {
+    dgt.util.EBoard.CHESSLINK: ("eboard.chesslink.board", "ChessLinkBoard"),
+    dgt.util.EBoard.CHESSNUT: ("eboard.chessnut.board", "ChessnutBoard"),
+    dgt.util.EBoard.ICHESSONE: ("eboard.ichessone.board", "IChessOneBoard"),
+    dgt.util.EBoard.CERTABO: ("eboard.certabo.board", "CertaboBoard"),
+}
+
 
 class WebServerListenError(RuntimeError):
     """Capture the port and reason when Tornado cannot bind the web server."""
@@ -157,6 +170,14 @@ def _listen_web_app(web_app: Any, requested_port: int) -> int:
         raise WebServerListenError(requested_port, "unavailable", exc) from exc
 
 
+def create_eboard(board_type: dgt.util.EBoard, args, loop: asyncio.AbstractEventLoop) -> EBoard:
+    """Import and create the e-board driver for board_type (DGT and no-eboard use DgtBoard)."""
+    if board_type in EBOARD_DRIVERS:
+        module_name, class_name = EBOARD_DRIVERS[board_type]
+        return profiler.import_attr(module_name, class_name)(loop)
+    return DgtBoard(args.dgt_port, args.disable_revelation_leds, args.dgtpi, args.disable_et, loop, args.slow_slide)
+
+
 def should_show_setpieces_after_lift_timeout(lifted_piece_char: str, is_hand_mode: bool) -> bool:
     """Return true when a held lifted piece should reach the audible set-pieces threshold."""
     if not lifted_piece_char:
@@ -378,6 +399,8 @@ class PicochessState:
         self.loaded_pgn_game: Game | None = None
         self.loaded_pgn_filename = ""
         self.picotutor: PicoTutor | None = None
+        self.tablebase: TablebaseProbe | None = None
+        self.tablebase_adjudicate = False  # end won and drawn endings by tablebase result
         self.last_hand_coach_move: chess.Move | None = None
         self.hand_coach_task: asyncio.Task | None = None
         self.brain_hint_task: asyncio.Task | None = None
@@ -432,6 +455,7 @@ class PicochessState:
         self._atomic_board = None  # chess.variant.AtomicBoard instance when variant == "atomic"
         self._racingkings_board = None  # chess.variant.RacingKingsBoard instance when variant == "racingkings"
         self._antichess_board = None  # chess.variant.AntichessBoard instance when variant == "antichess"
+        self._history: MoveNode | None = None  # move list of the last game snapshot, shared by the next one
 
     def save_position_checkpoint(self, interaction_mode: Mode | None = None) -> None:
         """Remember the position, history, and mode from before temporary analysis."""
@@ -605,15 +629,37 @@ class PicochessState:
         return move
 
     def game_copy(self) -> chess.Board:
-        """Return a copy of the game board with variant name attached.
+        """Return a copy of the game board with variant name and variant snapshot attached.
 
-        The _variant_name attribute allows the display layer to reconstruct
-        the correct variant FEN (e.g. atomic explosions) from the move_stack.
+        The _variant_name attribute tells the display layer which variant is played,
+        the snapshot gives it the variant FEN (e.g. atomic explosions) without
+        replaying the move_stack.
         """
         copy = self.game.copy()
         if self.variant != "chess":
             copy._variant_name = self.variant
-        return copy
+        return attach_snapshot(copy, self.variant_snapshot())
+
+    def game_snapshot(self) -> GameSnapshot:
+        """Return a read-only snapshot of the game for a Message, with the variant info of game_copy().
+
+        The snapshot shares its moves with the snapshot taken before, so no move stack is copied."""
+        snapshot = GameSnapshot.of(self.game, self._history)
+        self._history = snapshot.history
+        if self.variant != "chess":
+            snapshot._variant_name = self.variant
+        return attach_snapshot(snapshot, self.variant_snapshot())
+
+    def variant_snapshot(self) -> VariantSnapshot | None:
+        """Return a read-only snapshot of the variant board, None for standard chess.
+
+        None as well if the variant board is not in step with the game board,
+        the receiver then falls back to replaying the move_stack.
+        """
+        vb = self.get_variant_board()
+        if vb is None or not in_step(vb, self.game):
+            return None
+        return VariantSnapshot.of(self.variant, vb)
 
     def engine_board_copy(self):
         """Return a board copy suitable for engine communication.
@@ -629,7 +675,7 @@ class PicochessState:
 
     def new_game_msg(self, newgame: bool):
         """Create a START_NEW_GAME message with variant info attached."""
-        msg = Message.START_NEW_GAME(game=self.game_copy(), newgame=newgame)
+        msg = Message.START_NEW_GAME(game=self.game_snapshot(), newgame=newgame)
         if self.variant != "chess":
             msg.variant = self.variant
         return msg
@@ -833,7 +879,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=result,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
 
@@ -848,7 +894,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=GameResult.KOTH_WHITE,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
             if black_king in koth_center:
@@ -856,7 +902,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=GameResult.KOTH_BLACK,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
 
@@ -869,7 +915,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=GameResult.ATOMIC_BLACK,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
             if black_king is None:
@@ -877,7 +923,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=GameResult.ATOMIC_WHITE,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
 
@@ -895,7 +941,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=result,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
 
@@ -913,7 +959,7 @@ class PicochessState:
                     tc_init=self.time_control.get_parameters(),
                     result=result,
                     play_mode=self.play_mode,
-                    game=self.game_copy(),
+                    game=self.game_snapshot(),
                     mode=self.interaction_mode,
                 )
 
@@ -945,16 +991,32 @@ class PicochessState:
         elif check_board.is_checkmate():
             result = GameResult.MATE
         else:
-            return False
+            result = self._tablebase_adjudication()
+            if result is None:
+                return False
 
         return Message.GAME_ENDS(
             tc_init=self.time_control.get_parameters(),
             result=result,
             play_mode=self.play_mode,
-            game=self.game_copy(),
+            game=self.game_snapshot(),
             mode=self.interaction_mode,
         )
 
+    def _tablebase_adjudication(self) -> GameResult | None:
+        """Result of a standard chess ending by tablebase, None if not adjudicated."""
+        if not self.tablebase_adjudicate or self.tablebase is None or self.variant != "chess":
+            return None
+        tb_result = self.tablebase.game_result(self.game)
+        if tb_result is None:
+            return None
+        logger.info("tablebase adjudication %s at %s", tb_result, self.game.fen())
+        if tb_result == "1-0":
+            return GameResult.WIN_WHITE
+        if tb_result == "0-1":
+            return GameResult.WIN_BLACK
+        return GameResult.DRAW
+
     @staticmethod
     def _num(time_str) -> int:
         try:
@@ -1266,7 +1328,7 @@ async def main() -> None:
 
     async def display_ip_info(state: PicochessState):
         """Fire an IP_INFO message with the IP adr."""
-        location, ext_ip, int_ip = get_location()
+        location, ext_ip, int_ip = await location_lookup.get()
 
         if state.set_location == "auto":
             pass
@@ -1276,19 +1338,16 @@ async def main() -> None:
         info = {"location": location, "ext_ip": ext_ip, "int_ip": int_ip, "version": version}
         await DisplayMsg.show(Message.IP_INFO(info=info))
 
-    config = Configuration()
-    args, unknown = config._args, config.unknown
+    with profiler.phase("configuration"):
+        config = Configuration()
+        args, unknown = config._args, config.unknown
+    if args.profile_startup:
+        profiler.enable()
     set_window_control_backend_preference(args.window_control_backend)
 
     # Enable logging
     if args.log_file:
-        handler = RotatingFileHandler("logs" + os.sep + args.log_file, maxBytes=1 * 1024 * 1024, backupCount=5)
-        logging.basicConfig(
-            level=getattr(logging, args.log_level.upper()),
-            format="%(asctime)s.%(msecs)03d %(levelname)7s %(module)10s - %(funcName)s: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-            handlers=[handler],
-        )
+        setup_logging("logs" + os.sep + args.log_file, args.log_level)  # written by a background thread
     logging.getLogger("chess.engine").setLevel(logging.INFO)  # don't want to get so many python-chess uci messages
 
     logger.debug("#" * 20 + " PicoChess v%s " + "#" * 20, version)
@@ -1299,7 +1358,8 @@ async def main() -> None:
     if unknown:
         logger.warning("invalid parameter given %s", unknown)
 
-    EngineProvider.init(args.engine_menu_sort)
+    with profiler.phase("engine provider"):
+        EngineProvider.init(args.engine_menu_sort)
 
     Rev2Info.set_dgtpi(args.dgtpi)
     state.flag_flexible_ponder = args.flexible_analysis
@@ -1314,18 +1374,8 @@ async def main() -> None:
     ModeInfo.set_eboard_type(board_type)
 
     # wire some dgt classes
-    if board_type == dgt.util.EBoard.CHESSLINK:
-        dgtboard: EBoard = ChessLinkBoard(main_loop)
-    elif board_type == dgt.util.EBoard.CHESSNUT:
-        dgtboard = ChessnutBoard(main_loop)
-    elif board_type == dgt.util.EBoard.ICHESSONE:
-        dgtboard = IChessOneBoard(main_loop)
-    elif board_type == dgt.util.EBoard.CERTABO:
-        dgtboard = CertaboBoard(main_loop)
-    else:
-        dgtboard = DgtBoard(
-            args.dgt_port, args.disable_revelation_leds, args.dgtpi, args.disable_et, main_loop, args.slow_slide
-        )
+    with profiler.phase("eboard driver"):
+        dgtboard: EBoard = create_eboard(board_type, args, main_loop)
     state.dgttranslate = DgtTranslate(args.beep_config, args.beep_some_level, args.language, version)
     state.dgtmenu = DgtMenu(
         args.clockside,
@@ -1435,21 +1485,22 @@ async def main() -> None:
     def _should_emit_web_audio() -> bool:
         return bool(shared.get("web_audio_backend_remote", False)) and EventHandler.has_remote_clients()
 
-    pico_talker = PicoTalkerDisplay(
-        args.user_voice,
-        args.computer_voice,
-        args.speed_voice,
-        args.audio_backend,
-        bool(args.web_server_port),
-        _emit_web_audio,
-        _should_emit_web_audio,
-        args.enable_setpieces_voice,
-        args.comment_factor,
-        sample_beeper,
-        sample_beeper_level,
-        board_type,
-        main_loop,
-    )
+    with profiler.phase("picotalker"):
+        pico_talker = PicoTalkerDisplay(
+            args.user_voice,
+            args.computer_voice,
+            args.speed_voice,
+            args.audio_backend,
+            bool(args.web_server_port),
+            _emit_web_audio,
+            _should_emit_web_audio,
+            args.enable_setpieces_voice,
+            args.comment_factor,
+            sample_beeper,
+            sample_beeper_level,
+            board_type,
+            main_loop,
+        )
 
     non_main_tasks.add(asyncio.create_task(pico_talker.message_consumer()))
 
@@ -1494,7 +1545,7 @@ async def main() -> None:
         non_main_tasks.add(asyncio.create_task(my_web_vr.dgt_consumer()))
         logger.info("message queues ready - starting web server")
         dgtdispatcher.register("web")
-        theme_resolver = ThemeResolver(state.set_location)
+        theme_resolver = profiler.import_attr("theme", "ThemeResolver")(state.set_location)
         if theme_resolver.needs_location_lookup(args.theme):
             theme: str = await asyncio.to_thread(theme_resolver.resolve, args.theme)
         else:
@@ -1503,11 +1554,13 @@ async def main() -> None:
         shared["pieces"] = args.pieces
         shared["web-board-theme"] = args.web_board_theme
         shared["dgttranslate"] = state.dgttranslate
-        web_app = my_web_server.make_app(
-            theme, args.pieces, args.web_board_theme, shared, theme_resolver=theme_resolver
-        )
+        with profiler.phase("web server"):
+            web_app = my_web_server.make_app(
+                theme, args.pieces, args.web_board_theme, shared, theme_resolver=theme_resolver
+            )
         try:
-            active_web_server_port = _listen_web_app(web_app, args.web_server_port)
+            with profiler.phase("web server listen"):
+                active_web_server_port = _listen_web_app(web_app, args.web_server_port)
         except WebServerListenError as exc:
             if exc.reason == "permission":
                 logger.error("Could not start web server - port %d not allowed by operating system", exc.port)
@@ -1525,14 +1578,14 @@ async def main() -> None:
         # Connect to DGT board
         logger.debug("starting PicoChess in board mode")
         if args.dgtpi:
-            my_dgtpi = DgtPi(dgtboard, main_loop)
+            my_dgtpi = profiler.import_attr("dgt.pi", "DgtPi")(dgtboard, main_loop)
             dgtdispatcher.register("i2c")
             non_main_tasks.add(asyncio.create_task(my_dgtpi.dgt_consumer()))
             non_main_tasks.add(asyncio.create_task(my_dgtpi.process_incoming_clock_forever()))
         else:
             logger.debug("(ser) starting the board connection")
             dgtboard.run()  # a clock can only be online together with the board, so we must start it infront
-        my_dgthw = DgtHw(dgtboard, main_loop)
+        my_dgthw = profiler.import_attr("dgt.hw", "DgtHw")(dgtboard, main_loop)
         dgtdispatcher.register("ser")
         non_main_tasks.add(asyncio.create_task(my_dgthw.dgt_consumer()))
 
@@ -1598,9 +1651,13 @@ async def main() -> None:
             self.dgtboard = dgtboard
             self.board_type = board_type
             # @todo start background analyser only when new game starts
-            self.background_analyse_timer = AsyncRepeatingTimer(
-                FLOAT_MIN_BACKGROUND_TIME, self._pv_score_depth_analyser, loop=self.loop
+            self.background_analyse_timer = AnalysisScheduler(
+                self._pv_score_depth_analyser, self.analysis_watched, self._start_or_stop_analysis_as_needed, self.loop
             )
+            self.analysis_pipeline = AnalysisPipeline()  # one result per InfoDict for web and clock
+            self.resource_budget = ResourceBudget()  # cores of the engine and tutor engines
+            self.rating_store = RatingStore()  # rated games against adaptive engines
+            self.initial_rating: Optional[Rating] = None  # picochess.ini rating, start of an empty rating store
             self.shared = shared
             self.shared.setdefault("system_info", {})["game_started"] = self.state.game_started
             self.non_main_tasks = non_main_tasks
@@ -1645,6 +1702,8 @@ async def main() -> None:
                     windows=self.remote_windows(),
                 )
             self.tutor_remote_engine = self.args.tutor_remote_engine
+            self.state.tablebase = TablebaseProbe(self.args.tablebase_path)
+            self.state.tablebase_adjudicate = self.args.tablebase_adjudicate
 
             # ensure dgtmenu knows which engine will actually be loaded so the startup
             # announcement reflects the saved configuration
@@ -1680,73 +1739,35 @@ async def main() -> None:
             signal.signal(signal.SIGINT, self.exit_sigterm)
 
         async def initialise(self, time_text):
-            """Due to use of async some initialisation is moved here"""
-
-            # issue 106 - get update and git status information for the user
-            self.update_status = self.get_last_update_status()
-            logger.info("Update status: %s", self.update_status)
-            # This is shown for a very short time - you can also see it in the menu
-            if self.update_status:
-                self.state.dgttranslate.set_last_updated_info(self.update_status)
-                msg = Message.SHOW_TEXT(text_string=self.update_status)
-                await DisplayMsg.show(msg)
-            self.git_status = self.get_git_status()
-            if self.git_status:
-                self.state.dgttranslate.set_git_info(self.git_status)
-
-            engine_file_to_load = self.state.engine_file  # assume not mame
-            if "/mame/" in self.state.engine_file and self.state.dgtmenu.get_engine_rdisplay():
-                engine_file_art = self.state.engine_file + "_art"
-                my_file = Path(engine_file_art)
-                if my_file.is_file():
-                    self.state.artwork_in_use = True
-                    engine_file_to_load = engine_file_art  # load mame
-
-            uci_shell = self.uci_remote_shell if self.remote_engine_mode() and self.uci_remote_shell else self.uci_local_shell
-
-            self.engine = UciEngine(
-                file=engine_file_to_load,
-                uci_shell=uci_shell,
-                mame_par=self.calc_engine_mame_par(),
-                loop=self.loop,
-            )
-            await self.engine.open_engine()
-            if engine_file_to_load != self.state.engine_file:
-                await asyncio.sleep(1)  # mame artwork wait
+            """Due to use of async some initialisation is moved here
 
-            await display_ip_info(state)
-            await asyncio.sleep(1.0)
-
-            if not self.engine.loaded_ok():
-                logger.error("engine %s not started", self.state.engine_file)
+            Independent init steps run concurrently - the board is playable as soon
+            as the engine is ready, tutor engines and lookups finish in the background."""
+            # the tutor object exists from the start, its engines are opened in the background
+            self.state.comment_file = self.get_comment_file()
+            await self._create_picotutor()
+
+            orchestrator = StartupOrchestrator()
+            orchestrator.add("update status", self._startup_update_status)
+            orchestrator.add("ip info", lambda: display_ip_info(state))
+            orchestrator.add("engine", self._startup_engine)
+            orchestrator.add("tutor", self._startup_picotutor)
+            orchestrator.start()
+            self.non_main_tasks.update(orchestrator.pending())
+
+            (engine_result,) = await orchestrator.wait("engine")
+            if engine_result is None:
                 await asyncio.sleep(3)
                 await DisplayMsg.show(Message.ENGINE_FAIL())
                 await asyncio.sleep(2)
                 sys.exit(-1)
+            startup_ok, level_index = engine_result
 
             # Startup - internal
             self.state.game = chess.Board()  # Create the current game
             self.state.legal_fens = compute_legal_fens(self.state.game.copy(), self.state.get_variant_board())  # Compute the legal FENs
             self.state.flag_startup = True
 
-            if self.args.pgn_elo and self.args.pgn_elo.isnumeric() and self.args.rating_deviation:
-                self.state.rating = Rating(float(args.pgn_elo), float(args.rating_deviation))
-            self.args.engine_level = None if self.args.engine_level == "None" else self.args.engine_level
-            if self.args.engine_level == '""':
-                self.args.engine_level = None
-            engine_opt, level_index = await self.get_engine_level_dict(args.engine_level)
-            if self.args.engine_level and level_index is None:
-                logger.warning(
-                    "configured engine level '%s' not found for engine '%s'; using engine default",
-                    self.args.engine_level,
-                    self.state.engine_file,
-                )
-                self.args.engine_level = None
-            startup_ok = await self.engine.startup(engine_opt, self.state.rating)
-
-            # Initialize variant support from engine settings
-            self._init_variant_from_engine()
-
             if (
                 self.emulation_mode()
                 and self.state.dgtmenu.get_engine_rdisplay()
@@ -1792,7 +1813,7 @@ async def main() -> None:
                 "user_elo": self.args.pgn_elo,
                 "rspeed": round(float(args.rspeed), 2),
             }
-            if self.git_status:
+            if self.git_status:  # else the "update status" step sends it when its script is done
                 sys_info["git_status"] = self.git_status
 
             await DisplayMsg.show(Message.SYSTEM_INFO(info=sys_info))
@@ -1851,58 +1872,7 @@ async def main() -> None:
                 ModeInfo.set_online_mode(mode=False)
                 await self.engine.newgame(self.state.engine_board_copy())
 
-            self.state.comment_file = self.get_comment_file()
-            tutor_engine = self.args.tutor_engine
-            remote_tutor_override = self.tutor_remote_engine
-            # try remote tutor first if configured and remote shell exists
-            self.state.picotutor = None
-            if remote_tutor_override and self.uci_remote_shell:
-                logger.info("using remote tutor engine via ssh: %s", remote_tutor_override)
-                self.state.picotutor = PicoTutor(
-                    i_ucishell=self.uci_remote_shell,
-                    i_engine_path=tutor_engine,
-                    i_comment_file=self.state.comment_file,
-                    i_lang=self.args.language,
-                    loop=self.loop,
-                    remote_binary_override=remote_tutor_override,
-                )
-                await self.state.picotutor.set_analysis_enabled(
-                    tutor_analysis_allowed_in_mode(self.state.interaction_mode)
-                )
-                await self.state.picotutor.set_status(
-                    self.state.dgtmenu.get_picowatcher(),
-                    self.state.dgtmenu.get_picocoach(),
-                    self.state.dgtmenu.get_picoexplorer(),
-                    self.state.dgtmenu.get_picocomment(),
-                )
-                await self.state.picotutor.open_engine()
-                # fallback if remote tutor failed to load
-                if not self.state.picotutor.best_engine or not self.state.picotutor.obvious_engine:
-                    logger.warning("remote tutor failed to start - falling back to local tutor")
-                    self.state.picotutor = None
-
-            if not self.state.picotutor:
-                self.state.picotutor = PicoTutor(
-                    i_ucishell=self.uci_local_shell,
-                    i_engine_path=tutor_engine,
-                    i_comment_file=self.state.comment_file,
-                    i_lang=self.args.language,
-                    loop=self.loop,
-                )
-                await self.state.picotutor.set_analysis_enabled(
-                    tutor_analysis_allowed_in_mode(self.state.interaction_mode)
-                )
-                await self.state.picotutor.set_status(
-                    self.state.dgtmenu.get_picowatcher(),
-                    self.state.dgtmenu.get_picocoach(),
-                    self.state.dgtmenu.get_picoexplorer(),
-                    self.state.dgtmenu.get_picocomment(),
-                )
-                await self.state.picotutor.open_engine()
-            if self.shared is not None:
-                self.shared["picotutor"] = self.state.picotutor
-            my_pgn_display.set_picotutor(self.state.picotutor)  # needed for comments in pgn
-            # set_mode in picotutor init set to False
+            # set_mode in picotutor init set to False - its engines open in the "tutor" startup step
 
             ModeInfo.set_game_ending(result="*")
 
@@ -1916,54 +1886,125 @@ async def main() -> None:
 
             # board connection wait moved to wait_for_board_connection to avoid blocking startup
 
-        def get_last_update_status(self) -> str | None:
-            """
-            Runs the check-update-status.sh script and returns its output as a string.
-            Returns None if there was an error running the script.
-            """
-            script_path = "/opt/picochess/check-update-status.sh"
+        async def _startup_update_status(self):
+            """issue 106 - get update and git status information for the user"""
+            self.update_status = await update_status_lookup.get()
+            logger.info("Update status: %s", self.update_status)
+            # This is shown for a very short time - you can also see it in the menu
+            if self.update_status:
+                self.state.dgttranslate.set_last_updated_info(self.update_status)
+                msg = Message.SHOW_TEXT(text_string=self.update_status)
+                await DisplayMsg.show(msg)
+            self.git_status = await git_status_lookup.get()
+            if self.git_status:
+                self.state.dgttranslate.set_git_info(self.git_status)
+                await DisplayMsg.show(Message.SYSTEM_INFO(info={"git_status": self.git_status}))
+            await tags_lookup.get()  # prefetch for the update menu
 
-            try:
-                result = subprocess.run(
-                    [script_path],
-                    cwd="/opt/picochess",
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,  # capture as string
-                    check=False,  # don't raise exception on non-zero exit
-                )
+        async def _startup_engine(self) -> Optional[Tuple[bool, Optional[int]]]:
+            """Open and start the playing engine - return (startup_ok, level_index), None if it failed to load"""
+            engine_file_to_load = self.state.engine_file  # assume not mame
+            if "/mame/" in self.state.engine_file and self.state.dgtmenu.get_engine_rdisplay():
+                engine_file_art = self.state.engine_file + "_art"
+                my_file = Path(engine_file_art)
+                if my_file.is_file():
+                    self.state.artwork_in_use = True
+                    engine_file_to_load = engine_file_art  # load mame
 
-                # Return stripped output
-                return result.stdout.strip()
+            uci_shell = self.uci_remote_shell if self.remote_engine_mode() and self.uci_remote_shell else self.uci_local_shell
 
-            except Exception:
-                # Optionally log or print error
-                logger.info("Error running update status script")
-                return None
+            self.engine = UciEngine(
+                file=engine_file_to_load,
+                uci_shell=uci_shell,
+                mame_par=self.calc_engine_mame_par(),
+                loop=self.loop,
+            )
+            with profiler.phase("engine open"):
+                await self.engine.open_engine()
+            if engine_file_to_load != self.state.engine_file:
+                await asyncio.sleep(1)  # mame artwork wait
 
-        def get_git_status(self) -> str | None:
-            """
-            Runs the check-git-status.sh script and returns the git status string.
-            Returns None if there was an error running the script.
-            """
-            script_path = "/opt/picochess/check-git-status.sh"
+            if not self.engine.loaded_ok():
+                logger.error("engine %s not started", self.state.engine_file)
+                return None  # initialise shows the failure and exits
 
-            try:
-                result = subprocess.run(
-                    [script_path],
-                    cwd="/opt/picochess",
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,  # capture output as string
-                    check=False,  # don't raise exception on non-zero exit
+            if self.args.pgn_elo and self.args.pgn_elo.isnumeric() and self.args.rating_deviation:
+                # no rated game yet, start from the rating of picochess.ini
+                self.initial_rating = Rating(float(args.pgn_elo), float(args.rating_deviation))
+            self.state.rating = await asyncio.to_thread(self.rating_store.rating, self.initial_rating)
+            if self.state.rating is not None:
+                self.args.pgn_elo = str(int(self.state.rating.rating))
+            self.args.engine_level = None if self.args.engine_level == "None" else self.args.engine_level
+            if self.args.engine_level == '""':
+                self.args.engine_level = None
+            engine_opt, level_index = await self.get_engine_level_dict(args.engine_level)
+            if self.args.engine_level and level_index is None:
+                logger.warning(
+                    "configured engine level '%s' not found for engine '%s'; using engine default",
+                    self.args.engine_level,
+                    self.state.engine_file,
                 )
+                self.args.engine_level = None
+            with profiler.phase("engine startup"):
+                startup_ok = await self.engine.startup(engine_opt, self.state.rating)
 
-                # Return the full output string from the shell script
-                return result.stdout.strip()
+            # Initialize variant support from engine settings
+            self._init_variant_from_engine()
+            return startup_ok, level_index
 
-            except Exception:
-                logger.info("Error running git status script:")
-                return None
+        async def _create_picotutor(self, remote: bool = True):
+            """Create the PicoTutor (remote via ssh if configured) without opening its engines."""
+            tutor_engine = self.args.tutor_engine
+            remote_tutor_override = self.tutor_remote_engine if remote else None
+            if remote_tutor_override and self.uci_remote_shell:
+                logger.info("using remote tutor engine via ssh: %s", remote_tutor_override)
+                picotutor = PicoTutor(
+                    i_ucishell=self.uci_remote_shell,
+                    i_engine_path=tutor_engine,
+                    i_comment_file=self.state.comment_file,
+                    i_lang=self.args.language,
+                    loop=self.loop,
+                    remote_binary_override=remote_tutor_override,
+                    tablebase=self.state.tablebase,
+                )
+            else:
+                picotutor = PicoTutor(
+                    i_ucishell=self.uci_local_shell,
+                    i_engine_path=tutor_engine,
+                    i_comment_file=self.state.comment_file,
+                    i_lang=self.args.language,
+                    loop=self.loop,
+                    tablebase=self.state.tablebase,
+                )
+            await picotutor.set_analysis_enabled(tutor_analysis_allowed_in_mode(self.state.interaction_mode))
+            await self._set_picotutor_status(picotutor)
+            self.state.picotutor = picotutor
+            if self.shared is not None:
+                self.shared["picotutor"] = self.state.picotutor
+            my_pgn_display.set_picotutor(self.state.picotutor)  # needed for comments in pgn
+
+        async def _set_picotutor_status(self, picotutor: PicoTutor):
+            await picotutor.set_status(
+                self.state.dgtmenu.get_picowatcher(),
+                self.state.dgtmenu.get_picocoach(),
+                self.state.dgtmenu.get_picoexplorer(),
+                self.state.dgtmenu.get_picocomment(),
+            )
+
+        async def _startup_picotutor(self):
+            """Open the tutor engines in the background while the game can already start."""
+            await self.state.picotutor.open_engine()
+            if self.state.picotutor.remote_binary_override is not None and (
+                not self.state.picotutor.best_engine or not self.state.picotutor.obvious_engine
+            ):
+                # fallback if remote tutor failed to load
+                logger.warning("remote tutor failed to start - falling back to local tutor")
+                await self._create_picotutor(remote=False)
+                await self.state.picotutor.open_engine()
+                # the game may have started meanwhile - the new tutor has not seen its moves
+                await self.set_picotutor_position()
+            # the engines were not there when the status was set - start analysis now if needed
+            await self._set_picotutor_status(self.state.picotutor)
 
         async def _cache_engine_abort_result(self):
             """Ensure the fallback result for a missing engine move is cached."""
@@ -2068,7 +2109,7 @@ async def main() -> None:
                                     ponder_move = pv_line[1]  # not likely to happen
                             if move and not ponder_move:
                                 # no ponder means we should allow the next analysis info to be sent ASAP
-                                self.state.best_sent_depth.reset()
+                                self.reset_best_sent_depth()
                             if info:
                                 # send pv, score, not sendpv as it's sent by BEST_MOVE below
                                 ponder_cache = ponder_move if ponder_move else chess.Move.null()
@@ -2103,7 +2144,7 @@ async def main() -> None:
             await self.engine.stop()
             if self.engine.consume_forced_analyser_stop():
                 logger.debug("forced analyser stop detected - resetting best depth cache")
-                self.state.best_sent_depth.reset()
+                self.reset_best_sent_depth()
             if not self.emulation_mode():
                 while not self.engine.is_waiting():
                     await asyncio.sleep(0.05)
@@ -2190,7 +2231,7 @@ async def main() -> None:
                         san_move = game_tutor.san(t_best_move)
                         game_tutor.push(t_best_move)  # for picotalker (last move spoken)
                         tutor_str = "BEST" + san_move
-                        msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
+                        msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=GameSnapshot.of(game_tutor))
                         await DisplayMsg.show(msg)
                         await asyncio.sleep(5)
                 else:
@@ -2215,7 +2256,7 @@ async def main() -> None:
                             game_tutor.push(alt_move)  # for picotalker (last move spoken)
 
                             tutor_str = "BEST" + san_move
-                            msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
+                            msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=GameSnapshot.of(game_tutor))
                             await DisplayMsg.show(msg)
                             await asyncio.sleep(5)
                         else:
@@ -2254,7 +2295,7 @@ async def main() -> None:
             game_tutor = self.state.game.copy()
             san_move = game_tutor.san(best_move)
             game_tutor.push(best_move)
-            await DisplayMsg.show(Message.PICOTUTOR_MSG(eval_str="BEST" + san_move, game=game_tutor.copy()))
+            await DisplayMsg.show(Message.PICOTUTOR_MSG(eval_str="BEST" + san_move, game=GameSnapshot.of(game_tutor)))
 
         def _piece_type_name(self, piece_type: chess.PieceType | None) -> str:
             return {
@@ -2729,7 +2770,7 @@ async def main() -> None:
                 self.state.takeback_active = True
                 # it seems call to set_wait_state assumes its always user move
                 # so after engine move takeback user needs to press lever
-                await self.set_wait_state(Message.TAKE_BACK(game=self.state.game.copy()))
+                await self.set_wait_state(Message.TAKE_BACK(game=self.state.game_snapshot()))
 
                 if self.pgn_mode():  # molli pgn
                     log_pgn(self.state)
@@ -2906,7 +2947,7 @@ async def main() -> None:
                     self.state.set_position_ack_pending = False
                     if not (self.state.position_mode and self.state.delay_fen_error == 1):
                         await DisplayMsg.show(
-                            Message.PICOTUTOR_MSG(eval_str="POSOK", game=self.state.game.copy())
+                            Message.PICOTUTOR_MSG(eval_str="POSOK", game=self.state.game_snapshot())
                         )
                         await asyncio.sleep(1)
                 # molli: Chess tutor
@@ -2933,7 +2974,7 @@ async def main() -> None:
                     if self.state.delay_fen_error == 1:
                         # position finally alright!
                         tutor_str = "POSOK"
-                        msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game.copy())
+                        msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game_snapshot())
                         await DisplayMsg.show(msg)
                         self.state.delay_fen_error = 4
                         await asyncio.sleep(1)
@@ -3047,14 +3088,16 @@ async def main() -> None:
                             await asyncio.sleep(3)
                             # display set pieces again and accept new players move as pico's move
                             await DisplayMsg.show(
-                                Message.ALTERNATIVE_MOVE(game=self.state.game.copy(), play_mode=self.state.play_mode)
+                                Message.ALTERNATIVE_MOVE(
+                                    game=self.state.game_snapshot(), play_mode=self.state.play_mode
+                                )
                             )
                             await asyncio.sleep(2)
                             await DisplayMsg.show(
                                 Message.COMPUTER_MOVE(
                                     move=move,
                                     ponder=False,
-                                    game=self.state.game_copy(),
+                                    game=self.state.game_snapshot(),
                                     wait=False,
                                     is_user_move=False,
                                 )
@@ -3119,7 +3162,7 @@ async def main() -> None:
                 legal_moves = list(_move_board.legal_moves)
                 self.state.done_move = legal_moves[legal_fens_pico.index(fen)]
                 await DisplayMsg.show(
-                    Message.ALTERNATIVE_MOVE(game=self.state.game.copy(), play_mode=self.state.play_mode)
+                    Message.ALTERNATIVE_MOVE(game=self.state.game_snapshot(), play_mode=self.state.play_mode)
                 )
                 await asyncio.sleep(1.5)
                 if self.state.done_move:
@@ -3127,7 +3170,7 @@ async def main() -> None:
                         Message.COMPUTER_MOVE(
                             move=self.state.done_move,
                             ponder=False,
-                            game=self.state.game_copy(),
+                            game=self.state.game_snapshot(),
                             wait=False,
                             is_user_move=False,
                         )
@@ -3354,7 +3397,7 @@ async def main() -> None:
                     handled_fen = False
                 else:
                     handled_fen = False
-                    game_copy = copy.deepcopy(self.state.game)
+                    game_copy = self.state.game.copy()
                     while game_copy.move_stack:
                         game_copy.pop()
                         if game_copy.board_fen() == fen:
@@ -3388,7 +3431,7 @@ async def main() -> None:
                             self.state.takeback_active = True
                             self._update_variant_shared()  # sync check counts etc. after multi-pop
                             await self.set_wait_state(
-                                Message.TAKE_BACK(game=self.state.game.copy())
+                                Message.TAKE_BACK(game=self.state.game_snapshot())
                             )  # new: force stop no matter if picochess turn
 
                             break
@@ -3413,7 +3456,7 @@ async def main() -> None:
                 self.reset_setpieces_window_switch()
                 if self.state.position_mode and self.state.delay_fen_error == 1:
                     tutor_str = "POSOK"
-                    msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game.copy())
+                    msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game_snapshot())
                     await DisplayMsg.show(msg)
                     await asyncio.sleep(1)
                     if not self.state.done_computer_fen:
@@ -3427,7 +3470,7 @@ async def main() -> None:
                     self.reset_setpieces_window_switch()
                     if self.state.position_mode and self.state.delay_fen_error == 1:
                         tutor_str = "POSOK"
-                        msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game.copy())
+                        msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game_snapshot())
                         await DisplayMsg.show(msg)
                         if not self.state.done_computer_fen:
                             await self.state.start_clock()
@@ -3541,11 +3584,11 @@ async def main() -> None:
                                 )
                                 if not send_pv:
                                     self.state.pb_move = chess.Move.null()
-                                    self.state.best_sent_depth.reset()
+                                    self.reset_best_sent_depth()
                                 ponder_hit = True
                     if not ponder_hit:
                         # user deviated from analysed line (or no info available) - reset cache
-                        self.state.best_sent_depth.reset()
+                        self.reset_best_sent_depth()
 
                 # Clock logic after user move
                 #
@@ -3654,7 +3697,7 @@ async def main() -> None:
                                 game_tutor.push(t_pv_user_move[1])  # 1st counter move
 
                                 tutor_str = "THREAT" + san_move
-                                msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
+                                msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=GameSnapshot.of(game_tutor))
                                 pending_picotutor_msgs.append((msg, 5.0))
 
                             if t_hint_move != chess.Move.null():
@@ -3662,7 +3705,7 @@ async def main() -> None:
                                 san_move = game_tutor.san(t_hint_move)
                                 game_tutor.push(t_hint_move)
                                 tutor_str = "HINT" + san_move
-                                msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
+                                msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=GameSnapshot.of(game_tutor))
                                 pending_picotutor_msgs.append((msg, 5.0))
 
                     if self.state.game.fullmove_number < 1:
@@ -3673,7 +3716,7 @@ async def main() -> None:
                 #
                 if self.state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
                     msg = Message.USER_MOVE_DONE(
-                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game.copy()
+                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game_snapshot()
                     )
                     tutor_reveal_move = None
                     if self.picotutor_mode():
@@ -3725,7 +3768,7 @@ async def main() -> None:
                                     else:
                                         self.state.takeback_active = True
                                         self.state.automatic_takeback = True  # to be reset in think!
-                                        await self.set_wait_state(Message.TAKE_BACK(game=self.state.game.copy()))
+                                        await self.set_wait_state(Message.TAKE_BACK(game=self.state.game_snapshot()))
                                 else:
                                     # send move to engine
                                     logger.debug("starting think()")
@@ -3758,7 +3801,7 @@ async def main() -> None:
                     self.state.last_move = move
                 elif self.state.interaction_mode == Mode.REMOTE:
                     msg = Message.USER_MOVE_DONE(
-                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game.copy()
+                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game_snapshot()
                     )
                     game_end = self.state.check_game_state()
                     await DisplayMsg.show(msg)
@@ -3770,7 +3813,7 @@ async def main() -> None:
                         await self.observe()
                 elif self.state.interaction_mode == Mode.OBSERVE:
                     msg = Message.REVIEW_MOVE_DONE(
-                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game.copy()
+                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game_snapshot()
                     )
                     game_end = self.state.check_game_state()
                     if game_end:
@@ -3784,7 +3827,7 @@ async def main() -> None:
                         await self.observe()
                 else:  # self.state.interaction_mode in (Mode.ANALYSIS, Mode.KIBITZ, Mode.PONDER, Mode.PGNREPLAY):
                     msg = Message.REVIEW_MOVE_DONE(
-                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game.copy()
+                        move=move, fen=game_before.fen(), turn=game_before.turn, game=self.state.game_snapshot()
                     )
                     game_end = self.state.check_game_state()
                     if game_end:
@@ -3877,11 +3920,20 @@ async def main() -> None:
             return info
 
         async def update_elo(self, result):
-            if self.engine.is_adaptive:
-                self.state.rating = await self.engine.update_rating(
-                    self.state.rating,
-                    determine_result(result, self.state.play_mode, self.state.game.turn == chess.WHITE),
+            if self.engine.is_adaptive and self.engine.engine_rating >= 0:
+                user_result = determine_result(result, self.state.play_mode, self.state.game.turn == chess.WHITE)
+                if user_result is None:
+                    return
+                # the new rating comes from the stored history, rated per Glicko-2 rating period
+                self.state.rating = await asyncio.to_thread(
+                    self.rating_store.record,
+                    self.engine.get_name(),
+                    self.state.engine_level,
+                    self.engine.engine_rating,
+                    user_result,
+                    self.initial_rating,
                 )
+                await self.engine.adapt_to_rating(self.state.rating)
 
         async def update_elo_display(self):
             if self.emulation_mode():
@@ -3969,6 +4021,8 @@ async def main() -> None:
                 return False
             if self.pgn_mode() or (self.engine and self.engine.should_skip_engine_analyser()):
                 return False
+            if not self.analysis_watched():
+                return False  # nobody would see it
             if self.playing_game_analysis_stopped():
                 return False
             if self.eng_plays() and self.state.loaded_pgn_finished:
@@ -4074,7 +4128,7 @@ async def main() -> None:
                 self.state.position_mode = False
                 self.state.delay_fen_error = 4
                 await DisplayMsg.show(
-                    Message.PICOTUTOR_MSG(eval_str="POSOK", game=self.state.game.copy())
+                    Message.PICOTUTOR_MSG(eval_str="POSOK", game=self.state.game_snapshot())
                 )
                 await asyncio.sleep(1)
                 await DisplayMsg.show(Message.EXIT_MENU())
@@ -4158,7 +4212,7 @@ async def main() -> None:
             # explored branch for an arbitrary amount of time.
             self.state.position_mode = True
             self._update_variant_shared()
-            self.state.best_sent_depth.reset()
+            self.reset_best_sent_depth()
             self.state.done_computer_fen = None
             self.state.done_move = self.state.pb_move = chess.Move.null()
             self.state.searchmoves.reset()
@@ -4170,7 +4224,7 @@ async def main() -> None:
             self.state.legal_fens_after_cmove = []
             self.state.last_legal_fens = []
             await self.engine.newgame(self.state.engine_board_copy(), False)
-            await DisplayMsg.show(Message.WEB_ANALYSIS(analysis=None))
+            await self.clear_web_analysis()
             await DisplayMsg.show(self.state.new_game_msg(newgame=False))
 
             physical_fen = self.state.dgtmenu.get_dgt_fen() if self.state.dgtmenu is not None else ""
@@ -4207,7 +4261,7 @@ async def main() -> None:
             self.state.error_fen = None
             self.state.fen_error_occured = False
             self.state.position_mode = False
-            self.state.best_sent_depth.reset()
+            self.reset_best_sent_depth()
             self.state.done_computer_fen = None
             self.state.done_move = self.state.pb_move = chess.Move.null()
             self.state.searchmoves.reset()
@@ -4218,7 +4272,7 @@ async def main() -> None:
             self.state.legal_fens_after_cmove = []
             self.state.last_legal_fens = []
             await self.engine.newgame(self.state.engine_board_copy(), False)
-            await DisplayMsg.show(Message.WEB_ANALYSIS(analysis=None))
+            await self.clear_web_analysis()
             await DisplayMsg.show(Message.SHOW_TEXT(text_string="NEW_POSITION"))
             await DisplayMsg.show(self.state.new_game_msg(newgame=False))
             await self._start_or_stop_analysis_as_needed()
@@ -4265,8 +4319,25 @@ async def main() -> None:
                 self.engine.force_move()
                 await asyncio.sleep(0.5)  # wait for forced move to be handled
 
+        def engine_on_user_turn(self) -> bool:
+            """return True if the playing engine searches while the user thinks - next to the tutor"""
+            if not self.engine:
+                return False
+            if self.engine.is_pondering() or self.engine.is_mame_engine():
+                return True
+            tutor_replaces_engine = self.is_coach_analyser() and self.state.picotutor.can_use_coach_analyser()
+            return self.analysis_watched() and not tutor_replaces_engine
+
+        def _update_resource_budget(self) -> None:
+            """Share the cores for the next searches and publish the allocation to web clients."""
+            if self.resource_budget.update(self.engine, self.state.picotutor, self.engine_on_user_turn()):
+                update = {"resources": self.resource_budget.allocation}
+                self.shared.setdefault("system_info", {}).update(update)
+                EventHandler.write_to_clients({"event": "SystemInfo", "msg": update})
+
         async def _start_or_stop_analysis_as_needed(self):
             """start or stop engine analyser as needed (tutor handles this on its own)"""
+            self._update_resource_budget()
             if self.engine:
                 if self.need_engine_analyser():
                     limit = Limit(depth=FLOAT_ENGINE_MAX_ANALYSIS_DEPTH)
@@ -4385,7 +4456,8 @@ async def main() -> None:
                 )
             if info_list and (info_list_source != "tutor" or not self.eng_plays()):
                 info = info_list[0]  # pv first
-                await self.send_analyse(info, analysed_fen)
+                if self.analysis_pipeline.publish("clock", self.analysis_pipeline.result(info, analysed_fen)):
+                    await self.send_analyse(info, analysed_fen)
             # autoplay is temporarily piggybacking on this once-a-second analyse call
             # @todo give it a separate timer task when this is stable
             if allow_autoplay and self.state.autoplay_pgn_file and self.can_do_next_pgn_replay_move():
@@ -4425,10 +4497,13 @@ async def main() -> None:
             if analysed_fen != current_fen:
                 logger.debug("ignoring analysis info for old fen: %s != %s", analysed_fen, current_fen)
                 return
-            # ask for score from white's perspective
-            (move, score, mate) = PicoTutor.get_score(info)
+            # score from white's perspective
+            result = self.analysis_pipeline.result(info, analysed_fen)
+            (move, score, mate) = (result.move, result.score, result.mate)
+            if not send_pv or ponder_move is not None:
+                self.analysis_pipeline.forget("clock")  # the next tick sends the plain info again
             if "depth" in info:
-                depth = info.get("depth")
+                depth = result.depth
                 cache_ponder = move
                 if ponder_move is not None:
                     cache_ponder = ponder_move
@@ -4457,59 +4532,41 @@ async def main() -> None:
             source: str,
             suppress_engine_line: bool = False,
         ):
-            """Send full analysis info to the web client without depth gating."""
+            """Send full analysis info to the web client without depth gating, unless it was sent already."""
             if not info:
                 return
             current_fen = self.state.get_fen()
             if analysed_fen != current_fen:
                 logger.debug("ignoring web analysis for old fen: %s != %s", analysed_fen, current_fen)
                 return
-            (move, score, mate) = PicoTutor.get_score(info)
+            result = self.analysis_pipeline.result(info, analysed_fen)
             # Don't send incomplete analysis that would show "?" in the UI.
             # get_score() returns mate=0 (falsy) when there is no mate, so check
             # "not mate" rather than "mate is None" to cover both None and 0.
-            if score is None and not mate:
+            if result.score is None and not result.mate:
                 logger.debug("skip web analysis for %s: no score/mate yet", source)
                 return
-            depth = info.get("depth")
-            pv_moves = list(info.get("pv") or [])
-            # Convert PV to SAN using the analysed position so the web client can render
-            # figurine notation without needing to re-parse UCI+FEN through chess.js.
-            # (chess.js FEN loading or move application can silently fail, falling back to
-            # raw UCI coordinates.  Pre-computing SAN in Python eliminates that code path.)
-            pv_to_send = []
-            if pv_moves and analysed_fen:
-                try:
-                    san_board = chess.Board(analysed_fen)
-                    for m in pv_moves:
-                        if not m or m == chess.Move.null():
-                            break
-                        try:
-                            pv_to_send.append(san_board.san(m))
-                            san_board.push(m)
-                        except (ValueError, AssertionError):
-                            break
-                except Exception:
-                    pass
-            if not pv_to_send:
-                # Fallback: raw UCI (SAN board construction failed; JS will attempt chess.js parsing)
-                pv_to_send = [m.uci() for m in pv_moves if m and m != chess.Move.null()]
-            if not pv_to_send and move and move != chess.Move.null():
-                try:
-                    pv_to_send = [chess.Board(analysed_fen).san(move)]
-                except Exception:
-                    pv_to_send = [move.uci()]
-            analysis_payload = {
-                "depth": depth,
-                "score": score,
-                "mate": mate,
-                "pv": pv_to_send,
-                "fen": analysed_fen,
-                "source": source,
-                "suppress_engine_line": suppress_engine_line,
-            }
+            if not self.analysis_pipeline.publish("web_" + source, result, suppress_engine_line):
+                return  # the web client has this analysis already
+            analysis_payload = result.web_payload(source, suppress_engine_line)
             await DisplayMsg.show(Message.WEB_ANALYSIS(analysis=analysis_payload))
 
+        def reset_best_sent_depth(self):
+            """Drop the sent depth optimisation - the next analysis goes to the clock even if it is the same."""
+            self.state.best_sent_depth.reset()
+            self.analysis_pipeline.forget("clock")
+
+        async def clear_web_analysis(self, source: str | None = None):
+            """Clear the engine or tutor line of the web client, both lines if source is None."""
+            if source is None:
+                self.analysis_pipeline.forget("web_engine", "web_tutor", "clock")
+                await DisplayMsg.show(Message.WEB_ANALYSIS(analysis=None))
+            else:
+                self.analysis_pipeline.forget("web_" + source)
+                if source == "engine":
+                    self.analysis_pipeline.forget("clock")  # the web client drops the clock analysis with it
+                await DisplayMsg.show(Message.WEB_ANALYSIS(analysis={"source": source, "clear": True}))
+
         async def autoplay_pgnreplay_move(
             self, allow_game_ends, next_move: chess.Move | None = None
         ) -> chess.Move:
@@ -4540,7 +4597,7 @@ async def main() -> None:
                             tc_init=self.state.time_control.get_parameters(),
                             result=result,
                             play_mode=self.state.play_mode,
-                            game=self.state.game.copy(),
+                            game=self.state.game_snapshot(),
                             mode=self.state.interaction_mode,
                         )
                     )
@@ -4639,7 +4696,7 @@ async def main() -> None:
                                 self.state._atomic_board.set_fen(accepted_fen)
                             self._update_variant_shared()
                             await self.engine.newgame(self.state.engine_board_copy(), False)
-                            self.state.best_sent_depth.reset()
+                            self.reset_best_sent_depth()
                             self.state.done_computer_fen = None
                             self.state.done_move = self.state.pb_move = chess.Move.null()
                             self.state.searchmoves.reset()
@@ -4667,7 +4724,7 @@ async def main() -> None:
                                 Message.COMPUTER_MOVE(
                                     move=self.state.done_move,
                                     ponder=False,
-                                    game=self.state.game_copy(),
+                                    game=self.state.game_snapshot(),
                                     wait=False,
                                     is_user_move=False,
                                 )
@@ -4850,7 +4907,7 @@ async def main() -> None:
 
             await self.stop_search_and_clock()
             # reset best depth so new analysis results are not filtered by previous game
-            self.state.best_sent_depth.reset()
+            self.reset_best_sent_depth()
 
             # forget possible previously loaded PGN game
             self.state.picotutor.set_pgn_game_to_step(None)
@@ -4904,9 +4961,10 @@ async def main() -> None:
             # make sure we have "?" in important missing headers to
             # prevent overwrite by existing user or engine names or elos etc
             ensure_important_headers(l_game_pgn.headers)
-            self.state.loaded_pgn_game = copy.deepcopy(l_game_pgn)
+            # the loaded game is only read from here on - state and shared keep the same object
+            self.state.loaded_pgn_game = l_game_pgn
             self.state.loaded_pgn_filename = file_name
-            self.shared["loaded_pgn_game"] = copy.deepcopy(l_game_pgn)
+            self.shared["loaded_pgn_game"] = l_game_pgn
 
             if show_pgn_headers:
                 await DisplayMsg.show(Message.READ_GAME)
@@ -5013,7 +5071,7 @@ async def main() -> None:
             await self.set_picotutor_position(new_game=True)
 
             # ensure analysis optimisation is fresh after header display/setup
-            self.state.best_sent_depth.reset()
+            self.reset_best_sent_depth()
 
             self.state.tc_init_last = self.state.time_control.get_parameters()
             self.state.time_control.reset()  # fallback is same as ini setting
@@ -5259,7 +5317,7 @@ async def main() -> None:
             if self.state.picotutor is not None:
                 await self.state.picotutor.set_analysis_enabled(tutor_analysis_enabled)
             if not tutor_analysis_enabled:
-                await DisplayMsg.show(Message.WEB_ANALYSIS(analysis={"source": "tutor", "clear": True}))
+                await self.clear_web_analysis("tutor")
             if self.state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
                 # optimisation, dont ask for ponder unless needed
                 ponder_mode = True if self.state.interaction_mode == Mode.BRAIN else False
@@ -5291,11 +5349,24 @@ async def main() -> None:
             else:
                 return False
 
-        async def _pv_score_depth_analyser(self):
-            """Analyse PV score depth in the background"""
+        async def _pv_score_depth_analyser(self, woken: bool = False) -> bool:
+            """Analyse PV score depth in the background, return True if something new was sent
+            woken is True for a tick an analyser asked for early by reaching a new depth"""
+            sent = self.analysis_pipeline.sent
             if self.state.game:
                 if not self.state.game.is_game_over():
-                    await self.analyse(triggered_by_timer=True)
+                    # PGN autoplay moves on the regular ticks only, and keeps them coming every second
+                    await self.analyse(triggered_by_timer=True, allow_autoplay=not woken)
+                    if self.state.autoplay_pgn_file:
+                        return True
+            return self.analysis_pipeline.sent != sent
+
+        def analysis_watched(self) -> bool:
+            """return True if a display shows the background analysis or the mode depends on it"""
+            if EventHandler.clients or self.pgn_mode() or self.state.autoplay_pgn_file:
+                return True
+            # a hardware clock shows score, depth and hint on its buttons
+            return bool(getattr(self.dgtboard, "enable_ser_clock", False) or getattr(self.dgtboard, "is_pi", False))
 
         async def event_consumer(self):
             """Event consumer for main"""
@@ -5323,6 +5394,8 @@ async def main() -> None:
                 self.state.stop_fen_timer()
             # @todo are there other timers to stop here?
             # as we wait 5 secs before exiting we only want to prevent timer actions
+            self.background_analyse_timer.stop()
+            ContinuousAnalysis.remove_depth_listener(self.background_analyse_timer.wake)
             await self.stop_search()
             await self.state.stop_clock()
             await self.engine.quit()
@@ -5426,7 +5499,7 @@ async def main() -> None:
                     Message.COMPUTER_MOVE(
                         move=next_move,
                         ponder=False,
-                        game=game_copy,
+                        game=self.state.game_snapshot(),
                         wait=False,
                         is_user_move=True,
                     )
@@ -5553,8 +5626,8 @@ async def main() -> None:
             elif isinstance(event, Event.NEW_ENGINE):
                 # if we are waiting for an engine move, get rid of that first
                 await self.get_rid_of_engine_move()
-                self.state.best_sent_depth.reset()
-                await DisplayMsg.show(Message.WEB_ANALYSIS(analysis={"source": "engine", "clear": True}))
+                self.reset_best_sent_depth()
+                await self.clear_web_analysis("engine")
                 old_file = self.state.engine_file
                 old_options = {}
                 old_options = self.engine.get_pgn_options()
@@ -5743,7 +5816,7 @@ async def main() -> None:
                         self.engine.option("game_sequence", "forward")
                         await self.engine.send()
                     await self.engine.newgame(self.state.engine_board_copy())
-                    self.state.best_sent_depth.reset()
+                    self.reset_best_sent_depth()
                     self.state.done_computer_fen = None
                     self.state.done_move = self.state.pb_move = chess.Move.null()
                     self.state.searchmoves.reset()
@@ -5946,7 +6019,7 @@ async def main() -> None:
                                 tc_init=self.state.time_control.get_parameters(),
                                 result=result,
                                 play_mode=self.state.play_mode,
-                                game=self.state.game.copy(),
+                                game=self.state.game_snapshot(),
                                 mode=self.state.interaction_mode,
                             )
                         )
@@ -5996,7 +6069,7 @@ async def main() -> None:
                     self.state.engine_board_copy(),
                     send_position_to_mame=True,
                 )
-                self.state.best_sent_depth.reset()
+                self.reset_best_sent_depth()
                 self.state.done_computer_fen = None
                 self.state.done_move = self.state.pb_move = chess.Move.null()
                 self.state.legal_fens_after_cmove = []
@@ -6036,7 +6109,7 @@ async def main() -> None:
                     await DisplayMsg.show(Message.WRONG_FEN())
                 else:
                     tutor_str = "POSOK"
-                    msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game.copy())
+                    msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=self.state.game_snapshot())
                     await DisplayMsg.show(msg)
                     await asyncio.sleep(1)
 
@@ -6096,7 +6169,7 @@ async def main() -> None:
                                     tc_init=self.state.time_control.get_parameters(),
                                     result=result,
                                     play_mode=self.state.play_mode,
-                                    game=self.state.game.copy(),
+                                    game=self.state.game_snapshot(),
                                     mode=self.state.interaction_mode,
                                 )
                             )
@@ -6143,9 +6216,9 @@ async def main() -> None:
                         self._advance_pgn_engine_game()
                     await self.engine.newgame(self.state.engine_board_copy())
 
-                    self.state.best_sent_depth.reset()
-                    await DisplayMsg.show(Message.WEB_ANALYSIS(analysis={"source": "engine", "clear": True}))
-                    await DisplayMsg.show(Message.WEB_ANALYSIS(analysis={"source": "tutor", "clear": True}))
+                    self.reset_best_sent_depth()
+                    await self.clear_web_analysis("engine")
+                    await self.clear_web_analysis("tutor")
                     self.state.done_computer_fen = None
                     self.state.done_move = self.state.pb_move = chess.Move.null()
                     self.state.time_control.reset()
@@ -6265,7 +6338,7 @@ async def main() -> None:
                         else:
                             await DisplayMsg.show(Message.ONLINE_NAMES(own_user=self.own_user, opp_user=self.opp_user))
                             await asyncio.sleep(1)
-                        self.state.best_sent_depth.reset()
+                        self.reset_best_sent_depth()
                         self.state.seeking_flag = False
                         self.state.best_move_displayed = None
                         self.state.takeback_active = False
@@ -6378,7 +6451,9 @@ async def main() -> None:
                         if not self.state.check_game_state():
                             # picotuter should be in sync as takeback already was done
                             await self.think(
-                                Message.ALTERNATIVE_MOVE(game=self.state.game.copy(), play_mode=self.state.play_mode),
+                                Message.ALTERNATIVE_MOVE(
+                                    game=self.state.game_snapshot(), play_mode=self.state.play_mode
+                                ),
                                 searchlist=True,
                             )
                     elif self.eng_plays() and self.state.is_not_user_turn():
@@ -6435,7 +6510,9 @@ async def main() -> None:
                             # Allow any late bestmove/info lines from the previous search to drain.
                             await asyncio.sleep(0.2)
                             await self.think(
-                                Message.ALTERNATIVE_MOVE(game=self.state.game.copy(), play_mode=self.state.play_mode),
+                                Message.ALTERNATIVE_MOVE(
+                                    game=self.state.game_snapshot(), play_mode=self.state.play_mode
+                                ),
                                 searchlist=True,
                             )
                     else:
@@ -6448,7 +6525,7 @@ async def main() -> None:
                 await self._set_ponder_turn(not self.state.game.turn)
 
             elif isinstance(event, Event.SWITCH_SIDES):
-                self.state.best_sent_depth.reset()  # safest to drop optimisation when switching sides
+                self.reset_best_sent_depth()  # safest to drop optimisation when switching sides
                 await self.get_rid_of_engine_move()
                 self.state.flag_startup = False
                 await DisplayMsg.show(Message.EXIT_MENU())
@@ -6473,7 +6550,7 @@ async def main() -> None:
                             self.state._atomic_board.set_fen(bit_board.fen())
                         #  await self.stop_search_and_clock()
                         await self.engine.newgame(self.state.engine_board_copy())
-                        self.state.best_sent_depth.reset()
+                        self.reset_best_sent_depth()
                         self.state.done_computer_fen = None
                         self.state.done_move = self.state.pb_move = chess.Move.null()
                         self.state.time_control.reset()
@@ -6567,7 +6644,7 @@ async def main() -> None:
                         self.state.legal_fens = compute_legal_fens(self.state.game.copy(), self.state.get_variant_board())
 
                     if self.state.best_move_displayed:
-                        await DisplayMsg.show(Message.SWITCH_SIDES(game=self.state.game.copy(), move=move))
+                        await DisplayMsg.show(Message.SWITCH_SIDES(game=self.state.game_snapshot(), move=move))
 
                 elif self.state.interaction_mode == Mode.REMOTE:
                     if not self.engine.is_waiting():
@@ -6611,7 +6688,7 @@ async def main() -> None:
                             self.state.legal_fens = compute_legal_fens(self.state.game.copy(), self.state.get_variant_board())
 
                     if self.state.best_move_displayed:
-                        await DisplayMsg.show(Message.SWITCH_SIDES(game=self.state.game.copy(), move=move))
+                        await DisplayMsg.show(Message.SWITCH_SIDES(game=self.state.game_snapshot(), move=move))
 
             elif isinstance(event, Event.DRAWRESIGN):
                 if not self.state.game_declared:  # in case user leaves kings in place while moving other pieces
@@ -6648,7 +6725,7 @@ async def main() -> None:
                             tc_init=self.state.time_control.get_parameters(),
                             result=event.result,
                             play_mode=self.state.play_mode,
-                            game=self.state.game.copy(),
+                            game=self.state.game_snapshot(),
                             mode=self.state.interaction_mode,
                         )
                     )
@@ -6711,7 +6788,7 @@ async def main() -> None:
                             Message.COMPUTER_MOVE(
                                 move=event.move,
                                 ponder=chess.Move.null(),
-                                game=self.state.game_copy(),
+                                game=self.state.game_snapshot(),
                                 wait=False,
                                 is_user_move=False,
                             )
@@ -6749,7 +6826,7 @@ async def main() -> None:
                             self.state.game_declared = True
                             self.state.stop_fen_timer()
                             self.state.legal_fens_after_cmove = []
-                            game_msg = self.state.game.copy()
+                            game_msg = self.state.game_snapshot()
                             self.game_end_event()
                             if self.online_mode():
                                 winner = ""
@@ -6923,7 +7000,7 @@ async def main() -> None:
                                                 self.state.takeback_active = True
                                                 self.state.automatic_takeback = True
                                                 await self.set_wait_state(
-                                                    Message.TAKE_BACK(game=self.state.game.copy()),
+                                                    Message.TAKE_BACK(game=self.state.game_snapshot()),
                                                 )  # automatic takeback mode
                                     else:
                                         logger.debug("molli pgn: Wrong Move! Try Again!")
@@ -6950,7 +7027,7 @@ async def main() -> None:
                                             self.state.takeback_active = True
                                             self.state.automatic_takeback = True
                                             await self.set_wait_state(
-                                                Message.TAKE_BACK(game=self.state.game.copy())
+                                                Message.TAKE_BACK(game=self.state.game_snapshot())
                                             )  # automatic takeback mode
                                 else:
                                     #  issue #14 0000 bestmove - not pgn replay - reload engine
@@ -6970,7 +7047,7 @@ async def main() -> None:
                                                 tc_init=self.state.time_control.get_parameters(),
                                                 result=result,
                                                 play_mode=self.state.play_mode,
-                                                game=self.state.game.copy(),
+                                                game=self.state.game_snapshot(),
                                                 mode=self.state.interaction_mode,
                                             )
                                         )
@@ -6985,7 +7062,9 @@ async def main() -> None:
                                         else:
                                             self.state.takeback_active = True
                                             self.state.automatic_takeback = True
-                                            await self.set_wait_state(Message.TAKE_BACK(game=self.state.game.copy()))
+                                            await self.set_wait_state(
+                                                Message.TAKE_BACK(game=self.state.game_snapshot())
+                                            )
                                         loaded_ok = await self.engine.reopen_engine()
                                         if loaded_ok:
                                             level_index = self.state.dgtmenu.get_engine_level_index()
@@ -7025,7 +7104,7 @@ async def main() -> None:
                                 Message.COMPUTER_MOVE(
                                     move=event.move,
                                     ponder=event.ponder,
-                                    game=self.state.game_copy(),
+                                    game=self.state.game_snapshot(),
                                     wait=event.inbook,
                                     is_user_move=False,
                                 )
@@ -7191,11 +7270,11 @@ async def main() -> None:
                             Message.NEW_PV(
                                 pv=event.pv,
                                 mode=self.state.interaction_mode,
-                                game=self.state.game_copy(),
+                                game=self.state.game_snapshot(),
                             )
                         )
                     else:
-                        self.state.best_sent_depth.reset()
+                        self.reset_best_sent_depth()
                         logger.info(
                             "illegal move can not be displayed. move: %s fen: %s",
                             event.pv[0],
@@ -7235,7 +7314,7 @@ async def main() -> None:
                 await DisplayMsg.show(Message.SEARCH_STOPPED())
 
             elif isinstance(event, Event.SET_INTERACTION_MODE):
-                self.state.best_sent_depth.reset()  # dont use optimisation when switching modes
+                self.reset_best_sent_depth()  # dont use optimisation when switching modes
                 old_interaction_mode = self.state.interaction_mode
                 entering_ponder = old_interaction_mode != Mode.PONDER and event.mode == Mode.PONDER
                 leaving_ponder = old_interaction_mode == Mode.PONDER and event.mode != Mode.PONDER
@@ -7286,7 +7365,7 @@ async def main() -> None:
                             await self.read_pgn_file(
                                 file_name_only,
                                 start_replay=True,
-                                pgn_game=copy.deepcopy(loaded_pgn_game),
+                                pgn_game=loaded_pgn_game,
                             )
                         else:
                             file_name_only = "last_game.pgn"
@@ -7340,7 +7419,7 @@ async def main() -> None:
                         Message.SAVE_GAME(
                             tc_init=self.state.time_control.get_parameters(),
                             play_mode=self.state.play_mode,
-                            game=self.state.game.copy(),
+                            game=self.state.game_snapshot(),
                             pgn_filename=event.pgn_filename,
                             mode=self.state.interaction_mode,
                         )
@@ -7366,7 +7445,7 @@ async def main() -> None:
             elif isinstance(event, Event.PICOWATCHER):
                 self.state.dgtmenu.set_picowatcher(event.picowatcher)
                 write_picochess_ini("tutor-watcher", event.picowatcher)
-                self.state.best_sent_depth.reset()
+                self.reset_best_sent_depth()
                 await self.state.picotutor.set_status(
                     self.state.dgtmenu.get_picowatcher(),
                     self.state.dgtmenu.get_picocoach(),
@@ -7388,7 +7467,7 @@ async def main() -> None:
                     await self.state.picotutor.set_mode(self.pgn_mode() or not self.eng_plays())
                 # Clear stale web analysis lines and restart the engine analyser so the
                 # correct lines (engine / tutor) appear immediately after tutor state change.
-                await DisplayMsg.show(Message.WEB_ANALYSIS(analysis=None))
+                await self.clear_web_analysis()
                 await self._start_or_stop_analysis_as_needed()
                 await DisplayMsg.show(Message.PICOWATCHER(picowatcher=event.picowatcher))
 
@@ -7425,7 +7504,7 @@ async def main() -> None:
                 elif coach_request == 1 and self.state.dgtmenu.get_picocoach() == PicoCoach.COACH_OFF:
                     self.state.dgtmenu.set_picocoach(PicoCoach.COACH_ON)
                     write_picochess_ini("tutor-coach", "on")
-                self.state.best_sent_depth.reset()
+                self.reset_best_sent_depth()
                 await self.state.picotutor.set_status(
                     self.state.dgtmenu.get_picowatcher(),
                     self.state.dgtmenu.get_picocoach(),
@@ -7458,7 +7537,7 @@ async def main() -> None:
                         self.start_brain_hint_timer()
                 # Clear stale web analysis lines and restart the engine analyser so the
                 # correct lines (engine / tutor) appear immediately after tutor state change.
-                await DisplayMsg.show(Message.WEB_ANALYSIS(analysis=None))
+                await self.clear_web_analysis()
                 await self._start_or_stop_analysis_as_needed()
                 if coach_request != 2:
                     coach_msg = 0
@@ -7491,7 +7570,7 @@ async def main() -> None:
             elif isinstance(event, Event.PICOEXPLORER):
                 self.state.dgtmenu.set_picoexplorer(event.picoexplorer)
                 write_picochess_ini("tutor-explorer", event.picoexplorer)
-                self.state.best_sent_depth.reset()
+                self.reset_best_sent_depth()
                 await self.state.picotutor.set_status(
                     self.state.dgtmenu.get_picowatcher(),
                     self.state.dgtmenu.get_picocoach(),
@@ -7590,7 +7669,7 @@ async def main() -> None:
                         msg = self.state.new_game_msg(newgame=True)
                         await DisplayMsg.show(msg)
                     await self.engine.newgame(self.state.engine_board_copy())
-                    self.state.best_sent_depth.reset()
+                    self.reset_best_sent_depth()
                     self.state.done_computer_fen = None
                     self.state.done_move = self.state.pb_move = chess.Move.null()
                     self.state.searchmoves.reset()
@@ -7604,7 +7683,7 @@ async def main() -> None:
                     await self.update_elo_display()
 
             elif isinstance(event, Event.TAKE_BACK):
-                self.state.best_sent_depth.reset()
+                self.reset_best_sent_depth()
                 if self.state.game.move_stack and (
                     event.take_back == "PGN_TAKEBACK"
                     or not should_block_takeback(
@@ -7760,7 +7839,7 @@ async def main() -> None:
                         tc_init=self.state.time_control.get_parameters(),
                         result=result,
                         play_mode=self.state.play_mode,
-                        game=self.state.game.copy(),
+                        game=self.state.game_snapshot(),
                         mode=self.state.interaction_mode,
                     )
                 )
@@ -7780,7 +7859,7 @@ async def main() -> None:
                         tc_init=self.state.time_control.get_parameters(),
                         result=result,
                         play_mode=self.state.play_mode,
-                        game=self.state.game.copy(),
+                        game=self.state.game_snapshot(),
                         mode=self.state.interaction_mode,
                     )
                 )
@@ -7802,7 +7881,7 @@ async def main() -> None:
                         tc_init=self.state.time_control.get_parameters(),
                         result=result,
                         play_mode=self.state.play_mode,
-                        game=self.state.game.copy(),
+                        game=self.state.game_snapshot(),
                         mode=self.state.interaction_mode,
                     )
                 )
@@ -7846,13 +7925,13 @@ async def main() -> None:
                     # Full update on next boot through picochess-update.service.
                     update_pico_v4()
                 else:
-                    # only update code to a specific tag
-                    checkout_tag(event.tag)
+                    # only update code to a specific tag - git and pip block, keep the loop running
+                    await asyncio.to_thread(checkout_tag, event.tag)
                 await DisplayMsg.show(Message.EXIT_MENU())
 
             elif isinstance(event, Event.UPDATE_ENGINES):
                 await DisplayMsg.show(Message.UPDATE_PICO())
-                update_pico_engines()  # in utilities for now
+                await asyncio.to_thread(update_pico_engines)  # in utilities for now
                 await DisplayMsg.show(Message.EXIT_MENU())
 
             elif isinstance(event, Event.REMOTE_ROOM):
@@ -7890,6 +7969,7 @@ async def main() -> None:
                         await asyncio.sleep(0.2)
 
             await self._start_or_stop_analysis_as_needed()  # start analysis if needed
+            ContinuousAnalysis.add_depth_listener(self.background_analyse_timer.wake)
             self.background_analyse_timer.start()  # always run background analyser
 
     my_main = MainLoop(
@@ -7909,7 +7989,9 @@ async def main() -> None:
         non_main_tasks,
     )
 
-    await my_main.initialise(time_text)
+    with profiler.phase("main loop initialise"):
+        await my_main.initialise(time_text)
+    profiler.log_report()
     main_task = main_loop.create_task(my_main.event_consumer())  # start main message loop
     board_wait_task = main_loop.create_task(my_main.wait_for_board_connection())
     non_main_tasks.add(board_wait_task)  # ensure it gets cancelled on shutdown if still waiting
@@ -28,34 +28,65 @@ import subprocess
 import signal
 import threading
 import re
-from typing import Callable, Optional
-
-try:
-    import numpy as np  # type: ignore
-    import sounddevice as sd  # type: ignore
-    import soundfile as sf  # type: ignore
-    from audiotsm import wsola  # type: ignore
-    from audiotsm.io.array import ArrayReader, ArrayWriter  # type: ignore
-
-    NATIVE_AUDIO_AVAILABLE = True
-    NATIVE_AUDIO_IMPORT_ERROR = None
-except Exception as exc:  # pragma: no cover - missing native deps
-    NATIVE_AUDIO_AVAILABLE = False
-    NATIVE_AUDIO_IMPORT_ERROR = exc
+from typing import Any, Callable, Optional
+from urllib.parse import quote
 
 import chess  # type: ignore
 from utilities import DisplayMsg
 from dgt.api import Message
 from dgt.util import GameResult, PlayMode, Voice, EBoard
+from startup import profiler
+
+# the native audio stack (numpy, sounddevice, soundfile, audiotsm) is slow to import,
+# so it is only loaded by load_native_audio() when audio-backend = native
+np: Any = None
+sd: Any = None
+sf: Any = None
+wsola: Any = None
+ArrayReader: Any = None
+ArrayWriter: Any = None
+NATIVE_AUDIO_AVAILABLE = False
+NATIVE_AUDIO_IMPORT_ERROR: Optional[Exception] = None
+_native_audio_loaded = False
 
 logger = logging.getLogger(__name__)
 SOUND_CACHE_LIMIT = 128
+WEB_AUDIO_CLIP_CACHE_LIMIT = 256
+# voice clips below this directory are served by the web server under WEB_AUDIO_URL_PREFIX
+WEB_AUDIO_VOICES_DIR = Path(__file__).resolve().parent / "talker" / "voices"
+WEB_AUDIO_URL_PREFIX = "/voices/"
 NATIVE_STREAM_STARTUP_WAIT = 0.3
 SOX_PLAY_TIMEOUT = 12.0
 SOX_PLAY_KILL_TIMEOUT = 1.0
 REPLAYGAIN_TRACK_GAIN_RE = re.compile(rb"REPLAYGAIN_TRACK_GAIN=([+-]?\d+(?:\.\d+)?)\s*dB", re.IGNORECASE)
 
 
+def load_native_audio() -> bool:
+    """Import the native audio stack on first use - return True if it is available."""
+    global np, sd, sf, wsola, ArrayReader, ArrayWriter
+    global NATIVE_AUDIO_AVAILABLE, NATIVE_AUDIO_IMPORT_ERROR, _native_audio_loaded
+    if _native_audio_loaded:
+        return NATIVE_AUDIO_AVAILABLE
+    _native_audio_loaded = True
+    try:
+        np = profiler.import_module("numpy")
+        sd = profiler.import_module("sounddevice")
+        sf = profiler.import_module("soundfile")
+        wsola = profiler.import_attr("audiotsm", "wsola")
+        array_io = profiler.import_module("audiotsm.io.array")
+        ArrayReader, ArrayWriter = array_io.ArrayReader, array_io.ArrayWriter
+        NATIVE_AUDIO_AVAILABLE = True
+    except Exception as exc:  # pragma: no cover - missing native deps
+        NATIVE_AUDIO_AVAILABLE = False
+        NATIVE_AUDIO_IMPORT_ERROR = exc
+    return NATIVE_AUDIO_AVAILABLE
+
+
+# web clip descriptors keyed by (resolved path, mtime_ns), shared by all talkers
+_web_audio_clip_cache: OrderedDict = OrderedDict()
+_web_audio_clip_lock = threading.Lock()
+
+
 class PicoTalker(object):
     """Handle the human speaking of events."""
 
@@ -106,6 +137,59 @@ class PicoTalkerDisplay(DisplayMsg):
     SYSTEM = "system"
     BEEPER = "beeper"
 
+    # subscription filter: the messages process_picotalker_messages handles
+    message_types = frozenset(
+        {
+            Message.ALTERNATIVE_MOVE,
+            Message.ALTMOVES,
+            Message.CLOCK_TIME,
+            Message.COMPUTER_MOVE,
+            Message.COMPUTER_MOVE_DONE,
+            Message.CONTLAST,
+            Message.DGT_BUTTON,
+            Message.ENGINE_FAIL,
+            Message.ENGINE_READY,
+            Message.ENGINE_SETUP,
+            Message.GAME_ENDS,
+            Message.INTERACTION_MODE,
+            Message.LEVEL,
+            Message.LOST_ON_TIME,
+            Message.MOVE_RETRY,
+            Message.MOVE_WRONG,
+            Message.ONLINE_FAILED,
+            Message.ONLINE_LOGIN,
+            Message.ONLINE_NAMES,
+            Message.ONLINE_NO_OPPONENT,
+            Message.ONLINE_USER_FAILED,
+            Message.OPENING_BOOK,
+            Message.PGN_GAME_END,
+            Message.PICOCOACH,
+            Message.PICOCOMMENT,
+            Message.PICOEXPLORER,
+            Message.PICOTUTOR_MSG,
+            Message.PICOWATCHER,
+            Message.PLAY_MODE,
+            Message.POSITION_FAIL,
+            Message.READ_GAME,
+            Message.RESTORE_GAME,
+            Message.REVIEW_MOVE_DONE,
+            Message.SAVE_GAME,
+            Message.SEEKING,
+            Message.SET_VOICE,
+            Message.SHOW_ENGINENAME,
+            Message.SHOW_TEXT,
+            Message.STARTUP_INFO,
+            Message.START_NEW_GAME,
+            Message.SYSTEM_REBOOT,
+            Message.SYSTEM_SHUTDOWN,
+            Message.TAKE_BACK,
+            Message.TIMECONTROL_CHECK,
+            Message.TIME_CONTROL,
+            Message.USER_MOVE_DONE,
+            Message.WRONG_FEN,
+        }
+    )
+
     c_taken = False
     c_castle = False
     c_knight = False
@@ -143,8 +227,6 @@ class PicoTalkerDisplay(DisplayMsg):
         :param computer_voice: The voice to use for the computer (eg. en:christina).
         """
         super(PicoTalkerDisplay, self).__init__(loop)
-        if not NATIVE_AUDIO_AVAILABLE:
-            logger.warning("native audio unavailable: %s", NATIVE_AUDIO_IMPORT_ERROR)
         self.sound_cache = OrderedDict()  # cache for voice files
         self.common_queue = asyncio.Queue()  # queue for sound_player
         asyncio.create_task(self.sound_player())  # background sound player
@@ -197,6 +279,8 @@ class PicoTalkerDisplay(DisplayMsg):
         self.sample_beeper_level = sample_beeper_level
 
         self.audio_backend = (audio_backend or "sox").lower()
+        if self.audio_backend == "native" and not load_native_audio():
+            logger.warning("native audio unavailable: %s", NATIVE_AUDIO_IMPORT_ERROR)
         self.web_audio_backend_remote = bool(web_audio_backend_remote)
         self.web_audio_emitter = web_audio_emitter
         self.web_audio_should_emit = web_audio_should_emit
@@ -290,7 +374,35 @@ class PicoTalkerDisplay(DisplayMsg):
 
     @staticmethod
     def _encode_voice_file_for_web(voice_file: str, speed_factor: float):
-        suffix = Path(voice_file).suffix.lower()
+        """Return the web clip descriptor for a voice file.
+
+        Clips below the voices directory are sent as a short id plus a versioned URL,
+        so the browser fetches (and caches) each clip once. Other files fall back to
+        an inline base64 payload. Descriptors are cached by path and mtime."""
+        try:
+            path = Path(voice_file).resolve()
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError as os_exc:
+            logger.debug("web audio encode failed for %s: %s", voice_file, os_exc)
+            return None
+        key = (str(path), mtime_ns)
+        with _web_audio_clip_lock:
+            clip = _web_audio_clip_cache.get(key)
+            if clip is not None:
+                _web_audio_clip_cache.move_to_end(key)
+        if clip is None:
+            clip = PicoTalkerDisplay._build_web_audio_clip(path, mtime_ns)
+            if clip is None:
+                return None
+            with _web_audio_clip_lock:
+                _web_audio_clip_cache[key] = clip
+                if len(_web_audio_clip_cache) > WEB_AUDIO_CLIP_CACHE_LIMIT:
+                    _web_audio_clip_cache.popitem(last=False)
+        return dict(clip, rate=speed_factor)
+
+    @staticmethod
+    def _build_web_audio_clip(path: Path, mtime_ns: int) -> Optional[dict]:
+        suffix = path.suffix.lower()
         if suffix == ".ogg":
             mime_type = "audio/ogg"
         elif suffix == ".wav":
@@ -300,11 +412,18 @@ class PicoTalkerDisplay(DisplayMsg):
         else:
             mime_type = "application/octet-stream"
         try:
-            encoded = base64.b64encode(Path(voice_file).read_bytes()).decode("ascii")
+            clip_id = path.relative_to(WEB_AUDIO_VOICES_DIR).as_posix()
+        except ValueError:
+            clip_id = None
+        if clip_id is not None and suffix in (".ogg", ".wav", ".mp3"):
+            url = "{}{}?v={:x}".format(WEB_AUDIO_URL_PREFIX, quote(clip_id), mtime_ns)
+            return {"id": clip_id, "url": url, "mime_type": mime_type}
+        try:
+            encoded = base64.b64encode(path.read_bytes()).decode("ascii")
         except OSError as os_exc:
-            logger.debug("web audio encode failed for %s: %s", voice_file, os_exc)
+            logger.debug("web audio encode failed for %s: %s", path, os_exc)
             return None
-        return {"mime_type": mime_type, "base64": encoded, "rate": speed_factor}
+        return {"mime_type": mime_type, "base64": encoded}
 
     def _sound_cache_get(self, key):
         entry = self.sound_cache.get(key)
@@ -902,7 +1021,8 @@ class PicoTalkerDisplay(DisplayMsg):
                 # Check if we have something to say
                 message = await self.msg_queue.get()
                 if (
-                    not isinstance(message, Message.DGT_SERIAL_NR)
+                    logger.isEnabledFor(logging.DEBUG)
+                    and not isinstance(message, Message.DGT_SERIAL_NR)
                     and not isinstance(message, Message.DGT_CLOCK_TIME)
                     and not isinstance(message, Message.CLOCK_TIME)
                     and not isinstance(message, Message.NEW_DEPTH)
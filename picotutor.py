@@ -33,6 +33,7 @@ import chess.engine
 import chess.pgn
 from uci.engine import UciShell, UciEngine
 from dgt.util import PicoComment, PicoCoach
+from tablebase import TablebaseProbe
 
 # PicoTutor Constants
 import picotutor_constants as c
@@ -51,6 +52,7 @@ class PicoTutor:
         i_lang="en",
         loop=None,
         remote_binary_override: str | None = None,
+        tablebase: TablebaseProbe | None = None,
     ):
         self.user_color: chess.Color = i_player_color
         self.engine_path: str = i_engine_path
@@ -63,6 +65,8 @@ class PicoTutor:
 
         self.best_engine: UciEngine | None = None  # best - max
         self.obvious_engine: UciEngine | None = None  # obvious - min
+        # exact answers in 3-5 piece endings, asked before the engines
+        self.tablebase = tablebase
         # snapshot list of best = deep/max-ply, and obvious = shallow/low-ply
         # lists of InfoDict per color - filled in eval_legal_moves()
         self.best_info = {color: [] for color in [chess.WHITE, chess.BLACK]}
@@ -110,6 +114,7 @@ class PicoTutor:
         # a later analysis start, never by interrupting a running search.
         self.deep_threads_requested = c.NUM_THREADS
         self.deep_threads_applied = c.NUM_THREADS
+        self.deep_threads_limit: int | None = None  # cores left by the other engines, set by the ResourceBudget
         self.deep_multipv_requested = c.VALID_ROOT_MOVES
         self.deep_multipv_applied = c.VALID_ROOT_MOVES
         self.deep_depth_requested = c.DEEP_DEPTH
@@ -191,12 +196,12 @@ class PicoTutor:
         # not yet been changed to async --> causes changes in main
         # set_status might later be changed that require this engine
         if not self.best_engine:
-            options = {"Contempt": 0, "Threads": self.deep_threads_requested}
+            options = {"Contempt": 0, "Threads": self.get_deep_threads()}
             self.best_engine = await self._load_engine(options, "best picotutor")
             if self.best_engine is None:
                 logger.debug("best engine loading failed in Picotutor")
             else:
-                self.deep_threads_applied = self.deep_threads_requested
+                self.deep_threads_applied = options["Threads"]
         if not self.obvious_engine:
             options = {"Contempt": 0, "Threads": c.LOW_NUM_THREADS}
             self.obvious_engine = await self._load_engine(options, "obvious picotutor")
@@ -275,6 +280,27 @@ class PicoTutor:
         """Return the session-only deep Tutor thread request."""
         return self.deep_threads_requested
 
+    def limit_deep_threads(self, limit: int | None):
+        """Limit the deep Tutor threads to the cores the other engines leave, None for no limit.
+        Like a request it applies to the next analysis."""
+        if limit != self.deep_threads_limit:
+            logger.info(
+                "PicoTutor deep threads limited %s->%s; applies to next analysis",
+                self.deep_threads_limit,
+                limit,
+            )
+            self.deep_threads_limit = limit
+
+    def get_deep_threads(self) -> int:
+        """Return the deep Tutor threads for the next analysis - the request within the limit."""
+        if self.deep_threads_limit is None:
+            return self.deep_threads_requested
+        return max(1, min(self.deep_threads_requested, self.deep_threads_limit))
+
+    def get_applied_deep_threads(self) -> int:
+        """Return the threads of the current or next deep analysis."""
+        return self.deep_threads_applied
+
     def get_deep_thread_choices(self) -> tuple[int, ...]:
         """Return the allowed session choices for this Tutor instance."""
         return self.deep_thread_choices
@@ -322,7 +348,7 @@ class PicoTutor:
     async def _apply_requested_deep_settings(self) -> None:
         """Apply pending deep settings while the analyser is idle."""
         settings_unchanged = (
-            self.deep_threads_requested == self.deep_threads_applied
+            self.get_deep_threads() == self.deep_threads_applied
             and self.deep_multipv_requested == self.deep_multipv_applied
             and self.deep_depth_requested == self.deep_depth_applied
         )
@@ -337,12 +363,13 @@ class PicoTutor:
             logger.debug("PicoTutor applying pending deep settings at new-position boundary")
             await self.best_engine.stop_analysis()
 
-        if self.deep_threads_requested != self.deep_threads_applied:
+        if self.get_deep_threads() != self.deep_threads_applied:
             if "Threads" not in self.best_engine.get_options():
                 logger.warning("PicoTutor engine has no Threads option; keeping %d", self.deep_threads_applied)
                 self.deep_threads_requested = self.deep_threads_applied
+                self.deep_threads_limit = None
             else:
-                requested_threads = self.deep_threads_requested
+                requested_threads = self.get_deep_threads()
                 self.best_engine.option("Threads", requested_threads)
                 await self.best_engine.send()
                 logger.info(
@@ -950,8 +977,15 @@ class PicoTutor:
 
     def _get_better_pv_variations(self, turn: chess.Color, user_move: chess.Move, limit: int = 3) -> list[dict]:
         """Return tutor PVs ranked ahead of user_move as compact PGN variation data."""
+        return PicoTutor.better_pv_variations(self.best_moves.get(turn, []), self.best_info[turn], user_move, limit)
+
+    @staticmethod
+    def better_pv_variations(
+        best_moves: list[tuple], best_info: list[InfoDict], user_move: chess.Move, limit: int = 3
+    ) -> list[dict]:
+        """Return the PVs of best_moves ranked ahead of user_move as compact PGN variation data
+        best_moves is a sorted list of tuple(pv_key, move, score, mate) indexing best_info"""
         variations = []
-        best_moves = self.best_moves.get(turn, [])
         selected_index = None
         for index, (_pv_key, move, _score, _mate) in enumerate(best_moves):
             if move == user_move:
@@ -965,7 +999,7 @@ class PicoTutor:
             if move == user_move or move == chess.Move.null() or pv_key is None:
                 continue
             try:
-                info = self.best_info[turn][pv_key]
+                info = best_info[pv_key]
             except (IndexError, KeyError, TypeError):
                 continue
             pv = info.get("pv") if info else None
@@ -1013,8 +1047,10 @@ class PicoTutor:
         """returns best move, Info, and ponder move"""
         result = PlayResult(move=None, ponder=None, info=None)
         if self.can_use_coach_analyser():
-            analysis_result = await self.get_analysis()
-            info_list: list[InfoDict] = analysis_result.get("info")
+            info_list: list[InfoDict] | None = self._tablebase_info(self.board)
+            if info_list is None:
+                analysis_result = await self.get_analysis()
+                info_list = analysis_result.get("info")
             if info_list:
                 result.info = info_list[0]  # best line
                 if "pv" in result.info and len(result.info["pv"]) > 0:
@@ -1066,6 +1102,12 @@ class PicoTutor:
             pv_key = pv_key + 1
         return best_score
 
+    def _tablebase_info(self, board: chess.Board) -> list[InfoDict] | None:
+        """tablebase analysis of board as InfoDict list, None if there is no tablebase answer"""
+        if self.tablebase is None:
+            return None
+        return self.tablebase.analysis_info(board)
+
     async def eval_legal_moves(self, turn: chess.Color, analysed_move_already_done: bool = True):
         """Update analysis information from engine analysis snapshot
         parameter analysed_move_already_done is True if self.board already has a move
@@ -1088,10 +1130,16 @@ class PicoTutor:
                 logger.debug("can not evaluate empty board 1st move")
                 return
         # else situation is for get_pos_analysis() where no move is done yet
-        obvious_result = await self.obvious_engine.get_analysis(board_before_usermove)
-        self.obvious_info[turn] = obvious_result.get("info")
-        best_result = await self.best_engine.get_analysis(board_before_usermove)
-        self.best_info[turn] = best_result.get("info")
+        tablebase_info = self._tablebase_info(board_before_usermove)
+        if tablebase_info is not None:
+            # exact scores for every legal move - no need to wait for the engines
+            self.obvious_info[turn] = tablebase_info
+            self.best_info[turn] = tablebase_info
+        else:
+            obvious_result = await self.obvious_engine.get_analysis(board_before_usermove)
+            self.obvious_info[turn] = obvious_result.get("info")
+            best_result = await self.best_engine.get_analysis(board_before_usermove)
+            self.best_info[turn] = best_result.get("info")
         if self.best_info[turn]:
             best_score = PicoTutor._eval_pv_list(turn, self.best_info[turn], self.best_moves[turn])
             if self.best_moves[turn]:
@@ -1292,59 +1340,13 @@ class PicoTutor:
             eval_string = ""
             return eval_string, 0
 
-        ###############################################################
-        # 1. bad moves
-        ##############################################################
-        eval_string = ""
-
-        # Blunder ??
-        if best_deep_diff > c.VERY_BAD_MOVE_TH:
-            eval_string = "??"
-
-        # Mistake ?
-        elif best_deep_diff > c.BAD_MOVE_TH:
-            eval_string = "?"
-
-        # Dubious
-        # Do not use the shallow/deep comparison when the shallow move is missing.
-        elif (
-            not shallow_move_missing
-            and history_in_use
-            and best_deep_diff > c.DUBIOUS_TH
-            and (abs(deep_low_diff) > c.UNCLEAR_DIFF)
-            and (score_hist_diff > c.POS_INCREASE)
-        ):
-            eval_string = "?!"
-
-        ###############################################################
-        # 2. good moves
-        ##############################################################
-        eval_string2 = ""
-
-        if not shallow_move_missing:
-            # very good moves
-            if best_deep_diff <= c.VERY_GOOD_MOVE_TH and (deep_low_diff > c.VERY_GOOD_IMPROVE_TH):
-                if (best_score == 99999 and (best_mate == current_mate)) and legal_no <= 2:
-                    pass
-                else:
-                    eval_string2 = "!!"
-
-            # good move
-            elif best_deep_diff <= c.GOOD_MOVE_TH and (deep_low_diff > c.GOOD_IMPROVE_TH) and legal_no > 1:
-                eval_string2 = "!"
-
-            # interesting move
-            elif (
-                history_in_use
-                and best_deep_diff < c.INTERESTING_TH
-                and (abs(deep_low_diff) > c.UNCLEAR_DIFF)
-                and (score_hist_diff < c.POS_DECREASE)
-            ):
-                eval_string2 = "!?"
-
-        if eval_string2 != "":
-            if eval_string == "":
-                eval_string = eval_string2
+        eval_string = PicoTutor.classify_move(
+            best_deep_diff,
+            None if shallow_move_missing else deep_low_diff,
+            score_hist_diff if history_in_use else None,
+            legal_no,
+            forced_mate=best_score == 99999 and best_mate == current_mate,
+        )
 
         # remember this evaluation for later pgn generation in PgnDisplay
         # key to find evaluation later =(ply halfmove number: int, move: chess.Move)
@@ -1420,6 +1422,73 @@ class PicoTutor:
             "required_depth": c.MIN_WATCHER_EVAL_DEPTH,
         }
 
+    @staticmethod
+    def classify_move(
+        best_deep_diff: int,
+        deep_low_diff: int | None,
+        score_hist_diff: int | None,
+        legal_no: int,
+        forced_mate: bool = False,
+    ) -> str:
+        """evaluation string like ?? or ! of a move losing best_deep_diff centipawns (CPL)
+        deep_low_diff is None if the shallow (obvious) analysis is missing the move
+        score_hist_diff is None if there is no usable score for the previous move of the same side
+        forced_mate is True if the best move and the move give the same mate"""
+        ###############################################################
+        # 1. bad moves
+        ##############################################################
+        eval_string = ""
+
+        # Blunder ??
+        if best_deep_diff > c.VERY_BAD_MOVE_TH:
+            eval_string = "??"
+
+        # Mistake ?
+        elif best_deep_diff > c.BAD_MOVE_TH:
+            eval_string = "?"
+
+        # Dubious
+        # Do not use the shallow/deep comparison when the shallow move is missing.
+        elif (
+            deep_low_diff is not None
+            and score_hist_diff is not None
+            and best_deep_diff > c.DUBIOUS_TH
+            and (abs(deep_low_diff) > c.UNCLEAR_DIFF)
+            and (score_hist_diff > c.POS_INCREASE)
+        ):
+            eval_string = "?!"
+
+        ###############################################################
+        # 2. good moves
+        ##############################################################
+        eval_string2 = ""
+
+        if deep_low_diff is not None:
+            # very good moves
+            if best_deep_diff <= c.VERY_GOOD_MOVE_TH and (deep_low_diff > c.VERY_GOOD_IMPROVE_TH):
+                if forced_mate and legal_no <= 2:
+                    pass
+                else:
+                    eval_string2 = "!!"
+
+            # good move
+            elif best_deep_diff <= c.GOOD_MOVE_TH and (deep_low_diff > c.GOOD_IMPROVE_TH) and legal_no > 1:
+                eval_string2 = "!"
+
+            # interesting move
+            elif (
+                score_hist_diff is not None
+                and best_deep_diff < c.INTERESTING_TH
+                and (abs(deep_low_diff) > c.UNCLEAR_DIFF)
+                and (score_hist_diff < c.POS_DECREASE)
+            ):
+                eval_string2 = "!?"
+
+        if eval_string2 != "":
+            if eval_string == "":
+                eval_string = eval_string2
+        return eval_string
+
     @staticmethod
     def symbol_to_nag(eval_string: str) -> int:
         """convert an evaluation string like ! to NAG format like NAG_GOOD_MOVE"""
@@ -0,0 +1,150 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Log file writing off the event loop. Loggers only put records on a queue, one background thread
+# writes them. The file is written in blocks: on a timer, when the buffer is full, or at once for
+# warnings and errors - fewer writes and flushes on the SD card.
+
+import atexit
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List
+
+LOG_FORMAT = "%(asctime)s.%(msecs)03d %(levelname)7s %(module)10s - %(funcName)s: %(message)s"
+LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+LOG_MAX_BYTES = 1 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_LEVELS = ("notset", "debug", "info", "warning", "error", "critical")
+
+FLUSH_INTERVAL = 2.0  # seconds until buffered records reach the file
+BUFFER_SIZE = 64 * 1024  # bytes buffered before the file is written
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that only flushes for records at flush_level or when the LogListener says so."""
+
+    def __init__(self, filename: str, flush_level: int = logging.WARNING, **kwargs):
+        self.flush_level = flush_level
+        self.stream_size = 0  # bytes in the file and its buffer
+        self.record_size = 0  # bytes of the record being emitted
+        super(BatchedRotatingFileHandler, self).__init__(filename, **kwargs)
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=BUFFER_SIZE, encoding=self.encoding, errors=self.errors)
+        self.stream_size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Rotate on the size kept here - the stdlib seeks the file for its size and that writes the buffer out."""
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            self.record_size = 0
+            return False
+        message = self.format(record) + self.terminator
+        self.record_size = len(message.encode(self.encoding or "utf-8", errors="replace"))
+        return self.stream_size + self.record_size >= self.maxBytes
+
+    def emit(self, record: logging.LogRecord):
+        super(BatchedRotatingFileHandler, self).emit(record)
+        self.stream_size += self.record_size
+        if record.levelno >= self.flush_level:
+            self.flush_batch()
+
+    def flush(self):
+        """StreamHandler flushes after every record - keep the record in the buffer instead."""
+
+    def flush_batch(self):
+        super(BatchedRotatingFileHandler, self).flush()
+
+    def close(self):
+        self.flush_batch()
+        super(BatchedRotatingFileHandler, self).close()
+
+
+class LogListener(QueueListener):
+    """QueueListener that also flushes its handlers every flush_interval seconds."""
+
+    def __init__(self, log_queue, *handlers, flush_interval: float = FLUSH_INTERVAL):
+        super(LogListener, self).__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+
+    def dequeue(self, block: bool):
+        while True:
+            wait = self.last_flush + self.flush_interval - time.monotonic()
+            if wait <= 0:
+                self.flush()
+                continue
+            try:
+                return self.queue.get(block, wait)
+            except queue.Empty:
+                pass
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        for handler in self.handlers:
+            getattr(handler, "flush_batch", handler.flush)()
+
+    def stop(self):
+        if self._thread is not None:
+            super(LogListener, self).stop()
+        self.flush()
+
+
+def setup_logging(file_name: str, level: str = "warning", flush_interval: float = FLUSH_INTERVAL) -> LogListener:
+    """Route all logging through a queue to a batched rotating log file, return the started LogListener."""
+    handler = BatchedRotatingFileHandler(file_name, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATEFMT))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = LogListener(log_queue, handler, flush_interval=flush_interval)
+    listener.start()
+    logging.basicConfig(level=getattr(logging, level.upper()), handlers=[QueueHandler(log_queue)], force=True)
+    atexit.register(listener.stop)
+    return listener
+
+
+def logger_levels() -> Dict:
+    """Root level and the explicit and effective level of every logger, for the web settings."""
+    loggers: List[Dict] = []
+    for name in sorted(logging.root.manager.loggerDict):
+        module_logger = logging.root.manager.loggerDict[name]
+        if not isinstance(module_logger, logging.Logger):
+            continue  # PlaceHolder of a package without own logger
+        loggers.append(
+            {
+                "name": name,
+                "level": logging.getLevelName(module_logger.level).lower(),
+                "effective": logging.getLevelName(module_logger.getEffectiveLevel()).lower(),
+            }
+        )
+    root_level = logging.getLevelName(logging.root.level).lower()
+    return {"root": root_level, "levels": list(LOG_LEVELS), "loggers": loggers}
+
+
+def set_logger_level(name: str, level: str) -> bool:
+    """Set the level of a logger ("" for the root logger) until restart, False for unknown names or levels."""
+    if level not in LOG_LEVELS:
+        return False
+    if name and name not in logging.root.manager.loggerDict:
+        return False
+    logging.getLogger(name or None).setLevel(getattr(logging, level.upper()))
+    return True
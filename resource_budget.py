@@ -0,0 +1,99 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+# The playing engine, its analyser or ponder search, the two tutor engines and a MAME emulation all
+# run on the same few cores of a Raspberry Pi. The budget knows the core count and which engines
+# search at the same time, and gives the deep tutor engine the cores the others leave on the user's
+# turn. Engine options only change between searches: the tutor applies its new Threads at the next
+# position, and the playing engine keeps the Threads of its settings.
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def option_value(engine, name: str) -> int | None:
+    """Value of the spin option name of engine: the one set by picochess, else the engine default."""
+    option = engine.get_options().get(name)
+    if option is None:
+        return None  # the engine does not know it, picochess does not send it
+    value = engine.get_pgn_options().get(name, option.default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def local_threads(engine) -> int:
+    """Cores engine uses on this machine while it searches."""
+    if engine is None or not engine.loaded_ok() or engine.is_remote:
+        return 0
+    if engine.is_mame_engine():
+        return 1  # the emulator is one process, its Threads are not real
+    return max(1, option_value(engine, "Threads") or 1)
+
+
+def hash_size(engine) -> int | None:
+    """Hash table size of engine in MB, None if it has no Hash option."""
+    if engine is None or not engine.loaded_ok():
+        return None
+    return option_value(engine, "Hash")
+
+
+class ResourceBudget(object):
+    """Shares the cores between the playing engine and the tutor engines."""
+
+    def __init__(self, cores: int | None = None):
+        self.cores = cores or os.cpu_count() or 1
+        self.allocation: dict = {}
+
+    def update(self, engine, tutor, engine_on_user_turn: bool) -> bool:
+        """Work out the allocation and limit the deep tutor threads, return True if the allocation changed.
+
+        :param engine: the playing UciEngine
+        :param tutor: the PicoTutor, None if there is none
+        :param engine_on_user_turn: True if the engine searches while the user thinks - it ponders,
+                                    its analyser runs next to the tutor or it is a MAME emulation
+        """
+        engine_threads = local_threads(engine)
+        engine_user_turn = engine_threads if engine_on_user_turn else 0
+        tutor_threads = obvious_threads = 0
+        tutor_hash = None
+        if tutor is not None:
+            obvious_threads = local_threads(tutor.obvious_engine)
+            if tutor.best_engine is not None and tutor.best_engine.is_remote:
+                tutor.limit_deep_threads(None)  # the tutor runs on another machine
+            else:
+                tutor.limit_deep_threads(max(1, self.cores - engine_user_turn - obvious_threads))
+            if local_threads(tutor.best_engine):
+                tutor_threads = tutor.get_deep_threads()
+            tutor_hash = hash_size(tutor.best_engine)
+        allocation = {
+            "cores": self.cores,
+            # the tutor pauses while the engine searches its move
+            "engine_turn": {"engine": engine_threads, "tutor": 0, "tutor_obvious": 0},
+            "user_turn": {"engine": engine_user_turn, "tutor": tutor_threads, "tutor_obvious": obvious_threads},
+            "hash": {"engine": hash_size(engine), "tutor": tutor_hash},
+        }
+        if allocation == self.allocation:
+            return False
+        logger.debug("resource allocation: %s", allocation)
+        self.allocation = allocation
+        return True
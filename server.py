@@ -16,7 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-import base64
+from abc import ABCMeta, abstractmethod
 import datetime
 import html as html_lib
 import io
@@ -35,12 +35,10 @@ import platform
 import chess  # type: ignore
 import chess.pgn as pgn  # type: ignore
 import chess.polyglot  # type: ignore
-import chess.variant  # type: ignore
 
-import pam
 import tornado.web  # type: ignore
 import tornado.wsgi  # type: ignore
-from tornado.websocket import WebSocketHandler  # type: ignore
+from tornado.websocket import WebSocketClosedError, WebSocketHandler  # type: ignore
 
 from utilities import (
     Observable,
@@ -54,7 +52,7 @@ from utilities import (
     version as pico_version,
 )
 from upload_pgn import UploadHandler
-from web.picoweb import picoweb as pw
+import web_auth
 from web.menu_translate import get_menu_catalog, get_menu_source_map, get_menu_text
 
 from dgt.api import Dgt, DgtApi, Event, Message
@@ -74,10 +72,14 @@ from dgt.util import (
 )
 from dgt.util import EBoard as EBoardType
 from timecontrol import TimeControl
-from dgt.iface import DgtIface
+from dgt.iface import DgtIface, move_san, move_variant
 from eboard.eboard import EBoard as EBoardProtocol
-from pgn import ModeInfo, add_picotutor_variations_to_game
+from pgn import ModeInfo, add_picotutor_variations_to_node
 import picotutor_constants as picotutor_c
+from game_snapshot import game_last_moves, game_ply_count
+from variants import VARIANT_BOARDS, replay_variant_board, snapshot_of, variant_fen, variant_pgn_game
+from uci.rating import Rating
+from uci.rating_store import RatingStore
 
 # This needs to be reworked to be session based (probably by token)
 # Otherwise multiple clients behind a NAT can all play as the 'player'
@@ -88,6 +90,8 @@ logger = logging.getLogger(__name__)
 OBOOKSRV_BOOK_FILE = "obooksrv"
 OBOOKSRV_BOOK_LABEL = "ObookSrv"
 OBOOKSRV_DATA_FILE = os.path.join(os.path.dirname(__file__), "obooksrv", "opening.data")
+VOICES_DIR = os.path.join(os.path.dirname(__file__), "talker", "voices")
+VOICE_CLIP_SUFFIXES = frozenset({".ogg", ".wav", ".mp3"})
 INI_LINE_RE = re.compile(r"^\s*(#\s*)?([A-Za-z0-9_-]+)\s*=\s*(.*)$")
 INI_COMMENT_RE = re.compile(r"^\s*#\s*(.+)$")
 CHANNEL_REMOTE_AUTH_ACTIONS = frozenset(
@@ -753,27 +757,7 @@ def _channel_action_requires_remote_auth(action: str) -> bool:
 def _require_auth_if_remote(handler, realm: str) -> bool:
     if _is_local_request(handler.request):
         return True
-    auth_header = handler.request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Basic "):
-        handler.set_status(401)
-        handler.set_header("WWW-Authenticate", f'Basic realm="{realm}"')
-        handler.finish("Authentication required")
-        return False
-    try:
-        auth_decoded = base64.b64decode(auth_header[6:]).decode("utf-8")
-        username, password = auth_decoded.split(":", 1)
-    except Exception:
-        handler.set_status(401)
-        handler.set_header("WWW-Authenticate", f'Basic realm="{realm}"')
-        handler.finish("Authentication required")
-        return False
-    if not pam.pam().authenticate(username, password):
-        handler.set_status(401)
-        handler.set_header("WWW-Authenticate", f'Basic realm="{realm}"')
-        handler.finish("Authentication required")
-        return False
-    handler.current_user = username
-    return True
+    return web_auth.authenticate_request(handler, realm)
 
 
 def _parse_ini_entries(lines):
@@ -840,7 +824,11 @@ class ServerRequestHandler(tornado.web.RequestHandler):
         pass
 
 
-class ChannelHandler(ServerRequestHandler):
+class ChannelActions(metaclass=ABCMeta):
+    """The /channel actions, shared by the POST handler and the /event websocket.
+
+    A subclass provides shared, get_argument, set_status, set_header, write
+    and authorize(realm), which checks remote access for the protected actions."""
 
     async def process_board_scan(self):
         """Simulate exact DGT menu steps for position setup"""
@@ -924,17 +912,21 @@ class ChannelHandler(ServerRequestHandler):
         except (ValueError, IndexError):
             logger.warning("Invalid user input [%s]", raw)
 
-    async def post(self):
+    @abstractmethod
+    def authorize(self, realm: str) -> bool:
+        """Return True if the request may run a protected action, otherwise answer it and return False."""
+
+    async def run_action(self):
         action = self.get_argument("action")
         logger.info(f"POST recibido con action: {action}")
         dgttranslate = self.shared.get("dgttranslate") if self.shared else None
         dgtmenu = self.shared.get("dgtmenu") if self.shared else None
         if _channel_action_requires_remote_auth(action):
-            if not _require_auth_if_remote(self, "Control"):
+            if not self.authorize("Control"):
                 return
 
         if action == "broadcast":
-            if not _require_auth_if_remote(self, "Broadcast"):
+            if not self.authorize("Broadcast"):
                 return
             try:
                 fen = self.get_argument("fen")
@@ -1441,6 +1433,8 @@ class ChannelHandler(ServerRequestHandler):
                     self.shared["system_info"] = {}
                 self.shared["system_info"]["user_elo"] = str(elo_int)
                 write_picochess_ini("pgn-elo", str(elo_int))
+                # the rating store wins over pgn-elo at startup - a new start for the rating history
+                await asyncio.to_thread(RatingStore().reset, Rating(elo_int, Rating.MAX_RATING_DEVIATION))
                 logger.info("web set_player: elo=%r", elo_int)
             # Broadcast the updated values to all connected webclient tabs so
             # the move-list header and player display refresh immediately.
@@ -1681,6 +1675,76 @@ class ChannelHandler(ServerRequestHandler):
             logger.info("web rwindow setting saved: %s", rwindow)
 
 
+class ChannelHandler(ChannelActions, ServerRequestHandler):
+    """POST /channel - one request per action, for pages without the /event websocket."""
+
+    def authorize(self, realm: str) -> bool:
+        return _require_auth_if_remote(self, realm)
+
+    async def post(self):
+        await self.run_action()
+
+
+class ChannelTokenHandler(ServerRequestHandler):
+    """GET /channel/token - authenticate once (remote clients only) and get a session token."""
+
+    def get(self):
+        if not _require_auth_if_remote(self, "Control"):
+            return
+        user = self.current_user or "local"
+        self.set_header("Content-Type", "application/json")
+        self.write({"token": web_auth.session_tokens.issue(user), "lifetime": web_auth.SessionTokens.LIFETIME})
+
+
+class ChannelCommand(ChannelActions):
+    """A /channel action received as a command over the /event websocket.
+
+    The arguments come from the JSON command instead of the POST body, the
+    status and written result are sent back in the acknowledgement."""
+
+    def __init__(self, shared: dict, arguments: dict, user: str | None = None, local: bool = False):
+        self.shared = shared
+        self.arguments = arguments
+        self.user = user
+        self.local = local
+        self.status = 200
+        self.result: dict | None = None
+
+    _REQUIRED = object()
+
+    def get_argument(self, name: str, default=_REQUIRED):
+        value = self.arguments.get(name)
+        if value is None:
+            if default is self._REQUIRED:
+                raise tornado.web.MissingArgumentError(name)
+            return default
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        return str(value).strip()
+
+    def set_status(self, status_code: int):
+        self.status = status_code
+
+    def set_header(self, name: str, value):
+        pass
+
+    def write(self, chunk: dict):
+        self.result = dict(self.result or {}, **chunk)
+
+    def authorize(self, realm: str) -> bool:
+        if self.local or self.user:
+            return True
+        self.set_status(401)
+        self.write({"success": False, "error": "Authentication required"})
+        return False
+
+    def ack(self, request_id) -> dict:
+        ack = {"event": "Ack", "id": request_id, "status": self.status}
+        if self.result is not None:
+            ack["result"] = self.result
+        return ack
+
+
 class EventHandler(WebSocketHandler):
     """Started by /event HTTP call - Clients are WebDisplay and WebVr classes"""
 
@@ -1688,9 +1752,53 @@ class EventHandler(WebSocketHandler):
 
     def initialize(self, shared=None):
         self.shared = shared
+        self.user: str | None = None  # set by an "auth" command with a valid session token
 
-    def on_message(self, message):
+    async def on_message(self, message):
         logger.debug("WebSocket message " + message)
+        try:
+            request = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(request, dict) or not self.shared:
+            return
+        if request.get("event") == "resync":
+            # the client missed a ply (sequence gap) - send it the whole game again
+            full = _full_game_message(self.shared)
+            if full:
+                self.write_message(full)
+        elif "action" in request:
+            ack = await self.run_command(request)
+            try:
+                self.write_message(ack)
+            except WebSocketClosedError:
+                pass  # client went away before the acknowledgement
+
+    async def run_command(self, request: dict) -> dict:
+        """Run a /channel action sent over the websocket and return its acknowledgement.
+
+        A command is {"id": n, "action": ..., <arguments>}, the acknowledgement
+        {"event": "Ack", "id": n, "status": <http status>, "result": <written result>}.
+        Remote clients send {"action": "auth", "token": ...} once after connecting,
+        see ChannelTokenHandler."""
+        request_id = request.get("id")
+        if request.get("action") == "auth":
+            self.user = web_auth.session_tokens.verify(str(request.get("token", "")))
+            command = ChannelCommand(self.shared, {})
+            command.set_status(200 if self.user else 401)
+            command.write({"success": self.user is not None})
+            return command.ack(request_id)
+        arguments = {key: value for key, value in request.items() if key != "id"}
+        command = ChannelCommand(self.shared, arguments, self.user, _is_local_request(self.request))
+        try:
+            await command.run_action()
+        except tornado.web.MissingArgumentError as exc:
+            logger.warning("websocket command %s: %s", request.get("action"), exc)
+            command.set_status(400)
+        except Exception as exc:
+            logger.exception("websocket command %s failed: %s", request.get("action"), exc)
+            command.set_status(500)
+        return command.ack(request_id)
 
     def data_received(self, chunk):
         pass
@@ -1711,7 +1819,7 @@ class EventHandler(WebSocketHandler):
         # Sync newly connected client with last known board state, if available.
         if self.shared and "last_dgt_move_msg" in self.shared:
             try:
-                self.write_message(self.shared["last_dgt_move_msg"])
+                self.write_message(_full_game_message(self.shared))
             except Exception as exc:  # pragma: no cover - websocket errors
                 logger.warning("failed to sync board state to client: %s", exc)
         # The cached board message may contain PGN headers from before an engine
@@ -1774,7 +1882,7 @@ class DGTHandler(ServerRequestHandler):
         action = self.get_argument("action")
         if action == "get_last_move":
             if "last_dgt_move_msg" in self.shared:
-                result = dict(self.shared["last_dgt_move_msg"])
+                result = dict(_full_game_message(self.shared))
                 picotutor = self.shared.get("picotutor")
                 if picotutor:
                     try:
@@ -1817,7 +1925,7 @@ class InfoHandler(ServerRequestHandler):
         if action == "get_voices":
             # Return available speakers for the current language.
             # Speakers are sub-directories of talker/voices/{lang}/.
-            voices_base = os.path.join(os.path.dirname(__file__), "talker", "voices")
+            voices_base = VOICES_DIR
             dgttranslate = self.shared.get("dgttranslate")
             if dgttranslate:
                 lang = getattr(dgttranslate, "language", "en")
@@ -2393,6 +2501,15 @@ function closeManual() {
         )
 
 
+class VoiceClipHandler(tornado.web.StaticFileHandler):
+    """Serve voice clips for remote web audio; versioned URLs (?v=) are cached by the browser."""
+
+    def validate_absolute_path(self, root, absolute_path):
+        if os.path.splitext(absolute_path)[1].lower() not in VOICE_CLIP_SUFFIXES:
+            raise tornado.web.HTTPError(403)
+        return super().validate_absolute_path(root, absolute_path)
+
+
 class UploadPageHandler(tornado.web.RequestHandler):
     def get(self):
         self.render("web/picoweb/templates/upload.html")
@@ -2426,6 +2543,102 @@ class SettingsDataHandler(ServerRequestHandler):
         self.write({"entries": payload})
 
 
+class SettingsBenchHandler(ServerRequestHandler):
+    def get(self):
+        if not _require_auth_if_remote(self, "Settings"):
+            return
+        from uci.bench import load_report
+
+        # the report is written by "python3 -m uci.bench", an empty report until it has been run
+        report = load_report() or {"results": []}
+        self.set_header("Content-Type", "application/json")
+        self.write(json.dumps(report))
+
+
+class RatingHandler(ServerRequestHandler):
+    async def get(self):
+        engine = self.get_argument("engine", None)
+        level = self.get_argument("level", None)
+        curve = await asyncio.to_thread(RatingStore().curve, engine, level)
+        self.set_header("Content-Type", "application/json")
+        self.write(json.dumps({"curve": curve}))
+
+
+class AnnotateHandler(ServerRequestHandler):
+    """POST starts the offline annotation of a PGN file in games/, GET returns the job status."""
+
+    def get(self):
+        if not _require_auth_if_remote(self, "Annotate"):
+            return
+        from pgn_annotate import AnnotationJob
+
+        job = AnnotationJob.current
+        self.write(job.status if job else {"state": "idle"})
+
+    def post(self):
+        if not _require_auth_if_remote(self, "Annotate"):
+            return
+        from pgn_annotate import AnnotationJob, default_workers
+
+        games_dir = os.path.realpath("games")
+        pgn_file = os.path.realpath(os.path.join(games_dir, self.get_argument("file", "")))
+        if not pgn_file.startswith(games_dir + os.sep) or not pgn_file.lower().endswith(".pgn"):
+            self.set_status(400)
+            self.write({"error": "Invalid PGN file"})
+            return
+        if not os.path.isfile(pgn_file):
+            self.set_status(404)
+            self.write({"error": "PGN file not found"})
+            return
+        picotutor = self.shared.get("picotutor") if self.shared else None
+        if picotutor is None:
+            self.set_status(503)
+            self.write({"error": "No tutor engine"})
+            return
+        if AnnotationJob.running():
+            self.set_status(409)
+            self.write({"error": "An annotation is already running"})
+            return
+
+        async def progress(done, total, task):
+            EventHandler.write_to_clients(
+                {"event": "AnnotateProgress", "file": job.status["file"], "done": done, "total": total}
+            )
+
+        job = AnnotationJob(pgn_file, picotutor.engine_path, default_workers())
+        AnnotationJob.current = job
+        job.task = asyncio.create_task(job.run(progress))
+        self.set_status(202)
+        self.write(job.status)
+
+
+class SettingsLoggingHandler(ServerRequestHandler):
+    def get(self):
+        if not _require_auth_if_remote(self, "Settings"):
+            return
+        from queued_log import logger_levels
+
+        self.write(logger_levels())
+
+    def post(self):
+        if not _require_auth_if_remote(self, "Settings"):
+            return
+        from queued_log import logger_levels, set_logger_level
+
+        try:
+            payload = json.loads(self.request.body.decode("utf-8") or "{}")
+        except (ValueError, UnicodeDecodeError):
+            self.set_status(400)
+            self.write({"error": "Invalid JSON payload"})
+            return
+        # runtime only: picochess.ini log-level is used again after a restart
+        if not set_logger_level(str(payload.get("name", "")), str(payload.get("level", ""))):
+            self.set_status(400)
+            self.write({"error": "Unknown logger or level"})
+            return
+        self.write(logger_levels())
+
+
 class SettingsSaveHandler(ServerRequestHandler):
     def initialize(self, shared=None):
         self.shared = shared
@@ -2671,6 +2884,9 @@ class WebServer:
         self, theme: str, pieces: str, board: str, shared: dict, theme_resolver=None
     ) -> tornado.web.Application:
         """define web pages and their handlers"""
+        # Flask is only needed for the fallback pages, import it with the web server
+        from web.picoweb import picoweb as pw
+
         wsgi_app = tornado.wsgi.WSGIContainer(pw)
         return tornado.web.Application(
             [
@@ -2694,11 +2910,17 @@ class WebServer:
                 (r"/manual/?", ManualHandler),
                 (r"/manual/user-manual-en-GB.html", ManualHandler),
                 (r"/channel", ChannelHandler, dict(shared=shared)),
+                (r"/channel/token", ChannelTokenHandler, dict(shared=shared)),
                 (r"/upload-pgn", UploadHandler),
+                (r"/voices/(.*)", VoiceClipHandler, {"path": VOICES_DIR}),
                 (r"/upload", UploadPageHandler),
                 (r"/settings", SettingsPageHandler, dict(theme=theme)),
                 (r"/settings/data", SettingsDataHandler),
                 (r"/settings/save", SettingsSaveHandler, dict(shared=shared)),
+                (r"/settings/bench", SettingsBenchHandler),
+                (r"/settings/logging", SettingsLoggingHandler),
+                (r"/annotate", AnnotateHandler, dict(shared=shared)),
+                (r"/rating", RatingHandler),
                 (r"/settings/action/(wifi-hotspot|bt-pair|bt-fix|bt-reconnect)", SettingsActionHandler),
                 (r"/onboard", WifiSetupPageHandler),
                 (r"/onboard/wifi", WifiSetupHandler),
@@ -2717,12 +2939,12 @@ class WebVr(DgtIface):
         self.virtual_timer = AsyncRepeatingTimer(1, self._runclock, self.loop)
         self.enable_dgtpi = dgtboard.is_pi
         self.clock_show_time = True
-        self._last_runclock_time = 0.0  # wall-clock time of last _runclock tick
-        self._runclock_elapsed_carry = 0.0  # keep sub-second drift until it adds up to a full second
 
         # keep the last time to find out errorous DGT_MSG_BWTIME messages (error: current time > last time)
         self.r_time = 3600 * 10  # max value cause 10h cant be reached by clock
         self.l_time = 3600 * 10  # max value cause 10h cant be reached by clock
+        self._run_started = 0.0  # monotonic time the running clock was started or set
+        self._run_times = (self.l_time, self.r_time)  # l_time and r_time at _run_started
 
     async def initialize(self):
         """async inits moved here"""
@@ -2743,23 +2965,18 @@ class WebVr(DgtIface):
         """callback from AsyncRepeatingTimer once every second"""
         # this is probably only to show a running web clock
         # the clock time is handled by TimeControl class
-        now = time.time()
-        if self._last_runclock_time:
-            self._runclock_elapsed_carry += max(0.0, now - self._last_runclock_time)
-        else:
-            self._runclock_elapsed_carry += 1.0
-        self._last_runclock_time = now
-        elapsed = int(self._runclock_elapsed_carry)
-        self._runclock_elapsed_carry -= elapsed
+        # the timer ticks at full seconds after _run_started, rounding keeps a tick a hair early from counting short
+        elapsed = int(round(time.monotonic() - self._run_started, 3))
+        run_left, run_right = self._run_times
         if self.side_running == ClockSide.LEFT:
-            time_left = max(0, self.l_time - elapsed)
+            time_left = max(0, run_left - elapsed)
             if time_left <= 0:
                 logger.info("negative/zero time left: %s", time_left)
                 self.virtual_timer.stop()
                 time_left = 0
             self.l_time = time_left
         if self.side_running == ClockSide.RIGHT:
-            time_right = max(0, self.r_time - elapsed)
+            time_right = max(0, run_right - elapsed)
             if time_right <= 0:
                 logger.info("negative/zero time right: %s", time_right)
                 self.virtual_timer.stop()
@@ -2814,10 +3031,8 @@ class WebVr(DgtIface):
                 text = "{:2d}{:s}{:s}".format(bit_board.fullmove_number % 100, points, text)
         else:
             # Web-only path: always compute SAN with full move number.
-            bit_board = self._mk_board(message)
-            if bit_board.is_legal(message.move):
-                san = bit_board.san(message.move)
-            else:
+            bit_board, san = move_san(message.fen, move_variant(message), message.move)
+            if san is None:
                 san = message.move.uci()
             points = "..." if message.side == ClockSide.RIGHT else "."
             text = "{:d}{:s}{:s}".format(bit_board.fullmove_number, points, san)
@@ -2879,8 +3094,8 @@ class WebVr(DgtIface):
         if self.virtual_timer.is_running():
             self.virtual_timer.stop()
         if side != ClockSide.NONE:
-            self._last_runclock_time = time.time()
-            self._runclock_elapsed_carry = 0.0
+            self._run_started = time.monotonic()
+            self._run_times = (self.l_time, self.r_time)
             self.virtual_timer.start()
         self._resume_clock(side)
         self.clock_show_time = True
@@ -2894,6 +3109,8 @@ class WebVr(DgtIface):
             return True
         self.l_time = time_left
         self.r_time = time_right
+        self._run_started = time.monotonic()
+        self._run_times = (time_left, time_right)
         return True
 
     def light_squares_on_revelation(self, uci_move):
@@ -2927,6 +3144,131 @@ class WebVr(DgtIface):
         self.loop.create_task(self._process_message(msg))
 
 
+def _web_fen(game: chess.Board, variant: str, variant_board: chess.Board | None = None) -> str:
+    """FEN of game as the web client computes it, with variant rules applied.
+
+    variant_board is the variant board already in step with game, without it
+    the FEN comes from the variant snapshot of game (see variants.py)."""
+    if variant == "racingkings" or (variant == "atomic" and game_ply_count(game)):
+        fen = variant_board.fen() if variant_board is not None else variant_fen(game, variant)
+        if fen is not None:
+            return fen
+    # chess.js style: always show the ep square, standard castling rights
+    builder = []
+    builder.append(game.board_fen())
+    builder.append("w" if game.turn == chess.WHITE else "b")
+    builder.append(game.castling_xfen())
+    builder.append(chess.SQUARE_NAMES[game.ep_square] if game.ep_square else "-")
+    builder.append(str(game.halfmove_clock))
+    builder.append(str(game.fullmove_number))
+    return " ".join(builder)
+
+
+class WebGameState(object):
+    """The live game as the web clients know it, maintained move by move.
+
+    A move event carries only the new ply and a sequence number. The full PGN
+    is exported for a client that connects or asks for a resync, and is sent
+    to all clients only when the game tree changes in a way a single ply
+    cannot express: new game, takeback, reload or new tutor variations."""
+
+    def __init__(self):
+        self.seq = 0
+        self.variant = "chess"
+        self.board = chess.Board()  # at the mainline position without move history, a variant board for variants
+        self.game = pgn.Game()
+        self.mainline: list = []  # mainline nodes, index is halfmove - 1
+        self.tutor_variations: dict = {}  # picotutor eval key -> variations added to the game tree
+
+    def reset(self, game: chess.Board, variant: str = "chess") -> chess.pgn.Game:
+        """Rebuild from game - on new game, reload and resync only."""
+        self.seq += 1
+        self.variant = variant
+        board = None
+        if variant in VARIANT_BOARDS:
+            snapshot = snapshot_of(game)
+            board = snapshot.board() if snapshot is not None else replay_variant_board(game, variant)
+        self.board = board if board is not None else game.copy(stack=False)
+        # a variant game without moves is exported like a standard game
+        if board is not None and (game_ply_count(game) or variant == "racingkings"):
+            self.game = variant_pgn_game(game, variant)
+        else:
+            self.game = pgn.Game.from_board(game)
+        self.mainline = list(self.game.mainline())
+        self.tutor_variations = {}
+        return self.game
+
+    def follows(self, game: chess.Board) -> bool:
+        """Return True if game is at the position of this state."""
+        plies = game_ply_count(game)
+        return plies == len(self.mainline) and (not plies or game_last_moves(game, 1)[0] == self.mainline[-1].move)
+
+    def variant_board(self, game: chess.Board) -> chess.Board | None:
+        """The variant board in step with game, None if this state does not follow game."""
+        return self.board if self.variant != "chess" and self.follows(game) else None
+
+    def push(self, game: chess.Board) -> dict | None:
+        """Follow game by its last move and return the new ply, None if game is not exactly one ply ahead."""
+        plies = len(self.mainline)
+        if game_ply_count(game) != plies + 1:
+            return None
+        moves = game_last_moves(game, 2)  # a snapshot answers from its move list, without building a board
+        if plies and moves[0] != self.mainline[-1].move:
+            return None
+        if not plies and self.variant != "chess" and self.game.board().uci_variant == "chess":
+            return None  # first move of a variant game - the PGN switches to the variant board
+        move = moves[-1]
+        try:
+            san = self.board.san(move)
+        except (AssertionError, ValueError):
+            return None
+        self.board.push(move)
+        parent = self.mainline[-1] if self.mainline else self.game
+        self.mainline.append(parent.add_main_variation(move))
+        self.seq += 1
+        return {"san": san, "uci": move.uci(), "halfmove": len(self.mainline)}
+
+    def add_tutor_variations(self, picotutor) -> bool:
+        """Add new tutor PV alternatives, return True if the game tree got new variations."""
+        if not picotutor:
+            return False
+        eval_moves = picotutor.get_eval_moves()
+        current = {key: list(value.get("variations", [])) for key, value in eval_moves.items()}
+        if any(current.get(key) != variations for key, variations in self.tutor_variations.items()):
+            # an evaluation was replaced or dropped - take its variations out again
+            for node in self.mainline:
+                del node.parent.variations[1:]
+            self.tutor_variations = {}
+        changed = False
+        for key, value in eval_moves.items():
+            halfmove_nr, user_move, turn = key
+            if key in self.tutor_variations or halfmove_nr <= 0 or halfmove_nr > len(self.mainline):
+                continue
+            self.tutor_variations[key] = current[key]
+            node = self.mainline[halfmove_nr - 1]
+            if node.move == user_move and node.turn() == turn:
+                count = len(node.parent.variations)
+                add_picotutor_variations_to_node(node, value)
+                changed = changed or len(node.parent.variations) != count
+            else:
+                logger.debug("skipped move %s-%s picotutor variation mismatch", node.move.uci(), user_move.uci())
+        return changed
+
+    def pgn(self) -> str:
+        return self.game.accept(pgn.StringExporter(headers=True, comments=False, variations=True))
+
+
+def _full_game_message(shared: dict) -> dict | None:
+    """Last board message with the full PGN - for a client that connects or needs a resync."""
+    last = shared.get("last_dgt_move_msg")
+    if last is None or "ply" not in last:
+        return last
+    result = {key: value for key, value in last.items() if key != "ply"}
+    game_state = shared.get("web_game_state")
+    result["pgn"] = game_state.pgn() if game_state else ""
+    return result
+
+
 class WebDisplay(DisplayMsg):
     level_text_sav = ""
     level_name_sav = ""
@@ -2935,6 +3277,48 @@ class WebDisplay(DisplayMsg):
     result_sav = ""
     engine_name = "Picochess"
 
+    # subscription filter: the messages task() handles
+    message_types = frozenset(
+        {
+            Message.ALTERNATIVE_MOVE,
+            Message.BATTERY,
+            Message.CLOCK_TIME,
+            Message.COMPUTER_MOVE,
+            Message.COMPUTER_MOVE_DONE,
+            Message.DGT_CLOCK_VERSION,
+            Message.DGT_FEN,
+            Message.DGT_NO_CLOCK_ERROR,
+            Message.DGT_SERIAL_NR,
+            Message.ENGINE_READY,
+            Message.ENGINE_STARTUP,
+            Message.GAME_ENDS,
+            Message.INTERACTION_MODE,
+            Message.IP_INFO,
+            Message.LEVEL,
+            Message.NEW_DEPTH,
+            Message.NEW_PV,
+            Message.NEW_SCORE,
+            Message.OPENING_BOOK,
+            Message.PICOCOACH,
+            Message.PICOCOMMENT,
+            Message.PICOEXPLORER,
+            Message.PICOTUTOR_MSG,
+            Message.PICOWATCHER,
+            Message.PLAY_MODE,
+            Message.PROMOTION_DIALOG,
+            Message.REVIEW_MOVE_DONE,
+            Message.STARTUP_INFO,
+            Message.START_NEW_GAME,
+            Message.SWITCH_SIDES,
+            Message.SYSTEM_INFO,
+            Message.TAKE_BACK,
+            Message.TIME_CONTROL,
+            Message.TUTOR_MOVE_REVEAL,
+            Message.USER_MOVE_DONE,
+            Message.WEB_ANALYSIS,
+        }
+    )
+
     @staticmethod
     def _text_to_label(text_obj) -> str:
         """Extract a plain string from a DGT Text object or passthrough if already a str."""
@@ -2974,6 +3358,10 @@ class WebDisplay(DisplayMsg):
         self.shared = shared
         self._task = None  # task for message consumer
         self.starttime = datetime.datetime.now().strftime("%H:%M:%S")
+        self.game_state = WebGameState()
+        self.shared["web_game_state"] = self.game_state  # for the full PGN on connect and resync
+        self.pending_computer_game: chess.Board | None = None
+        self.clock_time: dict | None = None  # last e-board clock times, sent with each ply
         self.analysis_state = {
             "depth": None,
             "score": None,
@@ -3147,50 +3535,9 @@ class WebDisplay(DisplayMsg):
             _build_headers()
             _send_headers()
 
-        def _variant_board_fen(game: chess.Board) -> str:
-            """Return board_fen with variant rules applied (e.g. atomic explosions).
-
-            For atomic: replays the move stack on an AtomicBoard so captured
-            pieces and their neighbours are removed.  For all other variants
-            the standard board_fen is returned unchanged.
-            """
-            variant = self.shared.get("variant", "chess")
-            if variant == "atomic":
-                try:
-                    atm = chess.variant.AtomicBoard()
-                    for move in game.move_stack:
-                        atm.push(move)
-                    return atm.board_fen()
-                except Exception:
-                    pass  # fall through to standard
-            return game.board_fen()
-
         def _oldstyle_fen(game: chess.Board):
             variant = self.shared.get("variant", "chess")
-            if variant == "atomic" and game.move_stack:
-                try:
-                    atm = chess.variant.AtomicBoard()
-                    for move in game.move_stack:
-                        atm.push(move)
-                    return atm.fen()
-                except Exception:
-                    pass  # fall through to standard
-            elif variant == "racingkings":
-                try:
-                    rkb = chess.variant.RacingKingsBoard()
-                    for move in game.move_stack:
-                        rkb.push(move)
-                    return rkb.fen()
-                except Exception:
-                    pass  # fall through to standard
-            builder = []
-            builder.append(_variant_board_fen(game))
-            builder.append("w" if game.turn == chess.WHITE else "b")
-            builder.append(game.castling_xfen())
-            builder.append(chess.SQUARE_NAMES[game.ep_square] if game.ep_square else "-")
-            builder.append(str(game.halfmove_clock))
-            builder.append(str(game.fullmove_number))
-            return " ".join(builder)
+            return _web_fen(game, variant, self.game_state.variant_board(game))
 
         def _build_headers():
             self._create_headers()
@@ -3244,50 +3591,33 @@ class WebDisplay(DisplayMsg):
                 "source": "engine",
                 "engine_name": self.shared.get("system_info", {}).get("engine_name", "Engine"),
             }
+            last_payload = self.shared.get("analysis_state")
+            if analysis_payload == last_payload and self.shared.get("analysis_state_engine") is last_payload:
+                return  # depth, pv and score of one analysis tick often repeat the last payload
             self.shared["analysis_state"] = analysis_payload
             self.shared["analysis_state_engine"] = analysis_payload
             EventHandler.write_to_clients({"event": "Analysis", "analysis": analysis_payload})
 
         def _transfer(game: chess.Board, keep_these_headers: dict = None):
-            variant = self.shared.get("variant", "chess")
-            if variant == "atomic" and game.move_stack:
-                try:
-                    atm = chess.variant.AtomicBoard()
-                    for move in game.move_stack:
-                        atm.push(move)
-                    pgn_game = pgn.Game.from_board(atm)
-                except Exception:
-                    pgn_game = pgn.Game().from_board(game)
-            elif variant == "antichess" and game.move_stack:
-                try:
-                    acb = chess.variant.AntichessBoard()
-                    for move in game.move_stack:
-                        acb.push(move)
-                    pgn_game = pgn.Game.from_board(acb)
-                except Exception:
-                    pgn_game = pgn.Game().from_board(game)
-            elif variant == "racingkings":
-                try:
-                    rkb = chess.variant.RacingKingsBoard()
-                    for move in game.move_stack:
-                        rkb.push(move)
-                    pgn_game = pgn.Game.from_board(rkb)
-                except Exception:
-                    pgn_game = pgn.Game().from_board(game)
-            elif variant == "3check" and game.move_stack:
-                try:
-                    tcb = chess.variant.ThreeCheckBoard()
-                    for move in game.move_stack:
-                        tcb.push(move)
-                    pgn_game = pgn.Game.from_board(tcb)
-                except Exception:
-                    pgn_game = pgn.Game().from_board(game)
-            else:
-                pgn_game = pgn.Game().from_board(game)
+            pgn_game = self.game_state.reset(game, self.shared.get("variant", "chess"))
             self._build_game_header(pgn_game, keep_these_headers)
             self.shared["headers"] = pgn_game.headers
-            add_picotutor_variations_to_game(pgn_game, self.shared.get("picotutor"))
-            return pgn_game.accept(pgn.StringExporter(headers=True, comments=False, variations=True))
+            self.game_state.add_tutor_variations(self.shared.get("picotutor"))
+            return self.game_state.pgn()
+
+        def _move_message(game: chess.Board, move: chess.Move, play: str, keep_these_headers: dict = None) -> dict:
+            """Fen event with just the new ply if clients can follow, else with the full PGN."""
+            ply = self.game_state.push(game)
+            if ply is None:
+                result = {"pgn": _transfer(game, keep_these_headers)}
+            elif self.game_state.add_tutor_variations(self.shared.get("picotutor")):
+                result = {"pgn": self.game_state.pgn()}
+            else:
+                ply["clock"] = self.clock_time
+                result = {"ply": ply}
+            result.update({"seq": self.game_state.seq, "fen": _oldstyle_fen(game), "event": "Fen"})
+            result.update({"move": move.uci(), "play": play})
+            return result
 
         def peek_uci(game: chess.Board):
             """Return last move in uci format."""
@@ -3314,9 +3644,10 @@ class WebDisplay(DisplayMsg):
                 # #78 and #55 just a new position, keep headers
                 keep_these_headers = self.shared["headers"]
             pgn_str = _transfer(message.game, keep_these_headers)
-            fen = _oldstyle_fen(message.game) if message.game.move_stack else message.game.fen()
+            fen = _oldstyle_fen(message.game) if game_ply_count(message.game) else message.game.fen()
             result = {
                 "pgn": pgn_str,
+                "seq": self.game_state.seq,
                 "fen": fen,
                 "event": "Game",
                 "move": "0000",
@@ -3324,6 +3655,8 @@ class WebDisplay(DisplayMsg):
             }
             _attach_variant_info(result)
             result["mistakes"] = []  # always empty for a new game
+            self.clock_time = None
+            self.pending_computer_game = None
             self.shared.pop("pending_computer_move", None)  # discard any pending engine move
             self._set_pending_engine_move(False)
             self.shared["last_dgt_move_msg"] = result
@@ -3658,15 +3991,13 @@ class WebDisplay(DisplayMsg):
             if not message.is_user_move:
                 game_copy = message.game.copy()
                 game_copy.push(message.move)
-                if ModeInfo.get_pgn_mode():
-                    pgn_str = _transfer(game_copy, self.shared["headers"])
-                else:
-                    pgn_str = _transfer(game_copy)
                 fen = _oldstyle_fen(game_copy)
                 mov = message.move.uci()
-                result = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "computer"}
+                result = {"fen": fen, "event": "Fen", "move": mov, "play": "computer"}
                 _attach_mistakes(result)
                 _attach_variant_info(result)
+                # the move message is made at COMPUTER_MOVE_DONE - clients follow the board, not the engine
+                self.pending_computer_game = game_copy
                 self.shared["pending_computer_move"] = result  # not sent => keep it for COMPUTER_MOVE_DONE
                 has_board = bool(self.shared.get("system_info", {}).get("has_board", True))
                 self._set_pending_engine_move(has_board)
@@ -3677,7 +4008,11 @@ class WebDisplay(DisplayMsg):
             self._set_pending_engine_move(False)
             # If START_NEW_GAME already ran it cleared pending_computer_move, so result is None –
             # skip this stale engine move so the new game's clean PGN isn't overwritten.
-            if result is not None:
+            game = self.pending_computer_game
+            self.pending_computer_game = None
+            if result is not None and game is not None:
+                keep_these_headers = self.shared["headers"] if ModeInfo.get_pgn_mode() else None
+                result.update(_move_message(game, game.peek(), "computer", keep_these_headers))
                 # Re-stamp variant info: for 3check, process_fen has already pushed
                 # the engine move onto the ThreeCheck board and updated checks_remaining,
                 # so this overwrites the stale value captured at COMPUTER_MOVE time.
@@ -3687,6 +4022,9 @@ class WebDisplay(DisplayMsg):
             if self.shared.pop("brain_hint", None) is not None:
                 EventHandler.write_to_clients({"event": "BrainHint", "squares": []})
 
+        elif isinstance(message, Message.CLOCK_TIME):
+            self.clock_time = {"white": message.time_white, "black": message.time_black}
+
         elif isinstance(message, Message.DGT_FEN):
             # Update dgt_fen for board scan functionality
             self.shared["dgt_fen"] = message.fen.split(" ")[0]
@@ -3694,10 +4032,7 @@ class WebDisplay(DisplayMsg):
 
         elif isinstance(message, Message.USER_MOVE_DONE):
             WebDisplay.result_sav = ""
-            pgn_str = _transfer(message.game, self.shared["headers"])  # dont remake headers every move
-            fen = _oldstyle_fen(message.game)
-            mov = message.move.uci()
-            result = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "user"}
+            result = _move_message(message.game, message.move, "user", self.shared["headers"])
             _attach_mistakes(result)
             _attach_variant_info(result)
             self.shared["last_dgt_move_msg"] = result
@@ -3706,10 +4041,7 @@ class WebDisplay(DisplayMsg):
                 EventHandler.write_to_clients({"event": "BrainHint", "squares": []})
 
         elif isinstance(message, Message.REVIEW_MOVE_DONE):
-            pgn_str = _transfer(message.game, self.shared["headers"])  # dont remake headers every move
-            fen = _oldstyle_fen(message.game)
-            mov = message.move.uci()
-            result = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "review"}
+            result = _move_message(message.game, message.move, "review", self.shared["headers"])
             _attach_mistakes(result)
             _attach_variant_info(result)
             self.shared["last_dgt_move_msg"] = result
@@ -3720,7 +4052,14 @@ class WebDisplay(DisplayMsg):
             pgn_str = _transfer(message.game, self.shared["headers"])  # dont remake headers every move
             fen = _oldstyle_fen(message.game)
             mov = peek_uci(message.game)
-            result = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "reload"}
+            result = {
+                "pgn": pgn_str,
+                "seq": self.game_state.seq,
+                "fen": fen,
+                "event": "Fen",
+                "move": mov,
+                "play": "reload",
+            }
             _attach_mistakes(result)
             _attach_variant_info(result)
             self.shared["last_dgt_move_msg"] = result
@@ -3731,7 +4070,14 @@ class WebDisplay(DisplayMsg):
             pgn_str = _transfer(message.game)
             fen = _oldstyle_fen(message.game)
             mov = message.move.uci()
-            result = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "reload"}
+            result = {
+                "pgn": pgn_str,
+                "seq": self.game_state.seq,
+                "fen": fen,
+                "event": "Fen",
+                "move": mov,
+                "play": "reload",
+            }
             _attach_mistakes(result)
             _attach_variant_info(result)
             self.shared["last_dgt_move_msg"] = result
@@ -3742,7 +4088,14 @@ class WebDisplay(DisplayMsg):
             pgn_str = _transfer(message.game)
             fen = _oldstyle_fen(message.game)
             mov = peek_uci(message.game)
-            result = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "reload"}
+            result = {
+                "pgn": pgn_str,
+                "seq": self.game_state.seq,
+                "fen": fen,
+                "event": "Fen",
+                "move": mov,
+                "play": "reload",
+            }
             _attach_mistakes(result)
             _attach_variant_info(result)
             self.shared["last_dgt_move_msg"] = result
@@ -3835,7 +4188,14 @@ class WebDisplay(DisplayMsg):
             pgn_str = _transfer(game_for_end)
             fen = _oldstyle_fen(game_for_end)
             mov = peek_uci(game_for_end)
-            end_msg = {"pgn": pgn_str, "fen": fen, "event": "Fen", "move": mov, "play": "reload"}
+            end_msg = {
+                "pgn": pgn_str,
+                "seq": self.game_state.seq,
+                "fen": fen,
+                "event": "Fen",
+                "move": mov,
+                "play": "reload",
+            }
             _attach_mistakes(end_msg)
             _attach_variant_info(end_msg)
             self.shared["last_dgt_move_msg"] = end_msg
@@ -3848,7 +4208,8 @@ class WebDisplay(DisplayMsg):
             while True:
                 message = await self.msg_queue.get()
                 if (
-                    not isinstance(message, Message.DGT_SERIAL_NR)
+                    logger.isEnabledFor(logging.DEBUG)
+                    and not isinstance(message, Message.DGT_SERIAL_NR)
                     and not isinstance(message, Message.DGT_CLOCK_TIME)
                     and not isinstance(message, Message.CLOCK_TIME)
                     and not isinstance(message, Message.NEW_DEPTH)
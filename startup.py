@@ -0,0 +1,184 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Startup helpers: lazy imports, the --profile-startup time breakdown
+# and the orchestrator running independent init steps concurrently.
+
+import asyncio
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler(object):
+    """Collect import and init-phase timings during startup.
+
+    Timings are always collected (a few perf_counter calls), the report is
+    only written to the log when profiling has been enabled."""
+
+    IMPORT = "import"
+    INIT = "init"
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, str, float]] = []
+
+    def enable(self):
+        self.enabled = True
+        # the report is wanted even if the configured log level is higher
+        logger.setLevel(logging.INFO)
+
+    def record(self, kind: str, name: str, seconds: float):
+        self.entries.append((kind, name, seconds))
+
+    def import_module(self, name: str) -> ModuleType:
+        """Import a module on first use and record how long it took."""
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.record(self.IMPORT, name, time.perf_counter() - start)
+        return module
+
+    def import_attr(self, module_name: str, attr: str):
+        return getattr(self.import_module(module_name), attr)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time an init phase - use as a with-block around the phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(self.INIT, name, time.perf_counter() - start)
+
+    def report(self) -> List[str]:
+        lines = []
+        for kind in (self.IMPORT, self.INIT):
+            entries = [(name, secs) for (k, name, secs) in self.entries if k == kind]
+            if not entries:
+                continue
+            lines.append("{} total {:.3f}s".format(kind, sum(secs for _, secs in entries)))
+            for name, secs in sorted(entries, key=lambda entry: entry[1], reverse=True):
+                lines.append("  {:8.3f}s  {}".format(secs, name))
+        lines.append("startup wall time {:.3f}s".format(time.perf_counter() - self.started))
+        return lines
+
+    def log_report(self):
+        if not self.enabled:
+            return
+        logger.info("startup profile:")
+        for line in self.report():
+            logger.info(line)
+
+
+profiler = StartupProfiler()
+
+
+class StartupOrchestrator(object):
+    """Run init steps concurrently, each step starts as soon as the steps it depends on are done.
+
+    A step is an async callable - blocking file or network work inside a step
+    belongs in asyncio.to_thread. The caller awaits only the steps needed before
+    the board is playable, the other steps finish in the background."""
+
+    def __init__(self, step_profiler: StartupProfiler = profiler):
+        self.profiler = step_profiler
+        self.steps: Dict[str, Tuple[Callable[[], Awaitable[Any]], Tuple[str, ...]]] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.errors: Dict[str, BaseException] = {}
+
+    def add(self, name: str, step: Callable[[], Awaitable[Any]], after: Iterable[str] = ()):
+        """Register a step, after names the steps that must have finished before it starts."""
+        if self.tasks:
+            raise RuntimeError("cannot add startup step {} after start".format(name))
+        if name in self.steps:
+            raise ValueError("duplicate startup step {}".format(name))
+        self.steps[name] = (step, tuple(after))
+
+    def _check_graph(self):
+        visiting: Set[str] = set()
+        done: Set[str] = set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError("startup step dependency cycle at {}".format(name))
+            if name not in self.steps:
+                raise ValueError("unknown startup step {}".format(name))
+            visiting.add(name)
+            for dependency in self.steps[name][1]:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for step_name in self.steps:
+            visit(step_name)
+
+    def start(self):
+        """Create a task for every registered step."""
+        self._check_graph()
+        for name in self.steps:
+            self._task_for(name)
+
+    def _task_for(self, name: str) -> asyncio.Task:
+        if name not in self.tasks:
+            step, after = self.steps[name]
+            for dependency in after:
+                self._task_for(dependency)
+            self.tasks[name] = asyncio.create_task(self._run(name, step, after), name="startup " + name)
+        return self.tasks[name]
+
+    async def _run(self, name: str, step: Callable[[], Awaitable[Any]], after: Tuple[str, ...]):
+        if after:
+            await asyncio.gather(*(self.tasks[dependency] for dependency in after))
+            failed = [dependency for dependency in after if dependency in self.errors]
+            if failed:
+                logger.warning("startup step %s skipped as %s failed", name, ", ".join(failed))
+                self.errors[name] = RuntimeError("dependency failed: " + ", ".join(failed))
+                return None
+        start = time.perf_counter()
+        try:
+            return await step()
+        except Exception as exc:
+            # background steps are gathered with the other tasks - never let them raise
+            logger.exception("startup step %s failed: %s", name, exc)
+            self.errors[name] = exc
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            self.profiler.record(StartupProfiler.INIT, "step " + name, elapsed)
+            if self.profiler.enabled:
+                # background steps may finish after the startup report has been written
+                logger.info("startup step %s done in %.3fs", name, elapsed)
+
+    async def wait(self, *names: str) -> List[Any]:
+        """Wait for the given steps and return their results, None for a failed step."""
+        return list(await asyncio.gather(*(self.tasks[name] for name in names)))
+
+    def failed(self, name: str) -> bool:
+        return name in self.errors
+
+    def pending(self) -> Set[asyncio.Task]:
+        """Steps still running in the background, eg. to cancel them at shutdown."""
+        return {task for task in self.tasks.values() if not task.done()}
@@ -0,0 +1,158 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Syzygy tablebase probes for PicoTutor, the coach and endgame adjudication.
+# Download the 3-5 piece tables with tablebases/download-syzygy345.sh.
+
+import logging
+import os
+from collections import OrderedDict
+
+import chess  # type: ignore
+import chess.syzygy  # type: ignore
+from chess.engine import Cp, InfoDict, PovScore
+
+logger = logging.getLogger(__name__)
+
+PICOCHESS_DIR = os.path.dirname(os.path.abspath(__file__))
+TABLEBASE_DIR = os.path.join(PICOCHESS_DIR, "tablebases", "syzygy")
+TB_WIN_SCORE = 20000  # centipawns of a tablebase win, minus the distance to zeroing (DTZ)
+TB_DEPTH = 99  # depth reported for the exact tablebase lines
+
+
+def _table_pieces(name: str) -> int:
+    """Number of pieces of a table name like KQvKR."""
+    return len(name.replace("v", ""))
+
+
+class TablebaseProbe(object):
+    """Syzygy WDL/DTZ probes with an LRU cache of the probed positions.
+
+    The tables are opened on first use. Only standard chess positions without
+    castling rights and with few enough pieces are covered, for anything else
+    the probes return None and the caller asks the engine."""
+
+    CACHE_SIZE = 4096
+
+    def __init__(self, directory: str = TABLEBASE_DIR, tablebase=None, max_pieces: int = 0):
+        self.directory = os.path.join(PICOCHESS_DIR, directory)  # a relative path is below the picochess folder
+        self.tablebase = tablebase
+        self.max_pieces = max_pieces
+        self._opened = tablebase is not None
+        self.cache: OrderedDict = OrderedDict()  # position key -> (wdl, dtz) or None
+        self.hits = 0
+        self.misses = 0
+
+    def _open(self) -> bool:
+        if not self._opened:
+            self._opened = True
+            if os.path.isdir(self.directory):
+                try:
+                    tablebase = chess.syzygy.open_tablebase(self.directory)
+                except OSError as exc:
+                    logger.warning("can not open tablebases in %s: %s", self.directory, exc)
+                else:
+                    if tablebase.wdl:
+                        self.tablebase = tablebase
+                        self.max_pieces = max(_table_pieces(name) for name in tablebase.wdl)
+                        logger.info("syzygy tablebases up to %d pieces in %s", self.max_pieces, self.directory)
+                    else:
+                        tablebase.close()
+        return self.tablebase is not None
+
+    def close(self):
+        if self.tablebase is not None and self._opened:
+            self.tablebase.close()
+        self.tablebase = None
+
+    def covers(self, board: chess.Board) -> bool:
+        """Return True if board is a position the tables can answer."""
+        return (
+            type(board) is chess.Board
+            and not board.chess960
+            and not board.castling_rights
+            and chess.popcount(board.occupied) <= (self.max_pieces if self._open() else 0)
+        )
+
+    def probe(self, board: chess.Board) -> tuple[int, int] | None:
+        """(wdl, dtz) for the side to move, None if the position is not in the tables."""
+        if not self.covers(board):
+            return None
+        key = (board.board_fen(), board.turn, board.ep_square if board.has_legal_en_passant() else None)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        self.misses += 1
+        try:
+            result = (self.tablebase.probe_wdl(board), self.tablebase.probe_dtz(board))
+        except KeyError:
+            result = None  # table missing or broken
+        self.cache[key] = result
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return result
+
+    def move_scores(self, board: chess.Board) -> list[tuple[chess.Move, int]] | None:
+        """All legal moves with their exact score for the side to move, best first.
+
+        A win scores TB_WIN_SCORE less the distance to zeroing, cursed wins
+        and blessed losses are draws (50 move rule). None if not covered."""
+        if not self.covers(board):
+            return None
+        scores = []
+        for move in board.legal_moves:
+            board.push(move)
+            try:
+                result = self.probe(board)
+            finally:
+                board.pop()
+            if result is None:
+                return None
+            wdl, dtz = result
+            # the probe is for the opponent, who moves next
+            if wdl <= -2:
+                score = TB_WIN_SCORE - abs(dtz)
+            elif wdl >= 2:
+                score = -(TB_WIN_SCORE - abs(dtz))
+            else:
+                score = 0
+            scores.append((move, score))
+        scores.sort(key=lambda entry: entry[1], reverse=True)
+        return scores
+
+    def analysis_info(self, board: chess.Board) -> list[InfoDict] | None:
+        """Engine style multipv analysis of board (one line per legal move), None if not covered."""
+        scores = self.move_scores(board)
+        if not scores:
+            return None
+        return [
+            {"pv": [move], "score": PovScore(Cp(score), board.turn), "depth": TB_DEPTH, "multipv": index + 1}
+            for index, (move, score) in enumerate(scores)
+        ]
+
+    def game_result(self, board: chess.Board) -> str | None:
+        """Adjudicated result "1-0", "0-1" or "1/2-1/2" of board, None if not covered."""
+        result = self.probe(board)
+        if result is None:
+            return None
+        wdl = result[0]
+        if -1 <= wdl <= 1:
+            return "1/2-1/2"
+        white_wins = (wdl > 0) == (board.turn == chess.WHITE)
+        return "1-0" if white_wins else "0-1"
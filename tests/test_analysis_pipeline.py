@@ -0,0 +1,79 @@
+import unittest
+
+import chess
+import chess.engine
+
+from analysis_pipeline import AnalysisPipeline
+
+AFTER_E4 = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+
+
+def info(depth=10, pv=("e7e5", "g1f3"), cp=-20, mate=None, multipv=None):
+    result = {"depth": depth, "pv": [chess.Move.from_uci(uci) for uci in pv]}
+    if mate is not None:
+        result["score"] = chess.engine.PovScore(chess.engine.Mate(mate), chess.WHITE)
+    elif cp is not None:
+        result["score"] = chess.engine.PovScore(chess.engine.Cp(cp), chess.WHITE)
+    if multipv is not None:
+        result["multipv"] = multipv
+    return result
+
+
+class TestAnalysisPipeline(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = AnalysisPipeline()
+
+    def test_result_is_worked_out_once_per_info(self):
+        result = self.pipeline.result(info(), AFTER_E4)
+
+        self.assertIs(self.pipeline.result(info(), AFTER_E4), result)
+        self.assertEqual(result.san(), ["e5", "Nf3"])
+        self.assertEqual((result.move, result.score, result.mate), (chess.Move.from_uci("e7e5"), -20, 0))
+        self.assertIsNot(self.pipeline.result(info(depth=11), AFTER_E4), result)
+        self.assertIsNot(self.pipeline.result(info(pv=("e7e5", "b1c3")), AFTER_E4), result)
+        self.assertIsNot(self.pipeline.result(info(cp=-25), AFTER_E4), result)
+        self.assertIsNot(self.pipeline.result(info(multipv=2), AFTER_E4), result)
+        self.assertIsNone(self.pipeline.result({}, AFTER_E4))
+
+    def test_result_is_read_only(self):
+        result = self.pipeline.result(info(), AFTER_E4)
+
+        with self.assertRaises(AttributeError):
+            result.depth = 20
+        result.san().append("Nc6")
+        self.assertEqual(result.san(), ["e5", "Nf3"])
+
+    def test_unchanged_ticks_are_not_published_again(self):
+        result = self.pipeline.result(info(), AFTER_E4)
+
+        self.assertTrue(self.pipeline.publish("web_engine", result, False))
+        self.assertFalse(self.pipeline.publish("web_engine", self.pipeline.result(info(), AFTER_E4), False))
+        self.assertTrue(self.pipeline.publish("web_engine", result, True))
+        self.assertTrue(self.pipeline.publish("clock", result))
+        self.assertTrue(self.pipeline.publish("clock", self.pipeline.result(info(depth=11), AFTER_E4)))
+        self.assertEqual(self.pipeline.sent, 4)
+
+        self.pipeline.forget("web_engine")
+        self.assertTrue(self.pipeline.publish("web_engine", result, True))
+        self.pipeline.forget()
+        self.assertTrue(self.pipeline.publish("clock", result))
+
+    def test_web_payload(self):
+        payload = self.pipeline.result(info(mate=-3, cp=None), AFTER_E4).web_payload("tutor", True)
+
+        self.assertEqual(payload["pv"], ["e5", "Nf3"])
+        self.assertEqual(payload["mate"], -3)
+        self.assertEqual(payload["score"], -99996)
+        self.assertEqual(payload["source"], "tutor")
+        self.assertTrue(payload["suppress_engine_line"])
+
+    def test_pv_falls_back_to_uci(self):
+        illegal = self.pipeline.result(info(pv=("e2e4",)), AFTER_E4)
+        unreadable = self.pipeline.result(info(), "not a fen")
+
+        self.assertEqual(illegal.san(), ["e2e4"])
+        self.assertEqual(unreadable.san(), ["e7e5", "g1f3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import analysis_scheduler
+from analysis_scheduler import AnalysisScheduler
+
+INTERVALS = {"WOKEN_INTERVAL": 0.01, "BUSY_INTERVAL": 0.04, "QUIET_INTERVAL": 0.16, "IDLE_INTERVAL": 0.08}
+
+
+class TestAnalysisScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for name, value in INTERVALS.items():
+            patcher = patch.object(analysis_scheduler, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.news = False
+        self.watching = True
+        self.ticks = []
+        self.pause = AsyncMock()
+
+    async def analyse(self, woken):
+        self.ticks.append(woken)
+        return self.news
+
+    async def wait_for_ticks(self, count: int, timeout: float = 2.0):
+        """Wait until count ticks have run - a loaded machine runs them late, never early."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while len(self.ticks) < count and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.005)
+
+    def scheduler(self):
+        scheduler = AnalysisScheduler(self.analyse, lambda: self.watching, self.pause, asyncio.get_running_loop())
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    async def test_backs_off_without_news(self):
+        scheduler = self.scheduler()
+        scheduler.start()
+
+        await self.wait_for_ticks(1)
+        self.assertEqual(self.ticks, [False])
+        self.assertEqual(scheduler.interval, 0.08)
+        await self.wait_for_ticks(2)
+        self.assertEqual(scheduler.interval, 0.16)
+        await asyncio.sleep(0.06)
+        self.assertEqual(len(self.ticks), 2)
+
+        self.news = True
+        await self.wait_for_ticks(3)
+        self.assertEqual(scheduler.interval, 0.04)
+
+    async def test_new_depth_wakes_it_early(self):
+        scheduler = self.scheduler()
+        scheduler.interval = 0.16
+        scheduler.start()
+        await asyncio.sleep(0.01)
+
+        scheduler.wake()
+        scheduler.wake()
+        await self.wait_for_ticks(1)
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(self.ticks, [True])
+        self.assertEqual(scheduler.interval, 0.16)
+
+    async def test_pauses_without_a_display(self):
+        self.watching = False
+        scheduler = self.scheduler()
+        scheduler.start()
+
+        await asyncio.sleep(0.15)
+        scheduler.wake()
+        await asyncio.sleep(0.02)
+        self.assertEqual(self.ticks, [])
+        self.assertTrue(scheduler.paused)
+        self.pause.assert_awaited_once()
+
+        self.watching = True
+        await self.wait_for_ticks(1)
+        self.assertFalse(scheduler.paused)
+        self.assertEqual(self.ticks, [False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import chess
+from chess.engine import PlayResult
+
+from dgt.util import TimeMode
+from timecontrol import TimeControl
+from uci.bench import (
+    BENCH_POSITIONS,
+    LevelBenchmark,
+    _bench_options,
+    load_report,
+    read_rss_kb,
+    time_control_label,
+    write_report,
+)
+
+
+def _fake_engine(nps=100000):
+    engine = Mock()
+    engine.transport.get_pid.return_value = os.getpid()
+    engine.newgame = AsyncMock()
+    engine.searches = []
+
+    async def go(time_dict, game, result_queue, root_moves):
+        engine.searches.append(dict(time_dict))
+        move = next(iter(game.legal_moves))
+        await result_queue.put(PlayResult(move, None, info={"depth": 12, "nodes": nps // 10, "nps": nps}))
+
+    engine.go = go
+    return engine
+
+
+class TestBenchHelpers(unittest.TestCase):
+    def test_time_control_label(self):
+        self.assertEqual(time_control_label(TimeControl(mode=TimeMode.FIXED, fixed=5)), "fixed 5")
+        self.assertEqual(time_control_label(TimeControl(mode=TimeMode.FISCHER, blitz=3, fischer=2)), "fischer 3 2")
+
+    def test_read_rss_of_own_process(self):
+        if not os.path.exists("/proc/self/status"):
+            self.skipTest("no /proc on this system")
+        self.assertGreater(read_rss_kb(os.getpid()), 0)
+        self.assertIsNone(read_rss_kb(None))
+
+    def test_threads_and_hash_override_level_options(self):
+        options = _bench_options({"Skill Level": "5", "Threads": "1"}, threads=4, hash_mb=None)
+
+        self.assertEqual(options, {"Skill Level": "5", "Threads": "4"})
+
+    def test_report_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report_file = Path(tmp) / "logs" / "engine_bench.json"
+            write_report([{"engine": "Stockfish", "level": "", "nps": 1}], {"depth": 12}, report_file)
+
+            report = load_report(report_file)
+
+        self.assertEqual(report["results"][0]["engine"], "Stockfish")
+        self.assertEqual(report["settings"], {"depth": 12})
+        self.assertIsNone(load_report(Path(tmp) / "missing.json"))
+
+
+class TestLevelBenchmark(unittest.TestCase):
+    def test_run_records_speed_latency_and_rss(self):
+        engine = _fake_engine(nps=250000)
+        time_controls = ({"mode": TimeMode.FIXED, "fixed": 1}, {"mode": TimeMode.BLITZ, "blitz": 5})
+
+        result = asyncio.run(LevelBenchmark(engine, depth=12).run(time_controls))
+
+        self.assertEqual(result["nps"], 250000)
+        self.assertEqual(len(result["positions"]), len(BENCH_POSITIONS))
+        self.assertTrue(all(chess.Move.from_uci(entry["move"]) for entry in result["positions"]))
+        self.assertEqual(set(result["latency"]), {"fixed 1", "blitz 5"})
+        self.assertEqual(result["latency"]["blitz 5"]["moves"], len(BENCH_POSITIONS))
+        self.assertEqual(engine.searches[0], {"depth": "12"})
+        self.assertIn({"movetime": "1000"}, engine.searches)
+        if os.path.exists("/proc/self/status"):
+            self.assertGreater(result["rss_kb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -304,6 +304,22 @@ class TestDgtDisplay(unittest.IsolatedAsyncioTestCase):
         self.assertEqual("EVT_NEW_GAME", new_game_event._type)
         self.assertEqual(518, new_game_event.pos960)
 
+    @patch("dgt.display.DispatchDgt.fire", new_callable=AsyncMock)
+    async def test_take_back_displays_the_taken_back_move(self, dispatch_fire):
+        display = self.create_display()
+        game = chess.Board()
+        game.push_uci("e2e4")
+        game.push_uci("e7e5")
+        game._variant_name = "atomic"
+
+        await display._process_message(Message.TAKE_BACK(game=game))
+
+        moves = [call.args[0] for call in dispatch_fire.await_args_list if hasattr(call.args[0], "move")]
+        self.assertEqual(1, len(moves))
+        self.assertEqual(chess.Move.from_uci("e7e5"), moves[0].move)
+        self.assertEqual("atomic", moves[0].variant)
+        self.assertEqual(2, len(game.move_stack))  # the message game is not changed
+
     async def test_non_brain_coach_clears_brain_hint_display_cache(self):
         display = self.create_display()
         display.dgtmenu.res_picotutor_picocoach = PicoCoach.COACH_BRAIN
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+
+import chess
+import chess.variant
+
+from dgt.api import Dgt
+from dgt.iface import DgtIface, move_variant, render_move
+from dgt.util import ClockSide
+
+AFTER_E4_E5 = "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"
+
+
+class Device(DgtIface):
+    def __init__(self, name):
+        self.name = name
+
+    def get_name(self):
+        return self.name
+
+
+def display_move(uci, fen=AFTER_E4_E5, side=ClockSide.NONE, lang="en", capital=False, long=False):
+    return Dgt.DISPLAY_MOVE(
+        move=chess.Move.from_uci(uci),
+        fen=fen,
+        uci960=False,
+        side=side,
+        lang=lang,
+        capital=capital,
+        long=long,
+        beep=False,
+        maxtime=1,
+        devs={"ser", "i2c", "web"},
+        wait=False,
+    )
+
+
+class TestGetSan(unittest.TestCase):
+    def setUp(self):
+        render_move.cache_clear()
+        patcher = patch("dgt.iface.Rev2Info.get_new_rev2_mode", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_devices_share_the_rendered_move(self):
+        message = display_move("g1f3")
+
+        board, text = Device("ser").get_san(message)
+        other_board, other_text = Device("web").get_san(message)
+        xl_board, xl_text = Device("i2c").get_san(message, is_xl=True)
+
+        self.assertEqual(text, "Nf3")
+        self.assertEqual(other_text, "Nf3")
+        self.assertEqual(xl_text, "Nf3")
+        self.assertIs(other_board, board)
+        self.assertIs(xl_board, board)
+        self.assertEqual(render_move.cache_info().misses, 2)
+        self.assertEqual(board.fullmove_number, 2)
+
+    def test_piece_letters_of_the_language(self):
+        self.assertEqual(Device("ser").get_san(display_move("g1f3", lang="de"))[1], "Sf3")
+        self.assertEqual(Device("ser").get_san(display_move("e1e2", lang="fr"))[1], "Re2")
+        self.assertEqual(Device("ser").get_san(display_move("d1h5", lang="it", capital=True))[1], "DH5")
+        self.assertEqual(Device("ser").get_san(display_move("d1h5", lang="it", long=True))[1], "d1h5")
+
+    def test_right_side_is_padded_to_the_display(self):
+        message = display_move("g1f3", side=ClockSide.RIGHT)
+
+        self.assertEqual(Device("ser").get_san(message)[1], "     Nf3")
+        self.assertEqual(Device("i2c").get_san(message, is_xl=True)[1], "   Nf3")
+        with patch("dgt.iface.Rev2Info.get_new_rev2_mode", return_value=True):
+            self.assertEqual(Device("ser").get_san(message)[1], "  Nf3")
+
+    def test_illegal_move(self):
+        message = display_move("a1a5")
+
+        with self.assertLogs("dgt.iface", level="WARNING"):
+            self.assertEqual(Device("ser").get_san(message)[1], "err a1a5")
+        with self.assertLogs("dgt.iface", level="WARNING"):
+            self.assertEqual(Device("i2c").get_san(message, is_xl=True)[1], "era1a5")
+
+    def test_variant_board(self):
+        fen = chess.variant.ThreeCheckBoard().fen()
+
+        with patch("dgt.iface.ModeInfo.get_variant", return_value="3check"):
+            self.assertEqual(move_variant(display_move("e2e4", fen=fen)), "3check")
+            board, text = Device("ser").get_san(display_move("e2e4", fen=fen))
+
+        self.assertIsInstance(board, chess.variant.ThreeCheckBoard)
+        self.assertEqual(text, "e4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import queue
+import random
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from eboard import bench
+from eboard.certabo.parser import CertaboBoardMessageParser, CertaboPiece
+from eboard.chesslink import chess_link_protocol as clp
+from eboard.chessnut import parser as chessnut
+from eboard.frames import FrameAssembler, FrameSpec
+from eboard.ichessone import parser as ichessone
+
+SPECS = (FrameSpec("fixed", b"\x01\x24", 5), FrameSpec("line", b":", terminator=b"\r\n"))
+
+
+class Recorder(object):
+    def __init__(self, valid=True):
+        self.frames = []
+        self.valid = valid
+
+    def handlers(self):
+        return {spec.name: (lambda frame, name=spec.name: self.on_frame(name, frame)) for spec in SPECS}
+
+    def on_frame(self, name, frame):
+        self.frames.append((name, bytes(frame)))
+        return self.valid
+
+
+def certabo_parser(callback):
+    parser = CertaboBoardMessageParser(callback, False)
+    parser.update_stones({CertaboPiece(bytearray(piece_id)): symbol for symbol, piece_id in bench.CERTABO_IDS.items()})
+    return parser
+
+
+def chesslink_parser(callback):
+    replies = queue.SimpleQueue()
+    assembler = clp.reply_assembler(replies)
+
+    class Parser(object):
+        def parse(self, data):
+            assembler.feed(bytes(data).translate(clp.STRIP_PARITY))
+            while not replies.empty():
+                callback.reply(replies.get())
+
+    return Parser()
+
+
+PARSERS = {
+    "chessnut": (chessnut.Parser, bench.chessnut_message, [b"\x2a\x02\x32\x01", b"\x41\x03\x0c\x01\x3c"]),
+    "ichessone": (ichessone.Parser, bench.ichessone_message, [b"\x3d\x62\x01\x46"]),
+    "certabo": (certabo_parser, bench.certabo_message, [b"L\r\n", b":255 255 0 0 0 0 255 255 \r\n"]),
+    "chesslink": (chesslink_parser, bench.chesslink_message, [b"x00\x37\x38", clp.add_block_crc("v0103").encode()]),
+}
+
+
+class TestFrameAssembler(unittest.TestCase):
+    def test_frames_split_over_chunks_and_junk(self):
+        recorder = Recorder()
+        assembler = FrameAssembler(SPECS, recorder.handlers())
+
+        for chunk in (b"xx\x01", b"\x24abc:12", b"3\r", b"\n\x01\x24", b"de"):
+            assembler.feed(chunk)
+
+        self.assertEqual(recorder.frames, [("fixed", b"\x01\x24abc"), ("line", b":123\r\n")])
+        self.assertEqual(assembler.pending(), 4)
+
+    def test_earliest_marker_wins(self):
+        recorder = Recorder()
+
+        FrameAssembler(SPECS, recorder.handlers()).feed(b":\x01\x24\r\n\x01\x24abc")
+
+        self.assertEqual(recorder.frames, [("line", b":\x01\x24\r\n"), ("fixed", b"\x01\x24abc")])
+
+    def test_invalid_frame_searches_again_after_its_first_byte(self):
+        recorder = Recorder(valid=False)
+
+        FrameAssembler(SPECS, recorder.handlers()).feed(b"\x01\x24\x01\x24abc")
+
+        self.assertEqual(recorder.frames, [("fixed", b"\x01\x24\x01\x24a"), ("fixed", b"\x01\x24abc")])
+
+    def test_overlong_frame_is_dropped(self):
+        recorder = Recorder()
+        assembler = FrameAssembler(SPECS, recorder.handlers(), buffer_size=16)
+
+        assembler.feed(b":" + b"1" * 40)
+        assembler.feed(b":2\r\n")
+
+        self.assertEqual(recorder.frames, [("line", b":2\r\n")])
+
+    def test_flush_hands_over_the_unfinished_frame(self):
+        recorder = Recorder()
+        assembler = FrameAssembler(SPECS, recorder.handlers())
+        assembler.feed(b":12")
+
+        self.assertTrue(assembler.flush(lambda frame: bytes(frame) == b":12"))
+        self.assertEqual(assembler.pending(), 0)
+
+
+class TestParserFuzz(unittest.TestCase):
+    def stream(self, rnd, message, extras):
+        data = b""
+        for board in bench.builtin_boards(moves=8)[::5]:
+            if rnd.random() < 0.3:
+                data += bytes(rnd.choice((0x00, 0x55, 0x99, 0xFF)) for _ in range(rnd.randint(1, 6)))
+            data += message(board)
+            if rnd.random() < 0.3:
+                data += rnd.choice(extras)
+        return data
+
+    def calls(self, factory, chunks):
+        callback = MagicMock()
+        parser = factory(callback)
+        for chunk in chunks:
+            parser.parse(bytearray(chunk))
+        return callback.mock_calls
+
+    def test_any_chunking_gives_the_same_callbacks(self):
+        rnd = random.Random(42)
+        for name, (factory, message, extras) in PARSERS.items():
+            with self.subTest(board=name):
+                for _ in range(10):
+                    data = self.stream(rnd, message, extras)
+                    whole = self.calls(factory, [data])
+                    cuts = sorted(rnd.sample(range(1, len(data)), min(len(data) - 1, rnd.randint(1, 80))))
+                    pieces = [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+                    self.assertTrue(whole)
+                    self.assertEqual(self.calls(factory, pieces), whole)
+
+    def test_random_bytes_never_raise(self):
+        rnd = random.Random(7)
+        for name, (factory, _, _) in PARSERS.items():
+            with self.subTest(board=name):
+                parser = factory(MagicMock())
+                for _ in range(300):
+                    parser.parse(bytearray(rnd.getrandbits(8) for _ in range(rnd.randint(0, 64))))
+
+
+class TestThroughput(unittest.TestCase):
+    def seconds_per_byte(self, factory, data, chunk):
+        parser = factory(MagicMock())
+        start = time.perf_counter()
+        for offset in range(0, len(data), chunk):
+            parser.parse(bytearray(data[offset:offset + chunk]))
+        return (time.perf_counter() - start) / len(data)
+
+    def test_cost_per_byte_does_not_grow_with_the_stream(self):
+        # junk after a frame, or a line that never ends, must not make every new chunk slower
+        for name, spec in (("fixed", SPECS[0]), ("line", SPECS[1])):
+            with self.subTest(frame=name):
+                assembler = FrameAssembler((spec,), {name: lambda frame: True})
+                short, long = b"\x00" * 20000, b"\x00" * 160000
+
+                def rate(data):
+                    start = time.perf_counter()
+                    for offset in range(0, len(data), 20):
+                        assembler.feed(data[offset:offset + 20])
+                    return (time.perf_counter() - start) / len(data)
+
+                assembler.feed(spec.marker)
+                self.assertLess(rate(long), 4 * rate(short) + 1e-7)
+
+    def test_certabo_in_ble_chunks(self):
+        factory, message, _ = PARSERS["certabo"]
+        boards = bench.builtin_boards(moves=2)
+        short = b"".join(message(board) for board in boards)
+
+        self.assertLess(self.seconds_per_byte(factory, short * 8, 20), 4 * self.seconds_per_byte(factory, short, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
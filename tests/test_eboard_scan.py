@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import MagicMock
+
+import chess
+
+from eboard import bench, scan
+from eboard.certabo.parser import CertaboBoardMessageParser, CertaboPiece
+from eboard.chessnut import parser as chessnut
+from eboard.eboard import check_reversed
+
+
+class TestScanDecoder(unittest.TestCase):
+    def setUp(self):
+        self.decoder = scan.ScanDecoder(chessnut.PIECES, chessnut.FRAME_ORDER)
+        self.start = bench.encode(scan.START_BOARD, chessnut.PIECES, chessnut.FRAME_ORDER)
+
+    def test_tables_map_every_byte(self):
+        table = scan.nibble_table({0: scan.EMPTY, 0x07: "P", 0x04: "p"})
+
+        self.assertEqual(len(table), 256)
+        self.assertEqual(table[0x74], "Pp")
+        self.assertEqual(table[0x70], "P ")
+        self.assertEqual(table[0x7F], "P" + scan.INVALID)
+        self.assertEqual(scan.byte_table({ord("."): scan.EMPTY})[ord(".")], scan.EMPTY)
+
+    def test_repeated_frames_are_not_decoded_again(self):
+        self.assertEqual(self.decoder.update(self.start), scan.START_BOARD)
+
+        self.decoder.decode = MagicMock()
+        self.assertIsNone(self.decoder.update(bytearray(self.start)))
+        self.decoder.decode.assert_not_called()
+        self.assertTrue(self.decoder.valid)
+
+    def test_invalid_frame_keeps_last_board(self):
+        self.decoder.update(self.start)
+
+        self.assertIsNone(self.decoder.update(b"\xff" * 32))
+        self.assertFalse(self.decoder.valid)
+        self.assertIsNone(self.decoder.update(self.start))
+        self.assertTrue(self.decoder.valid)
+
+    def test_reset_decodes_the_same_frame_again(self):
+        self.decoder.update(self.start)
+        self.decoder.reset()
+
+        self.assertEqual(self.decoder.update(self.start), scan.START_BOARD)
+
+    def test_short_frame_is_invalid(self):
+        self.assertIsNone(self.decoder.decode(self.start[:31]))
+
+
+class TestShortFen(unittest.TestCase):
+    def test_matches_python_chess(self):
+        game = chess.Board()
+        for uci in bench.OPENING:
+            game.push_uci(uci)
+            self.assertEqual(scan.to_short_fen(bench.to_board(game)), game.board_fen())
+
+    def test_empty_and_full_ranks(self):
+        board = scan.EMPTY * 56 + "rnbqkbnr"
+
+        self.assertEqual(scan.to_short_fen(board), "rnbqkbnr/8/8/8/8/8/8/8")
+
+    def test_check_reversed_accepts_lists(self):
+        callback = MagicMock()
+
+        board, is_reversed = check_reversed(list(scan.START_BOARD[::-1]), False, callback)
+
+        self.assertEqual((board, is_reversed), (scan.START_BOARD, True))
+        callback.reversed.assert_called_once_with(True)
+
+
+class TestDrivers(unittest.TestCase):
+    def test_certabo_skips_repeated_scans_until_stones_change(self):
+        callback = MagicMock()
+        parser = CertaboBoardMessageParser(callback, False)
+        message = bench.certabo_message(scan.START_BOARD)
+        stones = {CertaboPiece(bytearray(piece_id)): symbol for symbol, piece_id in bench.CERTABO_IDS.items()}
+
+        parser.parse(bytearray(message))
+        parser.update_stones(stones)
+        parser.parse(bytearray(message))
+        parser.parse(bytearray(message))
+
+        self.assertEqual(callback.board_update.call_count, 2)
+        callback.board_update.assert_called_with("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+
+    def test_benchmark_replays_every_board_type(self):
+        report = bench.run_benchmark(bench.builtin_boards(moves=4), repeat=1)
+
+        self.assertEqual(set(report), {"chessnut", "ichessone", "certabo", "chesslink"})
+        for name, result in report.items():
+            with self.subTest(board=name):
+                self.assertEqual(result["replay"]["updates"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import copy
+import unittest
+
+import chess
+import chess.pgn
+import chess.variant
+
+from game_snapshot import GameSnapshot, game_last_moves, game_ply_count
+from picochess import PicochessState
+from server import WebGameState
+from variants import snapshot_of, variant_fen, variant_pgn_game
+
+MOVES = ["e2e4", "d7d5", "e4d5", "g8f6", "f1b5", "c7c6"]
+
+
+class TestGameSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.game = chess.Board()
+        for uci in MOVES:
+            self.game.push_uci(uci)
+
+    def test_answers_like_the_board(self):
+        snapshot = GameSnapshot.of(self.game)
+
+        self.assertEqual(snapshot.fen(), self.game.fen())
+        self.assertEqual(snapshot.turn, self.game.turn)
+        self.assertEqual(snapshot.move_stack, self.game.move_stack)
+        self.assertEqual(snapshot.peek(), self.game.peek())
+        self.assertEqual(snapshot.root(), self.game.root())
+        self.assertEqual(snapshot.result(), self.game.result())
+        self.assertEqual(set(snapshot.legal_moves), set(self.game.legal_moves))
+        self.assertEqual(str(chess.pgn.Game.from_board(snapshot)), str(chess.pgn.Game.from_board(self.game)))
+
+    def test_does_not_follow_the_game(self):
+        snapshot = GameSnapshot.of(self.game)
+        fen = self.game.fen()
+
+        self.game.pop()
+        self.game.push_uci("b8d7")
+
+        self.assertEqual(snapshot.fen(), fen)
+        self.assertEqual(snapshot.peek(), chess.Move.from_uci("c7c6"))
+        self.assertIs(copy.deepcopy(snapshot), snapshot)
+
+    def test_copy_is_a_board_to_play_on(self):
+        snapshot = GameSnapshot.of(self.game)
+
+        board = snapshot.copy()
+        board.pop()
+        board.push_uci("b8d7")
+
+        self.assertEqual(snapshot.move_stack, self.game.move_stack)
+        self.assertEqual(len(snapshot.copy(stack=2).move_stack), 2)
+        self.assertEqual(snapshot.copy(stack=False).fen(), self.game.fen())
+        with self.assertRaises(TypeError):
+            snapshot.push(chess.Move.from_uci("b1c3"))
+
+    def test_last_moves_come_from_the_move_list(self):
+        board = chess.Board()
+        for san in ("e4", "e5", "Nf3"):
+            board.push_san(san)
+        snapshot = GameSnapshot.of(board)
+
+        self.assertEqual(snapshot.last_moves(2), board.move_stack[-2:])
+        self.assertEqual(snapshot.last_moves(5), board.move_stack)
+        self.assertEqual(game_last_moves(board, 2), board.move_stack[-2:])
+        self.assertEqual(game_ply_count(snapshot), 3)
+        self.assertIsNone(snapshot._board)
+
+    def test_snapshots_share_their_moves(self):
+        first = GameSnapshot.of(self.game)
+        self.game.push_uci("b5c4")
+        second = GameSnapshot.of(self.game, first.history)
+        self.game.pop()
+        self.game.pop()
+        third = GameSnapshot.of(self.game, second.history)
+
+        self.assertIs(second.history.parent, first.history)
+        self.assertIs(third.history, first.history.parent)
+        self.assertEqual(second.ply_count(), len(MOVES) + 1)
+
+    def test_history_is_rebuilt_for_a_new_game(self):
+        first = GameSnapshot.of(self.game)
+        game = chess.Board()
+        for uci in MOVES[:3]:
+            game.push_uci(uci)
+
+        snapshot = GameSnapshot.of(game, first.history)
+
+        self.assertEqual(snapshot.move_stack, game.move_stack)
+        self.assertIsNot(snapshot.history, first.history.parent.parent.parent)
+
+
+class TestStateSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.state = PicochessState(self.loop)
+
+    def test_message_snapshots_share_the_history(self):
+        self.state.push_move(chess.Move.from_uci("e2e4"))
+        first = self.state.game_snapshot()
+        self.state.push_move(chess.Move.from_uci("e7e5"))
+        second = self.state.game_snapshot()
+
+        self.assertIs(second.history.parent, first.history)
+
+    def test_variant_info_is_attached(self):
+        self.state.variant = "atomic"
+        self.state._atomic_board = chess.variant.AtomicBoard()
+        for uci in ["e2e4", "d7d5", "e4d5"]:
+            self.state.push_move(chess.Move.from_uci(uci))
+
+        snapshot = self.state.game_snapshot()
+
+        self.assertEqual(snapshot._variant_name, "atomic")
+        self.assertIsNotNone(snapshot_of(snapshot))
+        self.assertEqual(variant_fen(snapshot, "atomic"), self.state._atomic_board.fen())
+        expected = variant_pgn_game(self.state.game_copy(), "atomic")
+        self.assertEqual(str(variant_pgn_game(snapshot, "atomic")), str(expected))
+
+    def test_web_game_state_follows_snapshots(self):
+        web = WebGameState()
+        web.reset(self.state.game_snapshot())
+        self.state.push_move(chess.Move.from_uci("g1f3"))
+
+        snapshot = self.state.game_snapshot()
+        ply = web.push(snapshot)
+
+        self.assertEqual(ply["san"], "Nf3")
+        self.assertTrue(web.follows(snapshot))
+        self.assertIsNone(snapshot._board)  # answered from the move list, no full board built
+
+
+if __name__ == "__main__":
+    unittest.main()
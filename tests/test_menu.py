@@ -9,6 +9,7 @@ from dgt.translate import DgtTranslate
 from dgt.util import Beep, Language, PicoComment, EBoard, PicoCoach, Theme, TimeMode, Voice
 from uci.read import read_engine_ini
 from uci.engine_provider import EngineProvider
+from utilities import version
 
 
 class TestDgtMenu(unittest.IsolatedAsyncioTestCase):
@@ -76,6 +77,22 @@ class TestDgtMenu(unittest.IsolatedAsyncioTestCase):
         menu = self.create_menu(machine_mock, rdisplay=True)
         self.assertTrue(menu.get_engine_rdisplay())
 
+    @patch("dgt.menu.tags_lookup")
+    @patch("platform.machine")
+    async def test_update_menu_with_cold_tag_cache_shows_running_version(self, machine_mock, tags_mock):
+        tags_mock.peek.return_value = []
+        menu = self.create_menu(machine_mock)
+
+        self.assertEqual("Ver " + version, menu.updt_middle("ser").large_text)
+        self.assertEqual("Ver " + version, menu.updt_right().large_text)
+        self.assertEqual("Ver " + version, menu.updt_left().large_text)
+        self.assertIsNone(menu.updt_down("ser"))
+
+        tags_mock.peek.return_value = [["v4.1", "4.1"], ["v4.2", "4.2"]]
+        menu.updt_middle("ser")
+        self.assertEqual("Ver 4.1", menu.updt_right().large_text)
+        self.assertEqual("v4.1", menu.updt_down("ser"))
+
     @patch("platform.machine")
     async def test_persistent_web_settings_update_live_menu_state(self, machine_mock):
         menu = self.create_menu(machine_mock)
@@ -642,7 +659,7 @@ class TestDgtMenu(unittest.IsolatedAsyncioTestCase):
         menu.state = MenuState.SYS_INFO_IP
         menu.int_ip = "192.168.0.99"
 
-        with patch("dgt.menu.get_internal_ip", return_value="10.20.30.40"), patch(
+        with patch("dgt.menu.internal_ip_lookup.get", new_callable=AsyncMock, return_value="10.20.30.40"), patch(
             "dgt.menu.Rev2Info.get_web_only", return_value=False
         ), patch("dgt.menu.DispatchDgt.fire", new_callable=AsyncMock) as dispatch_fire:
             text = await menu.main_down()
@@ -658,7 +675,7 @@ class TestDgtMenu(unittest.IsolatedAsyncioTestCase):
         menu.state = MenuState.SYS_INFO_IP
         menu.int_ip = "192.168.0.99"
 
-        with patch("dgt.menu.get_internal_ip", return_value=None), patch(
+        with patch("dgt.menu.internal_ip_lookup.get", new_callable=AsyncMock, return_value=None), patch(
             "dgt.menu.Rev2Info.get_web_only", return_value=True
         ), patch(
             "dgt.menu.DispatchDgt.fire", new_callable=AsyncMock
@@ -675,7 +692,7 @@ class TestDgtMenu(unittest.IsolatedAsyncioTestCase):
         menu = self.create_menu(machine_mock)
         menu.state = MenuState.SYS_INFO_IP
 
-        with patch("dgt.menu.get_internal_ip", return_value="10.20.30.40"), patch(
+        with patch("dgt.menu.internal_ip_lookup.get", new_callable=AsyncMock, return_value="10.20.30.40"), patch(
             "dgt.menu.Rev2Info.get_web_only", return_value=True
         ), patch("dgt.menu.DispatchDgt.fire", new_callable=AsyncMock), patch("dgt.menu.time.time", return_value=100.0):
             await menu.main_down()
@@ -0,0 +1,138 @@
+import ast
+import asyncio
+import copy
+import inspect
+import textwrap
+import unittest
+
+import chess
+
+import utilities
+from dgt.api import Dgt, Message
+from dgt.bench import builtin_trace, run_benchmark
+from dgt.display import DgtDisplay
+from dgt.iface import DgtIface
+from pgn import PgnDisplay
+from picotalker import PicoTalkerDisplay
+from server import WebDisplay
+from utilities import DisplayDgt, DisplayMsg, MessageDispatch, handles
+
+
+def isinstance_message_classes(method):
+    """Message classes tested with isinstance(message, Message.X) inside a method."""
+    tree = ast.parse(textwrap.dedent(inspect.getsource(method)))
+    classes = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "isinstance":
+            for attr in ast.walk(node.args[1]):
+                if isinstance(attr, ast.Attribute) and getattr(attr.value, "id", None) == "Message":
+                    classes.add(getattr(Message, attr.attr))
+    return classes
+
+
+class FakeIface(DgtIface):
+    def __init__(self, name):
+        super(FakeIface, self).__init__(None, None)
+        self.name = name
+        self.texts = []
+
+    def get_name(self):
+        return self.name
+
+    def display_text_on_clock(self, message):
+        self.texts.append(message.large_text)
+        return True
+
+
+class TestMessages(unittest.TestCase):
+    def test_hash_depends_on_content_only(self):
+        text = dict(large_text="ok", medium_text="ok", small_text="ok", devs={"ser", "web"}, beep=False)
+
+        self.assertEqual(hash(Dgt.DISPLAY_TEXT(**text)), hash(Dgt.DISPLAY_TEXT(**text)))
+        self.assertNotEqual(hash(Dgt.DISPLAY_TEXT(**text)), hash(Dgt.DISPLAY_TEXT(**dict(text, large_text="no"))))
+
+    def test_messages_have_no_instance_dict(self):
+        message = Message.NEW_SCORE(score=10, mate=None, mode=None, turn=chess.WHITE)
+
+        self.assertFalse(hasattr(message, "__dict__"))
+        with self.assertRaises(AttributeError):
+            message.unknown = 1
+        with self.assertRaises(TypeError):
+            Message.NEW_SCORE(unknown=1)
+
+    def test_deepcopy_keeps_fields(self):
+        game = chess.Board()
+        game.push_uci("e2e4")
+        message = Message.START_NEW_GAME(game=game, newgame=True, variant="3check")
+
+        copied = copy.deepcopy(message)
+
+        self.assertEqual(repr(copied), "MSG_START_NEW_GAME")
+        self.assertEqual(copied.game.fen(), game.fen())
+        self.assertIsNot(copied.game, game)
+        self.assertEqual(copied.variant, "3check")
+
+
+class TestMessageDispatch(unittest.TestCase):
+    def tearDown(self):
+        utilities.msgdisplay_devices.clear()
+        utilities.dgtdisplay_devices.clear()
+
+    def test_handlers_build_dispatch_table_and_subscription(self):
+        class Consumer(MessageDispatch):
+            def __init__(self):
+                self.seen = []
+
+            @handles(Message.LEVEL, Message.OPENING_BOOK)
+            async def _on_settings(self, message):
+                self.seen.append(repr(message))
+
+        consumer = Consumer()
+
+        self.assertEqual(Consumer.message_types, {Message.LEVEL, Message.OPENING_BOOK})
+        self.assertTrue(asyncio.run(consumer.dispatch(Message.LEVEL())))
+        self.assertFalse(asyncio.run(consumer.dispatch(Message.NEW_PV())))
+        self.assertEqual(consumer.seen, ["MSG_LEVEL"])
+
+    def test_show_only_queues_subscribed_messages(self):
+        async def show():
+            everything = DisplayMsg(asyncio.get_running_loop())
+            pgn_like = DisplayMsg(asyncio.get_running_loop())
+            pgn_like.message_types = PgnDisplay.message_types
+            await DisplayMsg.show(Message.NEW_PV(pv=[], mode=None, game=chess.Board()))
+            await DisplayMsg.show(Message.LEVEL(level_text=None, level_name="", do_speak=False))
+            return everything.msg_queue.qsize(), pgn_like.msg_queue.qsize()
+
+        self.assertEqual(asyncio.run(show()), (2, 1))
+
+    def test_dgt_commands_only_reach_the_addressed_device(self):
+        async def show():
+            ser, web = FakeIface("ser"), FakeIface("web")
+            await DisplayDgt.show(Dgt.DISPLAY_TEXT(large_text="hello", devs={"web"}))
+            for iface in (ser, web):
+                while not iface.dgt_queue.empty():
+                    await iface._process_message(iface.dgt_queue.get_nowait())
+            return ser.texts, web.texts
+
+        self.assertEqual(asyncio.run(show()), ([], ["hello"]))
+
+    def test_subscriptions_cover_every_handled_message(self):
+        for display, method in (
+            (DgtDisplay, DgtDisplay._process_message),
+            (WebDisplay, WebDisplay.task),
+            (PicoTalkerDisplay, PicoTalkerDisplay.process_picotalker_messages),
+        ):
+            with self.subTest(display=display.__name__):
+                self.assertEqual(isinstance_message_classes(method), set(display.message_types))
+        self.assertIn(Message.SAVE_GAME, PgnDisplay.handlers)
+
+    def test_benchmark_queues_less_with_subscriptions(self):
+        report = run_benchmark(builtin_trace(moves=2), repeat=1)
+
+        self.assertEqual(report["broadcast"]["queued"]["PgnDisplay"], report["messages"])
+        self.assertLess(report["subscribed"]["queued"]["PgnDisplay"], report["messages"])
+        self.assertEqual(utilities.msgdisplay_devices, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,48 +13,105 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock
 
-from eboard.move_debouncer import MoveDebouncer
+from eboard.move_debouncer import DebounceScheduler, MoveDebouncer, is_move_extendable
 
 
-@patch("eboard.move_debouncer.Timer.cancel")
-@patch("eboard.move_debouncer.Timer.start")
 class TestMoveDebouncer(unittest.TestCase):
 
-    def test_timer_is_started_for_extendable_move(self, MockedTimer_start, MockedTimer_cancel):
-        d = MoveDebouncer(1000, lambda fen: None)
+    def setUp(self):
+        self.scheduler = MagicMock()
+        self.call_later = self.scheduler.call_later
+        self.cancel = self.call_later.return_value.cancel
+
+    def test_timer_is_started_for_extendable_move(self):
+        d = MoveDebouncer(1000, lambda fen: None, self.scheduler)
         d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")  # start position
         d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR")  # pawn on e2 picked up
         d.update("rnbqkbnr/pppppppp/8/8/8/4P3/PPPP1PPP/RNBQKBNR")  # pawn put down on e3
-        MockedTimer_start.assert_called_once()
-        MockedTimer_cancel.assert_not_called()
+        self.call_later.assert_called_once()
+        self.cancel.assert_not_called()
 
-    def test_timer_is_canceled_for_non_extendable_move(self, MockedTimer_start, MockedTimer_cancel):
-        d = MoveDebouncer(1000, lambda fen: None)
+    def test_timer_is_canceled_for_non_extendable_move(self):
+        d = MoveDebouncer(1000, lambda fen: None, self.scheduler)
         d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")  # start position
         d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR")  # pawn on e2 picked up
         d.update("rnbqkbnr/pppppppp/8/8/8/4P3/PPPP1PPP/RNBQKBNR")  # pawn put down on e3
-        MockedTimer_start.reset_mock()
+        self.call_later.reset_mock()
         d.update("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR")  # pawn put down on e4
-        MockedTimer_cancel.assert_called_once()
-        MockedTimer_start.assert_not_called()
+        self.cancel.assert_called_once()
+        self.call_later.assert_not_called()
 
-    def test_rook_move_is_extendable(self, MockedTimer_start, MockedTimer_cancel):
-        d = MoveDebouncer(1000, lambda fen: None)
+    def test_rook_move_is_extendable(self):
+        d = MoveDebouncer(1000, lambda fen: None, self.scheduler)
         d.update("rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN2/PPP1BPP1/RNBQK2R")
         d.update("rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN2/PPP1BPP1/RNBQK3")  # remove rook from h1
         d.update("rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN2/PPP1BPPR/RNBQK3")  # place rook on h2
         d.update("rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN1R/PPP1BPP1/RNBQK3")  # place rook on h3
-        self.assertEqual(2, MockedTimer_start.call_count)
+        self.assertEqual(2, self.call_later.call_count)
+        rook_on_h3 = "rn1qk2r/pp2ppbp/2p2np1/3p1b1P/3P4/4PN1R/PPP1BPP1/RNBQK3"
+        self.call_later.assert_called_with(1.0, d.callback, rook_on_h3)
 
-    def test_ignore_knight_move(self, MockedTimer_start, MockedTimer_cancel):
-        d = MoveDebouncer(1000, lambda fen: None)
+    def test_ignore_knight_move(self):
+        d = MoveDebouncer(1000, lambda fen: None, self.scheduler)
         d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")  # start position
         d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKB1R")  # Knight on g1 picked up
         d.update("rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R")  # Knight put down on f3
-        MockedTimer_start.assert_not_called()
+        self.call_later.assert_not_called()
+
+    def test_extendability_is_cached_per_fen_pair(self):
+        is_move_extendable.cache_clear()
+        start = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"
+        e3 = "rnbqkbnr/pppppppp/8/8/8/4P3/PPPP1PPP/RNBQKBNR"
+        self.assertTrue(is_move_extendable(start, e3))
+        self.assertTrue(is_move_extendable(start, e3))
+        self.assertFalse(is_move_extendable(start, "rnbqkbnr/pppppppp/8/8/8/4P3/PPPPPPPP/RNBQKBNR"))  # no move
+        self.assertEqual(1, is_move_extendable.cache_info().hits)
+
+    def test_two_pieces_lifted_is_not_extendable(self):
+        before = "rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR"
+        both_lifted = "rnbqkbnr/ppp1pppp/8/8/8/8/PPPP1PPP/RNBQKBNR"  # e4 and d5 up during the capture
+        self.assertFalse(is_move_extendable(before, both_lifted))
+
+
+class TestDebounceScheduler(unittest.TestCase):
+
+    def test_only_the_last_update_is_delivered(self):
+        delivered = []
+        done = threading.Event()
+
+        def callback(fen):
+            delivered.append(fen)
+            done.set()
+
+        d = MoveDebouncer(20, callback, DebounceScheduler())
+        d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+        d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR")  # pawn on e2 picked up
+        d.update("rnbqkbnr/pppppppp/8/8/8/4P3/PPPP1PPP/RNBQKBNR")  # pawn slides over e3
+        d.update("rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR")  # and is lifted again
+        self.assertTrue(done.wait(2))
+        self.assertEqual(
+            [
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR",
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR",
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPP1PPP/RNBQKBNR",
+            ],
+            delivered,
+        )
+
+    def test_calls_run_in_deadline_order_on_one_thread(self):
+        scheduler = DebounceScheduler()
+        calls = []
+        done = threading.Event()
+        scheduler.call_later(0.05, lambda: (calls.append(("late", threading.current_thread())), done.set()))
+        scheduler.call_later(0.01, lambda: calls.append(("early", threading.current_thread())))
+        scheduler.call_later(0.02, calls.append, "cancelled").cancel()
+        self.assertTrue(done.wait(2))
+        self.assertEqual(["early", "late"], [name for name, _ in calls])
+        self.assertEqual({scheduler.thread}, {thread for _, thread in calls})
 
 
 if __name__ == "__main__":
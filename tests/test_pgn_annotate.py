@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import chess
+import chess.pgn
+from chess.engine import Cp, PovScore
+
+from pgn_annotate import PROGRESS_SUFFIX, AnnotationJob, AnnotatorPool, annotate_file, position_tasks, read_games
+
+# 3...Nc6?? leaves the white queen on g4 to the bishop
+GAME = """[Event "Club"]
+[White "A"]
+[Black "B"]
+[Result "*"]
+
+1. e4 e5 2. Qg4 d6 3. Nf3 Nc6 *
+"""
+
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300, chess.ROOK: 500, chess.QUEEN: 900}
+
+
+class FakeEngine:
+    """Scores a move by the material it captures, the same at every depth."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.analysed = []
+
+    def get_name(self):
+        return "Fake"
+
+    async def analyse_position(self, board, limit, multipv=None, root_moves=None):
+        if self.fail:
+            return []
+        self.analysed.append(board.fen())
+        infos = []
+        for move in root_moves or board.legal_moves:
+            captured = board.piece_at(move.to_square)
+            score = PIECE_VALUES.get(captured.piece_type, 0) if captured else 0
+            infos.append({"pv": [move], "score": PovScore(Cp(score), board.turn), "depth": limit.depth})
+        infos.sort(key=lambda info: info["score"].relative.score(), reverse=True)
+        return infos[: multipv or 1]
+
+
+class TestPgnAnnotate(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.pgn_file = os.path.join(tmp_dir.name, "club.pgn")
+        with open(self.pgn_file, "w") as pgn:
+            pgn.write(GAME)
+        self.output_file = os.path.join(tmp_dir.name, "club-annotated.pgn")
+
+    def _annotate(self, engines, progress=None):
+        return asyncio.run(annotate_file(self.pgn_file, engines, depth=12, multipv=5, progress=progress))
+
+    def test_blunder_is_annotated_with_nag_and_better_line(self):
+        updates = []
+
+        async def progress(done, total, task):
+            updates.append((done, total))
+
+        output_file = self._annotate([FakeEngine(), FakeEngine()], progress)
+
+        self.assertEqual(output_file, self.output_file)
+        game = read_games(output_file)[0]
+        nodes = list(game.mainline())
+        blunder = nodes[5]
+        self.assertIn(chess.pgn.NAG_BLUNDER, blunder.nags)
+        self.assertIn("Best: Bxg4", blunder.comment)
+        self.assertIn(chess.Move.from_uci("c8g4"), [variation.move for variation in blunder.parent.variations])
+        self.assertFalse(nodes[0].nags)
+        self.assertTrue(game.headers["Annotator"].startswith("PicoTutor Fake"))
+        self.assertEqual(updates[-1], (6, 6))
+        self.assertFalse(os.path.exists(output_file + PROGRESS_SUFFIX))
+
+    def test_interrupted_run_continues_from_progress_file(self):
+        tasks = position_tasks(read_games(self.pgn_file))
+        engine = FakeEngine()
+
+        async def first_half():
+            results = []
+
+            async def on_result(task, result):
+                results.append(result)
+
+            await AnnotatorPool([engine], depth=12, multipv=5).run(tasks[:4], on_result)
+            return results
+
+        with open(self.output_file + PROGRESS_SUFFIX, "w") as progress:
+            progress.write(json.dumps({"source": "club.pgn", "depth": 12}) + "\n")
+            for result in asyncio.run(first_half()):
+                progress.write(json.dumps(result) + "\n")
+            progress.write('{"key": "0:5:')  # cut short
+
+        second = FakeEngine()
+        self._annotate([second])
+
+        self.assertEqual(set(second.analysed), {tasks[4].fen, tasks[5].fen})
+        self.assertIn(chess.pgn.NAG_BLUNDER, list(read_games(self.output_file)[0].mainline())[5].nags)
+
+    def test_failing_engine_leaves_the_work_to_the_others(self):
+        working = FakeEngine()
+
+        self._annotate([FakeEngine(fail=True), working])
+
+        self.assertEqual(len({fen for fen in working.analysed}), 6)
+        self.assertFalse(os.path.exists(self.output_file + PROGRESS_SUFFIX))
+
+    def test_progress_file_is_kept_when_positions_are_missing(self):
+        self._annotate([FakeEngine(fail=True)])
+
+        self.assertTrue(os.path.exists(self.output_file))
+        self.assertTrue(os.path.exists(self.output_file + PROGRESS_SUFFIX))
+
+
+class TestAnnotationJob(unittest.IsolatedAsyncioTestCase):
+    async def test_engine_start_error_fails_the_job(self):
+        job = AnnotationJob("games/games.pgn", "engines/missing", workers=1)
+
+        with patch("pgn_annotate.AnnotationJob.current", job):
+            with patch("pgn_annotate.open_engines", new=AsyncMock(side_effect=OSError("no engine"))):
+                with self.assertLogs("pgn_annotate", level="ERROR"):
+                    await job.run()
+
+            self.assertEqual(job.status["state"], "failed")
+            self.assertFalse(AnnotationJob.running())
+
+
+if __name__ == "__main__":
+    unittest.main()
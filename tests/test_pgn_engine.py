@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ENGINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "engines", "pgn_engine", "pgn_engine.py")
+
+GAME = """[Event "Replay"]
+[White "A"]
+[Black "B"]
+[Result "*"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 *
+"""
+
+# pygame is blocked: the engine must not import it without audio
+RUN_ENGINE = "import runpy, sys; sys.modules['pygame'] = None; runpy.run_path(sys.argv[1], run_name='__main__')"
+
+
+class TestPgnEngine(unittest.TestCase):
+    def _bestmoves(self, commands):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pgn_file = os.path.join(tmp_dir, "replay.pgn")
+            with open(pgn_file, "w") as pgn:
+                pgn.write(GAME)
+            setup = [
+                "uci",
+                "setoption name pgn_game_file value " + pgn_file,
+                "setoption name think_time value 0",
+                "isready",
+                "ucinewgame",
+            ]
+            result = subprocess.run(
+                [sys.executable, "-c", RUN_ENGINE, ENGINE],
+                input="\n".join(setup + commands + ["quit"]) + "\n",
+                capture_output=True,
+                text=True,
+                cwd=tmp_dir,
+                timeout=30,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return [line.split()[1] for line in result.stdout.splitlines() if line.startswith("bestmove")]
+
+    def test_replays_game_moves_and_resyncs_after_wrong_guess(self):
+        bestmoves = self._bestmoves(
+            [
+                "position startpos moves e2e4",
+                "go",
+                "position startpos moves e2e4 e7e5 g1f3",
+                "go",
+                "position startpos moves e2e4 e7e5 g1f3 b8c6 d2d4",  # not the game move
+                "go",
+                "position startpos moves e2e4 e7e5 g1f3 b8c6 f1b5",  # taken back and corrected
+                "go",
+            ]
+        )
+
+        self.assertEqual(bestmoves, ["e7e5", "b8c6", "0000", "a7a6"])
+
+    def test_fen_position_is_found_in_game(self):
+        fen = "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 2"
+
+        bestmoves = self._bestmoves(["position fen " + fen + " moves g1f3", "go"])
+
+        self.assertEqual(bestmoves, ["b8c6"])
+
+
+if __name__ == "__main__":
+    unittest.main()
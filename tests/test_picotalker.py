@@ -8,7 +8,7 @@ from unittest.mock import Mock, patch
 
 import numpy as np
 
-from picotalker import PicoTalkerDisplay
+from picotalker import PicoTalkerDisplay, load_native_audio
 
 
 class TestPicoTalkerSoxBackend(unittest.TestCase):
@@ -55,6 +55,10 @@ class TestPicoTalkerSoxBackend(unittest.TestCase):
 
 
 class TestPicoTalkerReplayGain(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_native_audio()
+
     def test_read_replaygain_track_gain_from_ogg_comment_bytes(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             voice_file = Path(tmpdir) / "voice.ogg"
@@ -97,5 +101,39 @@ class TestPicoTalkerReplayGain(unittest.TestCase):
         self.assertIs(adjusted, samples)
 
 
+class TestPicoTalkerWebAudioClips(unittest.TestCase):
+    def test_voice_clip_is_sent_as_versioned_url(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            voice_file = Path(tmpdir) / "en" / "al" / "check.ogg"
+            voice_file.parent.mkdir(parents=True)
+            voice_file.write_bytes(b"OggS")
+
+            with patch("picotalker.WEB_AUDIO_VOICES_DIR", Path(tmpdir).resolve()):
+                clip = PicoTalkerDisplay._encode_voice_file_for_web(str(voice_file), 1.1)
+
+        self.assertEqual(clip["id"], "en/al/check.ogg")
+        self.assertTrue(clip["url"].startswith("/voices/en/al/check.ogg?v="))
+        self.assertEqual(clip["mime_type"], "audio/ogg")
+        self.assertEqual(clip["rate"], 1.1)
+        self.assertNotIn("base64", clip)
+
+    def test_clip_outside_voices_dir_is_encoded_once_per_mtime(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            voice_file = Path(tmpdir) / "beep.wav"
+            voice_file.write_bytes(b"RIFF")
+
+            with patch("picotalker.Path.read_bytes", autospec=True, side_effect=Path.read_bytes) as read_mock:
+                first = PicoTalkerDisplay._encode_voice_file_for_web(str(voice_file), 1.0)
+                second = PicoTalkerDisplay._encode_voice_file_for_web(str(voice_file), 0.9)
+
+        self.assertEqual(read_mock.call_count, 1)
+        self.assertEqual(first["base64"], "UklGRg==")
+        self.assertEqual(second["base64"], first["base64"])
+        self.assertEqual(second["rate"], 0.9)
+
+    def test_missing_clip_returns_none(self):
+        self.assertIsNone(PicoTalkerDisplay._encode_voice_file_for_web("/nonexistent/clip.ogg", 1.0))
+
+
 if __name__ == "__main__":
     unittest.main()
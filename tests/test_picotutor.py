@@ -517,6 +517,29 @@ class TestPicotutorAnalysisControl(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(17, tutor.deep_depth_applied)
         self.assertEqual(17, tutor.get_applied_deep_depth())
 
+    async def test_deep_thread_limit_applies_like_a_request(self):
+        tutor = PicoTutor(i_ucishell=self.uci_shell, i_engine_path="engines/x86_64/a-stock8")
+        tutor.best_engine = Mock()
+        tutor.best_engine.loaded_ok.return_value = True
+        tutor.best_engine.is_analyser_running.return_value = False
+        tutor.best_engine.get_options.return_value = {"Threads": Mock()}
+        tutor.best_engine.send = AsyncMock()
+        tutor.deep_thread_choices = c.DESKTOP_DEEP_THREAD_CHOICES
+
+        self.assertTrue(tutor.request_deep_threads(4))
+        tutor.limit_deep_threads(2)
+        await tutor._apply_requested_deep_settings()
+
+        tutor.best_engine.option.assert_called_once_with("Threads", 2)
+        self.assertEqual(4, tutor.get_requested_deep_threads())
+        self.assertEqual(2, tutor.get_applied_deep_threads())
+
+        tutor.limit_deep_threads(None)
+        await tutor._apply_requested_deep_settings()
+
+        tutor.best_engine.option.assert_called_with("Threads", 4)
+        self.assertEqual(4, tutor.get_applied_deep_threads())
+
     async def test_next_position_restarts_running_analyser_with_requested_settings(self):
         tutor = PicoTutor(i_ucishell=self.uci_shell, i_engine_path="engines/x86_64/a-stock8")
         tutor.watcher_on = True
@@ -0,0 +1,118 @@
+import logging
+import os
+import queue
+import tempfile
+import time
+import unittest
+from logging.handlers import QueueHandler
+
+from queued_log import BatchedRotatingFileHandler, LogListener, logger_levels, set_logger_level
+
+
+class TestQueuedLog(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.log_file = os.path.join(tmp_dir.name, "picochess.log")
+        self.handler = BatchedRotatingFileHandler(self.log_file, maxBytes=1024 * 1024, backupCount=1)
+        self.handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        self.log_queue = queue.SimpleQueue()
+        self.logger = logging.getLogger("tests.queued_log")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(QueueHandler(self.log_queue))
+        self.addCleanup(self.logger.handlers.clear)
+
+    def _listen(self, flush_interval):
+        listener = LogListener(self.log_queue, self.handler, flush_interval=flush_interval)
+        listener.start()
+        self.addCleanup(self.handler.close)
+        self.addCleanup(listener.stop)
+        return listener
+
+    def _wait_for_file(self, text, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with open(self.log_file) as log:
+                content = log.read()
+            if text in content:
+                return content
+            time.sleep(0.01)
+        return content
+
+    def test_debug_records_stay_buffered_until_a_warning(self):
+        self._listen(flush_interval=60)
+        self.logger.debug("first %s", "debug")
+        time.sleep(0.1)
+
+        with open(self.log_file) as log:
+            self.assertEqual(log.read(), "")
+
+        self.logger.warning("now")
+        self.assertEqual(self._wait_for_file("WARNING now"), "DEBUG first debug\nWARNING now\n")
+
+    def test_timer_flushes_buffered_records(self):
+        self._listen(flush_interval=0.05)
+        self.logger.info("later")
+
+        self.assertIn("INFO later", self._wait_for_file("INFO later"))
+
+    def test_stop_writes_the_rest(self):
+        listener = self._listen(flush_interval=60)
+        self.logger.debug("last words")
+
+        listener.stop()
+
+        with open(self.log_file) as log:
+            self.assertEqual(log.read(), "DEBUG last words\n")
+
+    def test_size_limit_does_not_write_each_record(self):
+        self.handler.close()
+        self.handler = BatchedRotatingFileHandler(self.log_file, maxBytes=1024 * 1024, backupCount=1)
+        self.handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        listener = self._listen(flush_interval=60)
+        for index in range(100):
+            self.logger.debug("record %d", index)
+        time.sleep(0.1)
+
+        self.assertEqual(os.path.getsize(self.log_file), 0)
+
+        listener.stop()
+        self.assertEqual(os.path.getsize(self.log_file), self.handler.stream_size)
+
+    def test_rotates_on_buffered_size(self):
+        self.handler.close()
+        self.handler = BatchedRotatingFileHandler(self.log_file, maxBytes=100, backupCount=1)
+        self.handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        listener = self._listen(flush_interval=60)
+        for index in range(10):
+            self.logger.debug("record %d", index)  # 15 bytes each, 6 fit below 100
+        listener.stop()
+
+        with open(self.log_file + ".1") as log:
+            self.assertEqual(log.read().count("\n"), 6)
+        with open(self.log_file) as log:
+            self.assertEqual(log.read(), "DEBUG record 6\nDEBUG record 7\nDEBUG record 8\nDEBUG record 9\n")
+
+
+class TestLoggerLevels(unittest.TestCase):
+    def setUp(self):
+        self.module_logger = logging.getLogger("tests.queued_log.levels")
+        self.addCleanup(self.module_logger.setLevel, logging.NOTSET)
+
+    def test_set_level_of_one_module(self):
+        self.assertTrue(set_logger_level("tests.queued_log.levels", "debug"))
+
+        entry = [entry for entry in logger_levels()["loggers"] if entry["name"] == "tests.queued_log.levels"][0]
+        self.assertEqual(entry["level"], "debug")
+        self.assertEqual(entry["effective"], "debug")
+        self.assertTrue(self.module_logger.isEnabledFor(logging.DEBUG))
+
+    def test_unknown_logger_or_level_is_refused(self):
+        self.assertFalse(set_logger_level("no.such.module", "debug"))
+        self.assertFalse(set_logger_level("tests.queued_log.levels", "verbose"))
+        self.assertEqual(self.module_logger.level, logging.NOTSET)
+
+
+if __name__ == "__main__":
+    unittest.main()
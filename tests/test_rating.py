@@ -72,6 +72,21 @@ class TestRating(unittest.TestCase):
 
         self.assertEqual(Rating.MIN_RATING_DEVIATION, rating.rating_deviation)
 
+    def test_rate_period_glicko2_example(self):
+        rating = Rating(1500, 200).rate_period(
+            [(Rating(1400, 30), Result.WIN), (Rating(1550, 100), Result.LOSS), (Rating(1700, 300), Result.LOSS)]
+        )
+        self.assertTrue(rating.is_similar_to(Rating(1464.050671, 151.516522)))
+        self.assertAlmostEqual(0.059996, rating.volatility, places=6)
+
+    def test_period_without_games_grows_deviation_up_to_maximum(self):
+        rating = Rating(1500, 50)
+
+        self.assertTrue(rating.rate_period([]).is_similar_to(Rating(1500, 51.074850)))
+        for _ in range(2000):
+            rating = rating.rate_period([])
+        self.assertEqual(Rating.MAX_RATING_DEVIATION, rating.rating_deviation)
+
 
 class TestDetermineResult(unittest.TestCase):
 
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from uci.rating import Rating, Result
+from uci.rating_store import RatingStore
+
+WEEK = Rating.RATING_PERIOD_DAYS * 86400
+
+
+class TestRatingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = RatingStore(Path(self.folder.name) / "games" / "ratings.db")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_empty_store_has_the_initial_rating(self):
+        self.assertIsNone(self.store.rating())
+        self.assertTrue(self.store.rating(Rating(1400, 100)).is_similar_to(Rating(1400, 100)))
+        self.assertEqual([], self.store.curve())
+
+    def test_games_of_a_rating_period_are_rated_together(self):
+        initial = Rating(1500, 200)
+        self.store.record("Stockfish", "Elo@1400", 1400, Result.WIN, initial, played=0)
+        self.store.record("Stockfish", "Elo@1550", 1550, Result.LOSS, initial, played=10)
+        last = self.store.record("Stockfish", "Elo@1700", 1700, Result.LOSS, initial, played=20)
+
+        expected = initial.rate_period(
+            [(Rating(1400, 0), Result.WIN), (Rating(1550, 0), Result.LOSS), (Rating(1700, 0), Result.LOSS)]
+        )
+        self.assertTrue(last.is_similar_to(expected))
+        self.assertTrue(self.store.rating(initial, now=30).is_similar_to(expected))
+
+    def test_periods_without_games_grow_the_deviation(self):
+        initial = Rating(1500, 200)
+        self.store.record("Stockfish", "Elo@1400", 1400, Result.WIN, initial, played=0)
+
+        after_game = initial.rate_period([(Rating(1400, 0), Result.WIN)])
+        self.assertTrue(self.store.rating(initial, now=WEEK - 1).is_similar_to(after_game))
+        # at 2 weeks the empty second period is over, the running third one does not count yet
+        later = self.store.rating(initial, now=2 * WEEK + 1)
+        self.assertTrue(later.is_similar_to(after_game.rate_period([])))
+
+    def test_curve_has_one_point_per_rating_period_and_filters(self):
+        self.store.record("Stockfish", "Elo@1350", 1350, Result.WIN, Rating(1400, 100), played=0)
+        second = self.store.record("Stockfish", "Elo@1350", 1400, Result.DRAW, Rating(1400, 100), played=10)
+        third = self.store.record("Komodo", "", 1400, Result.LOSS, Rating(1400, 100), played=WEEK + 1)
+
+        curve = self.store.curve()
+        self.assertEqual([10, WEEK + 1], [point["played"] for point in curve])
+        self.assertEqual([int(second.rating), int(third.rating)], [point["rating"] for point in curve])
+        self.assertEqual([(2, 1.5), (1, 0.0)], [(point["games"], point["score"]) for point in curve])
+        self.assertEqual([int(second.rating)], [point["rating"] for point in self.store.curve(engine="Stockfish")])
+        self.assertEqual([], self.store.curve(engine="Stockfish", level="Elo@2000"))
+
+    def test_rating_set_by_hand_starts_the_history_again(self):
+        self.store.record("Stockfish", "Elo@1350", 1350, Result.WIN, Rating(1400, 100), played=0)
+        self.store.reset(Rating(1800, Rating.MAX_RATING_DEVIATION), played=10)
+
+        self.assertTrue(self.store.rating(Rating(1400, 100), now=20).is_similar_to(Rating(1800, 350)))
+        after = self.store.record("Stockfish", "Elo@1800", 1800, Result.DRAW, Rating(1400, 100), played=30)
+        self.assertTrue(after.is_similar_to(Rating(1800, 350).rate_period([(Rating(1800, 0), Result.DRAW)])))
+        self.assertEqual([int(after.rating)], [point["rating"] for point in self.store.curve()])
+
+
+if __name__ == "__main__":
+    unittest.main()
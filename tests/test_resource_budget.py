@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import Mock
+
+from chess.engine import Option
+
+import picotutor_constants as c
+from picotutor import PicoTutor
+from resource_budget import ResourceBudget, hash_size, local_threads
+from uci.engine import UciShell
+
+
+def engine(threads=None, hash_mb=None, remote=False, mame=False):
+    """Engine with Threads and Hash options, threads and hash_mb are the values picochess set."""
+    options = {
+        "Threads": Option("Threads", "spin", 1, 1, 1024, None),
+        "Hash": Option("Hash", "spin", 16, 1, 33554432, None),
+    }
+    configured = {}
+    if threads is not None:
+        configured["Threads"] = str(threads)
+    if hash_mb is not None:
+        configured["Hash"] = str(hash_mb)
+    result = Mock()
+    result.loaded_ok.return_value = True
+    result.is_remote = remote
+    result.is_mame_engine.return_value = mame
+    result.get_options.return_value = options
+    result.get_pgn_options.return_value = configured
+    return result
+
+
+class TestResourceBudget(unittest.TestCase):
+    def setUp(self):
+        self.tutor = PicoTutor(i_ucishell=UciShell(), i_engine_path="engines/x86_64/a-stock8")
+        self.tutor.deep_thread_choices = c.DESKTOP_DEEP_THREAD_CHOICES
+        self.tutor.request_deep_threads(4)
+        self.tutor.best_engine = engine(threads=4, hash_mb=64)
+        self.tutor.obvious_engine = engine(threads=1)
+
+    def test_local_threads(self):
+        self.assertEqual(local_threads(engine(threads="3")), 3)
+        self.assertEqual(local_threads(engine()), 1)
+        self.assertEqual(local_threads(engine(threads=8, mame=True)), 1)
+        self.assertEqual(local_threads(engine(threads=8, remote=True)), 0)
+        self.assertEqual(local_threads(None), 0)
+
+    def test_engine_default_when_picochess_sets_nothing(self):
+        stockfish = engine()
+        self.assertEqual(local_threads(stockfish), 1)
+        self.assertEqual(hash_size(stockfish), 16)
+        stockfish.get_options.return_value = {}
+        self.assertEqual(local_threads(stockfish), 1)
+        self.assertIsNone(hash_size(stockfish))
+
+    def test_tutor_gets_the_cores_the_engine_leaves_on_the_user_turn(self):
+        budget = ResourceBudget(cores=4)
+
+        self.assertTrue(budget.update(engine(threads=2, hash_mb=128), self.tutor, engine_on_user_turn=True))
+
+        self.assertEqual(self.tutor.get_deep_threads(), 1)
+        self.assertEqual(budget.allocation["user_turn"], {"engine": 2, "tutor": 1, "tutor_obvious": 1})
+        self.assertEqual(budget.allocation["engine_turn"], {"engine": 2, "tutor": 0, "tutor_obvious": 0})
+        self.assertEqual(budget.allocation["hash"], {"engine": 128, "tutor": 64})
+        self.assertFalse(budget.update(engine(threads=2, hash_mb=128), self.tutor, engine_on_user_turn=True))
+
+    def test_threads_are_handed_back_when_the_engine_is_idle(self):
+        budget = ResourceBudget(cores=4)
+        budget.update(engine(threads=2), self.tutor, engine_on_user_turn=True)
+
+        self.assertTrue(budget.update(engine(threads=2), self.tutor, engine_on_user_turn=False))
+
+        self.assertEqual(self.tutor.get_deep_threads(), 3)
+        self.assertEqual(budget.allocation["user_turn"], {"engine": 0, "tutor": 3, "tutor_obvious": 1})
+
+    def test_remote_tutor_is_not_limited(self):
+        self.tutor.best_engine.is_remote = True
+        self.tutor.obvious_engine.is_remote = True
+        budget = ResourceBudget(cores=2)
+
+        budget.update(engine(threads=2), self.tutor, engine_on_user_turn=True)
+
+        self.assertEqual(self.tutor.get_deep_threads(), 4)
+        self.assertEqual(budget.allocation["user_turn"]["tutor"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
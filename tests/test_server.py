@@ -2,7 +2,7 @@ import json
 import asyncio
 import unittest
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import chess
 
@@ -12,8 +12,11 @@ from dgt.translate import DgtTranslate
 from dgt.util import EBoard as EBoardType
 from dgt.util import GameResult, Mode, PicoCoach, PlayMode, TimeMode
 from server import (
+    ChannelActions,
+    ChannelCommand,
     EventHandler,
     WebDisplay,
+    WebGameState,
     OBOOKSRV_BOOK_FILE,
     OBOOKSRV_BOOK_LABEL,
     _apply_web_analysis_state,
@@ -34,6 +37,7 @@ from server import (
     _engine_change_events,
     _engine_menu_labels,
     _engine_menu_payload,
+    _full_game_message,
     _apply_engine_menu_sort,
     _mode_text,
     _orient_scanned_board_fen,
@@ -48,6 +52,7 @@ from server import (
 )
 from uci.engine_provider import EngineProvider
 from utilities import version as pico_version
+from web_auth import SessionTokens
 
 
 class TestSettingsTemplate(unittest.TestCase):
@@ -427,6 +432,101 @@ class TestServerWebDisplayGameEnd(unittest.IsolatedAsyncioTestCase):
         self.assertFalse(shared["system_info"]["game_started"])
 
 
+class TestWebGameState(unittest.TestCase):
+    def test_push_follows_the_game_one_ply_at_a_time(self):
+        board = chess.Board()
+        state = WebGameState()
+        state.reset(board)
+
+        board.push_san("e4")
+        ply = state.push(board)
+
+        self.assertEqual({"san": "e4", "uci": "e2e4", "halfmove": 1}, ply)
+        self.assertEqual(2, state.seq)
+        self.assertTrue(state.follows(board))
+        self.assertIn("1. e4", state.pgn())
+
+    def test_push_refuses_a_game_it_cannot_follow(self):
+        board = chess.Board()
+        state = WebGameState()
+        state.reset(board)
+        board.push_san("e4")
+        board.push_san("e5")
+
+        self.assertIsNone(state.push(board))  # two plies ahead
+        self.assertEqual(1, state.seq)
+
+    def test_variant_board_is_kept_in_step(self):
+        board = chess.Board()
+        state = WebGameState()
+        state.reset(board, "atomic")
+        board.push_san("e4")
+        self.assertIsNone(state.push(board))  # the first move switches the PGN to the variant
+        state.reset(board, "atomic")
+        for san in ("d5", "exd5"):
+            board.push_san(san)
+            self.assertIsNotNone(state.push(board))
+
+        self.assertIsInstance(state.variant_board(board), chess.variant.AtomicBoard)
+        self.assertIsNone(state.board.piece_at(chess.D5))  # the capture exploded
+
+    def test_new_tutor_variations_are_reported_once(self):
+        board = chess.Board()
+        state = WebGameState()
+        state.reset(board)
+        board.push_san("e4")
+        state.push(board)
+        picotutor = Mock()
+        key = (1, chess.Move.from_uci("e2e4"), chess.BLACK)  # turn after the evaluated move
+        picotutor.get_eval_moves.return_value = {key: {"variations": [{"moves": ["d2d4"]}]}}
+
+        self.assertTrue(state.add_tutor_variations(picotutor))
+        self.assertFalse(state.add_tutor_variations(picotutor))
+        self.assertIn("( 1. d4 )", state.pgn())
+
+
+class TestServerWebDisplayMoveDelta(unittest.IsolatedAsyncioTestCase):
+    async def test_moves_send_only_the_new_ply(self):
+        board = chess.Board()
+        shared = {"headers": {}}
+        display = WebDisplay(shared, asyncio.get_running_loop())
+
+        with patch("server.EventHandler.write_to_clients") as write_to_clients:
+            await display.task(Message.START_NEW_GAME(game=board.copy(), newgame=False))
+            board.push_san("e4")
+            move = board.peek()
+            await display.task(Message.USER_MOVE_DONE(move=move, fen=board.fen(), turn=board.turn, game=board.copy()))
+
+        new_game, user_move = [call.args[0] for call in write_to_clients.call_args_list if "seq" in call.args[0]]
+        self.assertIn("pgn", new_game)
+        self.assertNotIn("pgn", user_move)
+        self.assertEqual(new_game["seq"] + 1, user_move["seq"])
+        self.assertEqual("e4", user_move["ply"]["san"])
+        self.assertEqual("e2e4", user_move["move"])
+        self.assertEqual("user", user_move["play"])
+        # a client connecting now gets the full game
+        self.assertIn("1. e4", _full_game_message(shared)["pgn"])
+        self.assertNotIn("ply", _full_game_message(shared))
+
+    async def test_computer_move_is_sent_when_done_on_the_board(self):
+        board = chess.Board()
+        shared = {"headers": {}, "system_info": {"has_board": True}}
+        display = WebDisplay(shared, asyncio.get_running_loop())
+
+        with patch("server.EventHandler.write_to_clients") as write_to_clients:
+            await display.task(Message.START_NEW_GAME(game=board.copy(), newgame=False))
+            move = chess.Move.from_uci("g1f3")
+            await display.task(
+                Message.COMPUTER_MOVE(move=move, ponder=None, game=board.copy(), wait=False, is_user_move=False)
+            )
+            self.assertFalse(any("ply" in call.args[0] for call in write_to_clients.call_args_list))
+            await display.task(Message.COMPUTER_MOVE_DONE())
+
+        done = write_to_clients.call_args_list[-1].args[0]
+        self.assertEqual("Nf3", done["ply"]["san"])
+        self.assertEqual("computer", done["play"])
+
+
 class TestServerWebBookSelection(unittest.TestCase):
     def test_web_book_choices_include_obooksrv_first(self):
         books = _web_book_choices()
@@ -629,6 +729,61 @@ class TestServerChannelAuth(unittest.TestCase):
             self.assertFalse(_channel_action_requires_remote_auth(action), action)
 
 
+class TestServerWebSocketCommands(unittest.IsolatedAsyncioTestCase):
+    class Client:
+        def __init__(self, remote_ip):
+            self.shared = {"headers": {}}
+            self.user = None
+            self.request = type("Request", (), {"remote_ip": remote_ip})()
+
+    async def test_move_command_fires_remote_move_and_is_acknowledged(self):
+        client = self.Client("192.168.1.20")
+        command = {"id": 7, "action": "move", "source": "e2", "target": "e4", "promotion": "", "fen": "x"}
+
+        with patch("server.Observable.fire", new=AsyncMock()) as fire:
+            ack = await EventHandler.run_command(client, command)
+
+        self.assertEqual(ack, {"event": "Ack", "id": 7, "status": 200})
+        event = fire.call_args[0][0]
+        self.assertEqual(event.move, chess.Move.from_uci("e2e4"))
+
+    async def test_missing_argument_is_a_bad_request(self):
+        with patch("server.Observable.fire", new=AsyncMock()) as fire:
+            ack = await EventHandler.run_command(self.Client("127.0.0.1"), {"id": 1, "action": "move"})
+
+        self.assertEqual(ack["status"], 400)
+        fire.assert_not_called()
+
+    async def test_protected_command_needs_a_session_token_from_remote(self):
+        client = self.Client("192.168.1.20")
+        token = SessionTokens()
+        command = {"id": 2, "action": "new_engine", "file": "missing-engine"}
+
+        with patch("web_auth.session_tokens", token):
+            rejected = await EventHandler.run_command(client, command)
+            bad_auth = await EventHandler.run_command(client, {"id": 3, "action": "auth", "token": "bogus"})
+            auth = await EventHandler.run_command(client, {"id": 4, "action": "auth", "token": token.issue("pi")})
+            with patch("uci.engine_provider.EngineProvider.resolve_engine", return_value=None):
+                accepted = await EventHandler.run_command(client, command)
+
+        self.assertEqual(rejected["status"], 401)
+        self.assertEqual(bad_auth["status"], 401)
+        self.assertEqual(auth, {"event": "Ack", "id": 4, "status": 200, "result": {"success": True}})
+        self.assertEqual(client.user, "pi")
+        self.assertEqual(accepted["status"], 200)
+
+    def test_command_arguments_read_like_post_arguments(self):
+        command = ChannelCommand({}, {"action": "rsound", "val": True, "name": " Pico "})
+
+        self.assertEqual(command.get_argument("val"), "true")
+        self.assertEqual(command.get_argument("name"), "Pico")
+        self.assertEqual(command.get_argument("level", ""), "")
+
+    def test_channel_actions_need_an_authorize(self):
+        with self.assertRaises(TypeError):
+            ChannelActions()
+
+
 class TestServerSetPositionFromPgn(unittest.TestCase):
     def test_scanned_position_drops_unavailable_castling_rights(self):
         parsed = _build_scanned_setup_board(
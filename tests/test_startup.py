@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import unittest
+
+from startup import StartupOrchestrator, StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_import_module_records_import_time(self):
+        profiler = StartupProfiler()
+
+        module = profiler.import_module("json")
+
+        self.assertIs(module, sys.modules["json"])
+        self.assertEqual([(kind, name) for kind, name, _ in profiler.entries], [(StartupProfiler.IMPORT, "json")])
+
+    def test_phase_records_even_when_phase_fails(self):
+        profiler = StartupProfiler()
+
+        with self.assertRaises(ValueError):
+            with profiler.phase("engine open"):
+                raise ValueError("boom")
+
+        self.assertEqual(profiler.entries[0][:2], (StartupProfiler.INIT, "engine open"))
+
+    def test_report_lists_slowest_entries_first(self):
+        profiler = StartupProfiler()
+        profiler.record(StartupProfiler.INIT, "fast", 0.1)
+        profiler.record(StartupProfiler.INIT, "slow", 2.0)
+
+        lines = profiler.report()
+
+        self.assertEqual(lines[0], "init total 2.100s")
+        self.assertTrue(lines[1].endswith("slow"))
+        self.assertTrue(lines[2].endswith("fast"))
+
+    def test_log_report_is_silent_unless_enabled(self):
+        profiler = StartupProfiler()
+        profiler.record(StartupProfiler.INIT, "web server", 0.5)
+
+        with self.assertNoLogs("startup", level="INFO"):
+            profiler.log_report()
+
+
+class TestStartupOrchestrator(unittest.IsolatedAsyncioTestCase):
+    async def test_independent_steps_run_concurrently(self):
+        orchestrator = StartupOrchestrator(StartupProfiler())
+        engine_started = asyncio.Event()
+        tutor_started = asyncio.Event()
+
+        async def engine():
+            engine_started.set()
+            await tutor_started.wait()
+            return "engine"
+
+        async def tutor():
+            tutor_started.set()
+            await engine_started.wait()
+            return "tutor"
+
+        orchestrator.add("engine", engine)
+        orchestrator.add("tutor", tutor)
+        orchestrator.start()
+
+        results = await asyncio.wait_for(orchestrator.wait("engine", "tutor"), 1.0)
+
+        self.assertEqual(results, ["engine", "tutor"])
+
+    async def test_step_waits_for_its_dependencies(self):
+        orchestrator = StartupOrchestrator(StartupProfiler())
+        order = []
+
+        async def step(name):
+            await asyncio.sleep(0)
+            order.append(name)
+
+        orchestrator.add("newgame", lambda: step("newgame"), after=("engine", "book"))
+        orchestrator.add("engine", lambda: step("engine"))
+        orchestrator.add("book", lambda: step("book"))
+        orchestrator.start()
+        await orchestrator.wait("newgame")
+
+        self.assertEqual(order[-1], "newgame")
+        self.assertEqual(set(order[:2]), {"engine", "book"})
+
+    async def test_failed_step_skips_dependents_without_raising(self):
+        profiler = StartupProfiler()
+        orchestrator = StartupOrchestrator(profiler)
+
+        async def broken():
+            raise OSError("no network")
+
+        async def dependent():
+            self.fail("must not run")
+
+        orchestrator.add("location", broken)
+        orchestrator.add("theme", dependent, after=("location",))
+        with self.assertLogs("startup", level="WARNING"):
+            orchestrator.start()
+            results = await orchestrator.wait("location", "theme")
+
+        self.assertEqual(results, [None, None])
+        self.assertTrue(orchestrator.failed("location"))
+        self.assertTrue(orchestrator.failed("theme"))
+        self.assertIn((StartupProfiler.INIT, "step location"), [entry[:2] for entry in profiler.entries])
+
+    def test_dependency_cycle_is_rejected(self):
+        orchestrator = StartupOrchestrator(StartupProfiler())
+        orchestrator.add("a", asyncio.sleep, after=("b",))
+        orchestrator.add("b", asyncio.sleep, after=("a",))
+
+        with self.assertRaises(ValueError):
+            orchestrator.start()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+import chess
+
+from dgt.util import GameResult
+from picochess import PicochessState
+from picotutor import PicoTutor
+from tablebase import PICOCHESS_DIR, TABLEBASE_DIR, TB_WIN_SCORE, TablebaseProbe
+from timecontrol import TimeControl
+
+KQ_VS_KR = "3r3k/8/8/8/8/8/8/3Q3K w - - 0 1"
+# white to move: Qd1xd8 wins, every other move keeps the queens on and draws
+KQ_VS_KQ = "3q3k/8/8/8/8/8/8/3Q3K w - - 0 1"
+
+
+class FakeSyzygy:
+    """Material only tables: the side with more queens wins, everything else draws."""
+
+    def __init__(self):
+        self.probes = 0
+
+    def probe_wdl(self, board):
+        self.probes += 1
+        balance = len(board.pieces(chess.QUEEN, board.turn)) - len(board.pieces(chess.QUEEN, not board.turn))
+        return 2 if balance > 0 else -2 if balance < 0 else 0
+
+    def probe_dtz(self, board):
+        wdl = self.probe_wdl(board)
+        dtz = board.legal_moves.count() + 1
+        return 0 if wdl == 0 else (dtz if wdl > 0 else -dtz)
+
+
+def _probe():
+    return TablebaseProbe(tablebase=FakeSyzygy(), max_pieces=5)
+
+
+class TestTablebaseProbe(unittest.TestCase):
+    def test_covers_only_small_standard_endings(self):
+        probe = _probe()
+
+        self.assertTrue(probe.covers(chess.Board(KQ_VS_KR)))
+        self.assertFalse(probe.covers(chess.Board()))
+        self.assertFalse(probe.covers(chess.Board("4k3/8/8/8/8/8/8/R3K3 w Q - 0 1")))
+        self.assertIsNone(TablebaseProbe(directory="/nonexistent").probe(chess.Board(KQ_VS_KR)))
+
+    def test_relative_directory_is_below_the_picochess_folder(self):
+        self.assertEqual(TablebaseProbe("tablebases/syzygy").directory, TABLEBASE_DIR)
+        self.assertEqual(TablebaseProbe("/data/syzygy").directory, "/data/syzygy")
+        self.assertEqual(os.path.dirname(os.path.abspath(os.path.dirname(__file__))), PICOCHESS_DIR)
+
+    def test_move_scores_rank_winning_moves_first(self):
+        board = chess.Board(KQ_VS_KQ)
+
+        scores = _probe().move_scores(board)
+
+        self.assertEqual(scores[0][0], chess.Move.from_uci("d1d8"))
+        self.assertGreater(scores[0][1], TB_WIN_SCORE - 100)
+        self.assertEqual(dict(scores)[chess.Move.from_uci("d1d7")], 0)
+        self.assertEqual(board.fen(), KQ_VS_KQ)
+
+    def test_analysis_info_is_multipv_from_side_to_move(self):
+        board = chess.Board(KQ_VS_KR)
+
+        info_list = _probe().analysis_info(board)
+
+        self.assertEqual(len(info_list), board.legal_moves.count())
+        self.assertEqual([info["multipv"] for info in info_list], list(range(1, len(info_list) + 1)))
+        self.assertGreater(info_list[0]["score"].pov(chess.WHITE).score(), 0)
+
+    def test_probes_are_cached(self):
+        probe = _probe()
+        board = chess.Board(KQ_VS_KR)
+
+        probe.probe(board)
+        probes = probe.tablebase.probes
+        probe.probe(board)
+
+        self.assertEqual(probe.tablebase.probes, probes)
+        self.assertEqual(probe.hits, 1)
+
+    def test_game_result(self):
+        probe = _probe()
+
+        self.assertEqual(probe.game_result(chess.Board(KQ_VS_KR)), "1-0")
+        self.assertEqual(probe.game_result(chess.Board("3q3k/8/8/8/8/8/8/7K w - - 0 1")), "0-1")
+        self.assertEqual(probe.game_result(chess.Board("7k/8/8/8/8/8/8/R6K b - - 0 1")), "1/2-1/2")
+
+
+class TestTablebaseTutor(unittest.TestCase):
+    def test_eval_legal_moves_skips_engines_in_tablebase_endings(self):
+        tutor = PicoTutor.__new__(PicoTutor)
+        tutor.tablebase = _probe()
+        tutor.coach_on = True
+        tutor.watcher_on = False
+        tutor.board = chess.Board(KQ_VS_KQ)
+        tutor.best_info = {chess.WHITE: [], chess.BLACK: []}
+        tutor.obvious_info = {chess.WHITE: [], chess.BLACK: []}
+        tutor.best_engine = Mock(get_analysis=AsyncMock())
+        tutor.obvious_engine = Mock(get_analysis=AsyncMock())
+        tutor.log_pv_lists = Mock()
+
+        asyncio.run(tutor.eval_legal_moves(chess.BLACK, False))
+
+        tutor.best_engine.get_analysis.assert_not_called()
+        tutor.obvious_engine.get_analysis.assert_not_called()
+        self.assertEqual(tutor.best_moves[chess.BLACK][0][1], chess.Move.from_uci("d1d8"))
+        self.assertEqual(tutor.alt_best_moves[chess.BLACK], [chess.Move.from_uci("d1d8")])
+
+
+class TestTablebaseAdjudication(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.state = PicochessState(self.loop)
+        self.state.game = chess.Board(KQ_VS_KR)
+        self.state.tablebase = _probe()
+        self.state.time_control = TimeControl()
+
+    def test_adjudication_is_off_by_default(self):
+        self.assertFalse(self.state.check_game_state())
+
+    def test_won_ending_is_adjudicated(self):
+        self.state.tablebase_adjudicate = True
+
+        message = self.state.check_game_state()
+
+        self.assertEqual(message.result, GameResult.WIN_WHITE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ from contextlib import contextmanager
 from unittest.mock import patch
 
 import theme
+import utilities
 
 
 @contextmanager
@@ -26,6 +27,9 @@ def freeze_time(value):
 
 @patch("utilities.get_location")
 class TestTheme(unittest.TestCase):
+    def setUp(self):
+        utilities.location_lookup.invalidate()
+
     def test_calc_theme_for_known_astral_location(self, mocked_get_location):
         with freeze_time("2022-12-21 22:00:00"):
             self.assertEqual("dark", theme.calc_theme("auto", "auto"))
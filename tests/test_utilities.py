@@ -1,9 +1,21 @@
 import asyncio
+import os
+import tempfile
 import threading
+import time
 import unittest
 from unittest.mock import patch
 
-from utilities import AsyncRepeatingTimer, _choose_wayland_backend, get_engine_mame_par, get_window_command
+from utilities import (
+    AsyncLookup,
+    AsyncRepeatingTimer,
+    TimerWheel,
+    _choose_wayland_backend,
+    do_popen,
+    get_engine_mame_par,
+    get_window_command,
+    run_status_script,
+)
 
 
 class TestUtilities(unittest.TestCase):
@@ -71,6 +83,156 @@ class TestAsyncRepeatingTimer(unittest.IsolatedAsyncioTestCase):
         await asyncio.sleep(0)
         self.assertFalse(timer.is_running())
 
+    async def test_timers_share_one_task_and_wakeups(self):
+        loop = asyncio.get_running_loop()
+        calls = []
+        timers = [AsyncRepeatingTimer(0.05, calls.append, loop, args=[index]) for index in range(5)]
+
+        for timer in timers:
+            timer.start()
+        wheel = TimerWheel.of(loop)
+        self.assertEqual(1, len([task for task in asyncio.all_tasks() if task is wheel._task]))
+        await asyncio.sleep(0.23)
+        for timer in timers:
+            timer.stop()
+
+        self.assertEqual(4 * 5, len(calls))
+        self.assertEqual(4, wheel.wakeups)
+        self.assertFalse(wheel.slots)
+
+    async def test_repeating_timer_keeps_its_phase(self):
+        loop = asyncio.get_running_loop()
+        ticks = []
+        timer = AsyncRepeatingTimer(0.05, lambda: ticks.append(loop.time()), loop)
+
+        start = loop.time()
+        timer.start()
+        await asyncio.sleep(0.07)
+        time.sleep(0.06)  # the loop is blocked over a tick
+        await asyncio.sleep(0.09)
+        timer.stop()
+
+        # the tick due at 0.1 comes late, the next ones are on time again
+        self.assertEqual(4, len(ticks))
+        self.assertGreaterEqual(ticks[1] - start, 0.13)
+        for tick, expected in zip(ticks[2:], (0.15, 0.2)):
+            self.assertAlmostEqual(expected, tick - start, delta=TimerWheel.TICK + 0.01)
+
+    async def test_async_callback_still_running_skips_the_tick(self):
+        loop = asyncio.get_running_loop()
+        started = []
+
+        async def slow():
+            started.append(loop.time())
+            await asyncio.sleep(0.12)
+
+        timer = AsyncRepeatingTimer(0.05, slow, loop)
+        timer.start()
+        await asyncio.sleep(0.23)
+        timer.stop()
+
+        self.assertEqual(2, len(started))
+
+    async def test_set_interval_moves_the_next_tick(self):
+        loop = asyncio.get_running_loop()
+        ticks = []
+        timer = AsyncRepeatingTimer(1.0, lambda: ticks.append(loop.time()), loop)
+
+        start = loop.time()
+        timer.start()
+        await asyncio.sleep(0.02)
+        timer.set_interval(0.05)
+        await asyncio.sleep(0.14)
+        timer.stop()
+
+        self.assertEqual(2, len(ticks))
+        self.assertAlmostEqual(0.07, ticks[0] - start, delta=TimerWheel.TICK + 0.01)
+        self.assertAlmostEqual(0.12, ticks[1] - start, delta=TimerWheel.TICK + 0.01)
+
+
+class TestAsyncLookup(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_callers_share_one_call_and_result_is_cached(self):
+        release = threading.Event()
+        calls = []
+
+        def lookup():
+            calls.append(1)
+            release.wait(1)
+            return "Vienna"
+
+        cache = AsyncLookup("location", lookup, ttl=60, timeout=2, default="?")
+        first = asyncio.ensure_future(cache.get())
+        second = asyncio.ensure_future(cache.get())
+        await asyncio.sleep(0.05)
+        release.set()
+
+        self.assertEqual(["Vienna", "Vienna"], await asyncio.gather(first, second))
+        self.assertEqual("Vienna", await cache.get())
+        self.assertEqual(1, len(calls))
+
+    async def test_timeout_returns_last_value_without_waiting_for_lookup(self):
+        release = threading.Event()
+        cache = AsyncLookup("location", lambda: release.wait(1) and "late", ttl=60, timeout=0.05, default="?")
+
+        self.assertEqual("?", await cache.get())
+        release.set()
+
+    async def test_failed_or_default_result_is_retried_after_retry_ttl(self):
+        results = [Exception("no network"), "Berlin"]
+
+        def lookup():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        cache = AsyncLookup("location", lookup, ttl=60, timeout=1, default="?", retry_ttl=0)
+
+        self.assertEqual("?", await cache.get())
+        self.assertEqual("Berlin", await cache.get())
+        self.assertEqual("Berlin", cache.peek())
+
+    def test_get_blocking_uses_cache(self):
+        calls = []
+        cache = AsyncLookup("ip", lambda: calls.append(1) or "10.0.0.2", ttl=60, timeout=1)
+
+        self.assertEqual("10.0.0.2", cache.get_blocking())
+        self.assertEqual("10.0.0.2", cache.get_blocking())
+        self.assertEqual(1, len(calls))
+
+
+class TestDoPopen(unittest.TestCase):
+
+    def test_command_exceeding_timeout_is_killed(self):
+        with self.assertLogs("utilities", level="WARNING"):
+            self.assertEqual("", do_popen(["sleep", "5"], log=False, timeout=0.1))
+
+
+class TestRunStatusScript(unittest.TestCase):
+
+    def _script(self, folder, body):
+        path = os.path.join(folder, "status.sh")
+        with open(path, "w") as script:
+            script.write("#!/bin/sh\n" + body + "\n")
+        os.chmod(path, 0o755)
+        return path
+
+    def test_output_is_stripped(self):
+        with tempfile.TemporaryDirectory() as folder:
+            self.assertEqual("up to date", run_status_script(self._script(folder, "echo '  up to date'"), timeout=5))
+
+    def test_hanging_script_and_its_children_are_killed(self):
+        with tempfile.TemporaryDirectory() as folder:
+            script = self._script(folder, "sleep 5 | cat\necho late")
+            start = time.monotonic()
+            with self.assertLogs("utilities", level="WARNING"):
+                self.assertIsNone(run_status_script(script, timeout=0.1))
+            self.assertLess(time.monotonic() - start, 2)
+
+    def test_missing_script_is_none(self):
+        self.assertIsNone(run_status_script("/nonexistent/check-git-status.sh", timeout=1))
+
 
 if __name__ == "__main__":
     unittest.main()
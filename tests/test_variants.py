@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+import chess
+import chess.pgn
+import chess.variant
+
+from picochess import PicochessState
+from variants import snapshot_of, variant_fen, variant_pgn_game
+
+# white captures on d5: in atomic the capturing pawn explodes as well
+ATOMIC_MOVES = ["e2e4", "d7d5", "e4d5", "g8f6"]
+
+
+class TestVariantSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.state = PicochessState(self.loop)
+        self.state.variant = "atomic"
+        self.state._atomic_board = chess.variant.AtomicBoard()
+        for uci in ATOMIC_MOVES:
+            self.state.push_move(chess.Move.from_uci(uci))
+
+    def test_game_copy_carries_variant_fen_without_replay(self):
+        expected = chess.variant.AtomicBoard()
+        for uci in ATOMIC_MOVES:
+            expected.push_uci(uci)
+
+        game = self.state.game_copy()
+
+        self.assertNotEqual(game.fen(), expected.fen())
+        self.assertEqual(snapshot_of(game).fen(), expected.fen())
+        self.assertEqual(variant_fen(game, "atomic"), expected.fen())
+
+    def test_snapshot_is_dropped_once_the_copy_moves_on(self):
+        game = self.state.game_copy()
+        self.state.push_move(chess.Move.from_uci("b1c3"))
+
+        game.pop()
+
+        self.assertIsNone(snapshot_of(game))
+        # the replay fallback still gives the variant position
+        replayed = chess.variant.AtomicBoard()
+        for move in game.move_stack:
+            replayed.push(move)
+        self.assertEqual(variant_fen(game, "atomic"), replayed.fen())
+
+    def test_no_snapshot_when_variant_board_is_out_of_step(self):
+        self.state.game.push(chess.Move.from_uci("b1c3"))
+
+        self.assertIsNone(self.state.variant_snapshot())
+        self.assertIsNone(snapshot_of(self.state.game_copy()))
+
+    def test_snapshot_after_move(self):
+        snapshot = self.state.variant_snapshot()
+        move = chess.Move.from_uci("b1c3")
+
+        after = snapshot.after(move)
+        self.state.push_move(move)
+
+        self.assertEqual(after.fen(), self.state.get_fen())
+        self.assertEqual(snapshot.ply, len(ATOMIC_MOVES))
+
+    def test_pgn_game_matches_replayed_variant_game(self):
+        replayed = chess.variant.AtomicBoard()
+        for uci in ATOMIC_MOVES:
+            replayed.push_uci(uci)
+
+        pgn_game = variant_pgn_game(self.state.game_copy(), "atomic")
+
+        self.assertEqual(str(pgn_game), str(chess.pgn.Game.from_board(replayed)))
+
+    def test_standard_chess_has_no_snapshot(self):
+        state = PicochessState(self.loop)
+        state.push_move(chess.Move.from_uci("e2e4"))
+
+        self.assertIsNone(state.variant_snapshot())
+        self.assertIsNone(variant_fen(state.game_copy(), "chess"))
+
+
+if __name__ == "__main__":
+    unittest.main()
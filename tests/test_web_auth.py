@@ -0,0 +1,146 @@
+import base64
+import unittest
+from unittest.mock import Mock, patch
+
+import web_auth
+from web_auth import LoginThrottle, SessionTokens, authenticate_request, basic_credentials
+
+
+class FakeHandler:
+    def __init__(self, headers=None, cookie=None, remote_ip="192.168.1.20"):
+        self.request = Mock(remote_ip=remote_ip, headers=headers or {})
+        self.cookie = cookie
+        self.status = 200
+        self.headers = {}
+        self.cookies = {}
+        self.finished = None
+        self.current_user = None
+
+    def get_cookie(self, name):
+        return self.cookie
+
+    def set_cookie(self, name, value, **kwargs):
+        self.cookies[name] = value
+
+    def set_status(self, status):
+        self.status = status
+
+    def set_header(self, name, value):
+        self.headers[name] = value
+
+    def finish(self, chunk):
+        self.finished = chunk
+
+
+def _basic(username, password):
+    return {"Authorization": "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()}
+
+
+class TestSessionTokens(unittest.TestCase):
+    def test_issued_token_is_valid_until_it_expires(self):
+        tokens = SessionTokens()
+        token = tokens.issue("pi", now=1000.0)
+
+        self.assertEqual(tokens.verify(token, now=1001.0), "pi")
+        self.assertIsNone(tokens.verify(token, now=1000.0 + SessionTokens.LIFETIME + 1))
+        self.assertNotIn(token, tokens.sessions)
+
+    def test_unknown_and_revoked_tokens_are_rejected(self):
+        tokens = SessionTokens()
+        token = tokens.issue("pi")
+
+        self.assertIsNone(SessionTokens().verify(token))
+        self.assertIsNone(tokens.verify(None))
+        tokens.revoke(token)
+        self.assertIsNone(tokens.verify(token))
+
+    def test_store_is_bounded(self):
+        tokens = SessionTokens()
+        first = tokens.issue("pi")
+        for _ in range(SessionTokens.MAX_SESSIONS):
+            tokens.issue("pi")
+
+        self.assertEqual(len(tokens.sessions), SessionTokens.MAX_SESSIONS)
+        self.assertIsNone(tokens.verify(first))
+
+
+class TestLoginThrottle(unittest.TestCase):
+    def test_backoff_starts_after_free_failures_and_doubles(self):
+        throttle = LoginThrottle()
+        for _ in range(LoginThrottle.FREE_FAILURES):
+            throttle.failed("10.0.0.5", now=100.0)
+        self.assertEqual(throttle.retry_after("10.0.0.5", now=100.0), 0.0)
+
+        throttle.failed("10.0.0.5", now=100.0)
+        first = throttle.retry_after("10.0.0.5", now=100.0)
+        throttle.failed("10.0.0.5", now=100.0)
+
+        self.assertEqual(first, LoginThrottle.BASE_DELAY)
+        self.assertEqual(throttle.retry_after("10.0.0.5", now=100.0), 2 * LoginThrottle.BASE_DELAY)
+        self.assertEqual(throttle.retry_after("10.0.0.6", now=100.0), 0.0)
+
+    def test_success_clears_failures(self):
+        throttle = LoginThrottle()
+        for _ in range(LoginThrottle.FREE_FAILURES + 1):
+            throttle.failed("10.0.0.5", now=100.0)
+
+        throttle.succeeded("10.0.0.5")
+
+        self.assertEqual(throttle.retry_after("10.0.0.5", now=100.0), 0.0)
+
+
+class TestAuthenticateRequest(unittest.TestCase):
+    def setUp(self):
+        patcher_tokens = patch.object(web_auth, "session_tokens", SessionTokens())
+        patcher_throttle = patch.object(web_auth, "login_throttle", LoginThrottle())
+        self.tokens = patcher_tokens.start()
+        self.throttle = patcher_throttle.start()
+        self.addCleanup(patcher_tokens.stop)
+        self.addCleanup(patcher_throttle.stop)
+
+    def test_basic_credentials(self):
+        self.assertEqual(basic_credentials(_basic("pi", "a:b")["Authorization"]), ("pi", "a:b"))
+        self.assertIsNone(basic_credentials("Bearer x"))
+        self.assertIsNone(basic_credentials("Basic !!!"))
+
+    def test_pam_is_asked_once_then_the_session_cookie_is_used(self):
+        with patch("web_auth.pam.pam") as pam_factory:
+            pam_factory.return_value.authenticate.return_value = True
+            login = FakeHandler(headers=_basic("pi", "secret"))
+            self.assertTrue(authenticate_request(login, "Control"))
+
+            cookie = login.cookies[web_auth.SESSION_COOKIE]
+            again = FakeHandler(headers=_basic("pi", "secret"), cookie=cookie)
+            self.assertTrue(authenticate_request(again, "Control"))
+
+        pam_factory.return_value.authenticate.assert_called_once_with("pi", "secret")
+        self.assertEqual(again.current_user, "pi")
+
+    def test_session_token_header_is_accepted(self):
+        token = self.tokens.issue("pi")
+
+        with patch("web_auth.pam.pam") as pam_factory:
+            handler = FakeHandler(headers={web_auth.TOKEN_HEADER: token})
+            self.assertTrue(authenticate_request(handler, "Control"))
+
+        pam_factory.assert_not_called()
+
+    def test_failed_logins_back_off_without_asking_pam(self):
+        with patch("web_auth.pam.pam") as pam_factory:
+            pam_factory.return_value.authenticate.return_value = False
+            for _ in range(LoginThrottle.FREE_FAILURES + 1):
+                handler = FakeHandler(headers=_basic("pi", "wrong"))
+                self.assertFalse(authenticate_request(handler, "Control"))
+                self.assertEqual(handler.status, 401)
+            calls = pam_factory.return_value.authenticate.call_count
+
+            blocked = FakeHandler(headers=_basic("pi", "wrong"))
+            self.assertFalse(authenticate_request(blocked, "Control"))
+
+        self.assertEqual(blocked.status, 429)
+        self.assertIn("Retry-After", blocked.headers)
+        self.assertEqual(pam_factory.return_value.authenticate.call_count, calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,25 +11,38 @@ class DummyBoard:
 
 class TestWebVr(unittest.IsolatedAsyncioTestCase):
 
-    async def test_runclock_accumulates_fractional_delay(self):
+    async def test_runclock_counts_whole_seconds_since_clock_start(self):
         web = WebVr(shared={}, dgtboard=DummyBoard(), loop=None)
         web.side_running = ClockSide.LEFT
         web.l_time = 60
         web.r_time = 60
-        web._last_runclock_time = 100.0
-        web._runclock_elapsed_carry = 0.0
+        web._run_started = 100.0
+        web._run_times = (60, 60)
         web._display_time = Mock()
 
         tick_times = [101.1, 102.2, 103.3, 104.4, 105.5, 106.6, 107.7, 108.8, 109.9, 111.0]
 
         with patch("server.DisplayMsg.show", new=AsyncMock()):
-            with patch("server.time.time", side_effect=tick_times):
+            with patch("server.time.monotonic", side_effect=tick_times):
                 for _ in tick_times:
                     await web._runclock()
 
         self.assertEqual(49, web.l_time)
         self.assertEqual(60, web.r_time)
 
+    async def test_tick_just_before_the_full_second_counts(self):
+        web = WebVr(shared={}, dgtboard=DummyBoard(), loop=None)
+        web.side_running = ClockSide.RIGHT
+        web._run_started = 100.1
+        web._run_times = (60, 30)
+        web._display_time = Mock()
+
+        with patch("server.DisplayMsg.show", new=AsyncMock()):
+            with patch("server.time.monotonic", return_value=105.0999999):
+                await web._runclock()
+
+        self.assertEqual(25, web.r_time)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -251,8 +251,7 @@ class TestEngine(unittest.IsolatedAsyncioTestCase):
             await eng.startup({UCI_ELO: 'max(auto, "abc")'}, Rating(450.5, 123.0))
         self.assertEqual(-1, eng.engine_rating)
 
-    @patch("uci.engine.write_picochess_ini")
-    async def test_update_rating(self, _):
+    async def test_update_rating(self):
         eng = UciEngine("some_engine", UciShell(), "", self.loop)
         eng.engine = MockEngine()
         await eng.startup({UCI_ELO: "auto"}, Rating(849.5, 123.0))
@@ -260,8 +259,17 @@ class TestEngine(unittest.IsolatedAsyncioTestCase):
         await eng.update_rating(Rating(850.5, 123.0), Result.WIN)
         self.assertEqual(900, eng.engine_rating)
 
-    @patch("uci.engine.write_picochess_ini")
-    async def test_update_rating_with_eval(self, _):
+    async def test_adapt_to_rating(self):
+        eng = UciEngine("some_engine", UciShell(), "", self.loop)
+        eng.engine = MockEngine()
+        await eng.startup({UCI_ELO: "auto"}, Rating(849.5, 123.0))
+
+        await eng.adapt_to_rating(Rating(1234.0, 80.0))
+
+        self.assertEqual(1250, eng.engine_rating)
+        self.assertEqual("1250", eng.options[UCI_ELO])
+
+    async def test_update_rating_with_eval(self):
         eng = UciEngine("some_engine", UciShell(), "", self.loop)
         eng.engine = MockEngine()
         await eng.startup({UCI_ELO: "auto + 11"}, Rating(850.5, 123.0))
@@ -270,8 +278,7 @@ class TestEngine(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(890, int(new_rating.rating))
         self.assertEqual(901, eng.engine_rating)
 
-    @patch("uci.engine.write_picochess_ini")
-    async def test_update_rating_expression_error_falls_back_without_crashing(self, _):
+    async def test_update_rating_expression_error_falls_back_without_crashing(self):
         eng = UciEngine("some_engine", UciShell(), "", self.loop)
         eng.engine = MockEngine()
         await eng.startup({UCI_ELO: "auto + 11"}, Rating(850.5, 123.0))
@@ -284,6 +291,21 @@ class TestEngine(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(900, eng.engine_rating)
         self.assertIsNone(eng.uci_elo_eval_fn)
 
+    async def test_depth_listeners_are_called_until_removed(self):
+        calls = []
+
+        def listener():
+            calls.append(1)
+
+        ContinuousAnalysis.add_depth_listener(listener)
+        ContinuousAnalysis.add_depth_listener(listener)
+        ContinuousAnalysis.notify_depth("test")
+        ContinuousAnalysis.remove_depth_listener(listener)
+        ContinuousAnalysis.notify_depth("test")
+        ContinuousAnalysis.remove_depth_listener(listener)
+
+        self.assertEqual([1], calls)
+
     async def test_continuous_analysis_recovers_after_protocol_failure(self):
         recover = AsyncMock(return_value=True)
         analyser = ContinuousAnalysis(
@@ -0,0 +1,145 @@
+import asyncio
+import configparser
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from chess.engine import Option
+
+from uci.write import CACHE_FILE_NAME, level_sections, probe_engine, write_engine_ini
+
+PROBE = {"name": "Stockfish 17", "options": {"Hash": "16"}, "levels": {"Level@00": {"Skill Level": "0"}}}
+
+
+class TestLevelSections(unittest.TestCase):
+
+    def test_elo_and_skill_levels(self):
+        options = {
+            "UCI_LimitStrength": Option("UCI_LimitStrength", "check", False, None, None, None),
+            "UCI_Elo": Option("UCI_Elo", "spin", 1320, 1320, 3190, None),
+            "Skill Level": Option("Skill Level", "spin", 20, 0, 2, None),
+        }
+
+        sections = level_sections(options)
+
+        self.assertEqual({"UCI_LimitStrength": "true", "UCI_Elo": "1320"}, sections["Elo@1320"])
+        self.assertEqual({"UCI_LimitStrength": "true", "UCI_Elo": "1413"}, sections["Elo@1413"])
+        self.assertEqual({"UCI_LimitStrength": "false", "UCI_Elo": "3190"}, sections["Elo@3190"])
+        self.assertEqual({"Skill Level": "2"}, sections["Level@02"])
+        self.assertEqual({}, level_sections({"Hash": Option("Hash", "spin", 16, 1, 1024, None)}))
+
+
+class FakeProbedEngine(object):
+    """An engine whose start and quit hang, leaving the transport of its started process behind."""
+
+    def __init__(self, hang_quit: bool):
+        self.hang_quit = hang_quit
+        self.engine = None
+        self.transport = None
+        self.remote_conn = None
+        self.quit_called = False
+
+    async def open_engine(self):
+        self.transport = MagicMock()
+        await asyncio.sleep(10)
+
+    def loaded_ok(self):
+        return self.engine is not None
+
+    async def quit(self):
+        self.quit_called = True
+        if self.hang_quit:
+            await asyncio.sleep(10)
+        self.transport = None
+
+
+class TestProbeEngine(unittest.TestCase):
+
+    def _probe(self, fake: FakeProbedEngine):
+        with patch("uci.write.UciEngine", return_value=fake):
+            return asyncio.run(probe_engine("engines/hanging", timeout=0.05))
+
+    def test_start_timeout_quits_the_started_process(self):
+        fake = FakeProbedEngine(hang_quit=False)
+
+        self.assertIsNone(self._probe(fake))
+        self.assertTrue(fake.quit_called)
+        self.assertIsNone(fake.transport)
+
+    def test_process_is_killed_when_quit_hangs(self):
+        fake = FakeProbedEngine(hang_quit=True)
+
+        self.assertIsNone(self._probe(fake))
+        transport = fake.transport
+        transport.kill.assert_called_once_with()
+        transport.close.assert_called_once_with()
+
+
+class TestWriteEngineIni(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = self.folder.name
+        for name in ("a-stockf", "b-broken", "c-stockf"):
+            self._write_engine(name, "binary " + name)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _write_engine(self, name: str, content: str):
+        fpath = os.path.join(self.path, name)
+        with open(fpath, "w") as binary:
+            binary.write(content)
+        os.chmod(fpath, 0o755)
+
+    def _run(self, probe, **kwargs):
+        with patch("uci.write.probe_engine", side_effect=probe), redirect_stdout(StringIO()) as output:
+            write_engine_ini(self.path, **kwargs)
+        return output.getvalue()
+
+    def test_probes_run_at_most_jobs_at_a_time(self):
+        running = []
+        most = []
+
+        async def probe(fpath, timeout):
+            running.append(fpath)
+            most.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(fpath)
+            return None if fpath.endswith("b-broken") else PROBE
+
+        output = self._run(probe, jobs=2)
+
+        self.assertEqual(2, max(most))
+        self.assertIn("[  3/3]", output)
+        config = configparser.ConfigParser()
+        config.optionxform = str
+        config.read(os.path.join(self.path, "engines.ini"))
+        self.assertEqual(["a-stockf", "c-stockf"], config.sections())
+        self.assertEqual("3360", config["a-stockf"]["elo"])
+        self.assertTrue(os.path.exists(os.path.join(self.path, "a-stockf.uci")))
+        self.assertTrue(os.path.exists(os.path.join(self.path, CACHE_FILE_NAME)))
+
+    def test_unchanged_engines_come_from_cache(self):
+        probed = []
+
+        async def probe(fpath, timeout):
+            probed.append(os.path.basename(fpath))
+            return None if fpath.endswith("b-broken") else PROBE
+
+        self._run(probe)
+        os.utime(os.path.join(self.path, "a-stockf"))  # touched, same binary
+        self._write_engine("c-stockf", "updated binary")
+        probed.clear()
+
+        self._run(probe)
+
+        # the failed engine is started again, the touched one is not
+        self.assertEqual(["b-broken", "c-stockf"], sorted(probed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -54,7 +54,9 @@ class ThemeResolver:
         with self._location_lock:
             if not self._location_checked:
                 location = (
-                    utilities.get_location()[0] if self.location_setting == "auto" else self.location_setting
+                    utilities.location_lookup.get_blocking()[0]
+                    if self.location_setting == "auto"
+                    else self.location_setting
                 )
                 try:
                     self._location_info = astral.geocoder.lookup(location, astral.geocoder.database())
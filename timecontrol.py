@@ -183,8 +183,8 @@ class TimeControl(object):
         self.moves_to_go = moves_to_go
 
     def reset_start_time(self):
-        """Set the start time to the current time."""
-        self.start_time = time.time()
+        """Set the start time to the current (monotonic) time."""
+        self.start_time = time.monotonic()
 
     async def _out_of_time(self):
         """Fire an OUT_OF_TIME event."""
@@ -336,7 +336,7 @@ class TimeControl(object):
                 self.timer.stop()
             else:
                 logger.warning("time=%s", self.internal_time)
-            used_time = time.time() - self.start_time
+            used_time = time.monotonic() - self.start_time
             if log:
                 logger.debug("used time: %s secs", used_time)
             self.internal_time[self.active_color] -= used_time
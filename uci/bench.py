@@ -0,0 +1,350 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Engine search-speed benchmark. Run from the picochess folder with picochess stopped:
+#   python3 -m uci.bench [--engines stockfish] [--levels "Elo@1350"] [--threads 2] [--hash 64]
+# Every installed engine and level is started through UciEngine and searches a fixed
+# position suite. The JSON report is shown on the Benchmark tab of the web settings page.
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import chess  # type: ignore
+
+from dgt.util import TimeMode
+from timecontrol import TimeControl
+from uci.engine import UciEngine
+from uci.engine_provider import EngineProvider
+from utilities import get_engine_mame_par
+
+logger = logging.getLogger(__name__)
+
+BENCH_REPORT_FILE = Path(__file__).resolve().parent.parent / "logs" / "engine_bench.json"
+
+# perft reference positions - opening, middlegame tactics and a pawn endgame
+BENCH_POSITIONS: Tuple[Tuple[str, str], ...] = (
+    ("start", chess.STARTING_FEN),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"),
+    ("promotion", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"),
+    ("middlegame", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8"),
+)
+
+# the TimeControl settings the move latency is measured with
+BENCH_TIME_CONTROLS: Tuple[Dict, ...] = (
+    {"mode": TimeMode.FIXED, "fixed": 1},
+    {"mode": TimeMode.FIXED, "fixed": 5},
+    {"mode": TimeMode.BLITZ, "blitz": 5},
+    {"mode": TimeMode.FISCHER, "blitz": 3, "fischer": 2},
+)
+
+BENCH_DEPTH = 12
+SEARCH_TIMEOUT = 120.0  # seconds before a search is forced to return
+
+
+def time_control_label(time_control: TimeControl) -> str:
+    """Short label like 'fixed 1' or 'fischer 3 2' for the report."""
+    mode = {TimeMode.FIXED: "fixed", TimeMode.BLITZ: "blitz", TimeMode.FISCHER: "fischer"}.get(
+        time_control.mode, str(time_control.mode)
+    )
+    return "{} {}".format(mode, " ".join(time_control.get_list_text().split()))
+
+
+def read_rss_kb(pid: Optional[int]) -> Optional[int]:
+    """Return the resident set size of a process in kB, None if not available (remote engine, no /proc)."""
+    if not pid:
+        return None
+    try:
+        with open("/proc/{}/status".format(pid), encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def board_model() -> str:
+    """Raspberry Pi model string, or the machine type on other computers."""
+    try:
+        with open("/proc/device-tree/model", encoding="utf-8") as model:
+            return model.read().strip("\x00\n ")
+    except OSError:
+        return platform.machine()
+
+
+def _engine_pid(engine: UciEngine) -> Optional[int]:
+    get_pid = getattr(engine.transport, "get_pid", None)
+    return get_pid() if callable(get_pid) else None
+
+
+async def timed_search(engine: UciEngine, board: chess.Board, time_dict: dict, timeout: float = SEARCH_TIMEOUT):
+    """Let the engine search like in a game, return (seconds until bestmove, PlayResult or None)."""
+    result_queue: asyncio.Queue = asyncio.Queue()
+    start = time.perf_counter()
+    await engine.go(time_dict, board, result_queue, None)
+    try:
+        result = await asyncio.wait_for(result_queue.get(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("%s search did not finish in %.0fs - forcing a move", engine.get_name(), timeout)
+        engine.force_move()
+        try:
+            result = await asyncio.wait_for(result_queue.get(), 5.0)
+        except asyncio.TimeoutError:
+            result = None
+    return time.perf_counter() - start, result
+
+
+class LevelBenchmark(object):
+    """Benchmark one already started engine at its current level."""
+
+    def __init__(self, engine: UciEngine, depth: int = BENCH_DEPTH, timeout: float = SEARCH_TIMEOUT):
+        self.engine = engine
+        self.depth = depth
+        self.timeout = timeout
+        self.rss_kb: Optional[int] = None
+
+    def _sample_rss(self):
+        rss = read_rss_kb(_engine_pid(self.engine))
+        if rss is not None:
+            self.rss_kb = max(rss, self.rss_kb or 0)
+
+    async def _newgame(self, board: chess.Board):
+        await self.engine.newgame(board, send_ucinewgame=True)
+
+    async def search_speed(self, positions: Iterable[Tuple[str, str]] = BENCH_POSITIONS) -> List[dict]:
+        """Search every position to a fixed depth - time-to-depth, nodes and nps."""
+        results = []
+        depth_dict = TimeControl(depth=self.depth).uci()
+        for name, fen in positions:
+            board = chess.Board(fen)
+            await self._newgame(board)
+            seconds, result = await timed_search(self.engine, board, depth_dict, self.timeout)
+            self._sample_rss()
+            info = (result.info if result else None) or {}
+            nodes = info.get("nodes")
+            nps = info.get("nps")
+            if nps is None and nodes and seconds > 0:
+                nps = int(nodes / seconds)
+            results.append(
+                {
+                    "position": name,
+                    "depth": info.get("depth"),
+                    "time_to_depth": round(seconds, 3),
+                    "nodes": nodes,
+                    "nps": nps,
+                    "move": result.move.uci() if result and result.move else None,
+                }
+            )
+        return results
+
+    async def move_latency(
+        self,
+        time_controls: Iterable[Dict] = BENCH_TIME_CONTROLS,
+        positions: Iterable[Tuple[str, str]] = BENCH_POSITIONS,
+    ) -> Dict[str, dict]:
+        """Time from go to bestmove for each time control, over the position suite."""
+        latency = {}
+        positions = list(positions)
+        for parameters in time_controls:
+            time_control = TimeControl(**parameters)
+            time_dict = time_control.uci()
+            samples = []
+            for _, fen in positions:
+                board = chess.Board(fen)
+                await self._newgame(board)
+                seconds, result = await timed_search(self.engine, board, time_dict, self.timeout)
+                self._sample_rss()
+                if result and result.move:
+                    samples.append(seconds)
+            latency[time_control_label(time_control)] = {
+                "mean": round(statistics.mean(samples), 3) if samples else None,
+                "max": round(max(samples), 3) if samples else None,
+                "moves": len(samples),
+            }
+        return latency
+
+    async def run(self, time_controls: Iterable[Dict] = BENCH_TIME_CONTROLS) -> dict:
+        self._sample_rss()
+        positions = await self.search_speed()
+        speeds = [entry["nps"] for entry in positions if entry["nps"]]
+        return {
+            "nps": int(statistics.median(speeds)) if speeds else None,
+            "positions": positions,
+            "latency": await self.move_latency(time_controls),
+            "rss_kb": self.rss_kb,
+        }
+
+
+def _bench_options(level_options: dict, threads: Optional[int], hash_mb: Optional[int]) -> dict:
+    """Level options with Threads/Hash overridden - options the engine lacks are filtered by UciEngine.send."""
+    options = dict(level_options)
+    if threads:
+        options["Threads"] = str(threads)
+    if hash_mb:
+        options["Hash"] = str(hash_mb)
+    return options
+
+
+async def bench_engine(
+    engine_info: dict,
+    loop: asyncio.AbstractEventLoop,
+    levels: Optional[List[str]] = None,
+    threads: Optional[int] = None,
+    hash_mb: Optional[int] = None,
+    depth: int = BENCH_DEPTH,
+    engine_rspeed: float = 1.0,
+    time_controls: Iterable[Dict] = BENCH_TIME_CONTROLS,
+) -> List[dict]:
+    """Benchmark all (or the selected) levels of one engine, a fresh engine process per level."""
+    level_dict = engine_info.get("level_dict") or {"": {}}
+    results = []
+    for level_name, level_options in level_dict.items():
+        if levels and level_name not in levels:
+            continue
+        entry = {
+            "engine": engine_info.get("name", ""),
+            "file": os.path.basename(engine_info["file"]),
+            "level": level_name,
+            "threads": threads,
+            "hash": hash_mb,
+        }
+        engine = UciEngine(
+            file=engine_info["file"],
+            uci_shell=None,
+            mame_par=get_engine_mame_par(engine_rspeed),
+            loop=loop,
+            engine_debug_name="bench",
+        )
+        try:
+            await engine.open_engine()
+            if not engine.loaded_ok():
+                entry["error"] = "engine did not start"
+            elif not await engine.startup(_bench_options(level_options, threads, hash_mb)):
+                entry["error"] = "invalid uci file"
+            else:
+                engine.set_mode(ponder=False)
+                logger.info("benchmarking %s level %s", engine.get_name(), level_name or "-")
+                entry.update(await LevelBenchmark(engine, depth=depth).run(time_controls))
+        except Exception as exc:  # one broken engine must not stop the whole run
+            logger.exception("benchmark of %s failed", engine_info["file"])
+            entry["error"] = str(exc)
+        finally:
+            if engine.loaded_ok():
+                await engine.quit()
+        results.append(entry)
+    return results
+
+
+def installed_engines(names: Optional[List[str]] = None) -> List[dict]:
+    """Engines from engines.ini, retro.ini and favorites.ini - each file once, pgn replay skipped."""
+    EngineProvider.init()
+    seen = set()
+    engines = []
+    for engine_info in EngineProvider.installed_engines:
+        basename = os.path.basename(engine_info["file"])
+        if engine_info["file"] in seen or basename.startswith("pgn_"):
+            continue
+        if names and not any(name.lower() in basename.lower() for name in names):
+            continue
+        seen.add(engine_info["file"])
+        engines.append(engine_info)
+    return engines
+
+
+def write_report(results: List[dict], settings: dict, report_file: Path = BENCH_REPORT_FILE):
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "board_model": board_model(),
+        "cpu_count": os.cpu_count(),
+        "settings": settings,
+        "results": results,
+    }
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = report_file.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as out:
+        json.dump(report, out, indent=1)
+    os.replace(tmp_file, report_file)  # the web page never sees a half written report
+    return report
+
+
+def load_report(report_file: Path = BENCH_REPORT_FILE) -> Optional[dict]:
+    try:
+        with open(report_file, encoding="utf-8") as report:
+            return json.load(report)
+    except (OSError, ValueError):
+        return None
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    loop = asyncio.get_running_loop()
+    results = []
+    for engine_info in installed_engines(args.engines):
+        results.extend(
+            await bench_engine(
+                engine_info,
+                loop,
+                levels=args.levels,
+                threads=args.threads,
+                hash_mb=args.hash,
+                depth=args.depth,
+                engine_rspeed=args.rspeed,
+            )
+        )
+    settings = {"threads": args.threads, "hash": args.hash, "depth": args.depth, "rspeed": args.rspeed}
+    return write_report(results, settings, Path(args.report))
+
+
+def _split_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark installed engines and levels on this computer")
+    parser.add_argument("--engines", type=_split_list, help="comma separated engine file names (substrings)")
+    parser.add_argument("--levels", type=_split_list, help="comma separated level names, default all levels")
+    parser.add_argument("--threads", type=int, help="Threads uci option, default the level setting")
+    parser.add_argument("--hash", type=int, help="Hash uci option in MB, default the level setting")
+    parser.add_argument("--depth", type=int, default=BENCH_DEPTH, help="depth for time-to-depth and nps")
+    parser.add_argument("--rspeed", type=float, default=1.0, help="retro engine speed factor, 0 = max")
+    parser.add_argument("--report", default=str(BENCH_REPORT_FILE), help="JSON report file")
+    parser.add_argument("--log-level", default="warning", help="logging level")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+    report = asyncio.run(run_benchmark(args))
+    for entry in report["results"]:
+        nps = entry.get("nps") or "-"
+        rss = entry.get("rss_kb") or "-"
+        error = entry.get("error", "")
+        level = entry["level"] or "-"
+        print("{:24.24} {:16.16} nps {:>10} rss {:>7} kB {}".format(entry["engine"], level, nps, rss, error))
+    print("report written to", args.report)
+
+
+if __name__ == "__main__":
+    main()
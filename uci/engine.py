@@ -39,7 +39,6 @@ import chess.engine  # type: ignore
 from chess.engine import InfoDict, Limit, UciProtocol, AnalysisResult, PlayResult, EngineTerminatedError
 from chess import Board  # type: ignore
 from uci.rating import Rating, Result
-from utilities import write_picochess_ini
 
 FLOAT_ANALYSIS_WAIT = 0.1  # save CPU in ContinuousAnalysis
 
@@ -279,6 +278,9 @@ class UciShell(object):
 class ContinuousAnalysis:
     """class for continous analysis from a chess engine"""
 
+    # called without arguments when an analysis reaches a new depth, to wake whoever polls get_analysis()
+    _depth_listeners: list[Callable[[], None]] = []
+
     def __init__(
         self,
         engine: UciProtocol,
@@ -475,6 +477,7 @@ class ContinuousAnalysis:
         # bestmove that never arrives.  By recording that _safe_stop was called we can skip
         # the redundant stop in the cleanup path.
         _already_stopped = False
+        notified_depth = 0
         try:
             # Wait briefly until the engine is ready before starting analysis
             ready = await self._wait_for_engine_ready(timeout=0.5)
@@ -526,8 +529,17 @@ class ContinuousAnalysis:
                             if "depth" in info_limit and limit.depth:
                                 if info_limit.get("depth") >= limit.depth:
                                     self.limit_reached = True
+                                    self.notify_depth(self.whoami)
                                     return  # limit reached
+                        depth = self._analysis_data[0].get("depth", 0)
+                        if depth > notified_depth:
+                            notified_depth = depth
+                            self.notify_depth(self.whoami)
                     await asyncio.sleep(self.delay)  # save cpu
+                    # analysis.multipv already holds the lines that came in while sleeping - skip them
+                    # instead of waking once per line, an engine sends hundreds of lines at low depths
+                    while not analysis.empty():
+                        await analysis.get()
             finally:
                 if self._active_analysis is analysis:
                     self._active_analysis = None
@@ -553,6 +565,26 @@ class ContinuousAnalysis:
                     logger.error("%s failed to recover engine after dirty analysis stop", self.whoami)
             self.engine_lease.release("continuous")
 
+    @staticmethod
+    def add_depth_listener(listener: Callable[[], None]):
+        """Call listener whenever an analysis reaches a new depth - remove it again with remove_depth_listener."""
+        if listener not in ContinuousAnalysis._depth_listeners:
+            ContinuousAnalysis._depth_listeners.append(listener)
+
+    @staticmethod
+    def remove_depth_listener(listener: Callable[[], None]):
+        if listener in ContinuousAnalysis._depth_listeners:
+            ContinuousAnalysis._depth_listeners.remove(listener)
+
+    @staticmethod
+    def notify_depth(whoami: str):
+        """Tell the depth listeners that an analysis of whoami reached a new depth."""
+        for listener in list(ContinuousAnalysis._depth_listeners):
+            try:
+                listener()
+            except Exception:
+                logger.exception("%s depth listener failed", whoami)
+
     def debug_analyser(self):
         """use this debug call to see how low and deep depth evolves"""
         # lock is on when we come here
@@ -840,8 +872,12 @@ class PlayingContinuousAnalysis:
                         if self._force_event.is_set() or self._cancel_event.is_set():
                             self._request_stop_or_delay(search_generation=search_generation)
 
+                        notified_depth = 0
                         async for info in analysis:
                             self.latest_info = info
+                            if info.get("depth", 0) > notified_depth:
+                                notified_depth = info.get("depth")
+                                ContinuousAnalysis.notify_depth(self.whoami)
                             if self._force_event.is_set() or self._cancel_event.is_set():
                                 analysis.stop()
                                 break
@@ -1804,10 +1840,34 @@ class UciEngine(object):
             if self.analyser.get_fen() == game.fen():
                 result = await self.analyser.get_analysis()
             else:
-                logger.debug("analysis for old position")
-                logger.debug("current new position is %s", game.fen())
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("analysis for old position, current new position is %s", game.fen())
         return result
 
+    async def analyse_position(
+        self,
+        game: chess.Board,
+        limit: Limit,
+        multipv: int | None = None,
+        root_moves: Optional[Iterable[chess.Move]] = None,
+    ) -> list[InfoDict]:
+        """one-shot analysis of game until limit - returns the list of InfoDict (multipv)
+        used by offline work like PGN annotation, waits while the engine is playing or analysing"""
+        if not self.engine or not self.engine_lease:
+            logger.warning("analyse_position requested but no engine loaded")
+            return []
+        await self.engine_lease.acquire(owner="offline")
+        try:
+            info = await self.engine.analyse(
+                copy.deepcopy(game), limit, multipv=multipv or 1, root_moves=list(root_moves) if root_moves else None
+            )
+        except (chess.engine.EngineError, EngineTerminatedError) as exc:
+            logger.warning("%s analyse_position failed: %s", self.whoami, exc)
+            return []
+        finally:
+            self.engine_lease.release("offline")
+        return info
+
     def is_analysis_limit_reached(self) -> bool:
         """return True if limit was reached for position being analysed"""
         if self.analyser and self.analyser.is_running():
@@ -2046,25 +2106,30 @@ class UciEngine(object):
         return max(500, int(value / 50 + 1) * 50)
 
     async def update_rating(self, rating: Rating, result: Result) -> Rating:
-        """Send the new ELO value to the engine and save the ELO and rating deviation"""
+        """Send the new ELO value to the engine and return the new rating, the caller keeps its history"""
         if not self.is_adaptive or result is None or self.engine_rating < 0:
             return rating
         new_rating = rating.rate(Rating(self.engine_rating, 0), result)
+        await self.adapt_to_rating(new_rating)
+        return new_rating
+
+    async def adapt_to_rating(self, rating: Rating):
+        """Send the ELO value for the user's rating to an adaptive engine"""
+        if not self.is_adaptive or self.engine_rating < 0:
+            return
         if self.uci_elo_eval_fn is not None:
             # evaluation function instead of auto?
-            uci_elo_with_rating = self.uci_elo_eval_fn.replace("auto", str(int(new_rating.rating)))
+            uci_elo_with_rating = self.uci_elo_eval_fn.replace("auto", str(int(rating.rating)))
             try:
                 self.engine_rating = safe_eval_elo(uci_elo_with_rating)
             except (ValueError, ArithmeticError) as e:
                 logger.error("invalid UCI_Elo update expression=%s, exception=%s", uci_elo_with_rating, e)
                 self.uci_elo_eval_fn = None
-                self.engine_rating = self._round_engine_rating(int(new_rating.rating))
+                self.engine_rating = self._round_engine_rating(int(rating.rating))
         else:
-            self.engine_rating = self._round_engine_rating(int(new_rating.rating))
-        self._save_rating(new_rating)
+            self.engine_rating = self._round_engine_rating(int(rating.rating))
         self._set_uci_elo_to_engine_rating()
         await self.send()
-        return new_rating
 
     def _set_uci_elo_to_engine_rating(self):
         if UCI_ELO in self.options:
@@ -2074,10 +2139,6 @@ class UciEngine(object):
         elif UCI_ELO_NON_STANDARD2 in self.options:
             self.options[UCI_ELO_NON_STANDARD2] = str(int(self.engine_rating))
 
-    def _save_rating(self, new_rating: Rating):
-        write_picochess_ini("pgn-elo", max(500, int(new_rating.rating)))
-        write_picochess_ini("rating-deviation", int(new_rating.rating_deviation))
-
     async def handle_bestmove_0000(self, game: chess.Board, timeout: float = 2.0, variant_board=None) -> str:
         """
         Handle 'bestmove 0000' from a UCI engine using python-chess UciProtocol.
@@ -11,7 +11,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Optional
+from typing import List, Optional, Tuple
 from enum import Enum
 import math
 
@@ -28,10 +28,18 @@ class Rating(object):
     THRESHOLD = 0.00001
     Q = math.log(10) / 400
     MIN_RATING_DEVIATION = 30.0
+    MAX_RATING_DEVIATION = 350.0
+    RATING_PERIOD_DAYS = 7
+    # Glicko-2, all games of a rating period are rated together
+    GLICKO2_SCALE = 400 / math.log(10)
+    TAU = 0.5  # how much the volatility may change per rating period
+    DEFAULT_VOLATILITY = 0.06
+    VOLATILITY_EPSILON = 0.000001
 
-    def __init__(self, rating: float, rating_deviation: float):
+    def __init__(self, rating: float, rating_deviation: float, volatility: float = DEFAULT_VOLATILITY):
         self.rating = rating
         self.rating_deviation = rating_deviation
+        self.volatility = volatility
 
     def rate(self, other: "Rating", result: Result) -> "Rating":
         """
@@ -46,6 +54,61 @@ class Rating(object):
         new_deviation = max(Rating.MIN_RATING_DEVIATION, math.sqrt(1.0 / denominator))
         return Rating(new_rating, new_deviation)
 
+    def rate_period(self, games: List[Tuple["Rating", Result]]) -> "Rating":
+        """
+        Rate all games of one rating period with Glicko-2 (see http://www.glicko.net/glicko/glicko2.pdf),
+        a period without games only grows the deviation
+        """
+        mu = (self.rating - 1500) / Rating.GLICKO2_SCALE
+        phi = self.rating_deviation / Rating.GLICKO2_SCALE
+        if not games:
+            deviation = math.sqrt(phi**2 + self.volatility**2) * Rating.GLICKO2_SCALE
+            return Rating(self.rating, min(deviation, Rating.MAX_RATING_DEVIATION), self.volatility)
+        variance_inv = 0.0
+        improvement = 0.0  # sum of g * (score - expected score), delta / v in the paper
+        for other, result in games:
+            g = self._g2(other.rating_deviation / Rating.GLICKO2_SCALE)
+            expected_outcome = 1.0 / (1 + math.exp(-g * (mu - (other.rating - 1500) / Rating.GLICKO2_SCALE)))
+            variance_inv += g**2 * expected_outcome * (1 - expected_outcome)
+            improvement += g * (result.value - expected_outcome)
+        variance = 1.0 / variance_inv
+        volatility = self._new_volatility(phi, variance, variance * improvement)
+        phi_star = math.sqrt(phi**2 + volatility**2)
+        new_phi = 1.0 / math.sqrt(1.0 / phi_star**2 + variance_inv)
+        new_rating = 1500 + Rating.GLICKO2_SCALE * (mu + new_phi**2 * improvement)
+        new_deviation = min(max(Rating.GLICKO2_SCALE * new_phi, Rating.MIN_RATING_DEVIATION), Rating.MAX_RATING_DEVIATION)
+        return Rating(new_rating, new_deviation, volatility)
+
+    def _new_volatility(self, phi: float, variance: float, delta: float) -> float:
+        """Step 5 of Glicko-2: solve for the new volatility with the Illinois algorithm"""
+        a = math.log(self.volatility**2)
+
+        def f(x: float) -> float:
+            ex = math.exp(x)
+            return ex * (delta**2 - phi**2 - variance - ex) / (2 * (phi**2 + variance + ex) ** 2) - (x - a) / Rating.TAU**2
+
+        low = a
+        if delta**2 > phi**2 + variance:
+            high = math.log(delta**2 - phi**2 - variance)
+        else:
+            k = 1
+            while f(a - k * Rating.TAU) < 0:
+                k += 1
+            high = a - k * Rating.TAU
+        f_low, f_high = f(low), f(high)
+        while math.fabs(high - low) > Rating.VOLATILITY_EPSILON:
+            c = low + (low - high) * f_low / (f_high - f_low)
+            f_c = f(c)
+            if f_c * f_high <= 0:
+                low, f_low = high, f_high
+            else:
+                f_low /= 2
+            high, f_high = c, f_c
+        return math.exp(low / 2)
+
+    def _g2(self, phi: float) -> float:
+        return 1.0 / math.sqrt(1 + 3 * phi**2 / math.pi**2)
+
     def _expected_outcome(self, other: "Rating"):
         return 1.0 / (1 + math.pow(10, -self._g(other.rating_deviation) * (self.rating - other.rating) / 400.0))
 
@@ -0,0 +1,177 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# History of the rated games against adaptive engines. Every game is one row with the engine,
+# its level and Elo and the result. The user's rating is computed from the history with
+# Glicko-2: the games of each rating period are rated together, a period without games
+# grows the deviation, the games of the running period give a provisional rating. Each row
+# also keeps the rating after its game, so the rating curve of an engine or level is one
+# query. A rating the user sets by hand is a row without engine and result, the history
+# starts again from it. picochess.ini only holds the starting rating of a new store.
+
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from uci.rating import Rating, Result
+
+logger = logging.getLogger(__name__)
+
+RATING_STORE_FILE = Path(__file__).resolve().parent.parent / "games" / "ratings.db"
+RATING_PERIOD = Rating.RATING_PERIOD_DAYS * 86400  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played REAL NOT NULL,
+    engine TEXT NOT NULL,
+    level TEXT NOT NULL,
+    engine_elo INTEGER NOT NULL,
+    result REAL,
+    rating REAL NOT NULL,
+    deviation REAL NOT NULL
+)
+"""
+
+
+class RatingStore(object):
+    """sqlite store of the rated games. Every call opens its own connection, so it can run in a thread."""
+
+    def __init__(self, path: Path = RATING_STORE_FILE):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute(_SCHEMA)
+        return connection
+
+    def record(
+        self, engine: str, level: str, engine_elo: int, result: Result, initial: Optional[Rating] = None, played=None
+    ) -> Rating:
+        """Append a rated game and return the user's rating after it, initial is the rating of an empty history."""
+        played = time.time() if played is None else played
+        history = self.history() + [(played, int(engine_elo), result.value, 0.0, 0.0)]
+        rating = _rate_periods(_start_rating(history, initial), history, played)
+        self._insert(engine, level or "", int(engine_elo), result.value, rating, played)
+        return rating
+
+    def reset(self, rating: Rating, played=None):
+        """Append a rating the user set by hand - the next games start from it."""
+        self._insert("", "", 0, None, rating, played)
+
+    def _insert(self, engine: str, level: str, engine_elo: int, result: Optional[float], rating: Rating, played):
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "INSERT INTO games (played, engine, level, engine_elo, result, rating, deviation)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        time.time() if played is None else played,
+                        engine,
+                        level,
+                        engine_elo,
+                        result,
+                        rating.rating,
+                        rating.rating_deviation,
+                    ),
+                )
+        except sqlite3.Error as exc:
+            logger.error("could not store rating in %s: %s", self.path, exc)
+
+    def history(self) -> List[tuple]:
+        """(played, engine_elo, result, rating, deviation) of the games since the last rating set by hand,
+        that rating first"""
+        try:
+            with closing(self._connect()) as connection:
+                return connection.execute(
+                    "SELECT played, engine_elo, result, rating, deviation FROM games"
+                    " WHERE id >= (SELECT COALESCE(MAX(id), 0) FROM games WHERE result IS NULL) ORDER BY id"
+                ).fetchall()
+        except sqlite3.Error as exc:
+            logger.error("could not read ratings from %s: %s", self.path, exc)
+            return []
+
+    def rating(self, initial: Optional[Rating] = None, now=None) -> Optional[Rating]:
+        """The user's rating computed from the history - initial if there is none."""
+        return rate_history(self.history(), initial, time.time() if now is None else now)
+
+    def curve(self, engine: Optional[str] = None, level: Optional[str] = None) -> List[dict]:
+        """One point per rating period with the rating after its last game, optionally for one engine and level."""
+        where, params = [], []
+        if engine:
+            where.append("engine = ?")
+            params.append(engine)
+        if level:
+            where.append("level = ?")
+            params.append(level)
+        # sqlite takes the bare columns of the row with MAX(id), the last game of each period
+        query = (
+            "SELECT MAX(id), played, rating, deviation, COUNT(result), TOTAL(result)"
+            " FROM games {} GROUP BY CAST(played / ? AS INTEGER) ORDER BY played".format(
+                "WHERE " + " AND ".join(where) if where else ""
+            )
+        )
+        params.append(Rating.RATING_PERIOD_DAYS * 86400)
+        try:
+            with closing(self._connect()) as connection:
+                rows = connection.execute(query, params).fetchall()
+        except sqlite3.Error as exc:
+            logger.error("could not read rating curve from %s: %s", self.path, exc)
+            return []
+        return [
+            {
+                "played": int(played),
+                "rating": int(rating),
+                "deviation": int(deviation),
+                "games": games,
+                "score": score,
+            }
+            for _, played, rating, deviation, games, score in rows
+        ]
+
+
+def rate_history(history: List[tuple], initial: Optional[Rating], now: float) -> Optional[Rating]:
+    """Replay the history rating period by rating period with Glicko-2, see RatingStore.history()."""
+    if not history:
+        return initial
+    return _rate_periods(_start_rating(history, initial), history, now)
+
+
+def _start_rating(history: List[tuple], initial: Optional[Rating]) -> Rating:
+    if history[0][2] is None:  # a rating set by hand
+        return Rating(history[0][3], history[0][4])
+    return initial if initial is not None else Rating(1500, Rating.MAX_RATING_DEVIATION)
+
+
+def _rate_periods(start: Rating, history: List[tuple], now: float) -> Rating:
+    games: Dict[int, List[Tuple[Rating, Result]]] = {}
+    for played, engine_elo, result, _, _ in history:
+        if result is not None:
+            games.setdefault(int(played // RATING_PERIOD), []).append((Rating(engine_elo, 0), Result(result)))
+    first = int(history[0][0] // RATING_PERIOD)
+    running = max([int(now // RATING_PERIOD)] + list(games))
+    rating = start
+    for period in range(first, running):  # the finished periods
+        rating = rating.rate_period(games.get(period, []))
+    if running in games:
+        rating = rating.rate_period(games[running])  # provisional until the period is over
+    return rating
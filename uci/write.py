@@ -15,142 +15,259 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+# Builds engines.ini (and a .uci level file for each engine that has none) from the engine
+# executables of a folder. The engines are started a few at a time with a timeout each, and the
+# name and options of every engine are cached by its binary hash, so a run after an update only
+# starts the changed engines.
+
 import platform
 import configparser
+import hashlib
+import json
+import logging
 import os
 import asyncio
+import time
+from typing import Dict, Optional
+
 from uci.engine import UciShell, UciEngine
 
+logger = logging.getLogger(__name__)
 
-def write_engine_ini(engine_path=None):
-    """Read the engine folder and create the engine.ini file."""
+CACHE_FILE_NAME = ".engines_cache.json"
+PROBE_TIMEOUT = 30.0  # seconds for one engine to start and report its options
+
+
+def calc_inc(diflevel: int):
+    """Calculate the increment for (max 20) levels."""
+    if diflevel > 1000:
+        inc = int(diflevel / 100)
+    else:
+        inc = int(diflevel / 10)
+    if 20 * inc < diflevel:
+        inc = int(diflevel / 20)
+    return inc
+
+
+def level_sections(options: dict) -> Dict[str, Dict[str, str]]:
+    """Level sections of the .uci file for the engine options."""
+    sections: Dict[str, Dict[str, str]] = {}
+    if "UCI_LimitStrength" in options and "UCI_Elo" in options:
+        uelevel = options["UCI_Elo"]
+        minlevel, maxlevel = min(uelevel.min, uelevel.max), max(uelevel.min, uelevel.max)
+        lvl_inc = calc_inc(maxlevel - minlevel)
+        level = minlevel
+        while level < maxlevel:
+            sections["Elo@{:04d}".format(level)] = {"UCI_LimitStrength": "true", "UCI_Elo": str(level)}
+            level += lvl_inc
+        sections["Elo@{:04d}".format(maxlevel)] = {"UCI_LimitStrength": "false", "UCI_Elo": str(maxlevel)}
+    for option_name in ("Skill Level", "Handicap Level"):
+        if option_name in options:
+            sklevel = options[option_name]
+            minlevel, maxlevel = min(sklevel.min, sklevel.max), max(sklevel.min, sklevel.max)
+            for level in range(minlevel, maxlevel + 1):
+                sections["Level@{:02d}".format(level)] = {option_name: str(level)}
+    if "Strength" in options:
+        sklevel = options["Strength"]
+        minlevel, maxlevel = min(sklevel.min, sklevel.max), max(sklevel.min, sklevel.max)
+        lvl_inc = calc_inc(maxlevel - minlevel)
+        level = minlevel
+        count = 0
+        while level < maxlevel:
+            sections["Level@{:02d}".format(count)] = {"Strength": str(level)}
+            level += lvl_inc
+            count += 1
+        sections["Level@{:02d}".format(count)] = {"Strength": str(maxlevel)}
+    return sections
+
+
+def name_build(parts: list, maxlength: int, default_name: str):
+    """Get a (clever formed) cut name for the part list."""
+    eng_name = ""
+    for token in parts:
+        if len(eng_name) + len(token) > maxlength:
+            break
+        eng_name += token
+    return eng_name if eng_name else default_name
+
+
+def is_exe(fpath: str):
+    """Check if fpath is an executable."""
+    return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
+
+
+def file_hash(fpath: str) -> str:
+    """sha256 of the engine binary."""
+    digest = hashlib.sha256()
+    with open(fpath, "rb") as binary:
+        for block in iter(lambda: binary.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def probe_engine(fpath: str, timeout: float = PROBE_TIMEOUT) -> Optional[dict]:
+    """Start the engine and return its name, option defaults and level sections - None if it does not start."""
+    engine = UciEngine(file=fpath, uci_shell=UciShell(), mame_par="", loop=asyncio.get_running_loop())
+    try:
+        await asyncio.wait_for(engine.open_engine(), timeout)
+        if not engine.loaded_ok():
+            return None
+        options = engine.get_options()
+        return {
+            "name": engine.get_name(),
+            "options": {option: str(options[option].default) for option in options},
+            "levels": level_sections(options),
+        }
+    except asyncio.TimeoutError:
+        logger.warning("engine %s did not start within %.0fs", fpath, timeout)
+        return None
+    except Exception:  # one broken engine must not stop the whole run
+        logger.exception("engine %s could not be probed", fpath)
+        return None
+    finally:
+        await close_engine(engine, fpath, timeout)
 
-    def write_level_ini(engine_filename: str):
-        """Write the level part for the engine.ini file."""
-
-        def calc_inc(diflevel: int):
-            """Calculate the increment for (max 20) levels."""
-            if diflevel > 1000:
-                inc = int(diflevel / 100)
-            else:
-                inc = int(diflevel / 10)
-            if 20 * inc < diflevel:
-                inc = int(diflevel / 20)
-            return inc
-
-        parser = configparser.ConfigParser()
-        parser.optionxform = str  # type: ignore
-        if not parser.read(engine_path + os.sep + engine_filename + ".uci"):
-            options = engine.get_options()
-            if engine.has_limit_strength():
-                uelevel = options["UCI_Elo"]
-                minelo = uelevel.min
-                maxelo = uelevel.max
-                minlevel, maxlevel = min(minelo, maxelo), max(minelo, maxelo)
-                lvl_inc = calc_inc(maxlevel - minlevel)
-                level = minlevel
-                while level < maxlevel:
-                    parser["Elo@{:04d}".format(level)] = {"UCI_LimitStrength": "true", "UCI_Elo": str(level)}
-                    level += lvl_inc
-                parser["Elo@{:04d}".format(maxlevel)] = {"UCI_LimitStrength": "false", "UCI_Elo": str(maxlevel)}
-            if engine.has_skill_level():
-                sklevel = options["Skill Level"]
-                minlevel = sklevel.min
-                maxlevel = sklevel.max
-                minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
-                for level in range(minlevel, maxlevel + 1):
-                    parser["Level@{:02d}".format(level)] = {"Skill Level": str(level)}
-            if engine.has_handicap_level():
-                sklevel = options["Handicap Level"]
-                minlevel = sklevel.min
-                maxlevel = sklevel.max
-                minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
-                for level in range(minlevel, maxlevel + 1):
-                    parser["Level@{:02d}".format(level)] = {"Handicap Level": str(level)}
-            if engine.has_strength():
-                sklevel = options["Strength"]
-                minlevel = sklevel.min
-                maxlevel = sklevel.max
-                minlevel, maxlevel = min(minlevel, maxlevel), max(minlevel, maxlevel)
-                lvl_inc = calc_inc(maxlevel - minlevel)
-                level = minlevel
-                count = 0
-                while level < maxlevel:
-                    parser["Level@{:02d}".format(count)] = {"Strength": str(level)}
-                    level += lvl_inc
-                    count += 1
-                parser["Level@{:02d}".format(count)] = {"Strength": str(maxlevel)}
-            with open(engine_path + os.sep + engine_filename + ".uci", "w") as configfile:
-                parser.write(configfile)
 
-    def is_exe(fpath: str):
-        """Check if fpath is an executable."""
-        return os.path.isfile(fpath) and os.access(fpath, os.X_OK)
+async def close_engine(engine: UciEngine, fpath: str, timeout: float):
+    """Quit whatever the probe opened - also after a timeout or a failed start - and kill it if it does not quit."""
+    if not (engine.engine or engine.transport or engine.remote_conn):
+        return
+    try:
+        await asyncio.wait_for(engine.quit(), timeout)
+        return
+    except asyncio.TimeoutError:
+        logger.warning("engine %s did not quit within %.0fs - killing it", fpath, timeout)
+    except Exception:
+        logger.exception("engine %s could not be quit - killing it", fpath)
+    if engine.transport:
+        try:
+            engine.transport.kill()
+        except OSError:  # already gone
+            pass
+        engine.transport.close()
+    if engine.remote_conn:
+        engine.remote_conn.close()
 
-    def name_build(parts: list, maxlength: int, default_name: str):
-        """Get a (clever formed) cut name for the part list."""
-        eng_name = ""
-        for token in parts:
-            if len(eng_name) + len(token) > maxlength:
-                break
-            eng_name += token
-        return eng_name if eng_name else default_name
 
+def load_cache(cache_file: str) -> dict:
+    try:
+        with open(cache_file, encoding="utf-8") as cache:
+            return json.load(cache)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict, cache_file: str):
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as out:
+        json.dump(cache, out, indent=1)
+    os.replace(tmp_file, cache_file)
+
+
+def engine_section(engine_file_name: str, probe: dict) -> Dict[str, str]:
+    """The engines.ini section of an engine."""
+    engine_name = probe["name"]
+    name_parts = engine_name.replace(".", "").split(" ")
+    name_small = name_build(name_parts, 6, engine_file_name[2:])
+    name_medium = name_build(name_parts, 8, name_small)
+    name_large = name_build(name_parts, 11, name_medium)
+
+    # config[engine_file_name][';available options'] = 'itsDefaultValue'
+    section = {";" + option: default for option, default in probe["options"].items()}
+
+    comp_elo = 2500
+    engine_elo = {
+        "stockfish": 3360,
+        "texel": 3050,
+        "rodent": 2920,
+        "zurichess": 2790,
+        "wyld": 2630,
+        "sayuri": 1850,
+    }
+    for name, elo in engine_elo.items():
+        if engine_name.lower().startswith(name):
+            comp_elo = elo
+            break
+
+    section["name"] = engine_name
+    section["small"] = name_small
+    section["medium"] = name_medium
+    section["large"] = name_large
+    section["elo"] = str(comp_elo)
+    return section
+
+
+async def discover_engines(
+    engine_path: str, jobs: int, timeout: float = PROBE_TIMEOUT, use_cache: bool = True
+) -> Dict[str, dict]:
+    """Probe the executables of engine_path, at most jobs at a time - unchanged engines come from the cache."""
+    engine_list = [name for name in sorted(os.listdir(engine_path)) if is_exe(engine_path + os.sep + name)]
+    cache_file = engine_path + os.sep + CACHE_FILE_NAME
+    cache = load_cache(cache_file) if use_cache else {}
+    semaphore = asyncio.Semaphore(max(1, jobs))
+    probes: Dict[str, dict] = {}
+    done = 0
+
+    async def discover(engine_file_name: str):
+        nonlocal done
+        fpath = engine_path + os.sep + engine_file_name
+        stat = os.stat(fpath)
+        entry = cache.get(engine_file_name, {})
+        source = "cached"
+        start = time.monotonic()
+        if entry.get("mtime") != stat.st_mtime or entry.get("size") != stat.st_size:
+            # a touched but unchanged binary keeps its probe, only the hash decides
+            sha256 = await asyncio.to_thread(file_hash, fpath)
+            if entry.get("sha256") != sha256:
+                async with semaphore:
+                    start = time.monotonic()
+                    entry = {"probe": await probe_engine(fpath, timeout)}
+                source = "started"
+            entry.update({"sha256": sha256, "mtime": stat.st_mtime, "size": stat.st_size})
+        probe = entry.get("probe")
+        if probe:
+            probes[engine_file_name] = probe
+            cache[engine_file_name] = entry
+        else:
+            source = "failed"
+            cache.pop(engine_file_name, None)  # try again on the next run
+        done += 1
+        print(
+            "[{:>3}/{}] {:24.24} {:8} {:5.1f}s".format(
+                done, len(engine_list), engine_file_name, source, time.monotonic() - start
+            ),
+            flush=True,
+        )
+
+    await asyncio.gather(*(discover(engine_file_name) for engine_file_name in engine_list))
+    for engine_file_name in list(cache):
+        if engine_file_name not in engine_list:
+            del cache[engine_file_name]
+    save_cache(cache, cache_file)
+    return {name: probes[name] for name in engine_list if name in probes}  # engines.ini in file name order
+
+
+def write_engine_ini(
+    engine_path=None, jobs: Optional[int] = None, timeout: float = PROBE_TIMEOUT, use_cache: bool = True
+):
+    """Read the engine folder and create the engine.ini file."""
     if not engine_path:
         program_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
         engine_path = program_path + os.sep + "engines" + os.sep + platform.machine()
-    engine_list = sorted(os.listdir(engine_path))
+    if jobs is None:
+        jobs = min(4, os.cpu_count() or 1)
+    probes = asyncio.run(discover_engines(engine_path, jobs, timeout, use_cache))
+
     config = configparser.ConfigParser()
-    config.optionxform = str
-    uci_shell = UciShell()
-    for engine_file_name in engine_list:
-        if is_exe(engine_path + os.sep + engine_file_name):
-            mame_par = ""  # attempt a simple porting of this code
-            loop = asyncio.get_event_loop()  # _could_ work as we just ask for name
-            engine = UciEngine(
-                file=engine_path + os.sep + engine_file_name, uci_shell=uci_shell, mame_par=mame_par, loop=loop
-            )
-            if engine:
-                print(engine_file_name)
-                try:
-                    if engine.has_levels():
-                        write_level_ini(engine_file_name)
-                    engine_name = engine.get_name()
-
-                    name_parts = engine_name.replace(".", "").split(" ")
-                    name_small = name_build(name_parts, 6, engine_file_name[2:])
-                    name_medium = name_build(name_parts, 8, name_small)
-                    name_large = name_build(name_parts, 11, name_medium)
-
-                    config[engine_file_name] = {}
-
-                    # config[engine_file_name][';available options'] = 'itsDefaultValue'
-                    engine_options = engine.get_options()
-                    for option in engine_options:
-                        config[engine_file_name][str(";" + option)] = str(engine_options[option].default)
-
-                    comp_elo = 2500
-                    engine_elo = {
-                        "stockfish": 3360,
-                        "texel": 3050,
-                        "rodent": 2920,
-                        "zurichess": 2790,
-                        "wyld": 2630,
-                        "sayuri": 1850,
-                    }
-                    for name, elo in engine_elo.items():
-                        if engine_name.lower().startswith(name):
-                            comp_elo = elo
-                            break
-
-                    config[engine_file_name]["name"] = engine_name
-                    config[engine_file_name]["small"] = name_small
-                    config[engine_file_name]["medium"] = name_medium
-                    config[engine_file_name]["large"] = name_large
-                    config[engine_file_name]["elo"] = str(comp_elo)
-
-                except AttributeError:
-                    pass
-                engine.quit()
+    config.optionxform = str  # type: ignore
+    for engine_file_name, probe in probes.items():
+        uci_file = engine_path + os.sep + engine_file_name + ".uci"
+        if probe["levels"] and not os.path.exists(uci_file):
+            parser = configparser.ConfigParser()
+            parser.optionxform = str  # type: ignore
+            parser.read_dict(probe["levels"])
+            with open(uci_file, "w") as configfile:
+                parser.write(configfile)
+        config[engine_file_name] = engine_section(engine_file_name, probe)
     with open(engine_path + os.sep + "engines.ini", "w") as configfile:
         config.write(configfile)
@@ -2,13 +2,12 @@
 
 import os
 import sys
-import base64
-import pam
 import tornado.web
 from tornado import escape
 
 from utilities import Observable
 from dgt.api import Event
+from web_auth import authenticate_request
 
 UPLOAD_BASE_DIR = "/opt/picochess/games"
 UPLOAD_DIR = "uploads"
@@ -18,28 +17,7 @@ if "unittest" not in sys.modules:  # do not create directories while running tes
 
 class UploadHandler(tornado.web.RequestHandler):
     def prepare(self):
-        auth_header = self.request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Basic "):
-            self.request_auth()
-            return
-
-        try:
-            auth_decoded = base64.b64decode(auth_header[6:]).decode("utf-8")
-            username, password = auth_decoded.split(":", 1)
-        except Exception:
-            self.request_auth()
-            return
-
-        if not pam.pam().authenticate(username, password):
-            self.request_auth()
-            return
-
-        self.current_user = username
-
-    def request_auth(self):
-        self.set_status(401)
-        self.set_header("WWW-Authenticate", 'Basic realm="Upload Area"')
-        self.finish("Authentication required")
+        authenticate_request(self, "Upload Area")
 
     async def post(self):
         if not hasattr(self, "current_user"):
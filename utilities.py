@@ -20,6 +20,7 @@ import os
 import platform
 import shlex
 import shutil
+import signal
 import urllib.request
 import socket
 import json
@@ -27,7 +28,11 @@ import copy
 import configparser
 import subprocess
 import asyncio
+import heapq
+import math
 import time
+import threading
+import weakref
 from ctypes import cdll, c_int
 
 from subprocess import Popen, PIPE
@@ -37,7 +42,7 @@ from dgt.api import Dgt
 
 from configobj import ConfigObj, ConfigObjError, DuplicateError  # type: ignore
 
-from typing import Optional
+from typing import Any, Callable, Dict, FrozenSet, Optional
 
 from pathlib import Path
 
@@ -48,6 +53,13 @@ logger = logging.getLogger(__name__)
 
 _WINDOW_CONTROL_BACKEND_PREFERENCE = "auto"
 
+# timeouts (seconds) for blocking lookups, a missing network must not delay the board or the clock
+LOCATION_TIMEOUT = 4.0
+INTERNAL_IP_TIMEOUT = 2.0
+GIT_LOOKUP_TIMEOUT = 5.0
+GIT_REMOTE_TIMEOUT = 60.0
+STATUS_SCRIPT_TIMEOUT = 20.0  # check-git-status.sh does a git fetch
+
 evt_queue: asyncio.Queue = asyncio.Queue()
 dispatch_queue: asyncio.Queue = asyncio.Queue()
 
@@ -92,7 +104,50 @@ class DispatchDgt(object):
         logger.debug("added dgt to queue %s", dgt)
 
 
-class DisplayMsg(object):
+def handles(*message_classes):
+    """Register the decorated coroutine method as the handler of these message classes."""
+
+    def register(func):
+        func.message_classes = message_classes
+        return func
+
+    return register
+
+
+class MessageDispatch(object):
+    """
+    Dispatch table from message class to handler, built from the @handles methods of a display.
+    message_types is the subscription filter: show() only queues these message classes to the display.
+    None subscribes to every message.
+    """
+
+    handlers: Dict[type, Callable] = {}
+    message_types: Optional[FrozenSet[type]] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        handlers = dict(cls.handlers)
+        for attr in vars(cls).values():
+            for message_class in getattr(attr, "message_classes", ()):
+                handlers[message_class] = attr
+        if handlers != cls.handlers:
+            cls.handlers = handlers
+            cls.message_types = frozenset(handlers)
+
+    def accepts(self, message) -> bool:
+        """Return True if the message belongs in the queue of this display."""
+        return self.message_types is None or type(message) in self.message_types
+
+    async def dispatch(self, message) -> bool:
+        """Run the registered handler, return False for messages without one."""
+        handler = self.handlers.get(type(message))
+        if handler is None:
+            return False
+        await handler(self, message)
+        return True
+
+
+class DisplayMsg(MessageDispatch):
     """Display devices (DGT XL clock, Piface LCD, pgn file...)."""
 
     def __init__(self, loop: asyncio.AbstractEventLoop):
@@ -107,13 +162,14 @@ class DisplayMsg(object):
 
     @staticmethod
     async def show(message):
-        """Send a message on each display device."""
+        """Send a message on each display device subscribed to it."""
         for display in msgdisplay_devices:
-            await display.add_to_queue(copy.deepcopy(message))
+            if display.accepts(message):
+                await display.add_to_queue(copy.deepcopy(message))
         # logger.debug("added message to %d queues %s", len(msgdisplay_devices), message)
 
 
-class DisplayDgt(object):
+class DisplayDgt(MessageDispatch):
     """Display devices (DGT XL clock, Piface LCD, pgn file...)."""
 
     def __init__(self, loop: asyncio.AbstractEventLoop):
@@ -129,18 +185,103 @@ class DisplayDgt(object):
 
     @staticmethod
     async def show(message):
-        """Send a message on each display device."""
+        """Send a message on each display device subscribed to it."""
         for display in dgtdisplay_devices:
-            await display.add_to_queue(copy.deepcopy(message))
+            if display.accepts(message):
+                await display.add_to_queue(copy.deepcopy(message))
+
+
+class TimerWheel(object):
+    """All timers of an event loop on one task, ordered by monotonic deadline.
+
+    Deadlines are loop.time() values, so a wall clock jump (NTP sync at boot) does not
+    move them. They are rounded up to slots of TICK seconds: timers due in the same slot
+    fire on one wakeup, and the task sleeps until the next occupied slot - it does not
+    tick while nothing is due. The task ends when no timer is left."""
+
+    TICK = 0.02  # slot length in seconds
+    _wheels: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def of(cls, loop: asyncio.AbstractEventLoop) -> "TimerWheel":
+        """The wheel of loop, only to be used from inside loop."""
+        wheel = cls._wheels.get(loop)
+        if wheel is None:
+            wheel = cls._wheels[loop] = cls(loop)
+        return wheel
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.slots: Dict[int, list] = {}  # slot number -> timers due in it
+        self.heap: list = []  # slot numbers, may hold numbers of slots emptied by remove()
+        self.wakeups = 0  # number of slots fired, for the tests and the log
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def now(self) -> float:
+        return self.loop.time()
+
+    def add(self, timer: "AsyncRepeatingTimer", deadline: float):
+        """Fire timer._fire() at deadline, the timer must not be in the wheel already."""
+        slot = math.ceil(deadline / self.TICK)
+        timers = self.slots.get(slot)
+        if timers is None:
+            self.slots[slot] = [timer]
+            if not self.heap or slot < self.heap[0]:
+                self._wakeup.set()  # sleeping for a later slot
+            heapq.heappush(self.heap, slot)
+        else:
+            timers.append(timer)
+        timer._slot = slot
+        if self._task is None:
+            self._task = self.loop.create_task(self._run())
+
+    def remove(self, timer: "AsyncRepeatingTimer"):
+        timers = self.slots.get(timer._slot)
+        if timers is not None and timer in timers:
+            timers.remove(timer)
+            if not timers:
+                del self.slots[timer._slot]
+        timer._slot = None
+
+    async def _run(self):
+        try:
+            while self.heap:
+                slot = self.heap[0]
+                if slot not in self.slots:
+                    heapq.heappop(self.heap)
+                    continue
+                due = slot * self.TICK
+                if due > self.loop.time():
+                    self._wakeup.clear()
+                    handle = self.loop.call_at(due, self._wakeup.set)
+                    try:
+                        await self._wakeup.wait()
+                    finally:
+                        handle.cancel()
+                    continue  # an earlier slot may have been added meanwhile
+                heapq.heappop(self.heap)
+                self.wakeups += 1
+                for timer in self.slots.pop(slot):
+                    timer._slot = None
+                    timer._fire()
+        finally:
+            self._task = None
 
 
 class AsyncRepeatingTimer:
-    """Call function on a given interval - Async version to replace RepeatedTimer"""
+    """Call function on a given interval - Async version to replace RepeatedTimer
+
+    The timers run on the TimerWheel of their loop. A repeating timer fires at start
+    time + n * interval, so it does not drift - if the loop was busy or the previous
+    (async) callback still runs, the tick is skipped instead of coming late."""
 
     def __init__(self, interval, callback, loop: asyncio.AbstractEventLoop, repeating=True, args=None, kwargs=None):
         self.interval = interval  # Interval between each execution
         self.callback = callback  # Function to be repeatedly called
-        self._task = None  # Reference to the asynchronous task
+        self._deadline: Optional[float] = None  # monotonic time of the next call, None while not in the wheel
+        self._slot: Optional[int] = None  # set by the wheel
+        self._callback_task: Optional[asyncio.Task] = None  # an async callback still running
         self._running = False  # Keeps track of whether the timer is running
         self.loop = loop  # run callback in callers eventloop
         self.repeating = repeating  # repeat is default, set false to run only once
@@ -151,19 +292,39 @@ class AsyncRepeatingTimer:
         """Return the running status."""
         return self._running
 
-    async def _run(self):
-        while self._running:  # Continue running until the timer is stopped
+    def _fire(self):
+        """Called by the wheel at the deadline."""
+        if not self._running:
+            self._deadline = None  # stopped from another thread, _stop_task() is still on its way
+            return
+        wheel = TimerWheel.of(self.loop)
+        if self.repeating:
+            now = wheel.now()
+            step = max(self.interval, TimerWheel.TICK)
+            deadline = self._deadline + step
+            while deadline <= now:
+                deadline += step  # missed ticks are skipped, the phase is kept
+            self._deadline = deadline
+            wheel.add(self, deadline)
+        else:
+            self._deadline = None
+            self._running = False
+        if self._callback_task is not None:
+            logger.debug("timer callback %s still running - tick skipped", self.callback)
+            return
+        if asyncio.iscoroutinefunction(self.callback):
+            self._callback_task = self.loop.create_task(self.callback(*self.args, **self.kwargs))
+            self._callback_task.add_done_callback(self._callback_done)
+        else:
             try:
-                await asyncio.sleep(self.interval)
-            except asyncio.CancelledError:
-                # Timer cancelled during shutdown; exit quietly.
-                break
-            if asyncio.iscoroutinefunction(self.callback):
-                await self.callback(*self.args, **self.kwargs)
-            else:
                 self.callback(*self.args, **self.kwargs)  # sync callback
-            if not self.repeating:
-                self._running = False
+            except Exception:
+                logger.exception("timer callback %s failed", self.callback)
+
+    def _callback_done(self, task: asyncio.Task):
+        self._callback_task = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("timer callback %s failed", self.callback, exc_info=task.exception())
 
     def _running_in_target_loop(self):
         try:
@@ -172,13 +333,25 @@ class AsyncRepeatingTimer:
             return False
 
     def _start_task(self):
-        if self._running and self._task is None:
-            self._task = self.loop.create_task(self._run())
+        if self._running and self._deadline is None:
+            wheel = TimerWheel.of(self.loop)
+            self._deadline = wheel.now() + self.interval
+            wheel.add(self, self._deadline)
 
     def _stop_task(self):
-        if self._task is not None:
-            self._task.cancel()
-            self._task = None
+        if self._deadline is not None:
+            TimerWheel.of(self.loop).remove(self)
+            self._deadline = None
+
+    def set_interval(self, interval):
+        """Change the interval starting now - the next call comes interval from now.
+        Call it from the timer's loop."""
+        self.interval = interval
+        if self._deadline is not None:
+            wheel = TimerWheel.of(self.loop)
+            wheel.remove(self)
+            self._deadline = wheel.now() + interval
+            wheel.add(self, self._deadline)
 
     def start(self):
         """Start the RepeatingTimer."""
@@ -203,6 +376,80 @@ class AsyncRepeatingTimer:
             logging.debug("repeated timer already stopped - strange!")
 
 
+class AsyncLookup:
+    """Run a blocking lookup (subprocess, network) in an executor - async version for the event loop.
+
+    The result is cached for ttl seconds (a result equal to default only for retry_ttl),
+    concurrent callers share one in-flight call and a caller never waits longer than
+    timeout - it gets the last known value (or default) instead."""
+
+    def __init__(self, name: str, func: Callable[[], Any], ttl: float, timeout: float, default=None, retry_ttl=30.0):
+        self.name = name
+        self.func = func
+        self.ttl = ttl
+        self.retry_ttl = retry_ttl
+        self.timeout = timeout
+        self.default = default
+        self._value = default
+        self._expires = 0.0  # monotonic time the cached value gets stale, 0 = nothing cached
+        self._lock = threading.Lock()  # one blocking call at a time, also for get_blocking() callers
+        self._inflight: Optional[asyncio.Future] = None
+
+    def _fresh(self) -> bool:
+        return time.monotonic() < self._expires
+
+    def _call(self):
+        with self._lock:
+            if self._fresh():
+                return self._value
+            try:
+                value = self.func()
+            except Exception as exc:
+                logger.debug("%s lookup failed: %s", self.name, exc)
+                value = self.default
+            self._value = value
+            self._expires = time.monotonic() + (self.retry_ttl if value == self.default else self.ttl)
+            return value
+
+    def peek(self):
+        """Return the last known value without doing a lookup."""
+        return self._value
+
+    def invalidate(self):
+        self._expires = 0.0
+
+    def get_blocking(self):
+        """Return the cached value or do the lookup now - only for threads, never on the event loop."""
+        if self._fresh():
+            return self._value
+        return self._call()
+
+    def _start(self) -> asyncio.Future:
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(asyncio.to_thread(self._call))
+        return self._inflight
+
+    async def get(self):
+        """Return the cached value or do the lookup in an executor, waiting at most timeout."""
+        if self._fresh():
+            return self._value
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._start()), self.timeout)
+        except asyncio.TimeoutError:
+            logger.debug("%s lookup still running after %.1fs - using last value", self.name, self.timeout)
+            return self._value
+
+    def refresh_soon(self):
+        """Start a lookup in the background if the cached value is stale."""
+        if self._fresh():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no event loop (yet) - the next caller starts the lookup
+        self._start()
+
+
 def get_opening_books():
     """Build an opening book lib."""
     config = configparser.ConfigParser()
@@ -237,14 +484,19 @@ def hms_time(seconds: int):
     return hours, mins, secs
 
 
-def do_popen(command, log=True, force_en_env=False):
-    """Connect via Popen and log the result."""
+def do_popen(command, log=True, force_en_env=False, timeout: Optional[float] = None):
+    """Connect via Popen and log the result - a command running longer than timeout is killed."""
+    env = None
     if force_en_env:  # force an english environment
-        force_en_env = os.environ.copy()
-        force_en_env["LC_ALL"] = "C"
-        stdout, stderr = Popen(command, stdout=PIPE, stderr=PIPE, env=force_en_env).communicate()
-    else:
-        stdout, stderr = Popen(command, stdout=PIPE, stderr=PIPE).communicate()
+        env = os.environ.copy()
+        env["LC_ALL"] = "C"
+    process = Popen(command, stdout=PIPE, stderr=PIPE, env=env)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        stdout, stderr = process.communicate()
+        logger.warning("command %s killed after %ss", command[0], timeout)
     if log:
         logging.debug([output.decode(encoding="UTF-8") for output in [stdout, stderr]])
     return stdout.decode(encoding="UTF-8")
@@ -258,7 +510,8 @@ def git_name():
 def get_tags():
     """Get the last 3 tags from git."""
     git = git_name()
-    tags = [(tags, tags[1] + tags[-2:]) for tags in do_popen([git, "tag"], log=False).split("\n")[-4:-1]]
+    output = do_popen([git, "tag"], log=False, timeout=GIT_LOOKUP_TIMEOUT)
+    tags = [(tags, tags[1] + tags[-2:]) for tags in output.split("\n")[-4:-1]]
     return tags  # returns something like [('v0.9j', 09j'), ('v0.9k', '09k'), ('v0.9l', '09l')]
 
 
@@ -269,6 +522,25 @@ def checkout_tag(tag):
     do_popen(["pip3", "install", "-r", "requirements.txt"])
 
 
+def run_status_script(script_path: str, timeout: float = STATUS_SCRIPT_TIMEOUT) -> Optional[str]:
+    """Run a status script in its directory and return its stripped output, None on error or timeout.
+
+    The script runs in its own process group, on timeout the whole group (eg. a hanging git fetch) is killed."""
+    try:
+        process = Popen([script_path], cwd=os.path.dirname(script_path), stdout=PIPE, stderr=PIPE, text=True, start_new_session=True)
+    except OSError as exc:
+        logger.info("error running status script %s: %s", script_path, exc)
+        return None
+    try:
+        stdout, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        logger.warning("status script %s killed after %ss", script_path, timeout)
+        return None
+    return stdout.strip()
+
+
 def update_pico_engines():
     """Update picochess engines from github resource (asset) files"""
     script_path = "/opt/picochess/move-engines-to-backup.sh"
@@ -335,18 +607,19 @@ async def update_picochess(dgtpi: bool, auto_reboot: bool, dgttranslate: DgtTran
     """Update picochess from git."""
     git = git_name()
 
-    branch = do_popen([git, "rev-parse", "--abbrev-ref", "HEAD"], log=False).rstrip()
+    # all git calls block - run them in an executor so the clock keeps running
+    branch = (await asyncio.to_thread(do_popen, [git, "rev-parse", "--abbrev-ref", "HEAD"], log=False)).rstrip()
     if branch == "master":
         # Fetch remote repo
-        do_popen([git, "remote", "update"])
+        await asyncio.to_thread(do_popen, [git, "remote", "update"], timeout=GIT_REMOTE_TIMEOUT)
         # Check if update is needed - need to make sure, we get english answers
-        output = do_popen([git, "status", "-uno"], force_en_env=True)
+        output = await asyncio.to_thread(do_popen, [git, "status", "-uno"], force_en_env=True)
         if "up-to-date" not in output and "Your branch is ahead of" not in output:
-            DispatchDgt.fire(dgttranslate.text("Y25_update"))
+            await DispatchDgt.fire(dgttranslate.text("Y25_update"))
             # Update
             logging.debug("updating picochess")
-            do_popen([git, "pull", "origin", branch])
-            do_popen(["pip3", "install", "-r", "requirements.txt"])
+            await asyncio.to_thread(do_popen, [git, "pull", "origin", branch], timeout=GIT_REMOTE_TIMEOUT)
+            await asyncio.to_thread(do_popen, ["pip3", "install", "-r", "requirements.txt"])
             if auto_reboot:
                 reboot(dgtpi, dev="web")
         else:
@@ -436,7 +709,9 @@ def reboot(dgtpi: bool, dev: str):
 
 def _get_internal_ip() -> Optional[str]:
     try:
-        iproute = subprocess.run(["ip", "-j", "route", "get", "8.8.8.8"], capture_output=True)
+        iproute = subprocess.run(
+            ["ip", "-j", "route", "get", "8.8.8.8"], capture_output=True, timeout=INTERNAL_IP_TIMEOUT
+        )
         routes = json.loads(iproute.stdout)
         if routes:
             gateway = routes[0]["gateway"]
@@ -461,7 +736,7 @@ def get_location():
     # to `ip -4 addr show` (e.g., wlan0/eth0) for offline-friendly IP display.
     if int_ip := get_internal_ip():
         try:
-            response = urllib.request.urlopen("https://ipv4.geojs.io/v1/ip/geo.json", timeout=4)
+            response = urllib.request.urlopen("https://ipv4.geojs.io/v1/ip/geo.json", timeout=LOCATION_TIMEOUT)
             j = json.loads(response.read().decode())
 
             country_name = j.get("country", "")
@@ -475,6 +750,28 @@ def get_location():
     return "?", None, None
 
 
+# Shared lookups for the event loop: the lambdas resolve the function at call time.
+location_lookup = AsyncLookup(
+    "location", lambda: get_location(), ttl=6 * 3600, timeout=LOCATION_TIMEOUT + 1, default=("?", None, None)
+)
+internal_ip_lookup = AsyncLookup(
+    "internal ip", lambda: _get_internal_ip(), ttl=10, timeout=INTERNAL_IP_TIMEOUT + 0.5, default=None, retry_ttl=5
+)
+tags_lookup = AsyncLookup("git tags", lambda: get_tags(), ttl=3600, timeout=GIT_LOOKUP_TIMEOUT + 0.5, default=[])
+update_status_lookup = AsyncLookup(
+    "update status",
+    lambda: run_status_script("/opt/picochess/check-update-status.sh"),
+    ttl=3600,
+    timeout=STATUS_SCRIPT_TIMEOUT + 0.5,
+)
+git_status_lookup = AsyncLookup(
+    "git status",
+    lambda: run_status_script("/opt/picochess/check-git-status.sh"),
+    ttl=3600,
+    timeout=STATUS_SCRIPT_TIMEOUT + 0.5,
+)
+
+
 def write_picochess_ini(key: str, value):
     """Update picochess.ini config file with key/value."""
     try:
@@ -0,0 +1,157 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Variant boards for the display, web and PGN layers. PicochessState keeps
+# the one authoritative variant board in step with push_move/pop_move, the
+# game copies it sends out carry a read-only snapshot of that board so the
+# receivers do not replay the move stack to get a variant FEN.
+
+import logging
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.variant  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# variants with their own board class - kingofthehill plays on a standard board
+VARIANT_BOARDS = {
+    "atomic": chess.variant.AtomicBoard,
+    "antichess": chess.variant.AntichessBoard,
+    "racingkings": chess.variant.RacingKingsBoard,
+    "3check": chess.variant.ThreeCheckBoard,
+}
+
+
+def in_step(variant_board: chess.Board, game: chess.Board) -> bool:
+    """Return True if variant_board has played the same moves as game (checked on the last move only)."""
+    stack = variant_board.move_stack
+    moves = game.move_stack
+    return len(stack) == len(moves) and (not moves or stack[-1] == moves[-1])
+
+
+class VariantSnapshot(object):
+    """Read-only copy of the variant board at one position of a game.
+
+    The copy is made without move history, so taking a snapshot costs the same
+    at move 5 and at move 150. A snapshot only describes the game it was taken
+    for - use snapshot_of() which checks that the game has not moved on."""
+
+    __slots__ = ("variant", "ply", "last_move", "_board")
+
+    def __init__(self, variant: str, board: chess.Board, ply: int, last_move: chess.Move | None):
+        self.variant = variant
+        self.ply = ply
+        self.last_move = last_move
+        self._board = board
+
+    @classmethod
+    def of(cls, variant: str, variant_board: chess.Board) -> "VariantSnapshot":
+        stack = variant_board.move_stack
+        return cls(variant, variant_board.copy(stack=False), len(stack), stack[-1] if stack else None)
+
+    def matches(self, game: chess.Board) -> bool:
+        moves = game.move_stack
+        return len(moves) == self.ply and (not moves or moves[-1] == self.last_move)
+
+    def after(self, move: chess.Move) -> "VariantSnapshot":
+        """Snapshot of the position after move, eg. for the ponder (hint) position."""
+        board = self._board.copy(stack=False)
+        board.push(move)
+        return VariantSnapshot(self.variant, board, self.ply + 1, move)
+
+    def fen(self) -> str:
+        return self._board.fen()
+
+    def board_fen(self) -> str:
+        return self._board.board_fen()
+
+    def result(self) -> str:
+        return self._board.result()
+
+    def board(self) -> chess.Board:
+        """A variant board at this position to check or push moves on - without move history."""
+        return self._board.copy(stack=False)
+
+
+def attach_snapshot(game: chess.Board, snapshot: VariantSnapshot | None) -> chess.Board:
+    """Attach snapshot to game (a copy about to be sent out) and return game."""
+    if snapshot is not None:
+        game._variant_snapshot = snapshot
+    return game
+
+
+def snapshot_of(game: chess.Board) -> VariantSnapshot | None:
+    """The variant snapshot attached to game, None if there is none or game has moved on since."""
+    snapshot = getattr(game, "_variant_snapshot", None)
+    if snapshot is not None and snapshot.matches(game):
+        return snapshot
+    return None
+
+
+def copy_variant_info(source: chess.Board, game: chess.Board) -> chess.Board:
+    """Carry the variant name and snapshot over to game - chess.Board.copy() drops them."""
+    variant_name = getattr(source, "_variant_name", None)
+    if variant_name:
+        game._variant_name = variant_name
+    return attach_snapshot(game, getattr(source, "_variant_snapshot", None))
+
+
+def replay_variant_board(game: chess.Board, variant: str) -> chess.Board | None:
+    """Variant board built by replaying the move stack of game - for a game without snapshot only."""
+    board_class = VARIANT_BOARDS.get(variant)
+    if board_class is None:
+        return None
+    try:
+        board = board_class()
+        for move in game.move_stack:
+            board.push(move)
+    except Exception as exc:
+        logger.warning("%s replay failed: %s", variant, exc)
+        return None
+    return board
+
+
+def variant_fen(game: chess.Board, variant: str) -> str | None:
+    """FEN of game with variant rules applied, None for standard chess or moves illegal in the variant."""
+    snapshot = snapshot_of(game)
+    if snapshot is not None and snapshot.variant == variant:
+        return snapshot.fen()
+    board = replay_variant_board(game, variant)
+    return board.fen() if board is not None else None
+
+
+def variant_pgn_game(game: chess.Board, variant: str) -> chess.pgn.Game:
+    """PGN game of game with the variant header, so SAN is written by the variant rules.
+
+    With a snapshot the moves are added to the tree without playing them, the
+    SAN is computed once by the exporter."""
+    board_class = VARIANT_BOARDS.get(variant)
+    if board_class is None:
+        return chess.pgn.Game.from_board(game)
+    snapshot = snapshot_of(game)
+    if snapshot is None or snapshot.variant != variant:
+        board = replay_variant_board(game, variant)
+        return chess.pgn.Game.from_board(board if board is not None else game)
+    pgn_game = chess.pgn.Game()
+    pgn_game.setup(board_class(game.root().fen()))
+    node = pgn_game
+    for move in game.move_stack:
+        node = node.add_variation(move)
+    pgn_game.headers["Result"] = snapshot.result()
+    return pgn_game
@@ -183,12 +183,17 @@ function playNextBackendAudio() {
     }
 
     var clip = backendAudioQueue.shift();
-    if (!clip || !clip.base64) {
+    if (!clip || (!clip.url && !clip.base64)) {
         return;
     }
 
     backendAudioPlaying = true;
-    backendAudioElement = new Audio("data:" + (clip.mime_type || "audio/ogg") + ";base64," + clip.base64);
+    // voice clips come as a versioned URL the browser caches; base64 is the fallback
+    if (clip.url) {
+        backendAudioElement = new Audio(clip.url);
+    } else {
+        backendAudioElement = new Audio("data:" + (clip.mime_type || "audio/ogg") + ";base64," + clip.base64);
+    }
     if (clip.rate && clip.rate > 0) {
         backendAudioElement.playbackRate = clip.rate;
     }
@@ -1346,10 +1351,10 @@ var onSnapEnd = async function (source, target) {
     stopAnalysis();
     updateCurrentPosition(move, tmpGame);
     updateChessGround();
-    $.post('/channel', {
+    sendCommand({
         action: 'move', fen: currentPosition.fen, source: source, target: target,
         promotion: move.promotion ? move.promotion : ''
-    }, function (data) { });
+    });
     updateStatus();
 };
 
@@ -1361,10 +1366,10 @@ async function promotionDialog(ucimove) {
     var tmpGame = createGamePointer();
     var move = await getMove(tmpGame, source, target);
     if (move !== null) {
-        $.post('/channel', {
+        sendCommand({
             action: 'promotion', fen: currentPosition.fen, source: source, target: target,
             promotion: move.promotion ? move.promotion : ''
-        }, function (data) { });
+        });
     }
 }
 
@@ -1739,7 +1744,7 @@ function newBoard(fen) {
 }
 
 function clockButton0() {
-    $.post('/channel', { action: 'clockbutton', button: 0 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 0 });
 }
 
 function setClockMenuActive(active) {
@@ -1783,19 +1788,19 @@ function setClockMenuActive(active) {
 }
 
 function clockButton1() {
-    $.post('/channel', { action: 'clockbutton', button: 1 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 1 });
 }
 
 function clockButton2() {
-    $.post('/channel', { action: 'clockbutton', button: 2 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 2 });
 }
 
 function clockButton3() {
-    $.post('/channel', { action: 'clockbutton', button: 3 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 3 });
 }
 
 function clockButton4() {
-    $.post('/channel', { action: 'clockbutton', button: 4 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 4 });
 }
 
 function toggleLeverButton() {
@@ -1805,19 +1810,19 @@ function toggleLeverButton() {
     if ($('#leverDown').is(':hidden')) {
         button = -0x40;
     }
-    $.post('/channel', { action: 'clockbutton', button: button }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: button });
 }
 
 function clockButtonPower() {
-    $.post('/channel', { action: 'clockbutton', button: 0x11 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 0x11 });
 }
 
 function clockSwitchSides() {
-    $.post('/channel', { action: 'clockbutton', button: 0x40 }, function (data) { });
+    sendCommand({ action: 'clockbutton', button: 0x40 });
 }
 
 function clockPauseResume() {
-    $.post('/channel', { action: 'pause_resume' }, function (data) { });
+    sendCommand({ action: 'pause_resume' });
 }
 
 function clockShowEvaluation() {
@@ -1865,12 +1870,12 @@ function setPositionFromCurrentPgn() {
     var fen = node.fen;
     var pgnPrefix = buildPgnPrefixForNode(node);
     console.log('Setting position to FEN:', fen);
-    return $.post('/channel', {
+    return sendCommand({
         action: 'set_position',
         fen: fen,
         pgn: pgnPrefix,
         uci960: chessGameType === 1 ? 'true' : 'false'
-    }, function (data) {
+    }).done(function (data) {
         console.log('Position set response:', data);
         goToPosition(fen);
         removeHighlights();
@@ -2434,9 +2439,156 @@ function analyze(position_update) {
     );
 }
 
+// Sequence number of the last live game message applied to the move tree.
+// Move events carry only the new ply; a gap means a message was missed and
+// the full game is requested again over the websocket.
+var liveGameSeq = null;
+var eventSocket = null;
+
+function requestGameResync() {
+    liveGameSeq = null;
+    if (eventSocket && eventSocket.readyState === WebSocket.OPEN) {
+        eventSocket.send(JSON.stringify({ event: 'resync' }));
+    }
+}
+
+// Board and clock actions go over the event websocket as commands with an
+// id; the server answers with an 'Ack' event carrying the same id. Remote
+// clients authenticate once per session with a token from /channel/token,
+// asked for only when a command is rejected. Without an open socket the
+// action is posted to /channel as before.
+var commandSeq = 0;
+var pendingCommands = {};
+var sessionToken = null;
+
+function sendCommand(params) {
+    if (!eventSocket || eventSocket.readyState !== WebSocket.OPEN) {
+        return $.post('/channel', params);
+    }
+    var deferred = $.Deferred();
+    sendSocketCommand(params, deferred, false);
+    return deferred.promise();
+}
+
+function sendSocketCommand(params, deferred, retried) {
+    var id = ++commandSeq;
+    pendingCommands[id] = { params: params, deferred: deferred, retried: retried };
+    eventSocket.send(JSON.stringify($.extend({ id: id }, params)));
+}
+
+function authenticateEventSocket(done) {
+    if (!sessionToken || !eventSocket || eventSocket.readyState !== WebSocket.OPEN) {
+        if (done) done(false);
+        return;
+    }
+    var deferred = $.Deferred();
+    sendSocketCommand({ action: 'auth', token: sessionToken }, deferred, true);
+    deferred.always(function () {
+        if (done) done(deferred.state() === 'resolved');
+    });
+}
+
+function commandAcknowledged(data) {
+    var pending = pendingCommands[data.id];
+    if (!pending) {
+        return;
+    }
+    delete pendingCommands[data.id];
+    var result = data.result || {};
+    if (data.status < 400) {
+        pending.deferred.resolve(result);
+    } else if (data.status === 401 && !pending.retried) {
+        // get a fresh token (the browser asks for the login), then try once more
+        $.get('/channel/token', function (tokenData) {
+            sessionToken = tokenData.token;
+            authenticateEventSocket(function () {
+                if (eventSocket && eventSocket.readyState === WebSocket.OPEN) {
+                    sendSocketCommand(pending.params, pending.deferred, true);
+                } else {
+                    pending.deferred.reject({ status: 0, responseJSON: {} });
+                }
+            });
+        }).fail(function () {
+            pending.deferred.reject({ status: 401, responseJSON: result });
+        });
+    } else {
+        pending.deferred.reject({ status: data.status, responseJSON: result });
+    }
+}
+
+function failPendingCommands() {
+    $.each(pendingCommands, function (id, pending) {
+        pending.deferred.reject({ status: 0, responseJSON: {} });
+    });
+    pendingCommands = {};
+}
+
+function appendLivePly(data) {
+    // Follow the live game by one ply - false if the move tree is out of step.
+    if (liveGameSeq === null || data.seq !== liveGameSeq + 1 || !gameHistory) {
+        return false;
+    }
+    var last = fenHash['last'] || gameHistory;
+    var board = new Chess(last.fen || setupBoardFen, chessGameType);
+    var move = board.move(data.ply.uci, { sloppy: true });
+    if (move === null) {
+        return false; // variant move chess.js cannot play
+    }
+    var node = null;
+    (last.variations || []).forEach(function (child) {
+        if (!node && child.move && child.move.san === move.san) {
+            node = child; // already entered on the web board
+        }
+    });
+    if (!node) {
+        node = addNewMove({ 'move': move }, last, board.fen()).node;
+        writeLivePly(last, node);
+    }
+    fenHash['last'] = node;
+    liveGameSeq = data.seq;
+    if (computerside == "" || move.color != computerside) {
+        saymove(move, board); // announce user move
+    }
+    return true;
+}
+
+function writeLivePly(last, node) {
+    // A new mainline leaf only adds its own tokens at the end of the written
+    // move list - anything else (a sideline, a list not ending with the
+    // previous ply) needs the full export.
+    var result = $(pgnEl).find('.gameMoves > .gameResult');
+    var written = result.prev().children('a.fen').attr('data-fen');
+    var inStep = last === gameHistory ? !result.prev().length : written === last.fen;
+    if (node.is_mainline && last.variations.length === 1 && result.length && inStep) {
+        var board = new Chess(last.fen || setupBoardFen, chessGameType);
+        board.fullmove_number = Math.ceil(node.half_move_num / 2);
+        var afterVariation = Boolean(last.previous && last.previous.variations.length > 1);
+        var exporter = new WebExporter();
+        exporter.put_fullmove_number(board.turn(), board.fullmove_number, afterVariation);
+        exporter.put_move(board, node.move);
+        result.before(exporter.toString() + ' ');
+        bindPgnFenLinks();
+        return;
+    }
+    var fullExporter = new WebExporter();
+    exportGame(gameHistory, fullExporter, true, true, undefined, false);
+    writeVariationTree(pgnEl, fullExporter.toString(), gameHistory);
+}
+
 function updateDGTPosition(data) {
     setLivePgnTreeActive(true);
     var preserveExplore = webExploreMode;
+    if (data.ply) {
+        if (!appendLivePly(data)) {
+            requestGameResync();
+            return;
+        }
+        if (!goToPosition(data.fen, { preserveExplore: preserveExplore })) {
+            forcePosition(data.fen);
+        }
+        return;
+    }
+    liveGameSeq = data.seq === undefined ? null : data.seq;
     if (data.play === 'reload') {
         // Takeback / switch-sides: always rebuild the move tree from the
         // fresh PGN so the diagram and move list are in sync, even when
@@ -3482,10 +3634,12 @@ $(function () {
 
         function connectWebSocket() {
             var ws = new WebSocket('ws://' + location.host + '/event');
+            eventSocket = ws;
 
             ws.onopen = function () {
                 // Reset backoff on successful connection.
                 wsReconnectDelay = 2000;
+                authenticateEventSocket();
                 stopAnalysisClock();
                 // Ensure placeholders are visible while waiting for first messages.
                 setEngineLinePlaceholder();
@@ -3496,6 +3650,9 @@ $(function () {
             ws.onmessage = function (e) {
                 var data = JSON.parse(e.data);
                 switch (data.event) {
+                    case 'Ack':
+                        commandAcknowledged(data);
+                        break;
                     case 'Fen':
                         pickPromotion(null) // reset promotion dialog if still showing
                         clearBrainHint();
@@ -3527,6 +3684,7 @@ $(function () {
                         }
                         break;
                     case 'Game':
+                        liveGameSeq = data.seq === undefined ? null : data.seq;
                         resetWebExploreForPlayablePosition();
                         _tutorMoveActive = false;
                         clearBrainHint();
@@ -3564,6 +3722,9 @@ $(function () {
                     case 'Message':
                         boardStatusEl.html(data.msg);
                         break;
+                    case 'AnnotateProgress':
+                        boardStatusEl.text('Annotating ' + data.file + ': ' + data.done + '/' + data.total);
+                        break;
                     case 'Clock':
                         if (!isAnalysisClockMode()) {
                             dgtClockTextEl.html(data.msg);
@@ -3721,6 +3882,7 @@ $(function () {
 
             ws.onclose = function () {
                 dgtClockStatusEl.html('connecting…');
+                failPendingCommands();
                 // Stop client-side web analysis (in-browser Stockfish).
                 // Server-side analysis display is preserved; the server will
                 // re-send the cached analysis payload on reconnect.
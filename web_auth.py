@@ -0,0 +1,162 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#                         Johan Sjöblom (messier109@gmail.com)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Login sessions for the password protected web pages. PAM checks the
+# basic-auth password once, the client then presents a session cookie or
+# token which is looked up in memory - no PAM call per request.
+
+import base64
+import logging
+import math
+import secrets
+import time
+
+import pam
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE = "picochess_session"
+TOKEN_HEADER = "X-Session-Token"
+
+
+class SessionTokens(object):
+    """Sessions of logged in web users, kept in memory only - a restart logs everybody out."""
+
+    LIFETIME = 12 * 3600  # seconds
+    MAX_SESSIONS = 256
+
+    def __init__(self):
+        self.sessions: dict[str, tuple[str, float]] = {}  # token -> (username, expires)
+
+    def issue(self, username: str, now: float | None = None) -> str:
+        now = time.time() if now is None else now
+        self._expire(now)
+        while len(self.sessions) >= self.MAX_SESSIONS:
+            del self.sessions[next(iter(self.sessions))]  # oldest session first
+        token = secrets.token_urlsafe(32)
+        self.sessions[token] = (username, now + self.LIFETIME)
+        return token
+
+    def verify(self, token: str | None, now: float | None = None) -> str | None:
+        """Return the user name of a known, unexpired session token, otherwise None."""
+        session = self.sessions.get(token or "")
+        if session is None:
+            return None
+        username, expires = session
+        if expires < (time.time() if now is None else now):
+            del self.sessions[token]
+            return None
+        return username
+
+    def revoke(self, token: str):
+        self.sessions.pop(token, None)
+
+    def _expire(self, now: float):
+        for token in [token for token, (_, expires) in self.sessions.items() if expires < now]:
+            del self.sessions[token]
+
+
+class LoginThrottle(object):
+    """Per client IP backoff after failed logins.
+
+    The first few failures are free (typos), then each failure doubles the
+    time before PAM is asked again for that IP."""
+
+    FREE_FAILURES = 3
+    BASE_DELAY = 2.0  # seconds
+    MAX_DELAY = 300.0
+    MAX_ADDRESSES = 1024
+
+    def __init__(self):
+        self.failures: dict[str, tuple[int, float]] = {}  # ip -> (failures, blocked until)
+
+    def retry_after(self, ip: str, now: float | None = None) -> float:
+        """Seconds until ip may try again, 0 if it may try now."""
+        _, blocked_until = self.failures.get(ip, (0, 0.0))
+        return max(0.0, blocked_until - (time.time() if now is None else now))
+
+    def failed(self, ip: str, now: float | None = None):
+        now = time.time() if now is None else now
+        count = self.failures.pop(ip, (0, 0.0))[0] + 1
+        blocked_until = 0.0
+        if count > self.FREE_FAILURES:
+            blocked_until = now + min(self.MAX_DELAY, self.BASE_DELAY * 2 ** (count - self.FREE_FAILURES - 1))
+        while len(self.failures) >= self.MAX_ADDRESSES:
+            del self.failures[next(iter(self.failures))]
+        self.failures[ip] = (count, blocked_until)
+        if blocked_until:
+            logger.warning("%d failed logins from %s, next try in %.0fs", count, ip, blocked_until - now)
+
+    def succeeded(self, ip: str):
+        self.failures.pop(ip, None)
+
+
+session_tokens = SessionTokens()
+login_throttle = LoginThrottle()
+
+
+def basic_credentials(auth_header: str | None) -> tuple[str, str] | None:
+    """(username, password) of a basic Authorization header, None if missing or broken."""
+    if not auth_header or not auth_header.startswith("Basic "):
+        return None
+    try:
+        username, password = base64.b64decode(auth_header[6:]).decode("utf-8").split(":", 1)
+    except Exception:
+        return None
+    return username, password
+
+
+def session_user(handler) -> str | None:
+    """User of the session token header or session cookie of the request, None without a session."""
+    user = session_tokens.verify(handler.request.headers.get(TOKEN_HEADER))
+    if user is None:
+        user = session_tokens.verify(handler.get_cookie(SESSION_COOKIE))
+    return user
+
+
+def authenticate_request(handler, realm: str) -> bool:
+    """Authenticate a tornado request by session, or by basic auth through PAM and start a session.
+
+    Answers the request with 401 (or 429 while the client IP is backing off
+    after failed logins) and returns False if not authenticated."""
+    user = session_user(handler)
+    if user is not None:
+        handler.current_user = user
+        return True
+    ip = handler.request.remote_ip or ""
+    wait = login_throttle.retry_after(ip)
+    if wait > 0:
+        handler.set_status(429)
+        handler.set_header("Retry-After", str(math.ceil(wait)))
+        handler.finish("Too many failed logins")
+        return False
+    credentials = basic_credentials(handler.request.headers.get("Authorization"))
+    if credentials is not None and not pam.pam().authenticate(*credentials):
+        login_throttle.failed(ip)
+        credentials = None
+    if credentials is None:
+        handler.set_status(401)
+        handler.set_header("WWW-Authenticate", f'Basic realm="{realm}"')
+        handler.finish("Authentication required")
+        return False
+    login_throttle.succeeded(ip)
+    username = credentials[0]
+    # plain http on the local network - a secure-only cookie would never be sent back
+    handler.set_cookie(SESSION_COOKIE, session_tokens.issue(username), httponly=True, samesite="Strict")
+    handler.current_user = username
+    return True